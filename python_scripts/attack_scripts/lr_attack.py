@@ -2,6 +2,11 @@ import requests
 import time
 import subprocess
 import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "monitoring"))
+import metrics  # noqa: E402
 
 # =========================
 # CONFIG
@@ -12,18 +17,34 @@ ENCLAVE = "my-testnet"
 NumberOfAttacks = 400
 PauseBetweenAttacks = 0
 ChanceOfAttack = 1
+SecondsPerSlot = 12
+MetricsPort = 9102                        # Prometheus text on http://127.0.0.1:9102/metrics, None to disable
+MetricsFile = "lr_attack_metrics.json"    # JSON snapshot, None to disable
 
 # =========================
 # get functions and helper functions
 # =========================
 
+GenesisTime = None
+
 def get_head_slot():                  #get current slot number
-    r = requests.get(f"{BEACON_API}/eth/v1/beacon/headers/head", timeout=5)
+    with metrics.timed(metrics.HTTP_REQUESTS, endpoint="/eth/v1/beacon/headers/head"):
+        r = requests.get(f"{BEACON_API}/eth/v1/beacon/headers/head", timeout=5)
     r.raise_for_status()
     return int(r.json()["data"]["header"]["message"]["slot"])
 
+def get_slot_start(slot):             #unix time at which slot starts
+    global GenesisTime
+    if GenesisTime is None:
+        with metrics.timed(metrics.HTTP_REQUESTS, endpoint="/eth/v1/beacon/genesis"):
+            r = requests.get(f"{BEACON_API}/eth/v1/beacon/genesis", timeout=5)
+        r.raise_for_status()
+        GenesisTime = int(r.json()["data"]["genesis_time"])
+    return GenesisTime + slot * SecondsPerSlot
+
 def get_last_proposer_of_epoch(epoch):
-    r = requests.get(f"{BEACON_API}/eth/v1/validator/duties/proposer/{epoch}")
+    with metrics.timed(metrics.HTTP_REQUESTS, endpoint="/eth/v1/validator/duties/proposer/{id}"):
+        r = requests.get(f"{BEACON_API}/eth/v1/validator/duties/proposer/{epoch}")
     r.raise_for_status()              #check if api reachable
     j = r.json()
     print("\n Plan on Attacking Validator ", j["data"][-1]["validator_index"], " at Slot ", j["data"][-1]["slot"])
@@ -44,6 +65,12 @@ def get_validator_client(index):
     else:
         return "cl-5-prysm-nethermind"
     
+def kurtosis_service(action, cl):    #run "kurtosis service <action>" and record how long it took
+    start = time.perf_counter()
+    result = subprocess.run(["kurtosis", "service", action, ENCLAVE, cl])
+    metrics.KURTOSIS_ACTIONS.observe(time.perf_counter() - start, action=f"service {action}", service=cl,
+                                     outcome=metrics.OK if result.returncode == 0 else metrics.ERROR)
+
 def stop_client(cl):
     print(f"Stopping {cl}")
 
@@ -51,7 +78,8 @@ def stop_client(cl):
         print("targeted super node")
         return
 
-    subprocess.run(["kurtosis", "service", "stop", ENCLAVE, cl])
+    kurtosis_service("stop", cl)
+    metrics.CLIENTS_STOPPED.inc()
 
 def start_client(cl):
     print(f"Starting {cl}")
@@ -60,7 +88,8 @@ def start_client(cl):
         print("targeted super node, didnt get stopped")
         return
 
-    subprocess.run(["kurtosis", "service", "start", ENCLAVE, cl])
+    kurtosis_service("start", cl)
+    metrics.CLIENTS_STOPPED.dec()
     
 # =========================
 # last revealer attack
@@ -102,13 +131,18 @@ def last_revealer_attack():           #start the attack
         raise Exception("currSlot is not pre to last slot in epoch!")
 
     print(f"\nstopping client {cl} for 24 seconds at slot {currSlot} of {currEpoch}")
+    metrics.SLOT_OFFSET.observe(time.time() - get_slot_start(lastSlot), action="stop")
     stop_client(cl)
+    stopTime = time.time()
     time.sleep(24)
 
     currSlot = get_head_slot()
     currEpoch = currSlot // 32
     print(f"\nstarting client {cl} at slot {currSlot} of {currEpoch}")
+    metrics.SLOT_OFFSET.observe(time.time() - get_slot_start(lastSlot), action="start")
     start_client(cl)
+    if cl is not None:
+        metrics.CLIENT_DOWNTIME.observe(time.time() - stopTime, client=cl)
 
 # =========================
 # main
@@ -116,17 +150,24 @@ def last_revealer_attack():           #start the attack
 
 def config_attack():      #while loop for repeating attacks, and prob. for chanche of attacks
     print(f"starting {NumberOfAttacks} Attacks with {PauseBetweenAttacks} epochs inbetween")
+    get_slot_start(0)     #fetch genesis time once, for the slot timing metrics
 
     AttackNumber = 0
     while AttackNumber < NumberOfAttacks:
         print(f"\nstarting attack number {AttackNumber}")
-        last_revealer_attack()
+        try:
+            last_revealer_attack()
+        except Exception:
+            metrics.ATTACK_ROUNDS.inc(strategy="last_revealer", outcome=metrics.ERROR)
+            raise
+        metrics.ATTACK_ROUNDS.inc(strategy="last_revealer", outcome=metrics.OK)
         AttackNumber += 1
         time.sleep(PauseBetweenAttacks * 60)
 
     print("\nAttackscript finished")
 
 if __name__ == "__main__":
+     metrics.start(port=MetricsPort, snapshot_file=MetricsFile)
      config_attack()     
 
 
@@ -2,6 +2,11 @@ import requests
 import time
 import subprocess
 import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "monitoring"))
+import metrics  # noqa: E402
 
 # =========================
 # CONFIG
@@ -15,20 +20,39 @@ PauseBetweenAttacks = 0        # in minutes
 NumberOfSlotsToAttack = 192      # how many slots per epoch to attack
 
 SLOTS_PER_EPOCH = 32
+SECONDS_PER_SLOT = 12
+
+METRICS_PORT = 9103                       # Prometheus text on http://127.0.0.1:9103/metrics, None to disable
+METRICS_FILE = "rb_attack_metrics.json"   # JSON snapshot, None to disable
 
 
 # =========================
 # Helper Functions
 # =========================
 
+genesis_time = None
+
+
 def get_head_slot():
-    r = requests.get(f"{BEACON_API}/eth/v1/beacon/headers/head", timeout=5)
+    with metrics.timed(metrics.HTTP_REQUESTS, endpoint="/eth/v1/beacon/headers/head"):
+        r = requests.get(f"{BEACON_API}/eth/v1/beacon/headers/head", timeout=5)
     r.raise_for_status()
     return int(r.json()["data"]["header"]["message"]["slot"])
 
 
+def get_slot_start(slot):
+    global genesis_time
+    if genesis_time is None:
+        with metrics.timed(metrics.HTTP_REQUESTS, endpoint="/eth/v1/beacon/genesis"):
+            r = requests.get(f"{BEACON_API}/eth/v1/beacon/genesis", timeout=5)
+        r.raise_for_status()
+        genesis_time = int(r.json()["data"]["genesis_time"])
+    return genesis_time + slot * SECONDS_PER_SLOT
+
+
 def get_proposer_duties(epoch):
-    r = requests.get(f"{BEACON_API}/eth/v1/validator/duties/proposer/{epoch}")
+    with metrics.timed(metrics.HTTP_REQUESTS, endpoint="/eth/v1/validator/duties/proposer/{id}"):
+        r = requests.get(f"{BEACON_API}/eth/v1/validator/duties/proposer/{epoch}")
     r.raise_for_status()
     return r.json()["data"]
 
@@ -61,18 +85,27 @@ def get_validator_client(index):
 # Client Control
 # =========================
 
+def kurtosis_service(action, cl):
+    start = time.perf_counter()
+    result = subprocess.run(["kurtosis", "service", action, ENCLAVE, cl])
+    metrics.KURTOSIS_ACTIONS.observe(time.perf_counter() - start, action=f"service {action}", service=cl,
+                                     outcome=metrics.OK if result.returncode == 0 else metrics.ERROR)
+
+
 def stop_client(cl):
     if cl is None:
         return
     print(f"Stopping {cl}")
-    subprocess.run(["kurtosis", "service", "stop", ENCLAVE, cl])
+    kurtosis_service("stop", cl)
+    metrics.CLIENTS_STOPPED.inc()
 
 
 def start_client(cl):
     if cl is None:
         return
     print(f"Starting {cl}")
-    subprocess.run(["kurtosis", "service", "start", ENCLAVE, cl])
+    kurtosis_service("start", cl)
+    metrics.CLIENTS_STOPPED.dec()
 
 
 # =========================
@@ -134,7 +167,9 @@ def attack_selected_slots(attack_list):
 
             if curr_slot >= slot - 1:
                 print(f"Stopping {cl} at slot {curr_slot}")
+                metrics.SLOT_OFFSET.observe(time.time() - get_slot_start(slot), action="stop")
                 stop_client(cl)
+                stop_time = time.time()
                 break
 
             time.sleep(0.5)
@@ -150,7 +185,10 @@ def attack_selected_slots(attack_list):
 
 
         print(f"Restarting {cl}")
+        metrics.SLOT_OFFSET.observe(time.time() - get_slot_start(slot), action="start")
         start_client(cl)
+        if cl is not None:
+            metrics.CLIENT_DOWNTIME.observe(time.time() - stop_time, client=cl)
 
 
 # =========================
@@ -183,12 +221,18 @@ def epoch_attack():
 def config_attack():
 
     print(f"Starting {NumberOfAttacks} attack rounds")
+    get_slot_start(0)   # genesis time, fetched once for the slot timing metrics
 
     attack_number = 0
 
     while attack_number < NumberOfAttacks:
         print(f"\n=== Attack Round {attack_number} ===")
-        epoch_attack()
+        try:
+            epoch_attack()
+        except Exception:
+            metrics.ATTACK_ROUNDS.inc(strategy="random_block", outcome=metrics.ERROR)
+            raise
+        metrics.ATTACK_ROUNDS.inc(strategy="random_block", outcome=metrics.OK)
         attack_number += 1
         time.sleep(PauseBetweenAttacks * 60)
 
@@ -196,5 +240,6 @@ def config_attack():
 
 
 if __name__ == "__main__":
+    metrics.start(port=METRICS_PORT, snapshot_file=METRICS_FILE)
     config_attack()
 
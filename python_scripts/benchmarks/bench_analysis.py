@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the statistics pipeline on synthetic seed sets.
+
+Generates reproducible seed sets (stat_analyse/synthetic_seeds.py) for each
+generator and size, then times and memory-profiles every analysis of
+analyze.py and analysis2.py on them. Each measurement is appended as one
+JSON line to a history file, so runs on different commits can be compared
+with --compare.
+
+Besides timings, every record keeps the headline statistic of the analysis
+(p-value, number of biased bits, ...). On the biased/correlated/constant
+generators these show whether a test actually detects the injected effect.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+ANALYZE_DIR = SCRIPT_DIR.parent / "stat_analyse"
+sys.path.insert(0, str(ANALYZE_DIR))
+
+import analysis2  # noqa: E402
+import synthetic_seeds  # noqa: E402
+from result_cache import json_default  # noqa: E402
+from stage_profiler import StageProfiler  # noqa: E402
+from timeline import change_epochs  # noqa: E402
+
+DEFAULT_HISTORY = SCRIPT_DIR / "bench_history.jsonl"
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+GENERATOR_PARAMS = {
+    'unbiased': {},
+    'biased': {'p': 0.52},
+    'correlated': {'flip_prob': 0.4},
+    'constant_injected': {'fraction': 0.1},
+}
+
+# analysis2.py's per-seed loop tests; above this many epochs they are skipped unless --no-limits
+LEGACY_MAX_EPOCHS = 10_000
+
+
+class Context:
+    """Data shared by the analyses of one (generator, size) dataset"""
+
+    def __init__(self, epochs, seed_bytes, out_dir):
+        self.epochs = epochs
+        self.seed_bytes = seed_bytes
+        self.out_dir = out_dir
+        self.analyzer = None
+        self.results = {}
+        self._bits = None
+
+    @property
+    def bits(self):
+        """Concatenated bitstream as analysis2.py sees it"""
+        if self._bits is None:
+            self._bits = np.unpackbits(self.seed_bytes.ravel()).astype(np.int64)
+        return self._bits
+
+
+def _analyze_load(ctx):
+    from analyze import RANDAOAnalyzer
+    ctx.analyzer = RANDAOAnalyzer.from_seeds(ctx.epochs, ctx.seed_bytes, output_dir=ctx.out_dir)
+    return {'n_samples': len(ctx.analyzer.epochs)}
+
+
+def _analyze_stage(name, method, **params):
+    def run(ctx):
+        ctx.results[name] = getattr(ctx.analyzer, method)(**params)
+        return METRICS[name](ctx.results[name])
+    return run
+
+
+def _analyze_summary(ctx):
+    summary = ctx.analyzer.generate_summary(ctx.results)
+    return {'assessment': summary['assessment'].split(' ')[0], 'issues': len(summary['issues'])}
+
+
+METRICS = {
+    'bit_bias': lambda r: {'biased_bits': len(r['biased_bits']), 'max_bias': r['max_bias']},
+    'hamming': lambda r: {'consecutive_mean': r['consecutive']['mean'],
+                          'p_value': r['consecutive_vs_random'].get('p_value')},
+    'entropy': lambda r: {'overall_entropy': r['overall_entropy']},
+    'autocorrelation': lambda r: {'significant_lags': len(r['significant_lags'])},
+    'min_entropy': lambda r: {'per_bit': r['min_entropy_per_bit'],
+                              'limiting': r['limiting_estimator']},
+    'timeline': lambda r: {'max_abs_bias_z': r['extremes']['max_abs_bias_z'],
+                           'change_points': sum(len(epochs)
+                                                for epochs in change_epochs(r).values())},
+    'linear_structure': lambda r: {'min_block_rank': r['rank']['blocks'].get('min_rank'),
+                                   'relations': r['relations']['total'],
+                                   'lc_p': r['linear_complexity']['p_value']},
+    'byte_transitions': lambda r: {'dependent_positions': len(r['dependent_positions']),
+                                   'min_p': r['min_p_value']},
+    'spectral': lambda r: {'dominant_periods': len(r['dominant_periods']),
+                           'dft_failures': len(r['dft_test']['failed_positions'])},
+}
+
+
+def _a2(func_name, source='bits', **params):
+    def run(ctx):
+        result = getattr(analysis2, func_name)(getattr(ctx, source), **params)
+        if isinstance(result, dict) and 'serial' in result:
+            return {'serial_p': result['serial']['p_value1'],
+                    'apen_p': result['approximate_entropy']['p_value'],
+                    'runs_p': result['runs']['p_value']}
+        if isinstance(result, dict):
+            return {k: v for k, v in result.items() if k in ('p_value', 'chi_square', 'z_score', 'min_entropy_per_bit')}
+        if isinstance(result, tuple):
+            return {'n': len(result[-1])}
+        return {'value': result}
+    run.source = source
+    return run
+
+
+# (name, function, max_epochs or None)
+ANALYSES = [
+    ('analyze.load', _analyze_load, None),
+    ('analyze.bit_bias', _analyze_stage('bit_bias', 'analyze_bit_bias'), None),
+    ('analyze.hamming', _analyze_stage('hamming', 'analyze_hamming_distances'), None),
+    ('analyze.entropy', _analyze_stage('entropy', 'analyze_shannon_entropy'), None),
+    ('analyze.autocorrelation', _analyze_stage('autocorrelation', 'analyze_autocorrelation'), None),
+    ('analyze.min_entropy', _analyze_stage('min_entropy', 'analyze_min_entropy'), None),
+    ('analyze.timeline', _analyze_stage('timeline', 'analyze_timeline'), None),
+    ('analyze.linear_structure', _analyze_stage('linear_structure', 'analyze_linear_structure'), None),
+    ('analyze.byte_transitions', _analyze_stage('byte_transitions', 'analyze_byte_transitions'), None),
+    ('analyze.spectral', _analyze_stage('spectral', 'analyze_spectrum'), None),
+    ('analyze.summary', _analyze_summary, None),
+    ('analysis2.monobit', _a2('monobit_test'), None),
+    ('analysis2.shannon_entropy', _a2('shannon_entropy'), None),
+    ('analysis2.min_entropy', _a2('min_entropy'), None),
+    ('analysis2.sp800_90b', _a2('sp800_90b_min_entropy'), None),
+    ('analysis2.serial_2bit', _a2('serial_test_2bit'), None),
+    ('analysis2.runs', _a2('runs_test'), None),
+    ('analysis2.m_bit_tests', _a2('m_bit_tests'), None),
+    ('analysis2.autocorrelation', _a2('autocorrelation'), None),
+    ('analysis2.hamming', _a2('seed_hamming_distances'), LEGACY_MAX_EPOCHS),
+]
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SCRIPT_DIR,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(generators, sizes, rng_seed, only=None, no_limits=False, trace_memory=True):
+    """Run every selected analysis on every (generator, size); returns history records"""
+    import tempfile
+
+    meta = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'host': socket.gethostname(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+    }
+    records = []
+    profiler = StageProfiler(trace_memory=trace_memory)
+
+    for generator in generators:
+        params = GENERATOR_PARAMS[generator]
+        for n in sizes:
+            gen_start = time.perf_counter()
+            epochs, seed_bytes = synthetic_seeds.generate(generator, n, seed=rng_seed, **params)
+            print(f"\n🧪 {generator} {params} n={n:,} (generated in {time.perf_counter() - gen_start:.2f}s)")
+
+            with tempfile.TemporaryDirectory() as out_dir:
+                ctx = Context(epochs, seed_bytes, out_dir)
+                for name, func, max_epochs in ANALYSES:
+                    if only and not any(sel in name for sel in only) and name != 'analyze.load':
+                        continue
+                    if max_epochs is not None and n > max_epochs and not no_limits:
+                        print(f"  {name:<28} skipped (n > {max_epochs:,})")
+                        continue
+
+                    if hasattr(func, 'source'):
+                        getattr(ctx, func.source)  # build the input outside the measurement
+                    with profiler.stage(name) as record:
+                        with contextlib.redirect_stdout(io.StringIO()):
+                            metric = func(ctx)
+                    record['metric'] = json.loads(json.dumps(metric, default=json_default))
+                    record['memory_traced'] = trace_memory
+
+                    records.append({**meta, 'generator': generator, 'params': params,
+                                    'n_epochs': n, 'rng_seed': rng_seed, **record})
+                    peak = record.get('peak_bytes')
+                    peak_str = f"{peak / 2**20:9.1f} MiB" if peak is not None else ""
+                    print(f"  {name:<28} {record['wall_s']:9.4f} s {peak_str}  {record['metric']}")
+
+    profiler.close()
+    return records
+
+
+def load_history(path):
+    if not Path(path).exists():
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(records, history):
+    """Print wall-time ratios against the most recent earlier run of the same measurement"""
+    def key(rec):
+        # tracemalloc slows Python-level loops a lot, so only compare like with like
+        return rec['generator'], rec['n_epochs'], rec['name'], rec.get('memory_traced', True)
+
+    previous = {key(rec): rec for rec in history}
+
+    print("\n📊 Comparison with previous runs (new / old wall time):")
+    for rec in records:
+        old = previous.get(key(rec))
+        if old is None:
+            continue
+        ratio = rec['wall_s'] / old['wall_s'] if old['wall_s'] > 0 else float('inf')
+        flag = "🐢" if ratio > 1.2 else ("🚀" if ratio < 0.8 else "  ")
+        print(f"  {flag} {rec['generator']:<18} n={rec['n_epochs']:<10,} {rec['name']:<28} "
+              f"{ratio:6.2f}x  ({old['wall_s']:.4f}s @ {old.get('commit')} → {rec['wall_s']:.4f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark RANDAO analyses on synthetic seed sets')
+    parser.add_argument('--generators', '-g', nargs='+', default=list(GENERATOR_PARAMS),
+                        choices=list(GENERATOR_PARAMS), help='Seed generators to benchmark')
+    parser.add_argument('--sizes', '-n', nargs='+', type=int, default=DEFAULT_SIZES,
+                        help=f'Dataset sizes in epochs (full range: {SIZES})')
+    parser.add_argument('--only', nargs='+', default=None,
+                        help='Only run analyses whose name contains one of these strings')
+    parser.add_argument('--rng-seed', type=int, default=0,
+                        help='Seed for the synthetic data generators')
+    parser.add_argument('--no-limits', action='store_true',
+                        help=f'Also run legacy analysis2 tests above {LEGACY_MAX_EPOCHS:,} epochs')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='Disable tracemalloc (lower overhead, no peak memory)')
+    parser.add_argument('--history', default=str(DEFAULT_HISTORY),
+                        help='JSONL file the results are appended to')
+    parser.add_argument('--compare', action='store_true',
+                        help='Compare against the previous run of each measurement in the history')
+    parser.add_argument('--no-save', action='store_true',
+                        help='Do not append results to the history file')
+    args = parser.parse_args()
+
+    history = load_history(args.history) if args.compare else []
+    records = run_benchmarks(args.generators, args.sizes, args.rng_seed, only=args.only,
+                             no_limits=args.no_limits, trace_memory=not args.no_memory)
+
+    if args.compare:
+        compare(records, history)
+
+    if not args.no_save:
+        with open(args.history, 'a') as f:
+            for rec in records:
+                f.write(json.dumps(rec, default=json_default) + "\n")
+        print(f"\n📄 {len(records)} measurements appended to {args.history}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for stat_analyse/analyze.py
+
+Measures what a batch job pays per call: the bare module import and a full
+`--basic` run in a fresh interpreter. It also checks that the basic path
+never pulls in the heavy modules (pandas, matplotlib, scipy, seaborn,
+pyarrow), so a stray top-level import shows up as a failure instead of a
+slow batch.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+ANALYZE_DIR = SCRIPT_DIR.parent / "stat_analyse"
+DEFAULT_LOG = SCRIPT_DIR.parent / "randao_seed_logger" / "geloggde_seeds" / "randao_log_config12_286ep_LR_attack.jsonl"
+
+HEAVY_MODULES = ["pandas", "matplotlib", "scipy", "seaborn", "pyarrow"]
+
+# Runs the basic analysis in-process and reports which heavy modules got imported
+HEAVY_CHECK = """
+import contextlib, io, json, sys
+sys.argv = ['analyze.py', '--basic', '--no-cache', '-l', {log!r}, '-o', {out!r}]
+import analyze
+with contextlib.redirect_stdout(io.StringIO()):
+    analyze.main()
+print(json.dumps(sorted(m for m in {heavy!r} if m in sys.modules)))
+"""
+
+
+def time_command(cmd, runs):
+    """Wall time (seconds) of `runs` fresh-interpreter executions of cmd"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=ANALYZE_DIR, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(name, timings):
+    print(f"  {name:<22} median {statistics.median(timings) * 1000:8.1f} ms   "
+          f"min {min(timings) * 1000:8.1f} ms   (n={len(timings)})")
+    return {'median_s': statistics.median(timings), 'min_s': min(timings), 'runs': len(timings)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark analyze.py startup and --basic runtime')
+    parser.add_argument('--log-file', '-l', default=str(DEFAULT_LOG),
+                        help='JSONL log used for the --basic run')
+    parser.add_argument('--runs', '-n', type=int, default=10,
+                        help='Number of fresh-interpreter runs per measurement')
+    parser.add_argument('--max-seconds', type=float, default=None,
+                        help='Fail if the median --basic run is slower than this')
+    parser.add_argument('--json', action='store_true',
+                        help='Print results as JSON')
+    args = parser.parse_args()
+
+    log_file = str(Path(args.log_file).resolve())
+    results = {}
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        print(f"⏱️  analyze.py startup benchmark ({args.runs} runs, {Path(log_file).name})")
+        results['interpreter'] = summarize(
+            "bare interpreter", time_command([sys.executable, "-c", "pass"], args.runs))
+        results['import'] = summarize(
+            "import analyze", time_command([sys.executable, "-c", "import analyze"], args.runs))
+        results['basic'] = summarize(
+            "analyze.py --basic",
+            time_command([sys.executable, "analyze.py", "--basic", "--no-cache", "-l", log_file, "-o", out_dir], args.runs))
+
+        check = subprocess.run(
+            [sys.executable, "-c", HEAVY_CHECK.format(log=log_file, out=out_dir, heavy=HEAVY_MODULES)],
+            cwd=ANALYZE_DIR, check=True, capture_output=True, text=True)
+        results['heavy_modules_loaded'] = json.loads(check.stdout.strip().splitlines()[-1])
+
+    failures = []
+    if results['heavy_modules_loaded']:
+        failures.append(f"--basic imported heavy modules: {', '.join(results['heavy_modules_loaded'])}")
+    if args.max_seconds is not None and results['basic']['median_s'] > args.max_seconds:
+        failures.append(f"--basic median {results['basic']['median_s']:.3f}s exceeds {args.max_seconds:.3f}s")
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ --basic stays on the NumPy-only path")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
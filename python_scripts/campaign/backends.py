@@ -0,0 +1,275 @@
+"""
+Network backends of the campaign runner
+
+Both backends expose the handful of beacon API calls (and the event stream)
+the logger and the attack strategies need, plus stopping and starting client
+services:
+
+- KurtosisBackend talks to a kurtosis enclave (optionally launching it from a
+  network_params YAML) and discovers the beacon API port itself.
+- FakeBackend simulates a chain in-process: spec proposer selection from the
+  RANDAO mix two epochs back, missed slots for stopped clients, finality two
+  epochs behind the head. Slots can be made short so a campaign runs in
+  seconds.
+"""
+
+import asyncio
+import hashlib
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from beacon import SLOTS_PER_EPOCH, BackendError, BeaconClient
+from proposers import MAX_EFFECTIVE_BALANCE, ProposerModel
+from reveals import DEFAULT_MNEMONIC, RevealSigner
+import metrics  # noqa: E402 (monitoring/ is put on sys.path by beacon)
+
+SECONDS_PER_SLOT = 12
+ETHEREUM_PACKAGE = "github.com/ethpandaops/ethereum-package"
+
+
+def client_of(groups: Dict[str, Tuple[int, int]], index: int) -> Optional[str]:
+    """Service name of the client running a validator index, None if outside every group"""
+    for name, (lo, hi) in groups.items():
+        if lo <= index < hi:
+            return name
+    return None
+
+# ==================== KURTOSIS ====================
+
+class KurtosisBackend:
+    """Beacon API of a kurtosis enclave; clients are stopped and started with the kurtosis CLI"""
+
+    seconds_per_slot = SECONDS_PER_SLOT
+
+    def __init__(self, enclave: str, beacon_service: str, beacon_api: Optional[str] = None,
+                 params_file: Optional[str] = None, launch: bool = False, teardown: bool = False,
+                 package: str = ETHEREUM_PACKAGE, mnemonic: str = DEFAULT_MNEMONIC):
+        self.enclave = enclave
+        self.beacon_service = beacon_service
+        self.beacon_api = beacon_api
+        self.params_file = params_file
+        self.launch = launch
+        self.teardown = teardown
+        self.package = package
+        self.mnemonic = mnemonic
+        self.beacon = None
+        self.signer = None
+        self.genesis = None
+        self.electra_epoch = None
+
+    async def _kurtosis(self, *args: str, service: str = '') -> str:
+        action = " ".join(args[:2]) if args[0] in ("service", "enclave", "port") else args[0]
+        with metrics.timed(metrics.KURTOSIS_ACTIONS, action=action, service=service):
+            process = await asyncio.create_subprocess_exec(
+                "kurtosis", *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
+            output, _ = await process.communicate()
+            text = output.decode(errors='replace').strip()
+            if process.returncode != 0:
+                raise BackendError(f"kurtosis {' '.join(args)} failed ({process.returncode}): {text}")
+        return text
+
+    async def start(self):
+        if self.launch:
+            print(f"🚀 Launching enclave {self.enclave} from {self.params_file}")
+            await self._kurtosis("run", "--enclave", self.enclave, self.package, "--args-file", str(self.params_file))
+        if self.beacon_api is None:
+            self.beacon_api = await self.discover_beacon_api()
+        self.beacon = BeaconClient(self.beacon_api)
+        await self.beacon.start()
+        print(f"🔌 Beacon API of {self.beacon_service}: {self.beacon_api}")
+        await self.wait_ready()
+        spec = await self.beacon.spec()
+        self.seconds_per_slot = int(spec["SECONDS_PER_SLOT"])
+        self.electra_epoch = int(spec.get("ELECTRA_FORK_EPOCH", 2**64 - 1))
+        self.genesis = await self.beacon.genesis_time()
+        self.signer = RevealSigner(self.mnemonic, self.beacon)
+
+    async def discover_beacon_api(self) -> str:
+        """Host URL of the beacon node's http port (kurtosis maps it to a random local port)"""
+        address = (await self._kurtosis("port", "print", self.enclave, self.beacon_service, "http",
+                                        service=self.beacon_service)).splitlines()[-1]
+        return address if "://" in address else f"http://{address}"
+
+    async def wait_ready(self, attempts: int = 60, interval: float = 2.0):
+        for attempt in range(attempts):
+            try:
+                await self.head_slot()
+                return
+            except BackendError as e:
+                if attempt == attempts - 1:
+                    raise BackendError(f"beacon API {self.beacon_api} not reachable: {e}") from e
+                await asyncio.sleep(interval)
+
+    async def close(self):
+        if self.beacon is not None:
+            await self.beacon.close()
+            self.beacon = None
+        if self.teardown:
+            print(f"🧹 Removing enclave {self.enclave}")
+            await self._kurtosis("enclave", "rm", "-f", self.enclave)
+
+    async def head_slot(self) -> int:
+        return await self.beacon.head_slot()
+
+    async def proposer_duties(self, epoch: int) -> Dict:
+        return await self.beacon.proposer_duties(epoch)
+
+    async def finalized_epoch(self) -> int:
+        return await self.beacon.finalized_epoch()
+
+    async def finalized_randao(self) -> str:
+        return await self.beacon.finalized_randao()
+
+    async def head_randao(self) -> str:
+        return await self.beacon.head_randao()
+
+    async def validators(self) -> Tuple[List[int], List[int]]:
+        return await self.beacon.active_validators()
+
+    async def randao_reveal(self, index: int, epoch: int) -> bytes:
+        return await self.signer.reveal(index, epoch)
+
+    def is_electra(self, epoch: int) -> bool:
+        return epoch >= self.electra_epoch
+
+    def slot_time(self, slot: int) -> float:
+        """Unix time at which slot starts"""
+        return self.genesis + slot * self.seconds_per_slot
+
+    def events(self, topics: List[str]) -> AsyncIterator[Tuple[str, Dict]]:
+        return self.beacon.events(topics, idle_timeout=4 * self.seconds_per_slot)
+
+    async def stop_service(self, name: str):
+        await self._kurtosis("service", "stop", self.enclave, name, service=name)
+
+    async def start_service(self, name: str):
+        await self._kurtosis("service", "start", self.enclave, name, service=name)
+
+# ==================== FAKE ====================
+
+class FakeBackend:
+    """
+    In-process chain simulation for local runs of the campaign machinery
+
+    Every slot the proposer (spec selection over equal 32 ETH validators,
+    seeded by the mix at the end of epoch - 2) XORs the hash of its reveal into
+    the mix unless its client is stopped, in which case the slot is missed and
+    the head does not advance. Reveals are deterministic per validator and
+    epoch, like the BLS signatures they stand in for.
+    """
+
+    def __init__(self, groups: Dict[str, Tuple[int, int]], seconds_per_slot: float = 0.1,
+                 seed: int = 0, finality_lag: int = 2):
+        self.groups = groups
+        self.n_validators = max(hi for _, hi in groups.values())
+        self.seconds_per_slot = seconds_per_slot
+        self.finality_lag = finality_lag
+        self.seed = seed
+        self.model = ProposerModel(range(self.n_validators), [MAX_EFFECTIVE_BALANCE] * self.n_validators,
+                                   electra=True)
+        # Like the eth1 block hash a real genesis state fills randao_mixes with
+        self.genesis_mix = hashlib.sha256(b"genesis" + seed.to_bytes(8, 'little')).digest()
+        self.mix = self.genesis_mix
+        self.epoch_mixes: Dict[int, bytes] = {}
+        self.stopped = set()
+        self.head = 0
+        self.slot = -1
+        self.missed = 0
+        self.genesis = None
+        self.genesis_time = None
+        self._ticker = None
+        self._subscribers: List[asyncio.Queue] = []
+
+    async def start(self):
+        self.genesis = time.monotonic()
+        self.genesis_time = time.time()
+        self._ticker = asyncio.create_task(self._run())
+        print(f"🧪 Fake chain: {self.n_validators} validators, {self.seconds_per_slot}s slots")
+
+    async def close(self):
+        if self._ticker is not None:
+            self._ticker.cancel()
+            await asyncio.gather(self._ticker, return_exceptions=True)
+            self._ticker = None
+
+    async def _run(self):
+        while True:
+            self._process_slot(self.slot + 1)
+            next_slot = self.genesis + (self.slot + 1) * self.seconds_per_slot
+            await asyncio.sleep(max(0.0, next_slot - time.monotonic()))
+
+    def _seed_mix(self, epoch: int) -> bytes:
+        return self.epoch_mixes.get(epoch - 2, self.genesis_mix)
+
+    def proposer_index(self, slot: int) -> int:
+        epoch = slot // SLOTS_PER_EPOCH
+        return int(self.model.epoch_proposers(self._seed_mix(epoch), epoch)[slot % SLOTS_PER_EPOCH])
+
+    def reveal(self, index: int, epoch: int) -> bytes:
+        digest = hashlib.sha256(b"fake-reveal" + self.seed.to_bytes(8, 'little') + index.to_bytes(8, 'little')
+                                + epoch.to_bytes(8, 'little')).digest()
+        return digest * 3
+
+    def _process_slot(self, slot: int):
+        proposer = self.proposer_index(slot)
+        if client_of(self.groups, proposer) in self.stopped:
+            self.missed += 1
+        else:
+            reveal = hashlib.sha256(self.reveal(proposer, slot // SLOTS_PER_EPOCH)).digest()
+            self.mix = bytes(a ^ b for a, b in zip(self.mix, reveal))
+            self.head = slot
+            for queue in self._subscribers:
+                queue.put_nowait(('head', {'slot': str(slot)}))
+        if slot % SLOTS_PER_EPOCH == SLOTS_PER_EPOCH - 1:
+            self.epoch_mixes[slot // SLOTS_PER_EPOCH] = self.mix
+        self.slot = slot
+
+    async def head_slot(self) -> int:
+        return self.head
+
+    async def proposer_duties(self, epoch: int) -> Dict:
+        if epoch > self.slot // SLOTS_PER_EPOCH + 1:
+            raise BackendError(f"duties of epoch {epoch} are not known yet")
+        first = epoch * SLOTS_PER_EPOCH
+        return {"dependent_root": "0x" + self._seed_mix(epoch).hex(),
+                "data": [{"validator_index": str(self.proposer_index(slot)), "slot": str(slot)}
+                         for slot in range(first, first + SLOTS_PER_EPOCH)]}
+
+    async def events(self, topics: List[str]) -> AsyncIterator[Tuple[str, Dict]]:
+        queue = asyncio.Queue()
+        self._subscribers.append(queue)
+        try:
+            while True:
+                topic, data = await queue.get()
+                if topic in topics:
+                    yield topic, data
+        finally:
+            self._subscribers.remove(queue)
+
+    async def finalized_epoch(self) -> int:
+        return max(0, (self.slot + 1) // SLOTS_PER_EPOCH - self.finality_lag)
+
+    async def finalized_randao(self) -> str:
+        epoch = await self.finalized_epoch()
+        return "0x" + self.epoch_mixes.get(epoch - 1, self.genesis_mix).hex()
+
+    async def head_randao(self) -> str:
+        return "0x" + self.mix.hex()
+
+    async def validators(self) -> Tuple[List[int], List[int]]:
+        return list(range(self.n_validators)), [MAX_EFFECTIVE_BALANCE] * self.n_validators
+
+    async def randao_reveal(self, index: int, epoch: int) -> bytes:
+        return self.reveal(index, epoch)
+
+    def is_electra(self, epoch: int) -> bool:
+        return True
+
+    def slot_time(self, slot: int) -> float:
+        return self.genesis_time + slot * self.seconds_per_slot
+
+    async def stop_service(self, name: str):
+        self.stopped.add(name)
+
+    async def start_service(self, name: str):
+        self.stopped.discard(name)
@@ -0,0 +1,217 @@
+"""
+Async beacon API client and proposer-duty lookahead cache
+
+BeaconClient keeps one pooled aiohttp session (keep-alive connections, a
+timeout on every request) and reads the /eth/v1/events stream.
+
+DutyCache holds proposer duties per epoch. On every new head epoch it
+prefetches the duties of the epoch after it (the one-epoch lookahead the
+beacon API serves), so an attack plan for epoch e+1 is ready while e is still
+running. A chain_reorg event drops every cached epoch whose dependent root
+(the block before the previous epoch's first slot) could lie on the
+abandoned branch; the duties are fetched again and kept if the dependent
+root did not actually change.
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+# monitoring/metrics.py, shared with the plain logger and attack scripts
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "monitoring"))
+import metrics  # noqa: E402
+
+SLOTS_PER_EPOCH = 32
+DEFAULT_TIMEOUT = 5.0
+DEFAULT_CONNECTIONS = 8
+
+
+class BackendError(RuntimeError):
+    """A beacon API call or a client control action failed"""
+
+# ==================== CLIENT ====================
+
+class BeaconClient:
+    """Pooled async client of the beacon node REST API"""
+
+    def __init__(self, base_url: str, timeout: float = DEFAULT_TIMEOUT, connections: int = DEFAULT_CONNECTIONS):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.connections = connections
+        self.session = None
+
+    async def start(self):
+        import aiohttp
+        self.session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            connector=aiohttp.TCPConnector(limit=self.connections, keepalive_timeout=60))
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def get(self, path: str) -> Dict:
+        import aiohttp
+        try:
+            with metrics.timed(metrics.HTTP_REQUESTS, endpoint=metrics.path_template(path)):
+                async with self.session.get(f"{self.base_url}{path}") as r:
+                    if r.status != 200:
+                        raise BackendError(f"GET {path}: HTTP {r.status} {(await r.text())[:200]}")
+                    return await r.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise BackendError(f"GET {path}: {type(e).__name__} {e}") from e
+
+    async def head_slot(self) -> int:
+        j = await self.get("/eth/v1/beacon/headers/head")
+        return int(j["data"]["header"]["message"]["slot"])
+
+    async def proposer_duties(self, epoch: int) -> Dict:
+        """Full response: {'dependent_root': ..., 'data': [{'validator_index', 'slot', ...}, ...]}"""
+        return await self.get(f"/eth/v1/validator/duties/proposer/{epoch}")
+
+    async def finalized_epoch(self) -> int:
+        j = await self.get("/eth/v1/beacon/states/finalized/finality_checkpoints")
+        return int(j["data"]["finalized"]["epoch"])
+
+    async def finalized_randao(self) -> str:
+        return (await self.get("/eth/v1/beacon/states/finalized/randao"))["data"]["randao"]
+
+    async def head_randao(self) -> str:
+        return (await self.get("/eth/v1/beacon/states/head/randao"))["data"]["randao"]
+
+    async def active_validators(self) -> Tuple[List[int], List[int]]:
+        """(indices, effective balances in Gwei) of the active validators at the head"""
+        data = (await self.get("/eth/v1/beacon/states/head/validators?status=active"))["data"]
+        return ([int(v["index"]) for v in data], [int(v["validator"]["effective_balance"]) for v in data])
+
+    async def genesis_time(self) -> int:
+        return int((await self.get("/eth/v1/beacon/genesis"))["data"]["genesis_time"])
+
+    async def spec(self) -> Dict:
+        return (await self.get("/eth/v1/config/spec"))["data"]
+
+    async def events(self, topics: List[str], idle_timeout: float = 60.0) -> AsyncIterator[Tuple[str, Dict]]:
+        """Server-sent events as (topic, data); raises BackendError when the stream breaks or stays silent"""
+        import aiohttp
+        timeout = aiohttp.ClientTimeout(total=None, sock_read=idle_timeout)
+        try:
+            async with self.session.get(f"{self.base_url}/eth/v1/events", params={'topics': ','.join(topics)},
+                                        headers={'Accept': 'text/event-stream'}, timeout=timeout) as r:
+                if r.status != 200:
+                    raise BackendError(f"event stream: HTTP {r.status}")
+                topic, data = None, []
+                async for raw in r.content:
+                    line = raw.decode(errors='replace').rstrip('\r\n')
+                    if line.startswith('event:'):
+                        topic = line[6:].strip()
+                    elif line.startswith('data:'):
+                        data.append(line[5:].strip())
+                    elif not line and topic is not None:
+                        yield topic, json.loads(''.join(data))
+                        topic, data = None, []
+        except (aiohttp.ClientError, asyncio.TimeoutError, json.JSONDecodeError) as e:
+            raise BackendError(f"event stream: {type(e).__name__} {e}") from e
+
+# ==================== DUTY CACHE ====================
+
+def dependent_slot(epoch: int) -> int:
+    """Last slot whose block decides the proposer duties of epoch (with one epoch of lookahead)"""
+    return (epoch - 1) * SLOTS_PER_EPOCH - 1
+
+
+class DutyCache:
+    """Proposer duties per epoch, prefetched one epoch ahead and invalidated on reorgs"""
+
+    def __init__(self, backend, lookahead: int = 1):
+        self.backend = backend
+        self.lookahead = lookahead
+        self.duties: Dict[int, List[Dict]] = {}
+        self.roots: Dict[int, Optional[str]] = {}
+        self.pending: Dict[int, asyncio.Task] = {}
+        self.head_epoch = -1
+        self.stats = {'hits': 0, 'misses': 0, 'prefetched': 0, 'invalidated': 0, 'changed': 0}
+
+    async def _fetch(self, epoch: int) -> List[Dict]:
+        response = await self.backend.proposer_duties(epoch)
+        root = response.get('dependent_root')
+        if epoch in self.roots and self.roots[epoch] != root:
+            self.stats['changed'] += 1
+            print(f"  🔀 Proposer duties of epoch {epoch} changed after a reorg")
+        self.duties[epoch], self.roots[epoch] = response['data'], root
+        return response['data']
+
+    async def get(self, epoch: int) -> List[Dict]:
+        """Duties of epoch, from the cache or fetched (concurrent requests for one epoch share a fetch)"""
+        if epoch in self.duties:
+            self.stats['hits'] += 1
+            return self.duties[epoch]
+        self.stats['misses'] += 1
+        return await self._fetch_once(epoch)
+
+    async def _fetch_once(self, epoch: int) -> List[Dict]:
+        task = self.pending.get(epoch)
+        if task is None:
+            task = self.pending[epoch] = asyncio.create_task(self._fetch(epoch))
+            task.add_done_callback(lambda _: self.pending.pop(epoch, None))
+        return await asyncio.shield(task)
+
+    async def prefetch(self, epoch: int):
+        if epoch not in self.duties:
+            try:
+                await self._fetch_once(epoch)
+                self.stats['prefetched'] += 1
+            except BackendError as e:
+                print(f"  Duty prefetch of epoch {epoch} failed: {e}")
+
+    def invalidate(self, fork_slot: int) -> List[int]:
+        """Drop epochs whose dependent block is at or after fork_slot; returns them"""
+        dropped = [epoch for epoch in self.duties if dependent_slot(epoch) >= fork_slot]
+        for epoch in dropped:
+            # The root stays, so a refetch can tell whether the duties really changed
+            del self.duties[epoch]
+        self.stats['invalidated'] += len(dropped)
+        return dropped
+
+    async def on_head(self, slot: int):
+        epoch = slot // SLOTS_PER_EPOCH
+        if epoch <= self.head_epoch:
+            return
+        self.head_epoch = epoch
+        for old in [e for e in self.roots if e < epoch - 1]:
+            self.duties.pop(old, None)
+            del self.roots[old]
+        for ahead in range(epoch, epoch + self.lookahead + 1):
+            await self.prefetch(ahead)
+
+    async def on_reorg(self, slot: int, depth: int):
+        dropped = self.invalidate(slot - depth)
+        if dropped:
+            print(f"  🔀 Reorg of depth {depth} at slot {slot}: refetching duties of epochs {sorted(dropped)}")
+        for epoch in sorted(dropped):
+            try:
+                await self._fetch(epoch)
+            except BackendError as e:
+                print(f"  Duty refetch of epoch {epoch} failed: {e}")
+
+    async def run(self):
+        """Follow head and reorg events (polling the head while the stream is down) and keep the cache warm"""
+        poll = self.backend.seconds_per_slot / 4
+        while True:
+            try:
+                async for topic, data in self.backend.events(['head', 'chain_reorg']):
+                    if topic == 'head':
+                        await self.on_head(int(data['slot']))
+                    elif topic == 'chain_reorg':
+                        await self.on_reorg(int(data['slot']), int(data['depth']))
+            except BackendError as e:
+                print(f"  Event stream down ({e}), polling the head for a slot")
+            deadline = asyncio.get_running_loop().time() + self.backend.seconds_per_slot
+            while asyncio.get_running_loop().time() < deadline:
+                try:
+                    await self.on_head(await self.backend.head_slot())
+                except BackendError:
+                    pass
+                await asyncio.sleep(poll)
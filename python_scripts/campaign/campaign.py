@@ -0,0 +1,648 @@
+#!/usr/bin/env python3
+"""
+Declarative experiment campaigns: seed logger + attacker + analysis in one run
+
+A spec file (YAML) lists campaigns; each one names the network and the attack
+and says how long to log and which analyses to run afterwards:
+
+    defaults:
+      enclave: my-testnet
+      analyses: [analyze]
+    campaigns:
+      - name: config12_lr
+        network_params: ../../ethpanda_realistic_testnet/network_params_config12.yaml
+        epochs: 300                  # stop after this many logged epochs
+        attack:
+          strategy: last_revealer    # last_revealer | adaptive_last_revealer | random_block | none
+          number_of_attacks: 286
+          chance_of_attack: 1
+        collect: true                # copy the log into geloggde_seeds
+        sequential:                  # stop early once the seeds answer the question
+          baseline: ../randao_seed_logger/geloggde_seeds/randao_log_Simple_Unmod_base.jsonl
+          alpha: 0.05
+          min_effect: 0.5            # baseline SDs (default: the smallest reachable within `epochs`)
+
+The logger and the attacker run as concurrent tasks on one event loop against
+a backend (kurtosis, with beacon port discovery, or an in-process fake
+chain). Campaigns run one after another; progress is kept in
+<runs-dir>/<name>/state.json so an interrupted queue resumes where it
+stopped: finished campaigns are skipped, the seed log and the attack rounds
+continue, and clients left stopped by a crash are started again.
+
+With `sequential`, every epoch the logger captures also updates a sequential
+test against a baseline seed log (stat_analyse/sequential.py). When it
+decides (a shift from the baseline, or none larger than min_effect) the
+logger stops, which ends the attacker too, and the campaign goes on to its
+analyses; `epochs` and `number_of_attacks` become upper bounds. `epochs` is
+also the horizon within which 'no effect' has to be reachable, and a
+min_effect that the baseline cannot resolve there is rejected when the spec
+is loaded.
+
+--metrics-port / --metrics-file export the monitoring/metrics.py counters
+(beacon API latency, kurtosis actions, records written, capture lag, attack
+timing relative to the slot boundary) while the queue runs.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import shutil
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from backends import FakeBackend, KurtosisBackend, client_of
+from beacon import SLOTS_PER_EPOCH, BackendError, DutyCache
+from proposers import ProposerModel
+from reveals import network_mnemonic
+import metrics  # noqa: E402 (monitoring/ is put on sys.path by beacon)
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+ANALYZE_DIR = SCRIPTS_DIR / "stat_analyse"
+SEED_LOG_DIR = SCRIPTS_DIR / "randao_seed_logger" / "geloggde_seeds"
+sys.path.insert(0, str(ANALYZE_DIR))
+
+from counterfactual import topology_groups  # noqa: E402
+from sequential import SequentialMonitor, captured_on_time  # noqa: E402
+
+STATE_FILE = "state.json"
+ATTACK_LOG = "attacks.jsonl"
+DECISION_LOG = "decisions.jsonl"
+LOG_PREFIX = "randao_log_"
+
+# Validator ranges hard-coded in lr_attack.py / rb_attack.py, used without network_params
+DEFAULT_GROUPS = {
+    "cl-1-lighthouse-geth": (0, 128),
+    "cl-2-lighthouse-geth": (128, 144),
+    "cl-3-lighthouse-nethermind": (144, 160),
+    "cl-4-prysm-geth": (160, 176),
+    "cl-5-prysm-nethermind": (176, 192),
+}
+
+DEFAULTS = {
+    'backend': 'kurtosis',
+    'enclave': 'my-testnet',
+    'epochs': None,
+    'attack': {'strategy': 'none'},
+    'analyses': ['analyze'],
+    'collect': False,
+    'launch': False,
+    'teardown': False,
+    'seconds_per_slot': 0.1,   # fake backend only
+    'seed': None,
+    'sequential': None,
+}
+
+# Analysis scripts run on a finished campaign: name -> argv builder (seed log, run directory)
+ANALYSES = {
+    'analyze': lambda log, run_dir: [ANALYZE_DIR / 'analyze.py', '-l', log, '-o', run_dir / 'analysis'],
+    'report': lambda log, run_dir: [ANALYZE_DIR / 'report.py', log, '-o', run_dir / 'report.html'],
+    # after 'analyze', so the sts assessment lands in its analysis_results.json
+    'nist_sts': lambda log, run_dir: [ANALYZE_DIR / 'nist_sts.py', log, '-o', run_dir / 'nist_sts',
+                                      '--merge-into', run_dir / 'analysis' / 'analysis_results.json'],
+}
+
+# ==================== SPEC ====================
+
+def load_spec(spec_file) -> List[Dict]:
+    """Campaigns of a spec file, with defaults applied and paths resolved relative to the file"""
+    import yaml
+    spec_file = Path(spec_file)
+    with open(spec_file) as f:
+        spec = yaml.safe_load(f) or {}
+    entries = spec.get('campaigns', [spec] if 'name' in spec else [])
+    base = {**DEFAULTS, **spec.get('defaults', {})}
+
+    campaigns = []
+    for entry in entries:
+        campaign = {**base, **entry}
+        campaign['attack'] = {**DEFAULTS['attack'], **base.get('attack', {}), **entry.get('attack', {})}
+        if not campaign.get('name'):
+            raise ValueError(f"{spec_file}: every campaign needs a name")
+        if campaign['backend'] not in ('kurtosis', 'fake'):
+            raise ValueError(f"{campaign['name']}: unknown backend {campaign['backend']!r}")
+        if campaign['attack']['strategy'] not in STRATEGIES:
+            raise ValueError(f"{campaign['name']}: unknown strategy {campaign['attack']['strategy']!r} "
+                             f"(choose from {', '.join(STRATEGIES)})")
+        unknown = [a for a in campaign['analyses'] if a not in ANALYSES]
+        if unknown:
+            raise ValueError(f"{campaign['name']}: unknown analyses {unknown} (choose from {', '.join(ANALYSES)})")
+        if campaign['epochs'] is None and campaign['attack']['strategy'] == 'none':
+            raise ValueError(f"{campaign['name']}: a campaign without attack needs 'epochs'")
+        if campaign.get('network_params'):
+            campaign['network_params'] = str((spec_file.parent / campaign['network_params']).resolve())
+        if campaign['sequential']:
+            if not campaign['sequential'].get('baseline'):
+                raise ValueError(f"{campaign['name']}: 'sequential' needs a baseline seed log")
+            campaign['sequential'] = {**campaign['sequential'],
+                                      'baseline': str((spec_file.parent / campaign['sequential']['baseline']).resolve())}
+            if campaign['epochs'] is not None:
+                campaign['sequential'].setdefault('horizon', campaign['epochs'])
+            params = dict(campaign['sequential'])
+            try:
+                SequentialMonitor.from_log(params.pop('baseline'), **params)
+            except (OSError, ValueError) as e:
+                raise ValueError(f"{campaign['name']}: sequential test: {e}") from e
+        campaigns.append(campaign)
+
+    names = [c['name'] for c in campaigns]
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        raise ValueError(f"{spec_file}: duplicate campaign names {duplicates}")
+    return campaigns
+
+# ==================== STATE ====================
+
+def read_state(run_dir: Path) -> Dict:
+    path = run_dir / STATE_FILE
+    if path.exists():
+        with open(path) as f:
+            return json.load(f)
+    return {'status': 'pending', 'rounds_done': 0, 'stopped_clients': [], 'errors': []}
+
+
+def write_state(run_dir: Path, state: Dict):
+    """Replace the state file atomically so a crash never leaves it half written"""
+    tmp = run_dir / (STATE_FILE + ".tmp")
+    with open(tmp, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, run_dir / STATE_FILE)
+
+
+def last_logged_epoch(log_file: Path) -> tuple:
+    """(number of records, last epoch_finalized) of an existing seed log, (0, -1) if there is none"""
+    count, last = 0, -1
+    if log_file.exists():
+        with open(log_file) as f:
+            for line in f:
+                try:
+                    last = int(json.loads(line)["epoch_finalized"])
+                    count += 1
+                except (ValueError, KeyError, TypeError):
+                    continue
+    return count, last
+
+# ==================== CAMPAIGN ====================
+
+class Campaign:
+    """One logger/attacker run with its state, seed log and attack log in <runs_dir>/<name>"""
+
+    def __init__(self, spec: Dict, runs_dir):
+        self.spec = spec
+        self.name = spec['name']
+        self.run_dir = Path(runs_dir) / self.name
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        self.log_file = self.run_dir / f"{LOG_PREFIX}{self.name}.jsonl"
+        self.attack_file = self.run_dir / ATTACK_LOG
+        self.decision_file = self.run_dir / DECISION_LOG
+        self.state = read_state(self.run_dir)
+        self.groups = topology_groups(spec['network_params']) if spec.get('network_params') else dict(DEFAULT_GROUPS)
+        # The first participant is the supernode the logger queries; it is never stopped
+        self.protected = set(spec.get('protected_clients') or list(self.groups)[:1])
+        self.rng = random.Random(spec['seed'])
+        self.backend = None
+        self.duties = None
+        self.planned_epoch = -1
+        self.model = None
+        self.model_key = None
+        self.decisions = []
+        self.monitor = None
+
+    def save(self, **changes):
+        self.state.update(changes)
+        write_state(self.run_dir, self.state)
+
+    def make_backend(self):
+        if self.spec['backend'] == 'fake':
+            return FakeBackend(self.groups, seconds_per_slot=self.spec['seconds_per_slot'],
+                               seed=self.spec['seed'] or 0)
+        return KurtosisBackend(self.spec['enclave'], beacon_service=self.spec.get('beacon_service') or list(self.groups)[0],
+                               beacon_api=self.spec.get('beacon_api'), params_file=self.spec.get('network_params'),
+                               launch=self.spec['launch'], teardown=self.spec['teardown'],
+                               mnemonic=self.spec.get('mnemonic') or network_mnemonic(self.spec.get('network_params')))
+
+    @property
+    def poll_interval(self) -> float:
+        return self.spec.get('poll_interval') or self.backend.seconds_per_slot / 4
+
+    async def run(self) -> bool:
+        """Run (or resume) the campaign; returns False if it failed"""
+        if self.state['status'] == 'done':
+            print(f"⏭️  {self.name}: already done")
+            return True
+        print(f"\n{'=' * 60}\n📋 Campaign {self.name} ({self.state['status']})\n{'=' * 60}")
+        try:
+            if self.state['status'] != 'analyzing':
+                self.backend = self.make_backend()
+                await self.backend.start()
+                try:
+                    await self.recover()
+                    self.save(status='running', started=self.state.get('started') or datetime.now().isoformat())
+                    await self.collect()
+                finally:
+                    await self.backend.close()
+                self.save(status='analyzing')
+            await self.analyze()
+            self.save(status='done', finished=datetime.now().isoformat())
+            print(f"✅ {self.name}: done")
+            return True
+        except Exception as e:
+            self.state['errors'].append(f"{datetime.now().isoformat()} {type(e).__name__}: {e}")
+            self.save(status='failed')
+            print(f"❌ {self.name} failed: {e}")
+            return False
+
+    async def recover(self):
+        """Start clients a previous, interrupted run left stopped"""
+        for client in list(self.state['stopped_clients']):
+            print(f"🩹 Restarting {client}, left stopped by an interrupted run")
+            await self.start_client(client)
+
+    async def collect(self):
+        """Logger and attacker as concurrent tasks; ends with the logger's epoch budget or the last attack"""
+        tasks = {asyncio.create_task(self.log_seeds(), name='logger')}
+        strategy = self.spec['attack']['strategy']
+        if strategy != 'none':
+            self.duties = DutyCache(self.backend)
+            tasks.add(asyncio.create_task(self.duties.run(), name='duties'))
+            tasks.add(asyncio.create_task(self.attack(STRATEGIES[strategy]), name='attacker'))
+        try:
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    task.result()
+                    if task.get_name() == 'logger' or (task.get_name() == 'attacker' and self.spec['epochs'] is None):
+                        print(f"🏁 {task.get_name()} finished")
+                        return
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if self.duties is not None:
+                print(f"🗂️  Duty cache: {self.duties.stats}")
+            if self.decisions:
+                self.print_decisions()
+
+    async def analyze(self):
+        """Collect the seed log into geloggde_seeds (if asked) and run the analyses on it"""
+        if not self.log_file.exists():
+            raise RuntimeError(f"no seeds were logged to {self.log_file}")
+        if self.spec['collect']:
+            SEED_LOG_DIR.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(self.log_file, SEED_LOG_DIR / self.log_file.name)
+            print(f"📦 Collected {self.log_file.name} into {SEED_LOG_DIR}")
+        for analysis in self.spec['analyses']:
+            await run_analysis(self, analysis)
+
+    # -------------------- logger --------------------
+
+    def start_monitor(self) -> bool:
+        """Sequential test of the spec, caught up on the existing log; True if it has already decided"""
+        params = dict(self.spec['sequential'])
+        self.monitor = SequentialMonitor.from_log(params.pop('baseline'), **params)
+        if self.log_file.exists():
+            with open(self.log_file) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.observe(record)
+        print(f"🧭 Sequential test against {self.spec['sequential']['baseline']} "
+              f"({self.monitor.n_baseline} baseline epochs, {self.monitor.epochs} live so far)")
+        return self.monitor.decision is not None
+
+    def observe(self, record: Dict) -> Optional[str]:
+        """Feed one logger record to the sequential test (late captures are skipped); returns its decision"""
+        if captured_on_time(record):
+            self.monitor.update(int(record["epoch_finalized"]), bytes.fromhex(record["randao_seed_for_next_epoch"][2:]))
+        return self.monitor.decision
+
+    def stop_early(self) -> bool:
+        """Record the sequential decision in the state; True if the logger should stop"""
+        self.save(sequential=self.monitor.status())
+        if self.monitor.decision is None:
+            return False
+        print(f"🛑 Sequential test: {self.monitor.decision} at epoch {self.monitor.decided_at} "
+              f"({self.monitor.describe()}), stopping logger and attacker")
+        return True
+
+    async def log_seeds(self):
+        """randao_logger.py on the event loop, resuming after the last epoch already in the log"""
+        count, last_collected_epoch = last_logged_epoch(self.log_file)
+        target = self.spec['epochs']
+        print(f"📝 Logging finalized RANDAO seeds to {self.log_file} ({count} already logged)")
+        if self.spec['sequential'] and self.start_monitor() and self.stop_early():
+            return
+        while target is None or count < target:
+            try:
+                finalized_epoch = await self.backend.finalized_epoch()
+                metrics.FINALIZED_EPOCH.set(finalized_epoch)
+                for epoch in range(last_collected_epoch + 1, finalized_epoch + 1):
+                    randao_seed = await self.backend.finalized_randao()
+                    log_entry = {
+                        "epoch_finalized": epoch,
+                        "capture_at_epoch": finalized_epoch,
+                        "randao_seed_for_next_epoch": randao_seed
+                    }
+                    with open(self.log_file, "a") as f:
+                        f.write(json.dumps(log_entry) + "\n")
+                    metrics.RECORDS_WRITTEN.inc(log="seeds")
+                    metrics.CAPTURE_LAG.observe(finalized_epoch - epoch)
+                    metrics.LOGGED_EPOCH.set(epoch)
+                    last_collected_epoch = epoch
+                    count += 1
+                    if target is None or count % 10 == 0 or count == target:
+                        print(f"  Epoch {epoch} finalized → RANDAO: {randao_seed} ({count}/{target or '∞'})")
+                    if self.monitor is not None:
+                        self.observe(log_entry)
+                        if self.stop_early():
+                            return
+                    if target is not None and count >= target:
+                        break
+            except (BackendError, OSError, KeyError, ValueError) as e:
+                print(f"  Logger error: {e}")
+                metrics.ERRORS.inc(component="logger")
+            await asyncio.sleep(self.poll_interval)
+
+    # -------------------- attacker --------------------
+
+    async def attack(self, strategy):
+        params = self.spec['attack']
+        rounds = int(params.get('number_of_attacks', 1))
+        pause = float(params.get('pause_between_attacks', 0)) * 60
+        print(f"⚔️  {params['strategy']}: {rounds} attack rounds, {self.state['rounds_done']} already done")
+        while self.state['rounds_done'] < rounds:
+            try:
+                await strategy(self, params)
+                metrics.ATTACK_ROUNDS.inc(strategy=params['strategy'], outcome=metrics.OK)
+            except (BackendError, OSError, KeyError, ValueError) as e:
+                print(f"  Attack round {self.state['rounds_done']} failed: {e}")
+                self.state['errors'].append(f"round {self.state['rounds_done']}: {e}")
+                metrics.ATTACK_ROUNDS.inc(strategy=params['strategy'], outcome=metrics.ERROR)
+            self.save(rounds_done=self.state['rounds_done'] + 1)
+            await asyncio.sleep(pause)
+        print("⚔️  Attack rounds finished")
+
+    async def wait_for_slot(self, slot: int, deadline: Optional[float] = None) -> int:
+        """Poll the head until it reaches slot (or, given a unix-time deadline, until then)"""
+        while True:
+            head = await self.backend.head_slot()
+            if head >= slot or (deadline is not None and time.time() >= deadline):
+                return head
+            await asyncio.sleep(self.backend.seconds_per_slot / 24)
+
+    async def next_target_epoch(self) -> int:
+        """
+        Epoch the next attack round plans for: the one after the head's epoch
+
+        Its duties are in the lookahead cache while the head's epoch is still
+        running, so the plan is ready before the target's first slot. Rounds
+        that finish early wait until the target is within the lookahead.
+        """
+        head_epoch = (await self.backend.head_slot()) // SLOTS_PER_EPOCH
+        self.planned_epoch = max(head_epoch + 1, self.planned_epoch + 1)
+        if self.planned_epoch > head_epoch + 1:
+            await self.wait_for_slot((self.planned_epoch - 1) * SLOTS_PER_EPOCH)
+        return self.planned_epoch
+
+    async def proposer_model(self, epoch: int) -> ProposerModel:
+        """Proposer selection over the current active validator set, rebuilt only when the set changes"""
+        indices, balances = await self.backend.validators()
+        key = hashlib.sha256(json.dumps([indices, balances, self.backend.is_electra(epoch)]).encode()).digest()
+        if key != self.model_key:
+            self.model = ProposerModel(indices, balances, electra=self.backend.is_electra(epoch))
+            self.model_key = key
+        return self.model
+
+    def print_decisions(self):
+        """Timing and outcome summary of the adaptive strategy's decisions"""
+        total = np.array([d['decide_ms'] for d in self.decisions])
+        withheld = [d for d in self.decisions if d['decision'] == 'withhold']
+        gain = sum(d['own_slots_withhold'] - d['own_slots_reveal'] for d in withheld)
+        print(f"🧠 {len(self.decisions)} decisions: {len(withheld)} withheld (+{gain} own slots two epochs later), "
+              f"{sum(d['decision'] == 'timeout' for d in self.decisions)} over budget, "
+              f"{sum(d['stale'] for d in self.decisions)} on a stale mix")
+        print(f"   decision latency: mean {total.mean():.1f} ms, p95 {np.percentile(total, 95):.1f} ms, "
+              f"max {total.max():.1f} ms (budget {self.decisions[-1]['budget_ms']:.0f} ms)")
+
+    async def stop_client(self, client: str):
+        # Recorded first, so a crash while the client is down is repaired on restart
+        self.save(stopped_clients=sorted(set(self.state['stopped_clients']) | {client}))
+        await self.backend.stop_service(client)
+        metrics.CLIENTS_STOPPED.set(len(self.state['stopped_clients']))
+
+    async def start_client(self, client: str):
+        await self.backend.start_service(client)
+        self.save(stopped_clients=[c for c in self.state['stopped_clients'] if c != client])
+        metrics.CLIENTS_STOPPED.set(len(self.state['stopped_clients']))
+
+    async def withhold(self, client: str, validator_index: int, slot: int, restart_at: int,
+                       stop_at: Optional[int] = None, delay: float = 0.0):
+        """Stop client once the head reaches stop_at (+ delay seconds; now without stop_at), restart at restart_at"""
+        stopped_at = await self.wait_for_slot(stop_at) if stop_at is not None else await self.backend.head_slot()
+        await asyncio.sleep(delay)
+        metrics.SLOT_OFFSET.observe(time.time() - self.backend.slot_time(slot), action="stop")
+        await self.stop_client(client)
+        stop_time = time.time()
+        try:
+            started_at = await self.wait_for_slot(restart_at)
+        finally:
+            metrics.SLOT_OFFSET.observe(time.time() - self.backend.slot_time(slot), action="start")
+            await self.start_client(client)
+            metrics.CLIENT_DOWNTIME.observe(time.time() - stop_time, client=client)
+        entry = {"epoch": slot // SLOTS_PER_EPOCH, "slot": slot, "validator_index": validator_index,
+                 "client": client, "stopped_at_slot": stopped_at, "started_at_slot": started_at,
+                 "stopped_seconds": round(time.time() - stop_time, 3)}
+        with open(self.attack_file, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+        metrics.RECORDS_WRITTEN.inc(log="attacks")
+        print(f"  Withheld slot {slot} of {client} (validator {validator_index})")
+
+
+async def last_revealer(campaign: Campaign, params: Dict):
+    """lr_attack.py: take the last proposer of the epoch offline over its slot"""
+    epoch = await campaign.next_target_epoch()
+    duty = (await campaign.duties.get(epoch))[-1]
+    validator_index, last_slot = int(duty["validator_index"]), int(duty["slot"])
+    client = client_of(campaign.groups, validator_index)
+    if client is None or client in campaign.protected:
+        print(f"  Epoch {epoch}: last proposer {validator_index} runs on a protected client, not attacked")
+        return
+    if campaign.rng.random() >= float(params.get('chance_of_attack', 1)):
+        print(f"  Epoch {epoch}: attack skipped by chance_of_attack")
+        return
+    # Stop half a slot after the pre-last slot started, restart two slots later (lr_attack's 6 s / 24 s)
+    seconds_per_slot = campaign.backend.seconds_per_slot
+    await campaign.withhold(client, validator_index, last_slot, restart_at=last_slot + 1, stop_at=last_slot - 1,
+                            delay=seconds_per_slot / 2)
+
+
+async def adaptive_last_revealer(campaign: Campaign, params: Dict):
+    """
+    Last revealer that withholds only when it pays off
+
+    The proposers of epoch + 2 follow from the mix at the end of epoch, which
+    the last proposer decides: revealing XORs the hash of its (precomputed)
+    reveal into the current mix, withholding keeps it. Once the pre-last block
+    is in (or decide_lead seconds before the slot at the latest) both
+    candidates are run through the spec's proposer selection and the client is
+    stopped only if withholding gives its validators more slots. A decision
+    that does not finish within latency_budget seconds falls back to reveal.
+    """
+    epoch = await campaign.next_target_epoch()
+    duty = (await campaign.duties.get(epoch))[-1]
+    validator_index, last_slot = int(duty["validator_index"]), int(duty["slot"])
+    client = client_of(campaign.groups, validator_index)
+    if client is None or client in campaign.protected:
+        print(f"  Epoch {epoch}: last proposer {validator_index} runs on a protected client, not attacked")
+        return
+    backend = campaign.backend
+    budget = float(params.get('latency_budget', 0.5))
+    lead = float(params.get('decide_lead', backend.seconds_per_slot / 2))
+
+    # Everything independent of the final mix is prepared while the epoch runs
+    model = await campaign.proposer_model(epoch + 2)
+    reveal_hash = hashlib.sha256(await backend.randao_reveal(validator_index, epoch)).digest()
+    lo, hi = campaign.groups[client]
+
+    head = await campaign.wait_for_slot(last_slot - 1, deadline=backend.slot_time(last_slot) - lead)
+    started = time.perf_counter()
+    mix = bytes.fromhex((await backend.head_randao())[2:])
+    fetched = time.perf_counter()
+
+    def candidates():
+        revealed = bytes(a ^ b for a, b in zip(mix, reveal_hash))
+        return model.slots_of(revealed, epoch + 2, lo, hi), model.slots_of(mix, epoch + 2, lo, hi)
+
+    try:
+        own_reveal, own_withhold = await asyncio.wait_for(asyncio.to_thread(candidates),
+                                                          timeout=max(0.0, budget - (fetched - started)))
+        decision = 'withhold' if own_withhold > own_reveal else 'reveal'
+    except asyncio.TimeoutError:
+        own_reveal = own_withhold = None
+        decision = 'timeout'
+    decided = time.perf_counter()
+
+    entry = {"epoch": epoch, "slot": last_slot, "validator_index": validator_index, "client": client,
+             "decision": decision, "own_slots_reveal": own_reveal, "own_slots_withhold": own_withhold,
+             "head_slot": head, "stale": head < last_slot - 1,
+             "fetch_ms": round((fetched - started) * 1000, 2), "compute_ms": round((decided - fetched) * 1000, 2),
+             "decide_ms": round((decided - started) * 1000, 2), "budget_ms": budget * 1000,
+             "seconds_to_slot": round(backend.slot_time(last_slot) - time.time(), 3)}
+    campaign.decisions.append(entry)
+    with open(campaign.decision_file, "a") as f:
+        f.write(json.dumps(entry) + "\n")
+    metrics.RECORDS_WRITTEN.inc(log="decisions")
+    print(f"  Epoch {epoch}: {decision} slot {last_slot} ({client}: {own_reveal} own slots if revealed, "
+          f"{own_withhold} if withheld; decided in {entry['decide_ms']:.1f} ms)")
+    if decision == 'withhold':
+        await campaign.withhold(client, validator_index, last_slot, restart_at=last_slot + 1)
+
+
+async def random_block(campaign: Campaign, params: Dict):
+    """rb_attack.py: withhold a random sample of the next epoch's non-protected proposer slots"""
+    target_epoch = await campaign.next_target_epoch()
+    candidates = []
+    for duty in await campaign.duties.get(target_epoch):
+        validator_index = int(duty["validator_index"])
+        client = client_of(campaign.groups, validator_index)
+        if client is not None and client not in campaign.protected:
+            candidates.append((client, validator_index, int(duty["slot"])))
+    if not candidates:
+        print(f"  Epoch {target_epoch}: no attackable slots")
+        return
+    selected = campaign.rng.sample(candidates, min(int(params.get('slots_per_epoch', SLOTS_PER_EPOCH)),
+                                                   len(candidates)))
+    for client, validator_index, slot in sorted(selected, key=lambda s: s[2]):
+        await campaign.withhold(client, validator_index, slot, restart_at=slot + 1, stop_at=slot - 1)
+
+
+STRATEGIES = {
+    'none': None,
+    'last_revealer': last_revealer,
+    'adaptive_last_revealer': adaptive_last_revealer,
+    'random_block': random_block,
+}
+
+# ==================== ANALYSIS ====================
+
+async def run_analysis(campaign: Campaign, analysis: str):
+    argv = [str(a) for a in ANALYSES[analysis](campaign.log_file, campaign.run_dir)]
+    output = campaign.run_dir / f"{analysis}.log"
+    print(f"🔬 {campaign.name}: {analysis} (output in {output})")
+    with open(output, 'w') as f:
+        process = await asyncio.create_subprocess_exec(sys.executable, *argv, stdout=f, stderr=asyncio.subprocess.STDOUT,
+                                                       cwd=str(ANALYZE_DIR))
+        returncode = await process.wait()
+    if returncode != 0:
+        raise RuntimeError(f"{analysis} exited with {returncode}, see {output}")
+
+# ==================== QUEUE ====================
+
+async def run_queue(campaigns: List[Dict], runs_dir) -> int:
+    """Run campaigns one after another; returns the number that failed"""
+    failed = 0
+    for spec in campaigns:
+        if not await Campaign(spec, runs_dir).run():
+            failed += 1
+    return failed
+
+
+def print_queue(campaigns: List[Dict], runs_dir):
+    print(f"{'Campaign':<32} {'Backend':<9} {'Strategy':<14} {'Status':<10} {'Rounds':>7} {'Epochs':>7}  Sequential")
+    for spec in campaigns:
+        run_dir = Path(runs_dir) / spec['name']
+        state = read_state(run_dir)
+        count, _ = last_logged_epoch(run_dir / f"{LOG_PREFIX}{spec['name']}.jsonl")
+        sequential = state.get('sequential') or {}
+        decision = (f"{sequential['decision']} at {sequential['decided_at']}" if sequential.get('decision')
+                    else 'undecided' if sequential else '-')
+        print(f"{spec['name']:<32} {spec['backend']:<9} {spec['attack']['strategy']:<14} {state['status']:<10} "
+              f"{state['rounds_done']:>7} {count:>7}  {decision}")
+
+
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description='Run queued RANDAO logger/attack/analysis campaigns from spec files')
+    parser.add_argument('specs', nargs='+', help='Campaign spec YAML files (queued in order)')
+    parser.add_argument('--runs-dir', default='./campaign_runs',
+                       help='Directory of per-campaign state, logs and analysis output')
+    parser.add_argument('--only', nargs='+', default=None, help='Run only these campaigns')
+    parser.add_argument('--list', action='store_true', help='Show the queue and its progress, run nothing')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                       help='Serve Prometheus metrics on http://127.0.0.1:PORT/metrics')
+    parser.add_argument('--metrics-file', default=None,
+                       help='Rewrite a JSON metrics snapshot to this file periodically and at exit')
+    parser.add_argument('--metrics-interval', type=float, default=metrics.DEFAULT_INTERVAL,
+                       help='Seconds between metrics snapshots')
+    args = parser.parse_args()
+
+    try:
+        campaigns = [c for spec in args.specs for c in load_spec(spec)]
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if args.only:
+        missing = set(args.only) - {c['name'] for c in campaigns}
+        if missing:
+            parser.error(f"unknown campaigns: {', '.join(sorted(missing))}")
+        campaigns = [c for c in campaigns if c['name'] in args.only]
+
+    if args.list:
+        print_queue(campaigns, args.runs_dir)
+        return
+    metrics.start(port=args.metrics_port, snapshot_file=args.metrics_file, interval=args.metrics_interval)
+    failed = asyncio.run(run_queue(campaigns, args.runs_dir))
+    print(f"\n🏁 {len(campaigns) - failed}/{len(campaigns)} campaigns finished")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Proposer selection of the consensus spec, vectorised for what-if evaluation
+
+The proposers of epoch e are fixed by the RANDAO mix at the end of epoch
+e - 2 (get_seed with MIN_SEED_LOOKAHEAD = 1). ProposerModel evaluates
+compute_proposer_index for all 32 slots of an epoch from a candidate mix: the
+swap-or-not shuffle is applied to the whole index list at once per round
+(one pivot hash and ceil(n/256) source hashes per round instead of 90 hashes
+per index) for all 32 slot seeds together, and everything that does not depend on the seed (index vector,
+source-hash suffixes, acceptance thresholds) is precomputed per validator set.
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+SLOTS_PER_EPOCH = 32
+SHUFFLE_ROUND_COUNT = 90
+DOMAIN_BEACON_PROPOSER = bytes.fromhex("00000000")
+MAX_EFFECTIVE_BALANCE = 32 * 10**9
+MAX_EFFECTIVE_BALANCE_ELECTRA = 2048 * 10**9
+CACHE_SIZE = 64
+
+
+def get_seed(mix: bytes, epoch: int) -> bytes:
+    """Proposer seed of epoch, given the mix at the end of epoch - 2"""
+    return hashlib.sha256(DOMAIN_BEACON_PROPOSER + epoch.to_bytes(8, 'little') + mix).digest()
+
+
+class ProposerModel:
+    """compute_proposer_index over a fixed active validator set (indices and effective balances in Gwei)"""
+
+    def __init__(self, indices, balances, electra: bool = True):
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.balances = np.asarray(balances, dtype=np.int64)
+        self.electra = electra
+        n = len(self.indices)
+        self.positions = np.arange(n, dtype=np.int64)
+        self.rounds = [r.to_bytes(1, 'little') for r in range(SHUFFLE_ROUND_COUNT)]
+        self.chunks = [c.to_bytes(4, 'little') for c in range((n + 255) // 256)]
+        # Acceptance: balance * MAX_RANDOM >= MAX_EFFECTIVE_BALANCE * random_value
+        if electra:
+            self.max_random, self.max_balance, self.random_bytes = 2**16 - 1, MAX_EFFECTIVE_BALANCE_ELECTRA, 2
+        else:
+            self.max_random, self.max_balance, self.random_bytes = 2**8 - 1, MAX_EFFECTIVE_BALANCE, 1
+        self.accept = self.balances * self.max_random
+        self.cache: OrderedDict = OrderedDict()
+
+    def shuffled(self, seeds) -> np.ndarray:
+        """compute_shuffled_index(i, n, seed) for every i and every seed: (S, n), all seeds in one pass"""
+        n = len(self.positions)
+        index = np.tile(self.positions, (len(seeds), 1))
+        rows = np.arange(len(seeds))[:, None]
+        for round_byte in self.rounds:
+            pivots = np.array([int.from_bytes(hashlib.sha256(seed + round_byte).digest()[:8], 'little') % n
+                               for seed in seeds], dtype=np.int64)
+            flip = (pivots[:, None] - index) % n
+            position = np.maximum(index, flip)
+            source = b"".join(hashlib.sha256(seed + round_byte + chunk).digest()
+                              for seed in seeds for chunk in self.chunks)
+            bits = np.unpackbits(np.frombuffer(source, dtype=np.uint8), bitorder='little').reshape(len(seeds), -1)
+            index = np.where(bits[rows, position] == 1, flip, index)
+        return index
+
+    def proposer_index(self, seed: bytes, shuffled: np.ndarray) -> int:
+        """compute_proposer_index for one slot seed, given its shuffled index list"""
+        n = len(shuffled)
+        per_hash = 32 // self.random_bytes
+        dtype = '<u2' if self.random_bytes == 2 else np.uint8
+        i = 0
+        while True:
+            if i % per_hash == 0:
+                random = hashlib.sha256(seed + (i // per_hash).to_bytes(8, 'little')).digest()
+                values = np.frombuffer(random, dtype=dtype)
+            candidate = shuffled[i % n]
+            if self.accept[candidate] >= self.max_balance * int(values[i % per_hash]):
+                return int(self.indices[candidate])
+            i += 1
+
+    def epoch_proposers(self, mix: bytes, epoch: int) -> np.ndarray:
+        """Proposer of every slot of epoch when the mix at the end of epoch - 2 is mix (cached)"""
+        key = (mix, epoch)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        seed = get_seed(mix, epoch)
+        first = epoch * SLOTS_PER_EPOCH
+        seeds = [hashlib.sha256(seed + slot.to_bytes(8, 'little')).digest()
+                 for slot in range(first, first + SLOTS_PER_EPOCH)]
+        proposers = np.array([self.proposer_index(s, shuffled) for s, shuffled in zip(seeds, self.shuffled(seeds))],
+                             dtype=np.int64)
+        self.cache[key] = proposers
+        if len(self.cache) > CACHE_SIZE:
+            self.cache.popitem(last=False)
+        return proposers
+
+    def slots_of(self, mix: bytes, epoch: int, lo: int, hi: int, proposers: Optional[np.ndarray] = None) -> int:
+        """Number of slots of epoch proposed by validators in [lo, hi)"""
+        proposers = self.epoch_proposers(mix, epoch) if proposers is None else proposers
+        return int(np.count_nonzero((proposers >= lo) & (proposers < hi)))
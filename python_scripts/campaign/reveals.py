@@ -0,0 +1,130 @@
+"""
+RANDAO reveals of the network's own validators
+
+Kurtosis derives every validator key from the mnemonic in network_params
+(EIP-2334 path m/12381/3600/<index>/0/0), so the attacker can compute the
+reveal a validator will publish in an epoch: the BLS signature of the epoch
+under DOMAIN_RANDAO. Key derivation (BIP-39 seed, EIP-2333 tree) uses only
+hashlib/hmac; signing needs py_ecc, imported when the first reveal is made.
+Signing takes a few hundred milliseconds in pure Python, so reveals are made
+at planning time and cached, never inside the decision window.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import unicodedata
+from typing import Dict, Optional, Tuple
+
+# BLS12-381 group order
+CURVE_ORDER = 0x73eda753299d7d483339d80809a1d80553bda402fffe5bfeffffffff00000001
+DOMAIN_RANDAO = bytes.fromhex("02000000")
+KEYGEN_SALT = b"BLS-SIG-KEYGEN-SALT-"
+# ethereum-package default of network_params.preregistered_validator_keys_mnemonic
+DEFAULT_MNEMONIC = ("giant issue aisle success illegal bike spike question tent bar rely arctic "
+                    "volcano long crawl hungry vocal artwork sniff fantasy very lucky have athlete")
+
+
+def network_mnemonic(params_file=None) -> str:
+    """Mnemonic the validator keys of a kurtosis network_params YAML are derived from"""
+    if params_file is None:
+        return DEFAULT_MNEMONIC
+    import yaml
+    with open(params_file) as f:
+        params = yaml.safe_load(f) or {}
+    return (params.get('network_params') or {}).get('preregistered_validator_keys_mnemonic', DEFAULT_MNEMONIC)
+
+
+def mnemonic_to_seed(mnemonic: str, passphrase: str = "") -> bytes:
+    """BIP-39 seed of a mnemonic"""
+    normalized = unicodedata.normalize("NFKD", mnemonic)
+    salt = unicodedata.normalize("NFKD", "mnemonic" + passphrase)
+    return hashlib.pbkdf2_hmac("sha512", normalized.encode(), salt.encode(), 2048)
+
+
+def _hkdf_extract(salt: bytes, ikm: bytes) -> bytes:
+    return hmac.new(salt, ikm, hashlib.sha256).digest()
+
+
+def _hkdf_expand(prk: bytes, info: bytes, length: int) -> bytes:
+    okm, block = b"", b""
+    for i in range(1, -(-length // 32) + 1):
+        block = hmac.new(prk, block + info + bytes([i]), hashlib.sha256).digest()
+        okm += block
+    return okm[:length]
+
+
+def _hkdf_mod_r(ikm: bytes) -> int:
+    salt, sk = KEYGEN_SALT, 0
+    while sk == 0:
+        salt = hashlib.sha256(salt).digest()
+        okm = _hkdf_expand(_hkdf_extract(salt, ikm + b"\x00"), (48).to_bytes(2, 'big'), 48)
+        sk = int.from_bytes(okm, 'big') % CURVE_ORDER
+    return sk
+
+
+def _lamport_pk(parent_sk: int, index: int) -> bytes:
+    salt = index.to_bytes(4, 'big')
+    ikm = parent_sk.to_bytes(32, 'big')
+    chunks = []
+    for key in (ikm, bytes(b ^ 0xff for b in ikm)):
+        okm = _hkdf_expand(_hkdf_extract(salt, key), b"", 32 * 255)
+        chunks.extend(hashlib.sha256(okm[i:i + 32]).digest() for i in range(0, len(okm), 32))
+    return hashlib.sha256(b"".join(chunks)).digest()
+
+
+def derive_master_sk(seed: bytes) -> int:
+    """EIP-2333 master secret key"""
+    return _hkdf_mod_r(seed)
+
+
+def derive_child_sk(parent_sk: int, index: int) -> int:
+    """EIP-2333 child secret key"""
+    return _hkdf_mod_r(_lamport_pk(parent_sk, index))
+
+
+def validator_sk(seed: bytes, index: int) -> int:
+    """Signing key of validator index (EIP-2334 path m/12381/3600/index/0/0)"""
+    sk = derive_master_sk(seed)
+    for step in (12381, 3600, index, 0, 0):
+        sk = derive_child_sk(sk, step)
+    return sk
+
+
+def randao_signing_root(epoch: int, fork_version: bytes, genesis_validators_root: bytes) -> bytes:
+    """compute_signing_root(epoch, get_domain(state, DOMAIN_RANDAO, epoch))"""
+    fork_data_root = hashlib.sha256(fork_version.ljust(32, b"\x00") + genesis_validators_root).digest()
+    domain = DOMAIN_RANDAO + fork_data_root[:28]
+    return hashlib.sha256(epoch.to_bytes(8, 'little').ljust(32, b"\x00") + domain).digest()
+
+
+class RevealSigner:
+    """Reveals of validators with keys from a mnemonic; keys and signatures are cached"""
+
+    def __init__(self, mnemonic: str, beacon):
+        self.seed = mnemonic_to_seed(mnemonic)
+        self.beacon = beacon
+        self.keys: Dict[int, int] = {}
+        self.reveals: Dict[Tuple[int, int], bytes] = {}
+        self.genesis_validators_root: Optional[bytes] = None
+
+    async def _fork_version(self, epoch: int) -> bytes:
+        fork = (await self.beacon.get("/eth/v1/beacon/states/head/fork"))["data"]
+        version = fork["current_version"] if epoch >= int(fork["epoch"]) else fork["previous_version"]
+        return bytes.fromhex(version[2:])
+
+    def _sign(self, index: int, signing_root: bytes) -> bytes:
+        from py_ecc.bls import G2ProofOfPossession
+        if index not in self.keys:
+            self.keys[index] = validator_sk(self.seed, index)
+        return G2ProofOfPossession.Sign(self.keys[index], signing_root)
+
+    async def reveal(self, index: int, epoch: int) -> bytes:
+        """randao_reveal validator index publishes in epoch"""
+        if (index, epoch) not in self.reveals:
+            if self.genesis_validators_root is None:
+                genesis = (await self.beacon.get("/eth/v1/beacon/genesis"))["data"]
+                self.genesis_validators_root = bytes.fromhex(genesis["genesis_validators_root"][2:])
+            root = randao_signing_root(epoch, await self._fork_version(epoch), self.genesis_validators_root)
+            self.reveals[(index, epoch)] = await asyncio.to_thread(self._sign, index, root)
+        return self.reveals[(index, epoch)]
@@ -1,61 +1,277 @@
-#BitStreamCreator -> json log file to bit randao data
+#!/usr/bin/env python3
+"""
+BitStreamCreator -> seed logs to bit data for external test batteries
+
+Streams any number of JSONL seed logs record by record (constant memory)
+and writes every requested format in a single pass:
+
+    raw    <name>.bin        32 bytes per seed, most significant bit first (sts -F r)
+    bits   <name>_bits.txt   continuous ASCII '0'/'1' stream (sts -F a), 8x the data
+    lines  <name>_sep.txt    one 256-bit ASCII line per seed
+    hex    <name>_hex.txt    continuous 0x-prefixed hex stream
+    npy    <name>.npy        packed archive of (epoch, seed) records,
+                             np.load(path, mmap_mode='r')
+
+Records are exported in log order. Optional filters keep an epoch range,
+only on-time captures (capture_at_epoch equal to epoch_finalized), and drop
+repeated epochs (not above the last exported one) or repeated seeds. The
+logger writes the current seed for every epoch it catches up on, so of a
+run of equal consecutive seeds only the last record, the epoch that owns the
+seed, is kept (as catalogue.py marks the others 'repeat').
+Several logs are converted in parallel, one worker per file, or combined
+into one dataset with --combine.
+
+    python randao_binary_creator.py ../randao_seed_logger/geloggde_seeds/*.jsonl -o ./bitstreams
+    ./sts -F r -S <bits> -i 1 bitstreams/Simple_Unmod_base.bin
+"""
+
+import argparse
 import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib import format as npy_format
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "stat_analyse"))
+from analyze import LOGGER_EPOCH_KEY, LOGGER_SEED_KEY, SEED_BITS, SEED_BYTES, seed_to_bytes  # noqa: E402
 
 INPUT_FILE = "randao_log_Simple_Unmod_base.jsonl"
-BITSTREAM_FILE = "randao_binary_stream.txt"
-BITLINE_FILE = "randao_binary_sep.txt"
-HEXSTREAM_FILE = "randao_hex.txt"
+LOG_PREFIX = "randao_log_"
+
+FORMATS = {
+    'raw': '.bin',
+    'bits': '_bits.txt',
+    'lines': '_sep.txt',
+    'hex': '_hex.txt',
+    'npy': '.npy',
+}
+RECORD_DTYPE = np.dtype([('epoch', '<i8'), ('seed', 'u1', (SEED_BYTES,))])
+
+DEDUPE_EPOCH = 'epoch'
+DEDUPE_SEED = 'seed'
+
+
+def dataset_name(log_file) -> str:
+    name = Path(log_file).stem
+    return name[len(LOG_PREFIX):] if name.startswith(LOG_PREFIX) else name
+
+# ==================== READING ====================
+
+def iter_seeds(log_file):
+    """Yield (epoch, capture_at_epoch or None, 32-byte seed) per valid record, in log order"""
+    with open(log_file, 'r') as f:
+        for index, line in enumerate(f):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if 'randao_bits' in entry:
+                seed = seed_to_bytes(entry['randao_bits'], from_bits=True)
+            else:
+                seed = seed_to_bytes(entry.get(LOGGER_SEED_KEY), from_bits=False)
+            if seed is None:
+                continue
+            epoch = entry.get('epoch', entry.get(LOGGER_EPOCH_KEY, index))
+            yield int(epoch), entry.get('capture_at_epoch'), seed
 
 
-def hex_to_256bit_binary(hex_str):
+class RecordFilter:
     """
-    Converts 0x-prefixed hex string to a 256-bit binary string
+    Epoch range, on-time and duplicate filters applied while streaming
+
+    The last accepted record is held back until the next one shows whether
+    it repeats its seed; flush() releases it at the end of the stream.
     """
-    hex_str = hex_str.lower().replace("0x", "")
-    return format(int(hex_str, 16), "0256b")
 
+    def __init__(self, from_epoch: Optional[int] = None, to_epoch: Optional[int] = None,
+                 on_time: bool = False, dedupe: Sequence[str] = ()):
+        self.from_epoch = from_epoch
+        self.to_epoch = to_epoch
+        self.on_time = on_time
+        self.dedupe = set(dedupe)
+        self.last_epoch = None
+        self.pending: Optional[Tuple[int, bytes]] = None
+        self.dropped = {'range': 0, 'late': 0, 'epoch': 0, 'seed': 0}
 
-def process_randao_log():
-    bitstream = []
-    hexstream = []
-    bitlines = []
+    def push(self, epoch: int, capture, seed: bytes) -> Optional[Tuple[int, bytes]]:
+        """Filter one record; returns the previously accepted (epoch, seed) once it is final"""
+        if (self.from_epoch is not None and epoch < self.from_epoch) or \
+                (self.to_epoch is not None and epoch > self.to_epoch):
+            reason = 'range'
+        elif self.on_time and capture is not None and int(capture) != epoch:
+            reason = 'late'
+        elif DEDUPE_EPOCH in self.dedupe and self.last_epoch is not None and epoch <= self.last_epoch:
+            reason = 'epoch'
+        else:
+            ready = self.pending
+            if DEDUPE_SEED in self.dedupe and ready is not None and seed == ready[1]:
+                # a later epoch with the same seed: the earlier record was a catch-up copy
+                self.dropped['seed'] += 1
+                ready = None
+            self.last_epoch, self.pending = epoch, (epoch, seed)
+            return ready
+        self.dropped[reason] += 1
+        return None
 
-    with open(INPUT_FILE, "r") as f:
-        for line in f:
-            if not line.strip():
-                continue
+    def flush(self) -> Optional[Tuple[int, bytes]]:
+        """The record still held back at the end of the stream"""
+        ready, self.pending = self.pending, None
+        return ready
+
+# ==================== WRITING ====================
+
+class NpyWriter:
+    """Append-only .npy of RECORD_DTYPE; the header is rewritten with the final count on close"""
+
+    def __init__(self, path):
+        self.f = open(path, 'wb')
+        self.count = 0
+        self._write_header()
+
+    def _write_header(self):
+        # numpy pads the header for growth, so its length does not depend on the count
+        npy_format.write_array_header_1_0(self.f, {'descr': npy_format.dtype_to_descr(RECORD_DTYPE),
+                                                   'fortran_order': False, 'shape': (self.count,)})
+
+    def write(self, epoch: int, seed: bytes):
+        self.f.write(epoch.to_bytes(8, 'little', signed=True) + seed)
+        self.count += 1
+
+    def close(self):
+        self.f.seek(0)
+        self._write_header()
+        self.f.close()
+
+
+class StreamWriter:
+    """Writes each exported seed to every requested format"""
+
+    def __init__(self, output_dir, name: str, formats: Sequence[str]):
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self.paths = {fmt: output_dir / f"{name}{FORMATS[fmt]}" for fmt in formats}
+        self.files = {}
+        for fmt, path in self.paths.items():
+            if fmt == 'npy':
+                self.files[fmt] = NpyWriter(path)
+            else:
+                self.files[fmt] = open(path, 'wb' if fmt == 'raw' else 'w')
+        self.count = 0
+
+    def write(self, epoch: int, seed: bytes):
+        files = self.files
+        if 'raw' in files:
+            files['raw'].write(seed)
+        if 'bits' in files or 'lines' in files:
+            bits = format(int.from_bytes(seed, 'big'), f"0{SEED_BITS}b")
+            if 'bits' in files:
+                files['bits'].write(bits)
+            if 'lines' in files:
+                files['lines'].write(bits + "\n")
+        if 'hex' in files:
+            files['hex'].write("0x" + seed.hex())
+        if 'npy' in files:
+            files['npy'].write(epoch, seed)
+        self.count += 1
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+
+# ==================== EXPORT ====================
 
-            entry = json.loads(line)
-            hex_seed = entry["randao_seed_for_next_epoch"]
+def export_logs(log_files: Sequence, output_dir, name: str, formats: Sequence[str] = tuple(FORMATS),
+                **filters) -> Dict:
+    """Stream one or more logs (concatenated in the given order) into one dataset"""
+    start = time.perf_counter()
+    record_filter = RecordFilter(**filters)
+    writer = StreamWriter(output_dir, name, formats)
+    read = 0
+    try:
+        for log_file in log_files:
+            for epoch, capture, seed in iter_seeds(log_file):
+                read += 1
+                ready = record_filter.push(epoch, capture, seed)
+                if ready is not None:
+                    writer.write(*ready)
+        ready = record_filter.flush()
+        if ready is not None:
+            writer.write(*ready)
+    finally:
+        writer.close()
+    return {
+        'dataset': name,
+        'inputs': [str(p) for p in log_files],
+        'seeds_read': read,
+        'seeds_written': writer.count,
+        'bits': writer.count * SEED_BITS,
+        'dropped': {k: v for k, v in record_filter.dropped.items() if v},
+        'outputs': {fmt: str(path) for fmt, path in writer.paths.items()},
+        'seconds': time.perf_counter() - start,
+    }
 
-            binary = hex_to_256bit_binary(hex_seed)
 
-            # 1) continuous bitstream
-            bitstream.append(binary)
+def _export_task(args) -> Dict:
+    log_file, output_dir, formats, filters = args
+    return export_logs([log_file], output_dir, dataset_name(log_file), formats, **filters)
 
-            # 2) comma-separated bits per seed
-            bitlines.append(binary)
 
-            # 3) continuoes hexstream
-            hexstream.append(hex_seed)
+def export_many(log_files: Sequence, output_dir, formats: Sequence[str] = tuple(FORMATS),
+                workers: Optional[int] = None, **filters) -> List[Dict]:
+    """Export every log to its own dataset, one worker process per file when workers > 1"""
+    names = [dataset_name(p) for p in log_files]
+    duplicates = {n for n in names if names.count(n) > 1}
+    if duplicates:
+        raise ValueError(f"several inputs map to the same output name: {', '.join(sorted(duplicates))}")
+    tasks = [(str(p), str(output_dir), list(formats), filters) for p in log_files]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        return [_export_task(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_export_task, tasks))
 
-    # write bitstream
-    with open(BITSTREAM_FILE, "w") as f:
-        f.write("".join(bitstream))
 
-    # write hexstream
-    with open(HEXSTREAM_FILE, "w") as f:
-        f.write("".join(hexstream))
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description='Export RANDAO seed logs as bit streams for external test batteries')
+    parser.add_argument('logs', nargs='*', default=[INPUT_FILE], help='JSONL seed logs')
+    parser.add_argument('--output-dir', '-o', default='.', help='Directory for the exported files')
+    parser.add_argument('--formats', '-f', nargs='+', choices=list(FORMATS), default=list(FORMATS),
+                        help='Output formats (default: all)')
+    parser.add_argument('--combine', metavar='NAME', default=None,
+                        help='Concatenate all logs, in the given order, into one dataset NAME')
+    parser.add_argument('--from-epoch', type=int, default=None, help='Skip epochs before this one')
+    parser.add_argument('--to-epoch', type=int, default=None, help='Skip epochs after this one')
+    parser.add_argument('--on-time', action='store_true',
+                        help='Only records captured in their own epoch (capture_at_epoch == epoch_finalized)')
+    parser.add_argument('--dedupe', nargs='+', choices=[DEDUPE_EPOCH, DEDUPE_SEED], default=[],
+                        help='Drop repeated epochs and/or consecutive repeated seeds (keeping the last epoch)')
+    parser.add_argument('--workers', '-w', type=int, default=None, help='Parallel files (default: CPU count)')
+    args = parser.parse_args()
 
-    # write csv-style bit file
-    with open(BITLINE_FILE, "w") as f:
-        for line in bitlines:
-            f.write(line + "\n")
+    filters = dict(from_epoch=args.from_epoch, to_epoch=args.to_epoch, on_time=args.on_time, dedupe=args.dedupe)
+    start = time.perf_counter()
+    if args.combine:
+        summaries = [export_logs(args.logs, args.output_dir, args.combine, args.formats, **filters)]
+    else:
+        summaries = export_many(args.logs, args.output_dir, args.formats, args.workers, **filters)
 
-    print(f"Processed {len(bitlines)} RANDAO seeds")
-    print(f"→ {BITSTREAM_FILE}")
-    print(f"→ {BITLINE_FILE}")
+    for s in summaries:
+        dropped = ", ".join(f"{n} {reason}" for reason, n in s['dropped'].items())
+        print(f"Processed {s['seeds_written']} of {s['seeds_read']} RANDAO seeds → {s['dataset']} "
+              f"({s['bits']} bits){f', dropped {dropped}' if dropped else ''}")
+        for path in s['outputs'].values():
+            print(f"→ {path}")
+    print(f"\n⏱️  {len(summaries)} dataset(s) in {time.perf_counter() - start:.2f}s")
 
 
 if __name__ == "__main__":
-    process_randao_log()
+    main()
@@ -0,0 +1,24 @@
+"""Streaming filter checks for randao_binary_creator.py on a small logger log"""
+
+import json
+
+import numpy as np
+
+from randao_binary_creator import DEDUPE_SEED, export_logs
+
+
+def write_log(path, records):
+    with open(path, 'w') as f:
+        for epoch, seed in records:
+            f.write(json.dumps({'epoch_finalized': epoch, 'randao_seed_for_next_epoch': '0x' + seed.hex()}) + "\n")
+
+
+def test_repeated_seed_keeps_the_epoch_that_owns_it(tmp_path):
+    a, b, c = (bytes([value]) * 32 for value in (1, 2, 3))
+    # the logger caught up over epochs 11-13, writing the seed of epoch 13 for all of them
+    write_log(tmp_path / 'log.jsonl', [(10, a), (11, b), (12, b), (13, b), (14, c)])
+    summary = export_logs([tmp_path / 'log.jsonl'], tmp_path, 'out', ['npy'], dedupe=[DEDUPE_SEED])
+    records = np.load(tmp_path / 'out.npy')
+    assert records['epoch'].tolist() == [10, 13, 14]
+    assert [bytes(seed) for seed in records['seed']] == [a, b, c]
+    assert summary['dropped'] == {'seed': 2}
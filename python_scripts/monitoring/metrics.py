@@ -0,0 +1,316 @@
+"""
+Lightweight operational metrics for the logger, the attack scripts and the campaign runner
+
+Counters, gauges and histograms with labels, kept in a process-wide registry
+and exported two ways:
+
+- a local HTTP endpoint (start(port=...)): /metrics in the Prometheus text
+  format, /metrics.json as the JSON snapshot
+- a JSON snapshot file rewritten every few seconds and at exit
+  (start(snapshot_file=...)), for runs nobody scrapes
+
+Standard library only, so the plain scripts can import it next to requests.
+The metrics every script shares (beacon API latency, kurtosis actions,
+records written, capture lag, attack timing) are defined here so the names
+are the same whichever script recorded them:
+
+    with metrics.timed(metrics.HTTP_REQUESTS, endpoint=metrics.path_template(path)):
+        r = requests.get(...)
+"""
+
+import atexit
+import json
+import math
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+DEFAULT_INTERVAL = 15.0  # seconds between snapshot file writes
+DEFAULT_HOST = "127.0.0.1"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+EPOCH_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64)
+# Seconds from the start of the slot an action was aimed at; negative is before the boundary
+OFFSET_BUCKETS = (-12.0, -6.0, -3.0, -1.0, -0.5, 0.0, 0.5, 1.0, 3.0, 6.0, 12.0, 24.0)
+DOWNTIME_BUCKETS = (6.0, 12.0, 18.0, 24.0, 30.0, 36.0, 48.0, 60.0, 120.0)
+
+OK = 'ok'
+ERROR = 'error'
+CANCELLED = 'cancelled'
+
+LabelKey = Tuple[str, ...]
+
+# ==================== METRIC TYPES ====================
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelKey, object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict) -> LabelKey:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _labels(self, key: LabelKey, extra: Sequence[Tuple[str, str]] = ()) -> str:
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{n}="{_escape(v)}"' for n, v in pairs) + '}'
+
+    def items(self):
+        with self._lock:
+            return sorted(self._values.items())
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        for key, value in self.items():
+            yield f"{self.name}{self._labels(key)} {_number(value)}"
+
+    def snapshot(self):
+        return [{'labels': dict(zip(self.labelnames, key)), 'value': value} for key, value in self.items()]
+
+
+class Gauge(Counter):
+    """Value that goes up and down"""
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets, with count, sum and max"""
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'counts': [0] * len(self.buckets), 'count': 0, 'sum': 0.0,
+                                             'max': -math.inf}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['counts'][i] += 1
+            state['count'] += 1
+            state['sum'] += value
+            state['max'] = max(state['max'], value)
+
+    def render(self):
+        for key, state in self.items():
+            for bound, count in zip(self.buckets, state['counts']):
+                yield f"{self.name}_bucket{self._labels(key, [('le', _number(bound))])} {count}"
+            yield f"{self.name}_bucket{self._labels(key, [('le', '+Inf')])} {state['count']}"
+            yield f"{self.name}_sum{self._labels(key)} {_number(state['sum'])}"
+            yield f"{self.name}_count{self._labels(key)} {state['count']}"
+
+    def snapshot(self):
+        return [{'labels': dict(zip(self.labelnames, key)), 'count': s['count'], 'sum': s['sum'],
+                 'mean': s['sum'] / s['count'], 'max': s['max'],
+                 'buckets': {_number(b): c for b, c in zip(self.buckets, s['counts'])}}
+                for key, s in self.items()]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value: float) -> str:
+    if isinstance(value, float) and math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(value) if isinstance(value, float) else str(value)
+
+# ==================== REGISTRY ====================
+
+class Registry:
+    """Named metrics of one process; asking for an existing name returns the same metric"""
+
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, help: str, labelnames: Sequence[str], **kwargs):
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, help, labelnames, **kwargs)
+            elif type(metric) is not cls or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"metric {name} already registered as {metric.kind} with labels {metric.labelnames}")
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get(Gauge, name, help, labelnames)
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """Prometheus text exposition format 0.0.4"""
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict:
+        return {
+            'timestamp': time.time(),
+            'uptime_seconds': time.time() - self.started,
+            'pid': os.getpid(),
+            'metrics': {m.name: {'type': m.kind, 'help': m.help, 'values': m.snapshot()}
+                        for m in list(self.metrics.values())},
+        }
+
+
+REGISTRY = Registry()
+
+# Shared by every instrumented script
+HTTP_REQUESTS = REGISTRY.histogram('randao_http_request_seconds', 'Beacon API request latency',
+                                   ['endpoint', 'outcome'])
+KURTOSIS_ACTIONS = REGISTRY.histogram('randao_kurtosis_action_seconds', 'Duration of kurtosis CLI actions',
+                                      ['action', 'service', 'outcome'])
+RECORDS_WRITTEN = REGISTRY.counter('randao_records_written_total', 'Records appended to JSONL logs', ['log'])
+ERRORS = REGISTRY.counter('randao_errors_total', 'Errors caught and survived, by component', ['component'])
+FINALIZED_EPOCH = REGISTRY.gauge('randao_finalized_epoch', 'Latest finalized epoch seen by the logger')
+LOGGED_EPOCH = REGISTRY.gauge('randao_logged_epoch', 'Latest epoch written to the seed log')
+CAPTURE_LAG = REGISTRY.histogram('randao_capture_lag_epochs', 'Finalized epoch at capture minus the logged epoch',
+                                 buckets=EPOCH_BUCKETS)
+ATTACK_ROUNDS = REGISTRY.counter('randao_attack_rounds_total', 'Attack rounds by outcome', ['strategy', 'outcome'])
+SLOT_OFFSET = REGISTRY.histogram('randao_attack_slot_offset_seconds',
+                                 'Time of a client stop/start relative to the start of the slot it targets',
+                                 ['action'], buckets=OFFSET_BUCKETS)
+CLIENT_DOWNTIME = REGISTRY.histogram('randao_client_downtime_seconds', 'Time a client was kept stopped',
+                                     ['client'], buckets=DOWNTIME_BUCKETS)
+CLIENTS_STOPPED = REGISTRY.gauge('randao_clients_stopped', 'Clients currently stopped by the attacker')
+
+
+def path_template(path: str) -> str:
+    """Endpoint label of a beacon API path: query dropped, numeric segments replaced, so epochs do not add series"""
+    path = path.split('?', 1)[0]
+    return re.sub(r'/(0x[0-9a-fA-F]+|\d+)(?=/|$)', '/{id}', path)
+
+
+@contextmanager
+def timed(histogram: Histogram, **labels):
+    """Observe the duration of the block; fills an 'outcome' label with ok / error / cancelled"""
+    start = time.perf_counter()
+    outcome = OK
+    try:
+        yield
+    except Exception:
+        outcome = ERROR
+        raise
+    except BaseException:
+        outcome = CANCELLED
+        raise
+    finally:
+        if 'outcome' in histogram.labelnames:
+            labels['outcome'] = outcome
+        histogram.observe(time.perf_counter() - start, **labels)
+
+# ==================== EXPORT ====================
+
+class _Handler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path == '/metrics':
+            body, content_type = self.registry.render().encode(), 'text/plain; version=0.0.4; charset=utf-8'
+        elif path == '/metrics.json':
+            body, content_type = json.dumps(self.registry.snapshot()).encode(), 'application/json'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port: int, host: str = DEFAULT_HOST, registry: Registry = REGISTRY) -> ThreadingHTTPServer:
+    """Serve /metrics and /metrics.json from a daemon thread"""
+    handler = type('MetricsHandler', (_Handler,), {'registry': registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    return server
+
+
+def write_snapshot(path, registry: Registry = REGISTRY):
+    """Replace the snapshot file atomically, so readers never see it half written"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(registry.snapshot(), f, indent=2)
+    os.replace(tmp, path)
+
+
+def write_snapshots(path, interval: float = DEFAULT_INTERVAL, registry: Registry = REGISTRY) -> threading.Event:
+    """Rewrite the snapshot file every interval seconds from a daemon thread and once more at exit"""
+    stop = threading.Event()
+
+    def loop():
+        while not stop.wait(interval):
+            try:
+                write_snapshot(path, registry)
+            except OSError as e:
+                print(f"⚠️ Metrics snapshot to {path} failed: {e}")
+
+    threading.Thread(target=loop, name='metrics-snapshot', daemon=True).start()
+    atexit.register(lambda: (stop.set(), write_snapshot(path, registry)))
+    return stop
+
+
+def start(port: Optional[int] = None, snapshot_file=None, interval: float = DEFAULT_INTERVAL,
+          host: str = DEFAULT_HOST):
+    """Start whichever exports are configured (None disables one)"""
+    if port:
+        try:
+            serve(port, host)
+            print(f"📈 Metrics on http://{host}:{port}/metrics")
+        except OSError as e:
+            print(f"⚠️ Metrics endpoint on port {port} not started: {e}")
+    if snapshot_file:
+        write_snapshots(snapshot_file, interval)
+        print(f"📈 Metrics snapshot every {interval:g}s to {snapshot_file}")
@@ -1,23 +1,32 @@
 import requests
 import time
 import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "monitoring"))
+import metrics  # noqa: E402
 
 BEACON_API = "http://127.0.0.1:32865"
 POLL_INTERVAL = 3  # seconds
+METRICS_PORT = 9101  # Prometheus text on http://127.0.0.1:9101/metrics, None to disable
+METRICS_FILE = "randao_logger_metrics.json"  # JSON snapshot, None to disable
 
 def get_finalized_randao():
-    r = requests.get(
-        f"{BEACON_API}/eth/v1/beacon/states/finalized/randao",
-        timeout=5,
-    )
+    with metrics.timed(metrics.HTTP_REQUESTS, endpoint="/eth/v1/beacon/states/finalized/randao"):
+        r = requests.get(
+            f"{BEACON_API}/eth/v1/beacon/states/finalized/randao",
+            timeout=5,
+        )
     r.raise_for_status()
     return r.json()["data"]["randao"]
 
 def get_finalized_epoch():
-    r = requests.get(
-        f"{BEACON_API}/eth/v1/beacon/states/finalized/finality_checkpoints",
-        timeout=5,
-    )
+    with metrics.timed(metrics.HTTP_REQUESTS, endpoint="/eth/v1/beacon/states/finalized/finality_checkpoints"):
+        r = requests.get(
+            f"{BEACON_API}/eth/v1/beacon/states/finalized/finality_checkpoints",
+            timeout=5,
+        )
     r.raise_for_status()
     return int(r.json()["data"]["finalized"]["epoch"])
 
@@ -28,6 +37,7 @@ def collect_finalized_randao_seeds(output_file="randao_log.jsonl"):
     while True:
         try:
             finalized_epoch = get_finalized_epoch()
+            metrics.FINALIZED_EPOCH.set(finalized_epoch)
 
             for epoch in range(last_collected_epoch + 1, finalized_epoch + 1):
                 randao_seed = get_finalized_randao()
@@ -42,13 +52,18 @@ def collect_finalized_randao_seeds(output_file="randao_log.jsonl"):
 
                 with open(output_file, "a") as f:
                     f.write(json.dumps(log_entry) + "\n")
+                metrics.RECORDS_WRITTEN.inc(log="seeds")
+                metrics.CAPTURE_LAG.observe(finalized_epoch - epoch)
+                metrics.LOGGED_EPOCH.set(epoch)
 
                 last_collected_epoch = epoch
 
         except Exception as e:
             print(f"Error: {e}")
+            metrics.ERRORS.inc(component="logger")
 
         time.sleep(POLL_INTERVAL)
 
 if __name__ == "__main__":
+    metrics.start(port=METRICS_PORT, snapshot_file=METRICS_FILE)
     collect_finalized_randao_seeds()
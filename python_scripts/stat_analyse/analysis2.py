@@ -1,179 +1,251 @@
-
 # ============================================================
 # RANDAO Statistical Analysis Script
 # ============================================================
 
 import numpy as np
-import matplotlib.pyplot as plt
 from scipy.special import erfc
 from scipy.stats import chi2
 import math
+from pathlib import Path
+
+from bit_patterns import linear_pair_counts, pack_bits, pattern_statistics, transition_count
+from min_entropy import estimate_min_entropy
+from plotting import bar_plot, histogram_plot, integer_histograms, line_plot, minmax_decimate, render_figures
 
 # ============================================================
 # CHANGE THIS TO YOUR INPUT FILE
 # ============================================================
 INPUT_FILE = "randao_binary_stream_UnMOD_Base.txt"
 
+# Plots are written here as PNGs (non-interactive backend)
+OUTPUT_DIR = "randao_analysis2"
+
+# Block length of the m-bit serial / approximate entropy tests (1-16)
+PATTERN_M = 4
+
 # ============================================================
 # LOAD BITSTREAM
 # ============================================================
 
-with open(INPUT_FILE, "r") as f:
-    bitstream = f.read().strip()
+def load_bitstream(path):
+    with open(path, "r") as f:
+        bitstream = f.read().strip()
+    return "".join(bitstream.split())
 
-bitstream = "".join(bitstream.split())
-bits = np.array([int(b) for b in bitstream])
-n = len(bits)
 
-print("Total bits loaded:", n)
+def bitstream_to_bits(bitstream):
+    return (np.frombuffer(bitstream.encode(), dtype=np.uint8) - ord("0")).astype(np.int64)
 
 # ============================================================
 # MONOBIT TEST
 # ============================================================
 
-num_ones = np.sum(bits)
-num_zeros = n - num_ones
-
-S_obs = abs(num_ones - num_zeros) / np.sqrt(n)
-p_value_monobit = erfc(S_obs / np.sqrt(2))
+def monobit_test(bits):
+    n = len(bits)
+    num_ones = np.sum(bits)
+    num_zeros = n - num_ones
 
-print("\n--- Monobit Test ---")
-print("Zeros:", num_zeros)
-print("Ones :", num_ones)
-print("Z-score:", S_obs)
-print("p-value:", p_value_monobit)
+    S_obs = abs(num_ones - num_zeros) / np.sqrt(n)
+    p_value_monobit = erfc(S_obs / np.sqrt(2))
 
-cumsum = np.cumsum(2*bits - 1)
-plt.figure()
-plt.plot(cumsum)
-plt.title("Cumulative Sum of Bitstream")
-plt.xlabel("Bit Index")
-plt.ylabel("Cumulative Sum")
-plt.show()
+    return {"zeros": num_zeros, "ones": num_ones, "z_score": S_obs, "p_value": p_value_monobit}
 
 # ============================================================
 # SHANNON ENTROPY
 # ============================================================
 
-p = num_ones / n
-if p in [0, 1]:
-    shannon_entropy = 0
-else:
-    shannon_entropy = -p*np.log2(p) - (1-p)*np.log2(1-p)
-
-print("\n--- Shannon Entropy ---")
-print("Entropy:", shannon_entropy)
+def shannon_entropy(bits):
+    p = np.sum(bits) / len(bits)
+    if p in [0, 1]:
+        return 0
+    return -p*np.log2(p) - (1-p)*np.log2(1-p)
 
 # ============================================================
 # MIN-ENTROPY
 # ============================================================
 
-max_prob = max(p, 1-p)
-min_entropy = -np.log2(max_prob)
+def min_entropy(bits):
+    p = np.sum(bits) / len(bits)
+    max_prob = max(p, 1-p)
+    return -np.log2(max_prob)
 
-print("\n--- Min-Entropy ---")
-print("Min-Entropy:", min_entropy)
+# ============================================================
+# SP 800-90B MIN-ENTROPY ESTIMATORS
+# ============================================================
+
+def sp800_90b_min_entropy(bits):
+    return estimate_min_entropy(np.packbits(bits.astype(np.uint8)))
 
 # ============================================================
 # 2-BIT SERIAL TEST
 # ============================================================
 
-pairs = [bitstream[i:i+2] for i in range(n-1)]
-counts = {
-    "00": pairs.count("00"),
-    "01": pairs.count("01"),
-    "10": pairs.count("10"),
-    "11": pairs.count("11")
-}
+def serial_test_2bit(bits):
+    n = len(bits)
+    counts = linear_pair_counts(*pack_bits(bits))
 
-expected = (n-1)/4
-chi_square = sum((counts[k] - expected)**2 / expected for k in counts)
-p_value_serial = 1 - chi2.cdf(chi_square, df=3)
+    expected = (n-1)/4
+    chi_square = sum((counts[k] - expected)**2 / expected for k in counts)
+    p_value_serial = 1 - chi2.cdf(chi_square, df=3)
 
-print("\n--- 2-Bit Serial Test ---")
-print("Counts:", counts)
-print("Chi-square:", chi_square)
-print("p-value:", p_value_serial)
-
-plt.figure()
-plt.bar(counts.keys(), counts.values())
-plt.title("2-Bit Pair Frequencies")
-plt.xlabel("Bit Pair")
-plt.ylabel("Count")
-plt.show()
+    return {"counts": counts, "chi_square": chi_square, "p_value": p_value_serial}
 
 # ============================================================
 # RUNS TEST
 # ============================================================
 
-runs = 1
-for i in range(1, n):
-    if bits[i] != bits[i-1]:
-        runs += 1
+def runs_test(bits):
+    n = len(bits)
+    p = np.sum(bits) / n
+
+    runs = 1 + transition_count(*pack_bits(bits))
 
-expected_runs = 2*n*p*(1-p)
-variance_runs = 2*n*p*(1-p)*(1 - 2*p*(1-p))
-z_runs = (runs - expected_runs) / np.sqrt(variance_runs)
-p_value_runs = erfc(abs(z_runs)/np.sqrt(2))
+    expected_runs = 2*n*p*(1-p)
+    variance_runs = 2*n*p*(1-p)*(1 - 2*p*(1-p))
+    z_runs = (runs - expected_runs) / np.sqrt(variance_runs)
+    p_value_runs = erfc(abs(z_runs)/np.sqrt(2))
 
-print("\n--- Runs Test ---")
-print("Observed runs:", runs)
-print("Z-score:", z_runs)
-print("p-value:", p_value_runs)
+    return {"runs": runs, "z_score": z_runs, "p_value": p_value_runs}
+
+# ============================================================
+# M-BIT SERIAL / APPROXIMATE ENTROPY (NIST SP 800-22 2.11, 2.12)
+# ============================================================
+
+def m_bit_tests(bits, m=PATTERN_M):
+    return pattern_statistics(*pack_bits(bits), m=m)
 
 # ============================================================
 # AUTOCORRELATION (Lag 1–10)
 # ============================================================
 
-print("\n--- Autocorrelation ---")
-lags = range(1, 11)
-autocorr_values = []
+def autocorrelation(bits, max_lag=10):
+    lags = range(1, max_lag + 1)
+    autocorr_values = []
 
-for lag in lags:
-    corr = np.corrcoef(bits[:-lag], bits[lag:])[0,1]
-    autocorr_values.append(corr)
-    print(f"Lag {lag}: {corr}")
+    for lag in lags:
+        corr = np.corrcoef(bits[:-lag], bits[lag:])[0,1]
+        autocorr_values.append(corr)
 
-plt.figure()
-plt.plot(list(lags), autocorr_values)
-plt.title("Autocorrelation (Lag 1–10)")
-plt.xlabel("Lag")
-plt.ylabel("Correlation")
-plt.show()
+    return list(lags), autocorr_values
 
 # ============================================================
 # HAMMING DISTANCE BETWEEN 256-BIT SEEDS
 # ============================================================
 
-seed_length = 256
-num_seeds = n // seed_length
+def seed_hamming_distances(bits, seed_length=256):
+    num_seeds = len(bits) // seed_length
+
+    seeds = [
+        bits[i*seed_length:(i+1)*seed_length]
+        for i in range(num_seeds)
+    ]
+
+    hamming_distances = []
+
+    for i in range(len(seeds)-1):
+        dist = np.sum(seeds[i] != seeds[i+1])
+        hamming_distances.append(dist)
+
+    return num_seeds, hamming_distances
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def main(input_file=INPUT_FILE, output_dir=OUTPUT_DIR):
+    bitstream = load_bitstream(input_file)
+    bits = bitstream_to_bits(bitstream)
+    n = len(bits)
+
+    print("Total bits loaded:", n)
+
+    monobit = monobit_test(bits)
+
+    print("\n--- Monobit Test ---")
+    print("Zeros:", monobit["zeros"])
+    print("Ones :", monobit["ones"])
+    print("Z-score:", monobit["z_score"])
+    print("p-value:", monobit["p_value"])
+
+    jobs = []
+
+    cumsum = np.cumsum(2*bits - 1)
+    x, y = minmax_decimate(np.arange(n), cumsum)
+    jobs.append(("cumulative_sum.png", line_plot, dict(
+        x=x, y=y, title="Cumulative Sum of Bitstream", xlabel="Bit Index", ylabel="Cumulative Sum")))
+
+    print("\n--- Shannon Entropy ---")
+    print("Entropy:", shannon_entropy(bits))
+
+    print("\n--- Min-Entropy ---")
+    print("Min-Entropy:", min_entropy(bits))
+
+    assessed = sp800_90b_min_entropy(bits)
+
+    print("\n--- SP 800-90B Min-Entropy ---")
+    print("Bitstring:", assessed["h_bitstring"], f"({assessed['bits']['limiting_estimator']})")
+    print("Bytes    :", assessed["h_original"], f"({assessed['bytes']['limiting_estimator']})")
+    print("Assessed per bit:", assessed["min_entropy_per_bit"])
+
+    serial = serial_test_2bit(bits)
+
+    print("\n--- 2-Bit Serial Test ---")
+    print("Counts:", serial["counts"])
+    print("Chi-square:", serial["chi_square"])
+    print("p-value:", serial["p_value"])
+
+    jobs.append(("pair_frequencies.png", bar_plot, dict(
+        labels=list(serial["counts"].keys()), values=list(serial["counts"].values()),
+        title="2-Bit Pair Frequencies", xlabel="Bit Pair", ylabel="Count")))
+
+    runs = runs_test(bits)
+
+    print("\n--- Runs Test ---")
+    print("Observed runs:", runs["runs"])
+    print("Z-score:", runs["z_score"])
+    print("p-value:", runs["p_value"])
+
+    patterns = m_bit_tests(bits)
+
+    print(f"\n--- {patterns['m']}-Bit Serial / Approximate Entropy ---")
+    print("Serial del psi^2:", patterns["serial"]["delta_psi2"], " p-value:", patterns["serial"]["p_value1"])
+    print("Serial del^2 psi^2:", patterns["serial"]["delta2_psi2"], " p-value:", patterns["serial"]["p_value2"])
+    print("ApEn:", patterns["approximate_entropy"]["apen"], " p-value:", patterns["approximate_entropy"]["p_value"])
+
+    print("\n--- Autocorrelation ---")
+    lags, autocorr_values = autocorrelation(bits)
+    for lag, corr in zip(lags, autocorr_values):
+        print(f"Lag {lag}: {corr}")
+
+    jobs.append(("autocorrelation.png", line_plot, dict(
+        x=list(lags), y=list(autocorr_values), title="Autocorrelation (Lag 1–10)",
+        xlabel="Lag", ylabel="Correlation")))
+
+    num_seeds, hamming_distances = seed_hamming_distances(bits)
 
-seeds = [
-    bits[i*seed_length:(i+1)*seed_length]
-    for i in range(num_seeds)
-]
+    mean_hd = np.mean(hamming_distances)
+    std_hd = np.std(hamming_distances)
 
-hamming_distances = []
+    print("\n--- Hamming Distance Between Consecutive Seeds ---")
+    print("Number of seeds:", num_seeds)
+    print("Mean Hamming Distance:", mean_hd)
+    print("Std Dev:", std_hd)
+    print("Expected mean (ideal): 128")
+    print("Expected std (ideal): 8")
 
-for i in range(len(seeds)-1):
-    dist = np.sum(seeds[i] != seeds[i+1])
-    hamming_distances.append(dist)
+    histograms = integer_histograms(
+        {"Consecutive seeds": np.bincount(np.asarray(hamming_distances, dtype=np.int64), minlength=257)},
+        target_bins=15)
+    if histograms:
+        jobs.append(("hamming_distance.png", histogram_plot, dict(
+            histograms=histograms, title="Hamming Distance Distribution", xlabel="Hamming Distance")))
 
-mean_hd = np.mean(hamming_distances)
-std_hd = np.std(hamming_distances)
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    saved = render_figures(jobs, output_dir)
+    print(f"\nPlots saved to {output_dir}: {', '.join(saved)}")
 
-print("\n--- Hamming Distance Between Consecutive Seeds ---")
-print("Number of seeds:", num_seeds)
-print("Mean Hamming Distance:", mean_hd)
-print("Std Dev:", std_hd)
-print("Expected mean (ideal): 128")
-print("Expected std (ideal): 8")
+    print("\nAnalysis complete.")
 
-plt.figure()
-plt.hist(hamming_distances, bins=15)
-plt.title("Hamming Distance Distribution")
-plt.xlabel("Hamming Distance")
-plt.ylabel("Frequency")
-plt.show()
 
-print("\nAnalysis complete.")
+if __name__ == "__main__":
+    main()
@@ -2,92 +2,385 @@
 """
 RANDAO Randomness Analysis Tool - FIXED VERSION
 Compatible with SciPy >= 1.10.0
+
+Only NumPy is imported at module load. pandas and matplotlib are imported
+inside the stages that use them, so `--basic` runs on NumPy alone.
 """
 
 import json
-import pandas as pd
+import math
 import numpy as np
-from collections import defaultdict
-import matplotlib.pyplot as plt
-from scipy import stats
-from scipy.spatial.distance import hamming
-import seaborn as sns
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
 import argparse
+from contextlib import nullcontext
+
+from result_cache import (AnalysisCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, dataset_hash, function_fingerprint,
+                          json_default, module_fingerprint)
+from stage_profiler import StageProfiler, PROFILE_REPORT
+from min_entropy import DEFAULT_MAX_SAMPLES, estimate_min_entropy
+from timeline import DEFAULT_WINDOW, analyze_timeline, change_epochs
+from gf2 import RANK_BLOCK, RELATION_SPAN, analyze_gf2
+from byte_transitions import DEFAULT_PERMUTATIONS, analyze_transitions, transition_table
+from spectral import SPECTRAL_ALPHA, analyze_spectrum
+from plotting import (PlotJob, binned_counts, bit_epoch_heatmap, byte_transition_plot, heatmap_plot, histogram_plot,
+                      integer_histograms, line_plot, minmax_decimate, periodogram_plot, render_figures, rolling_plot)
+
+SEED_BITS = 256
+SEED_BYTES = SEED_BITS // 8
+
+# Assessed SP 800-90B min-entropy per bit below which the summary warns
+MIN_ENTROPY_WARN = 0.5
+GF2_ALPHA = 0.01  # significance level of the GF(2) rank and linear-complexity tests
+
+# Raw logger entries (randao_logger.py) use these keys instead of 'randao_bits'/'epoch'
+LOGGER_SEED_KEY = 'randao_seed_for_next_epoch'
+LOGGER_EPOCH_KEY = 'epoch_finalized'
+
+# Modules each stage runs on (its own module plus the shared helpers it calls); their
+# contents are part of that stage's cache key, so editing one analysis only recomputes it
+STAGE_MODULES = {
+    'bit_bias': ['analyze.py'],
+    'hamming': ['analyze.py'],
+    'entropy': ['analyze.py', 'plotting.py'],
+    'autocorrelation': ['analyze.py'],
+    'min_entropy': ['min_entropy.py'],
+    'timeline': ['timeline.py', 'plotting.py'],
+    'linear_structure': ['gf2.py'],
+    'byte_transitions': ['byte_transitions.py'],
+    'spectral': ['spectral.py', 'plotting.py'],
+    'visualizations': ['plotting.py'],
+}
+ANALYSIS_MODULES = sorted({module for modules in STAGE_MODULES.values() for module in modules})
+STAGE_CODE = {stage: module_fingerprint(modules) for stage, modules in STAGE_MODULES.items()}
+
+# ==================== NUMERIC HELPERS ====================
+
+def binary_entropy(p) -> np.ndarray:
+    """Shannon entropy (bits) of a Bernoulli(p) source, elementwise, with 0*log(0) = 0"""
+    p = np.asarray(p, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ent = -p * np.log2(p) - (1 - p) * np.log2(1 - p)
+    return np.where((p <= 0) | (p >= 1), 0.0, ent)
+
+
+def binom_test_half(ones, n: int) -> np.ndarray:
+    """
+    Two-sided exact binomial test against p=0.5, vectorised over `ones`.
+
+    Same result as scipy.stats.binomtest(k, n, 0.5).pvalue: the null
+    distribution is symmetric, so the p-value is twice the lower tail at
+    min(k, n-k), capped at 1.
+    """
+    ones = np.asarray(ones, dtype=np.int64)
+    k = np.minimum(ones, n - ones)
+    k_max = int(k.max()) if k.size else 0
+    i = np.arange(1, k_max + 1)
+    log_coef = np.concatenate(([0.0], np.cumsum(np.log(n - i + 1) - np.log(i))))
+    lower_tail = np.cumsum(np.exp(log_coef - n * math.log(2)))
+    return np.minimum(1.0, 2.0 * lower_tail[k])
+
+
+def _incomplete_beta(a: float, b: float, x: float) -> float:
+    """Regularized incomplete beta I_x(a, b) via Lentz's continued fraction"""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    if x > (a + 1) / (a + b + 2):
+        return 1.0 - _incomplete_beta(b, a, 1.0 - x)
+    
+    tiny = 1e-300
+    log_front = (math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                 + a * math.log(x) + b * math.log1p(-x))
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 500):
+        for num in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                    -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1.0 + num * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + num / c
+            c = c if abs(c) > tiny else tiny
+            h *= d * c
+        if abs(d * c - 1.0) < 1e-15:
+            break
+    return math.exp(log_front) * h / a
+
+
+def welch_ttest(a, b) -> Tuple[float, float]:
+    """Welch's unequal-variance t-test, same result as scipy.stats.ttest_ind(equal_var=False)"""
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    if len(a) < 2 or len(b) < 2:
+        return float('nan'), float('nan')
+    
+    var_a = a.var(ddof=1) / len(a)
+    var_b = b.var(ddof=1) / len(b)
+    se2 = var_a + var_b
+    if se2 == 0:
+        return float('nan'), float('nan')
+    
+    t_stat = (a.mean() - b.mean()) / math.sqrt(se2)
+    dof = se2 ** 2 / (var_a ** 2 / (len(a) - 1) + var_b ** 2 / (len(b) - 1))
+    p_value = _incomplete_beta(dof / 2, 0.5, dof / (dof + t_stat ** 2))
+    return float(t_stat), float(p_value)
+
+# ==================== LOADING ====================
+
+def seed_to_bytes(value, from_bits: bool):
+    """Pack one 'randao_bits' string or 0x-hex seed into 32 bytes, None if invalid"""
+    if not isinstance(value, str):
+        return None
+    if from_bits:
+        if len(value) != SEED_BITS or not set(value).issubset({'0', '1'}):
+            return None
+        return int(value, 2).to_bytes(SEED_BYTES, 'big')
+    hex_str = value[2:] if value[:2].lower() == '0x' else value
+    if len(hex_str) != 2 * SEED_BYTES:
+        return None
+    try:
+        return bytes.fromhex(hex_str)
+    except ValueError:
+        return None
+
+
+def records_to_seeds(records: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert parsed log entries to (epochs, N x 32 uint8 seed matrix), sorted by epoch.
+
+    Accepts analyzer entries ('randao_bits', 'epoch') as well as raw logger
+    entries ('randao_seed_for_next_epoch', 'epoch_finalized').
+    """
+    first = records[0]
+    if 'randao_bits' in first:
+        seed_key, from_bits = 'randao_bits', True
+    elif LOGGER_SEED_KEY in first:
+        seed_key, from_bits = LOGGER_SEED_KEY, False
+    else:
+        raise ValueError("Missing required column: 'randao_bits'")
+    
+    epoch_key = next((k for k in ('epoch', LOGGER_EPOCH_KEY) if k in first), None)
+    if epoch_key is None:
+        print("⚠️ 'epoch' column not found, using index")
+    
+    seeds = []
+    epochs = []
+    for idx, entry in enumerate(records):
+        packed = seed_to_bytes(entry.get(seed_key), from_bits)
+        if packed is None:
+            continue
+        seeds.append(packed)
+        epochs.append(entry.get(epoch_key, idx) if epoch_key else idx)
+    
+    n_invalid = len(records) - len(seeds)
+    if n_invalid:
+        print(f"⚠️ Found {n_invalid} invalid bit strings, filtering them out")
+    if not seeds:
+        raise ValueError("No valid seeds found in log file")
+    
+    epochs = np.asarray(epochs, dtype=np.int64)
+    seed_bytes = np.frombuffer(b''.join(seeds), dtype=np.uint8).reshape(-1, SEED_BYTES)
+    
+    # Sort by epoch
+    order = np.argsort(epochs, kind='stable')
+    return epochs[order], seed_bytes[order]
+
+def read_records(log_file) -> List[Dict]:
+    """Parse the entries of a JSONL log file, skipping malformed lines"""
+    data = []
+    with open(log_file, 'r') as f:
+        for line_num, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+                data.append(entry)
+            except json.JSONDecodeError as e:
+                print(f"⚠️ Skipping malformed line {line_num}: {e}")
+                continue
+    
+    if not data:
+        raise ValueError("No valid data found in log file")
+    
+    return data
+
+
+def load_log(log_file) -> Tuple[np.ndarray, np.ndarray]:
+    """Parse a JSONL log file into (epochs, N x 32 uint8 seed matrix), sorted by epoch"""
+    return records_to_seeds(read_records(log_file))
+
+# ==================== BIT BIAS ====================
+
+def bit_bias_from_counts(bit_counts, n_samples: int) -> Dict:
+    """Bit-bias results from the number of 1s at each of the 256 positions over n_samples seeds"""
+    bit_counts = np.asarray(bit_counts, dtype=np.int64)
+    bit_biases = bit_counts / n_samples
+    expected = 0.5
+    
+    # Exact two-sided binomial test for all 256 positions at once
+    p_values = binom_test_half(bit_counts, n_samples)
+    
+    biased_bits = []
+    for bit_pos in np.flatnonzero(p_values < 0.01):
+        bias = float(bit_biases[bit_pos])
+        biased_bits.append({
+            'position': int(bit_pos),
+            'bias': bias,
+            'p_value': float(p_values[bit_pos]),
+            'ones_count': int(bit_counts[bit_pos]),
+            'total_samples': int(n_samples),
+            'deviation': abs(bias - 0.5)
+        })
+    
+    return {
+        'bit_positions': list(range(256)),
+        'biases': [float(b) for b in bit_biases],
+        'mean_bias': float(np.mean(np.abs(bit_biases - expected))),
+        'max_bias': float(np.max(np.abs(bit_biases - expected))),
+        'median_bias': float(np.median(np.abs(bit_biases - expected))),
+        'biased_bits': biased_bits,
+        'n_samples': int(n_samples)
+    }
+
+# ==================== KEY METRICS ====================
+
+def _metric(name: str, value, display: str, expected: str, ok: bool) -> Dict:
+    return {'name': name, 'value': value, 'display': display, 'expected': expected, 'ok': bool(ok)}
+
+
+def key_metrics(results: Dict) -> List[Dict]:
+    """Headline metrics of a results dict with their pass/fail thresholds (summary table rows)"""
+    metrics = []
+    
+    if 'bit_bias' in results and 'mean_bias' in results['bit_bias']:
+        bias_val = results['bit_bias']['mean_bias']
+        metrics.append(_metric("Mean Bit Bias", bias_val, f"{bias_val:.6f}", "0.000", bias_val < 0.01))
+    
+    if 'bit_bias' in results and 'max_bias' in results['bit_bias']:
+        max_bias_val = results['bit_bias']['max_bias']
+        metrics.append(_metric("Max Bit Bias", max_bias_val, f"{max_bias_val:.6f}", "0.000", max_bias_val < 0.05))
+    
+    if 'hamming' in results and 'consecutive' in results['hamming']:
+        hamming_val = results['hamming']['consecutive']['mean']
+        hamming_diff = abs(hamming_val - 128)
+        metrics.append(_metric("Hamming Distance", hamming_val, f"{hamming_val:.2f}", "128.00", hamming_diff < 2))
+    
+    if 'entropy' in results and 'sample_entropy' in results['entropy']:
+        entropy_val = results['entropy']['sample_entropy']['mean']
+        metrics.append(_metric("Shannon Entropy", entropy_val, f"{entropy_val:.6f}", "1.0000", entropy_val > 0.99))
+    
+    if 'autocorrelation' in results and 'max_abs_correlation' in results['autocorrelation']:
+        autocorr_val = results['autocorrelation']['max_abs_correlation']
+        metrics.append(_metric("Autocorrelation Max", autocorr_val, f"{autocorr_val:.6f}", "<0.01",
+                               autocorr_val < 0.01))
+    
+    if 'min_entropy' in results and 'min_entropy_per_bit' in results['min_entropy']:
+        h_val = results['min_entropy']['min_entropy_per_bit']
+        metrics.append(_metric("Min-Entropy (SP 800-90B)", h_val, f"{h_val:.6f}", f">{MIN_ENTROPY_WARN}",
+                               h_val >= MIN_ENTROPY_WARN))
+    
+    if 'timeline' in results and 'change_points' in results['timeline']:
+        n_changes = sum(len(e) for e in change_epochs(results['timeline']).values())
+        metrics.append(_metric("Change Points", n_changes, f"{n_changes}", "0", n_changes == 0))
+    
+    if 'linear_structure' in results and 'rank' in results['linear_structure']:
+        linear = results['linear_structure']
+        blocks = linear['rank']['blocks']
+        if 'min_rank' in blocks:
+            metrics.append(_metric("Min Block Rank (GF(2))", blocks['min_rank'], f"{blocks['min_rank']}",
+                                   f"{blocks['full_rank']}", blocks['p_value'] >= GF2_ALPHA))
+        n_relations = linear['relations']['total']
+        metrics.append(_metric("Short XOR Relations", n_relations, f"{n_relations}", "0", n_relations == 0))
+        lc_p = linear['linear_complexity']['p_value']
+        metrics.append(_metric("Linear Complexity p-value", lc_p, f"{lc_p:.4f}", f">{GF2_ALPHA}", lc_p >= GF2_ALPHA))
+    
+    if 'byte_transitions' in results and 'min_p_value' in results['byte_transitions']:
+        transitions = results['byte_transitions']
+        metrics.append(_metric("Byte Transition Min p", transitions['min_p_value'],
+                               f"{transitions['min_p_value']:.2e}", f">{transitions['alpha']:.1e}",
+                               not transitions['dependent_positions']))
+    
+    return metrics
+
+# ==================== ANALYZER ====================
 
 class RANDAOAnalyzer:
-    def __init__(self, log_file: str, output_dir: str = "./randao_analysis"):
+    def __init__(self, log_file: str, output_dir: str = "./randao_analysis",
+                 cache: Optional[AnalysisCache] = None,
+                 profiler: Optional[StageProfiler] = None,
+                 seeds: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+                 dataset: Optional[str] = None,
+                 plot_workers: Optional[int] = None):
         """
         Initialize analyzer with RANDAO log file
+
+        log_file may also be the root of a Parquet store (parquet_store.py),
+        in which case the seeds of `dataset` are read from it.
+
+        If a cache is given, stage results are looked up by the hash of the
+        seeds and epochs and only recomputed when the data, parameters or
+        code of the stage (STAGE_MODULES) changed.
+        If a profiler is given, every stage (including loading and plotting)
+        is timed and memory-traced. Passing seeds=(epochs, seed_bytes) skips
+        reading log_file (see from_seeds). Plots are rendered by up to
+        plot_workers processes (default: one per CPU).
         """
         self.log_file = Path(log_file)
+        self.dataset = dataset
+        self.plot_workers = plot_workers
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.cache = cache
+        self.profiler = profiler
         
         # Load and prepare data
-        self.df = self.load_data()
-        self.bit_arrays = self.extract_bit_arrays()
-        
-        print(f"📊 Loaded {len(self.df)} RANDAO samples")
-        print(f"📈 Epoch range: {self.df['epoch'].min()} to {self.df['epoch'].max()}")
-        
-    def load_data(self) -> pd.DataFrame:
-        """Load and parse the JSONL log file"""
-        data = []
-        with open(self.log_file, 'r') as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    entry = json.loads(line)
-                    data.append(entry)
-                except json.JSONDecodeError as e:
-                    print(f"⚠️ Skipping malformed line {line_num}: {e}")
-                    continue
-        
-        if not data:
-            raise ValueError("No valid data found in log file")
-        
-        df = pd.DataFrame(data)
-        
-        # Check for required columns
-        if 'randao_bits' not in df.columns:
-            raise ValueError("Missing required column: 'randao_bits'")
-        
-        # Add epoch if not present (use index as fallback)
-        if 'epoch' not in df.columns:
-            print("⚠️ 'epoch' column not found, using index")
-            df['epoch'] = df.index
-        
-        # Ensure bit strings are valid
-        invalid_bits = []
-        for idx, bits in enumerate(df['randao_bits']):
-            if not isinstance(bits, str) or len(bits) != 256 or not set(bits).issubset({'0', '1'}):
-                invalid_bits.append(idx)
-        
-        if invalid_bits:
-            print(f"⚠️ Found {len(invalid_bits)} invalid bit strings, filtering them out")
-            df = df.drop(invalid_bits).reset_index(drop=True)
-        
-        # Sort by epoch
-        df = df.sort_values('epoch').reset_index(drop=True)
-        df['epoch_seq'] = range(len(df))
-        
-        return df
+        with self.stage('load_data'):
+            self.epochs, self.seed_bytes = seeds if seeds is not None else self.load_data()
+        with self.stage('extract_bit_arrays'):
+            self.bit_arrays = self.extract_bit_arrays()
+        self._df = None
+        self.data_hash = dataset_hash(self.seed_bytes, self.epochs)
+        
+        print(f"📊 Loaded {len(self.epochs)} RANDAO samples")
+        print(f"📈 Epoch range: {self.epochs.min()} to {self.epochs.max()}")
+        
+    @classmethod
+    def from_seeds(cls, epochs: np.ndarray, seed_bytes: np.ndarray,
+                   output_dir: str = "./randao_analysis", source: str = "<memory>", **kwargs):
+        """Build an analyzer from in-memory epochs and an N x 32 uint8 seed matrix"""
+        order = np.argsort(epochs, kind='stable')
+        seeds = (np.asarray(epochs)[order], np.ascontiguousarray(seed_bytes[order], dtype=np.uint8))
+        return cls(source, output_dir, seeds=seeds, **kwargs)
+    
+    def load_data(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Load and parse the JSONL log file (or Parquet store) into (epochs, packed seed matrix)"""
+        if self.log_file.is_dir():
+            from parquet_store import load_seeds
+            return load_seeds(self.log_file, dataset=self.dataset)
+        return load_log(self.log_file)
     
     def extract_bit_arrays(self) -> np.ndarray:
-        """Convert bit strings to numpy arrays for fast computation"""
-        if len(self.df) == 0:
-            return np.array([])
+        """Unpack the seed matrix into an N x 256 uint8 bit matrix"""
+        if len(self.seed_bytes) == 0:
+            return np.zeros((0, SEED_BITS), dtype=np.uint8)
         
-        bit_arrays = []
-        for bits in self.df['randao_bits']:
-            bit_array = np.array([int(b) for b in bits], dtype=np.uint8)
-            bit_arrays.append(bit_array)
-        
-        return np.array(bit_arrays)
+        return np.unpackbits(self.seed_bytes, axis=1)
+    
+    @property
+    def df(self):
+        """pandas view of the samples (epoch, randao_bits, epoch_seq); imports pandas on first use"""
+        if self._df is None:
+            import pandas as pd
+            bit_strings = (self.bit_arrays + ord('0')).view(f'S{SEED_BITS}').ravel()
+            self._df = pd.DataFrame({
+                'epoch': self.epochs,
+                'randao_bits': [s.decode() for s in bit_strings],
+                'epoch_seq': np.arange(len(self.epochs)),
+            })
+        return self._df
     
     # ==================== BIT-LEVEL ANALYSIS ====================
     
@@ -98,57 +391,8 @@ class RANDAOAnalyzer:
         if len(self.bit_arrays) == 0:
             return {"error": "No bit arrays available"}
         
-        n_samples = len(self.bit_arrays)
         bit_counts = np.sum(self.bit_arrays, axis=0)  # Sum of 1s per bit position
-        
-        bit_biases = bit_counts / n_samples
-        expected = 0.5
-        
-        # Use binomtest from scipy.stats (modern version)
-        try:
-            from scipy.stats import binomtest
-            use_binomtest = True
-        except ImportError:
-            from scipy.stats import binom_test
-            use_binomtest = False
-        
-        biased_bits = []
-        for bit_pos in range(256):
-            ones = int(bit_counts[bit_pos])
-            total = n_samples
-            
-            try:
-                if use_binomtest:
-                    # Modern SciPy (>= 1.10.0)
-                    result = binomtest(ones, total, p=0.5, alternative='two-sided')
-                    p_value = result.pvalue
-                else:
-                    # Legacy SciPy
-                    p_value = binom_test(ones, total, p=0.5, alternative='two-sided')
-            except Exception as e:
-                print(f"Warning: Could not compute p-value for bit {bit_pos}: {e}")
-                p_value = 1.0
-            
-            if p_value < 0.01:
-                bias = float(bit_biases[bit_pos])
-                biased_bits.append({
-                    'position': bit_pos,
-                    'bias': bias,
-                    'p_value': float(p_value),
-                    'ones_count': int(ones),
-                    'total_samples': int(total),
-                    'deviation': abs(bias - 0.5)
-                })
-        
-        results = {
-            'bit_positions': list(range(256)),
-            'biases': [float(b) for b in bit_biases],
-            'mean_bias': float(np.mean(np.abs(bit_biases - expected))),
-            'max_bias': float(np.max(np.abs(bit_biases - expected))),
-            'median_bias': float(np.median(np.abs(bit_biases - expected))),
-            'biased_bits': biased_bits,
-            'n_samples': n_samples
-        }
+        results = bit_bias_from_counts(bit_counts, len(self.bit_arrays))
         
         print(f"  Mean absolute bias from 0.5: {results['mean_bias']:.6f}")
         print(f"  Maximum bias: {results['max_bias']:.6f}")
@@ -170,24 +414,20 @@ class RANDAOAnalyzer:
             return {"error": "Need at least 2 samples for Hamming analysis"}
         
         n_samples = len(self.bit_arrays)
-        consecutive_distances = []
         
         # Calculate distances between consecutive samples
-        for i in range(n_samples - 1):
-            dist = hamming(self.bit_arrays[i], self.bit_arrays[i + 1]) * 256
-            consecutive_distances.append(dist)
+        consecutive_distances = np.count_nonzero(
+            self.bit_arrays[1:] != self.bit_arrays[:-1], axis=1).astype(float)
         
         # Calculate distances between random pairs
-        random_pair_distances = []
         n_random_pairs = min(1000, max(10, n_samples // 2))
         
         np.random.seed(42)  # For reproducibility
         indices = np.arange(n_samples)
-        
-        for _ in range(n_random_pairs):
-            i, j = np.random.choice(indices, 2, replace=False)
-            dist = hamming(self.bit_arrays[i], self.bit_arrays[j]) * 256
-            random_pair_distances.append(dist)
+        pairs = np.array([np.random.choice(indices, 2, replace=False)
+                          for _ in range(n_random_pairs)])
+        random_pair_distances = np.count_nonzero(
+            self.bit_arrays[pairs[:, 0]] != self.bit_arrays[pairs[:, 1]], axis=1).astype(float)
         
         # Statistical analysis
         results = {
@@ -197,7 +437,8 @@ class RANDAOAnalyzer:
                 'min': float(np.min(consecutive_distances)),
                 'max': float(np.max(consecutive_distances)),
                 'median': float(np.median(consecutive_distances)),
-                'n': len(consecutive_distances)
+                'n': len(consecutive_distances),
+                'histogram': np.bincount(consecutive_distances.astype(np.int64), minlength=SEED_BITS + 1).tolist()
             },
             'random': {
                 'mean': float(np.mean(random_pair_distances)),
@@ -205,10 +446,11 @@ class RANDAOAnalyzer:
                 'min': float(np.min(random_pair_distances)),
                 'max': float(np.max(random_pair_distances)),
                 'median': float(np.median(random_pair_distances)),
-                'n': len(random_pair_distances)
+                'n': len(random_pair_distances),
+                'histogram': np.bincount(random_pair_distances.astype(np.int64), minlength=SEED_BITS + 1).tolist()
             },
             'all': {
-                'mean': float(np.mean(consecutive_distances + random_pair_distances)),
+                'mean': float(np.mean(np.concatenate([consecutive_distances, random_pair_distances]))),
                 'expected_mean': 128.0,
                 'expected_std': 8.0
             }
@@ -216,8 +458,7 @@ class RANDAOAnalyzer:
         
         # Test if consecutive differs from random
         try:
-            t_stat, p_value = stats.ttest_ind(consecutive_distances, random_pair_distances, 
-                                             equal_var=False)  # Welch's t-test
+            t_stat, p_value = welch_ttest(consecutive_distances, random_pair_distances)
             results['consecutive_vs_random'] = {
                 't_statistic': float(t_stat),
                 'p_value': float(p_value),
@@ -243,46 +484,20 @@ class RANDAOAnalyzer:
         """Calculate Shannon entropy for each sample and overall"""
         print("\n🎲 Analyzing Shannon Entropy...")
         
-        if len(self.df) == 0:
+        if len(self.bit_arrays) == 0:
             return {"error": "No data available"}
         
+        n_samples = len(self.bit_arrays)
+        
         # Entropy per sample
-        sample_entropies = []
-        for bits in self.df['randao_bits']:
-            # Count 0s and 1s
-            counts = np.bincount([int(b) for b in bits], minlength=2)
-            prob = counts / len(bits)
-            
-            # Calculate entropy (bits), handle log(0)
-            ent = 0.0
-            for p in prob:
-                if p > 0:
-                    ent -= p * np.log2(p)
-            sample_entropies.append(ent)
+        sample_entropies = binary_entropy(self.bit_arrays.sum(axis=1) / SEED_BITS)
         
         # Overall entropy across all bits
-        all_bits = ''.join(self.df['randao_bits'])
-        total_counts = np.bincount([int(b) for b in all_bits], minlength=2)
-        total_prob = total_counts / len(all_bits)
-        overall_entropy = 0.0
-        for p in total_prob:
-            if p > 0:
-                overall_entropy -= p * np.log2(p)
-        
-        # Byte-wise entropy (8-bit chunks)
-        byte_entropies = []
-        for bits in self.df['randao_bits']:
-            # Split into bytes (32 bytes = 256 bits)
-            bytes_list = [bits[i:i+8] for i in range(0, 256, 8)]
-            
-            for byte in bytes_list:
-                counts = np.bincount([int(b) for b in byte], minlength=2)
-                prob = counts / 8
-                ent = 0.0
-                for p in prob:
-                    if p > 0:
-                        ent -= p * np.log2(p)
-                byte_entropies.append(ent)
+        overall_entropy = binary_entropy(self.bit_arrays.mean())
+        
+        # Byte-wise entropy (8-bit chunks, 32 bytes = 256 bits)
+        byte_ones = self.bit_arrays.reshape(n_samples, SEED_BYTES, 8).sum(axis=2)
+        byte_entropies = binary_entropy(byte_ones / 8).ravel()
         
         results = {
             'sample_entropy': {
@@ -291,7 +506,9 @@ class RANDAOAnalyzer:
                 'min': float(np.min(sample_entropies)),
                 'max': float(np.max(sample_entropies)),
                 'median': float(np.median(sample_entropies)),
-                'n': len(sample_entropies)
+                'n': len(sample_entropies),
+                'histogram': binned_counts(sample_entropies, 20, (float(sample_entropies.min()),
+                                                                  float(sample_entropies.max())))
             },
             'overall_entropy': float(overall_entropy),
             'expected_entropy': 1.0,
@@ -315,33 +532,23 @@ class RANDAOAnalyzer:
         """Analyze autocorrelation in bit sequences"""
         print(f"\n🔄 Analyzing Autocorrelation (max lag={max_lag})...")
         
-        if len(self.df) == 0:
+        if len(self.bit_arrays) == 0:
             return {"error": "No data available"}
         
         # Flatten all bits into one long sequence
-        all_bits = ''.join(self.df['randao_bits'])
-        if len(all_bits) < max_lag * 2:
-            max_lag = len(all_bits) // 2
+        bit_array = self.bit_arrays.ravel()
+        if len(bit_array) < max_lag * 2:
+            max_lag = len(bit_array) // 2
             print(f"  Adjusted max_lag to {max_lag} due to limited data")
         
-        bit_array = np.array([int(b) for b in all_bits])
-        
         # Normalize to [-1, 1] for correlation
-        normalized = bit_array * 2 - 1
+        normalized = bit_array.astype(np.float64) * 2 - 1
         
         # Calculate autocorrelation
-        autocorr = []
-        for lag in range(max_lag + 1):
-            if lag == 0:
-                corr = 1.0
-            else:
-                # Manual correlation calculation for efficiency
-                n = len(normalized) - lag
-                if n > 0:
-                    corr = np.sum(normalized[:n] * normalized[lag:]) / n
-                else:
-                    corr = 0.0
-            autocorr.append(corr)
+        autocorr = [1.0]
+        for lag in range(1, max_lag + 1):
+            n = len(normalized) - lag
+            autocorr.append(float(np.dot(normalized[:n], normalized[lag:]) / n) if n > 0 else 0.0)
         
         # Find significant correlations
         significant_lags = []
@@ -376,8 +583,174 @@ class RANDAOAnalyzer:
         
         return results
     
+    # ==================== MIN-ENTROPY (SP 800-90B) ====================
+    
+    def analyze_min_entropy(self, max_samples: int = DEFAULT_MAX_SAMPLES) -> Dict:
+        """SP 800-90B non-IID min-entropy estimators over the bit and byte streams"""
+        print("\n🔐 Estimating Min-Entropy (NIST SP 800-90B)...")
+        
+        if len(self.seed_bytes) == 0:
+            return {"error": "No data available"}
+        
+        results = estimate_min_entropy(self.seed_bytes, max_samples=max_samples)
+        
+        for stream in ('bits', 'bytes'):
+            r = results[stream]
+            print(f"  {stream.capitalize()} ({r['n_samples']:,} samples):")
+            for name, value in r.items():
+                if isinstance(value, dict) and value.get('min_entropy') is not None:
+                    marker = " ←" if name == r['limiting_estimator'] else ""
+                    print(f"    {name:<12} {value['min_entropy']:.6f}{marker}")
+        print(f"  Naive min-entropy (ones ratio): {results['naive_min_entropy']:.6f} bits/bit")
+        print(f"  Assessed min-entropy: {results['min_entropy_per_bit']:.6f} bits/bit "
+              f"({results['min_entropy_per_seed']:.1f} bits/seed, limited by {results['limiting_estimator']})")
+        
+        return results
+    
+    # ==================== TIMELINE / CHANGE POINTS ====================
+    
+    def analyze_timeline(self, window: int = DEFAULT_WINDOW) -> Dict:
+        """Rolling-window metrics and change-point detection along the epochs"""
+        print(f"\n⏱️  Analyzing Timeline (window={window} epochs)...")
+        
+        if len(self.epochs) < 4:
+            return {"error": "Not enough epochs for a timeline"}
+        
+        results = analyze_timeline(self.epochs, self.seed_bytes, window=window)
+        extremes = results['extremes']
+        
+        print(f"  Windows: {results['n_windows']} of {results['window']} epochs")
+        print(f"  Max |bias z|: {extremes['max_abs_bias_z']:.2f}")
+        print(f"  Max bit-position |z|: {extremes['max_position_z']:.2f}")
+        print(f"  Min serial p-value: {extremes['min_serial_p_value']:.6f}")
+        
+        flagged = change_epochs(results)
+        if flagged:
+            for series, epochs in flagged.items():
+                print(f"  Change points in {series}: epochs {epochs[:10]}")
+        else:
+            print("  No change points detected")
+        for series, cp in results['change_points'].items():
+            if cp['bocpd']['change_epochs']:
+                print(f"  Bayesian segmentation of {series}: {cp['bocpd']['change_epochs'][:10]}")
+        
+        return results
+    
+    # ==================== GF(2) LINEAR STRUCTURE ====================
+    
+    def analyze_linear_structure(self, block: int = RANK_BLOCK, span: int = RELATION_SPAN) -> Dict:
+        """GF(2) ranks, short XOR relations between nearby seeds and per-bit linear complexity"""
+        print("\n🧮 Analyzing GF(2) Linear Structure...")
+        
+        if len(self.seed_bytes) < 2:
+            return {"error": "Not enough seeds"}
+        
+        results = analyze_gf2(self.epochs, self.seed_bytes, block=block, span=span)
+        rank, relations, complexity = results['rank'], results['relations'], results['linear_complexity']
+        
+        print(f"  Rank: {rank['rank']}/{rank['expected_rank']} "
+              f"(consecutive differences: {rank['difference_rank']}/{rank['expected_difference_rank']})")
+        blocks = rank['blocks']
+        if 'ranks' in blocks:
+            print(f"  Block rank ({blocks['block']} seeds, stride {blocks['stride']}): "
+                  f"min {blocks['min_rank']}/{blocks['full_rank']}, "
+                  f"{blocks['n_deficient']} deficient blocks, p={blocks['p_value']:.3g}")
+            for block_info in blocks['deficient'][:5]:
+                print(f"    from epoch {block_info['start_epoch']}: rank {block_info['rank']}, "
+                      f"relation {block_info['relation_epochs']}")
+        print(f"  XOR relations within {relations['span']} epochs: "
+              + ", ".join(f"{n} of size {size}" for size, n in relations['counts'].items()))
+        for example in relations['examples'][:5]:
+            print(f"    epochs {example}")
+        print(f"  Linear complexity ({complexity['n_bits']:,} bits per position): "
+              f"{complexity['min']}-{complexity['max']} (expected {complexity['expected']:.1f}), "
+              f"p={complexity['p_value']:.4f}")
+        if complexity['deficient_positions']:
+            print(f"    Low complexity at bit positions {complexity['deficient_positions'][:20]}")
+        
+        return results
+    
+    # ==================== BYTE TRANSITIONS ====================
+    
+    def analyze_byte_transitions(self, lag: int = 1, permutations: int = DEFAULT_PERMUTATIONS) -> Dict:
+        """Dependence of byte j of seed t + lag on byte j of seed t, for all 32 positions"""
+        print(f"\n🔀 Analyzing Byte Transitions (lag {lag})...")
+        
+        if len(self.seed_bytes) <= lag + 1:
+            return {"error": "Not enough seeds"}
+        
+        results = analyze_transitions(self.seed_bytes, lag=lag, permutations=permutations)
+        
+        print(f"  {results['n_transitions']:,} transitions per position, "
+              f"{results['mean_expected_cell']:.3f} expected per cell"
+              + (" (sparse: collision test instead of G-test)" if results['sparse'] else ""))
+        strongest = results['positions'][results['strongest_position']]
+        print(f"  Strongest position: byte {strongest['position']} (p={strongest['p_value']:.3g}; "
+              f"{strongest['collisions']} collisions vs {strongest['expected_collisions']:.2f} expected, "
+              f"G z={strongest['g_z']:.2f}, XOR p={strongest['xor_p_value']:.3g}, "
+              f"excess MI={strongest['mutual_information_excess']:.4f} bits)")
+        if results['dependent_positions']:
+            print(f"  Dependent byte positions (p < {results['alpha']:.1e}): {results['dependent_positions']}")
+        else:
+            print("  No dependent byte positions")
+        
+        return results
+    
+    # ==================== SPECTRAL ====================
+    
+    def analyze_spectrum(self, alpha: float = SPECTRAL_ALPHA) -> Dict:
+        """Periodicity of every bit position along the epoch axis (DFT test and periodograms)"""
+        print("\n🌊 Analyzing Bit-Position Spectra...")
+        
+        if len(self.seed_bytes) < 8:
+            return {"error": "Not enough seeds"}
+        
+        results = analyze_spectrum(self.epochs, self.seed_bytes, alpha=alpha)
+        if 'error' in results:
+            return results
+        
+        axis = (f"{results['grid_length']:,}-epoch grid, {results['missing_epochs']:,} missing epochs zero-filled"
+                if results['axis'] == 'epoch' else f"{results['grid_length']:,} records in log order (sparse epochs)")
+        print(f"  {SEED_BITS} positions x {results['n_frequencies']:,} frequencies ({axis})")
+        dft = results['dft_test']
+        print(f"  DFT test: {len(dft['failed_positions'])} positions fail at p < {alpha} "
+              f"(expected {dft['expected_failures']:.1f}, p={dft['excess_p_value']:.3g})")
+        mean = results['mean_periodogram']
+        if mean['whitened_components']:
+            print(f"  Shared structure: {mean['whitened_components']} leading components whitened "
+                  f"({mean['effective_positions']:.0f} effective positions)")
+        for name, label in (('mean_periodogram', 'Mean'), ('coherent_periodogram', 'Coherent')):
+            top = results[name]['peaks'][0]
+            print(f"  {label} periodogram: strongest period {top['period_epochs']:.2f} epochs "
+                  f"(power {top['power']:.3f}, adjusted p={top['p_value']:.3g})")
+        if results['dominant_periods']:
+            print(f"  Significant periods (epochs): {[round(p, 2) for p in results['dominant_periods'][:10]]}")
+        else:
+            print("  No significant periods")
+        if results['periodic_positions']:
+            print(f"  Bit positions with a significant peak: {results['periodic_positions'][:20]}")
+        
+        return results
+    
     # ==================== RUN ALL ANALYSES ====================
     
+    def stage(self, name: str, **info):
+        """Profiling context for one stage (no-op without a profiler)"""
+        if self.profiler is None:
+            return nullcontext({})
+        return self.profiler.stage(name, **info)
+    
+    def run_stage(self, name: str, func: Callable, **params):
+        """Run one analysis stage, going through the result cache if enabled"""
+        with self.stage(name) as record:
+            if self.cache is None:
+                return func(**params)
+            hits_before = self.cache.hits
+            result = self.cache.get_or_compute(self.data_hash, name, func, params, code=STAGE_CODE[name])
+            record['cached'] = self.cache.hits > hits_before
+            return result
+    
+    
     def run_basic_analysis(self):
         """Run basic analyses (faster, for debugging)"""
         print("=" * 60)
@@ -387,10 +760,11 @@ class RANDAOAnalyzer:
         results = {}
         
         # Run basic analyses
-        results['bit_bias'] = self.analyze_bit_bias()
-        results['hamming'] = self.analyze_hamming_distances()
-        results['entropy'] = self.analyze_shannon_entropy()
-        results['autocorrelation'] = self.analyze_autocorrelation(max_lag=min(20, len(self.df)))
+        results['bit_bias'] = self.run_stage('bit_bias', self.analyze_bit_bias)
+        results['hamming'] = self.run_stage('hamming', self.analyze_hamming_distances)
+        results['entropy'] = self.run_stage('entropy', self.analyze_shannon_entropy)
+        results['autocorrelation'] = self.run_stage('autocorrelation', self.analyze_autocorrelation,
+                                                    max_lag=min(20, len(self.epochs)))
         
         # Quick summary
         print("\n" + "=" * 60)
@@ -419,8 +793,8 @@ class RANDAOAnalyzer:
         
         return results
     
-    def run_complete_analysis(self):
-        """Run all analyses and generate reports"""
+    def run_complete_analysis(self, window: int = DEFAULT_WINDOW):
+        """Run all analyses and generate reports (window: rolling window of the timeline, in epochs)"""
         print("=" * 60)
         print("🧪 RANDAO COMPLETE ANALYSIS")
         print("=" * 60)
@@ -428,19 +802,27 @@ class RANDAOAnalyzer:
         results = {}
         
         # Run all analyses
-        results['bit_bias'] = self.analyze_bit_bias()
-        results['hamming'] = self.analyze_hamming_distances()
-        results['entropy'] = self.analyze_shannon_entropy()
-        results['autocorrelation'] = self.analyze_autocorrelation()
+        results['bit_bias'] = self.run_stage('bit_bias', self.analyze_bit_bias)
+        results['hamming'] = self.run_stage('hamming', self.analyze_hamming_distances)
+        results['entropy'] = self.run_stage('entropy', self.analyze_shannon_entropy)
+        results['autocorrelation'] = self.run_stage('autocorrelation', self.analyze_autocorrelation)
+        results['min_entropy'] = self.run_stage('min_entropy', self.analyze_min_entropy)
+        results['timeline'] = self.run_stage('timeline', self.analyze_timeline, window=window)
+        results['linear_structure'] = self.run_stage('linear_structure', self.analyze_linear_structure)
+        results['byte_transitions'] = self.run_stage('byte_transitions', self.analyze_byte_transitions)
+        results['spectral'] = self.run_stage('spectral', self.analyze_spectrum)
         
         # Generate summary
-        results['summary'] = self.generate_summary(results)
+        with self.stage('summary'):
+            results['summary'] = self.generate_summary(results)
         
         # Save results
-        self.save_results(results)
+        with self.stage('save_results'):
+            self.save_results(results)
         
         # Generate visualizations
-        self.generate_visualizations(results)
+        with self.stage('visualizations'):
+            self.generate_visualizations(results)
         
         print("\n" + "=" * 60)
         print("✅ ANALYSIS COMPLETE")
@@ -479,6 +861,53 @@ class RANDAOAnalyzer:
             if results['autocorrelation'].get('significant_lags'):
                 issues.append(f"Significant autocorrelation at {len(results['autocorrelation']['significant_lags'])} lags")
         
+        # Check SP 800-90B min-entropy
+        if 'min_entropy' in results and 'min_entropy_per_bit' in results['min_entropy']:
+            h = results['min_entropy']['min_entropy_per_bit']
+            if h < MIN_ENTROPY_WARN:
+                limiting = results['min_entropy']['limiting_estimator']
+                warnings.append(f"Low SP 800-90B min-entropy: {h:.4f} bits/bit (limited by {limiting})")
+        
+        # Check for shifts along the timeline
+        if 'timeline' in results and 'change_points' in results['timeline']:
+            for series, epochs in change_epochs(results['timeline']).items():
+                warnings.append(f"Change point in {series} near epoch(s) {', '.join(map(str, epochs[:5]))}")
+        
+        # Check GF(2) linear structure
+        if 'linear_structure' in results and 'rank' in results['linear_structure']:
+            linear = results['linear_structure']
+            rank = linear['rank']
+            if rank['p_value'] < GF2_ALPHA or rank['difference_p_value'] < GF2_ALPHA:
+                issues.append(f"Rank-deficient seed matrix: rank {rank['rank']}/{rank['expected_rank']}, "
+                              f"differences {rank['difference_rank']}/{rank['expected_difference_rank']}")
+            if rank['blocks'].get('p_value', 1.0) < GF2_ALPHA:
+                warnings.append(f"{rank['blocks']['n_deficient']} rank-deficient blocks of "
+                                f"{rank['blocks']['block']} seeds (min rank {rank['blocks']['min_rank']})")
+            if linear['relations']['total']:
+                issues.append(f"{linear['relations']['total']} XOR relations among seeds "
+                              f"within {linear['relations']['span']} epochs")
+            complexity = linear['linear_complexity']
+            if complexity['p_value'] < GF2_ALPHA or complexity['deficient_positions']:
+                warnings.append(f"Anomalous linear complexity (p={complexity['p_value']:.4f}, "
+                                f"{len(complexity['deficient_positions'])} low-complexity bit positions)")
+        
+        # Check byte-to-byte dependence between consecutive seeds
+        if 'byte_transitions' in results and 'dependent_positions' in results['byte_transitions']:
+            dependent = results['byte_transitions']['dependent_positions']
+            if dependent:
+                warnings.append(f"Byte values predict the next seed at {len(dependent)} position(s): {dependent[:8]}")
+        
+        # Check periodicity along the epoch axis
+        if 'spectral' in results and 'dominant_periods' in results['spectral']:
+            spectral = results['spectral']
+            if spectral['dominant_periods']:
+                periods = ', '.join(f"{p:.1f}" for p in spectral['dominant_periods'][:5])
+                issues.append(f"Periodic bit patterns every {periods} epochs")
+            dft = spectral['dft_test']
+            if dft['excess_p_value'] < spectral['alpha']:
+                warnings.append(f"DFT test fails at {len(dft['failed_positions'])} bit positions "
+                                f"(expected {dft['expected_failures']:.1f})")
+        
         # Overall assessment
         if not issues:
             assessment = "GOOD - No major randomness issues detected"
@@ -491,11 +920,21 @@ class RANDAOAnalyzer:
             'assessment': assessment,
             'issues': issues,
             'warnings': warnings,
-            'samples_analyzed': len(self.df),
+            'samples_analyzed': len(self.epochs),
             'bit_length': 256,
-            'epoch_range': f"{self.df['epoch'].min()}-{self.df['epoch'].max()}"
+            'epoch_range': f"{self.epochs.min()}-{self.epochs.max()}"
         }
         
+        if 'min_entropy' in results and 'min_entropy_per_bit' in results['min_entropy']:
+            estimate = results['min_entropy']
+            summary['min_entropy'] = {
+                'per_bit': estimate['min_entropy_per_bit'],
+                'per_seed': estimate['min_entropy_per_seed'],
+                'h_bitstring': estimate['h_bitstring'],
+                'h_original': estimate['h_original'],
+                'limiting_estimator': estimate['limiting_estimator'],
+            }
+        
         return summary
     
     def save_results(self, results: Dict):
@@ -503,22 +942,9 @@ class RANDAOAnalyzer:
         # Save full results as JSON
         results_file = self.output_dir / "analysis_results.json"
         
-        # Custom JSON serializer
-        def default_serializer(obj):
-            if isinstance(obj, (np.integer, np.int32, np.int64)):
-                return int(obj)
-            elif isinstance(obj, (np.floating, np.float32, np.float64)):
-                return float(obj)
-            elif isinstance(obj, np.ndarray):
-                return obj.tolist()
-            elif isinstance(obj, pd.Timestamp):
-                return obj.isoformat()
-            else:
-                return str(obj)
-        
         try:
             with open(results_file, 'w') as f:
-                json.dump(results, f, indent=2, default=default_serializer)
+                json.dump(results, f, indent=2, default=json_default)
             
             # Save summary as Markdown
             summary_file = self.output_dir / "analysis_summary.md"
@@ -565,122 +991,134 @@ class RANDAOAnalyzer:
         f.write("| Metric | Value | Expected | Status |\n")
         f.write("|--------|-------|----------|--------|\n")
         
-        # Collect metrics safely
-        metrics = []
-        
-        if 'bit_bias' in results and 'mean_bias' in results['bit_bias']:
-            bias_val = results['bit_bias']['mean_bias']
-            metrics.append(("Mean Bit Bias", f"{bias_val:.6f}", "0.000", 
-                          "✓" if bias_val < 0.01 else "⚠️"))
-        
-        if 'bit_bias' in results and 'max_bias' in results['bit_bias']:
-            max_bias_val = results['bit_bias']['max_bias']
-            metrics.append(("Max Bit Bias", f"{max_bias_val:.6f}", "0.000", 
-                          "✓" if max_bias_val < 0.05 else "⚠️"))
-        
-        if 'hamming' in results and 'consecutive' in results['hamming']:
-            hamming_val = results['hamming']['consecutive']['mean']
-            hamming_diff = abs(hamming_val - 128)
-            metrics.append(("Hamming Distance", f"{hamming_val:.2f}", "128.00", 
-                          "✓" if hamming_diff < 2 else "⚠️"))
-        
-        if 'entropy' in results and 'sample_entropy' in results['entropy']:
-            entropy_val = results['entropy']['sample_entropy']['mean']
-            metrics.append(("Shannon Entropy", f"{entropy_val:.6f}", "1.0000", 
-                          "✓" if entropy_val > 0.99 else "⚠️"))
-        
-        if 'autocorrelation' in results and 'max_abs_correlation' in results['autocorrelation']:
-            autocorr_val = results['autocorrelation']['max_abs_correlation']
-            metrics.append(("Autocorrelation Max", f"{autocorr_val:.6f}", "<0.01", 
-                          "✓" if autocorr_val < 0.01 else "⚠️"))
-        
-        for name, value, expected, status in metrics:
-            f.write(f"| {name} | {value} | {expected} | {status} |\n")
+        for metric in key_metrics(results):
+            status = "✓" if metric['ok'] else "⚠️"
+            f.write(f"| {metric['name']} | {metric['display']} | {metric['expected']} | {status} |\n")
         
         f.write("\n## Notes\n\n")
         f.write("See `analysis_results.json` for complete data.\n")
-        f.write(f"\nAnalysis based on {len(self.df)} samples from epoch {self.df['epoch'].min()} to {self.df['epoch'].max()}.\n")
+        f.write(f"\nAnalysis based on {len(self.epochs)} samples from epoch {self.epochs.min()} to {self.epochs.max()}.\n")
     
     def generate_visualizations(self, results: Dict):
         """Generate visualization plots"""
         print("\n📈 Generating visualizations...")
         
-        try:
-            # 1. Bit bias plot
-            if 'bit_bias' in results and 'biases' in results['bit_bias']:
-                plt.figure(figsize=(12, 6))
-                biases = results['bit_bias']['biases'][:256]  # Ensure we only plot 256 bits
-                plt.plot(range(len(biases)), biases)
-                plt.axhline(y=0.5, color='r', linestyle='--', alpha=0.5, label='Expected (0.5)')
-                plt.xlabel('Bit Position (0-255)')
-                plt.ylabel('Frequency of 1s')
-                plt.title('Bit Bias Analysis')
-                plt.legend()
-                plt.tight_layout()
-                plt.savefig(self.output_dir / 'bit_bias.png', dpi=150)
-                plt.close()
-                print("  ✓ Bit bias plot saved")
-            
-            # 2. Hamming distance distribution
-            if 'hamming' in results and 'consecutive' in results['hamming']:
-                plt.figure(figsize=(10, 6))
-                consecutive_vals = results['hamming']['consecutive'].get('values', [])
-                random_vals = results['hamming']['random'].get('values', [])
-                
-                if consecutive_vals and random_vals:
-                    plt.hist(consecutive_vals, alpha=0.5, bins=30, label='Consecutive', density=True)
-                    plt.hist(random_vals, alpha=0.5, bins=30, label='Random Pairs', density=True)
-                    plt.axvline(x=128, color='r', linestyle='--', label='Expected Mean (128)')
-                    plt.xlabel('Hamming Distance')
-                    plt.ylabel('Density')
-                    plt.title('Hamming Distance Distribution')
-                    plt.legend()
-                    plt.tight_layout()
-                    plt.savefig(self.output_dir / 'hamming_distance.png', dpi=150)
-                    plt.close()
-                    print("  ✓ Hamming distance plot saved")
-            
-            # 3. Entropy distribution
-            if 'entropy' in results and 'sample_entropy' in results['entropy']:
-                plt.figure(figsize=(10, 6))
-                entropy_vals = results['entropy']['sample_entropy'].get('values', [])
-                if entropy_vals:
-                    plt.hist(entropy_vals, bins=20, alpha=0.7)
-                    plt.axvline(x=1.0, color='r', linestyle='--', label='Perfect Entropy (1.0)')
-                    plt.xlabel('Shannon Entropy (bits)')
-                    plt.ylabel('Frequency')
-                    plt.title('Sample Entropy Distribution')
-                    plt.legend()
-                    plt.tight_layout()
-                    plt.savefig(self.output_dir / 'entropy_distribution.png', dpi=150)
-                    plt.close()
-                    print("  ✓ Entropy distribution plot saved")
-            
-            # 4. Autocorrelation plot
-            if 'autocorrelation' in results and 'autocorrelation' in results['autocorrelation']:
-                plt.figure(figsize=(10, 6))
-                autocorr_vals = results['autocorrelation']['autocorrelation']
-                lags = results['autocorrelation'].get('lags', range(len(autocorr_vals)))
-                conf_bound = results['autocorrelation'].get('confidence_95', 0.0)
-                
-                if len(autocorr_vals) > 1:
-                    plt.plot(lags, autocorr_vals, marker='o', markersize=3)
-                    plt.axhline(y=conf_bound, color='r', linestyle='--', alpha=0.5, label='95% Confidence')
-                    plt.axhline(y=-conf_bound, color='r', linestyle='--', alpha=0.5)
-                    plt.axhline(y=0, color='k', linestyle='-', alpha=0.3)
-                    plt.xlabel('Lag')
-                    plt.ylabel('Autocorrelation')
-                    plt.title('Autocorrelation Function')
-                    plt.legend()
-                    plt.tight_layout()
-                    plt.savefig(self.output_dir / 'autocorrelation.png', dpi=150)
-                    plt.close()
-                    print("  ✓ Autocorrelation plot saved")
+        # Skip rendering when the plotted results and the PNGs on disk are unchanged
+        plot_key = None
+        if self.cache is not None:
+            plot_inputs = {k: results.get(k) for k in ('bit_bias', 'hamming', 'entropy', 'autocorrelation', 'timeline',
+                                                         'byte_transitions', 'spectral')}
+            plot_key = self.cache.make_key(
+                self.data_hash, 'visualizations',
+                {'output_dir': str(self.output_dir.resolve()),
+                 'inputs': dataset_hash(json.dumps(plot_inputs, sort_keys=True, default=json_default).encode())},
+                function_fingerprint(self.generate_visualizations) + function_fingerprint(self.plot_jobs)
+                + STAGE_CODE['visualizations'])
+            saved_plots = self.cache.get(plot_key)
+            if saved_plots is not None and all((self.output_dir / name).exists() for name in saved_plots):
+                print(f"  ♻️  Plots unchanged, keeping {len(saved_plots)} existing PNGs")
+                return
+        jobs = self.plot_jobs(results)
+        saved = render_figures(jobs, self.output_dir, workers=self.plot_workers)
+        for name in saved:
+            print(f"  ✓ {name} saved")
+        print(f"  📊 Visualizations saved to {self.output_dir}")
+        
+        if plot_key is not None and len(saved) == len(jobs):
+            self.cache.put(plot_key, 'visualizations', self.data_hash, saved)
+    
+    def plot_jobs(self, results: Dict) -> List[PlotJob]:
+        """Pre-aggregated plot jobs for every result that can be drawn"""
+        jobs = []
+        
+        # 1. Bit bias plot
+        if 'bit_bias' in results and 'biases' in results['bit_bias']:
+            biases = results['bit_bias']['biases'][:256]  # Ensure we only plot 256 bits
+            jobs.append(('bit_bias.png', line_plot, dict(
+                x=np.arange(len(biases)), y=biases, title='Bit Bias Analysis',
+                xlabel='Bit Position (0-255)', ylabel='Frequency of 1s',
+                reference=0.5, reference_label='Expected (0.5)', figsize=(12, 6))))
+        
+        # 2. Hamming distance distribution
+        if 'hamming' in results and 'histogram' in results['hamming'].get('consecutive', {}):
+            histograms = integer_histograms({'Consecutive': results['hamming']['consecutive']['histogram'],
+                                             'Random Pairs': results['hamming']['random']['histogram']})
+            if histograms:
+                jobs.append(('hamming_distance.png', histogram_plot, dict(
+                    histograms=histograms, title='Hamming Distance Distribution', xlabel='Hamming Distance',
+                    density=True, reference=128, reference_label='Expected Mean (128)')))
+        
+        # 3. Entropy distribution
+        if 'entropy' in results and 'histogram' in results['entropy'].get('sample_entropy', {}):
+            jobs.append(('entropy_distribution.png', histogram_plot, dict(
+                histograms={'Samples': results['entropy']['sample_entropy']['histogram']},
+                title='Sample Entropy Distribution', xlabel='Shannon Entropy (bits)',
+                reference=1.0, reference_label='Perfect Entropy (1.0)')))
+        
+        # 4. Autocorrelation plot
+        if 'autocorrelation' in results and 'autocorrelation' in results['autocorrelation']:
+            autocorr_vals = results['autocorrelation']['autocorrelation']
+            lags = results['autocorrelation'].get('lags', range(len(autocorr_vals)))
+            if len(autocorr_vals) > 1:
+                x, y = minmax_decimate(np.asarray(lags), autocorr_vals)
+                jobs.append(('autocorrelation.png', line_plot, dict(
+                    x=x, y=y, title='Autocorrelation Function', xlabel='Lag', ylabel='Autocorrelation',
+                    bands=results['autocorrelation'].get('confidence_95', 0.0), marker='o')))
+        
+        # 5. Rolling metrics with change points
+        if 'timeline' in results and 'rolling' in results['timeline']:
+            timeline = results['timeline']
+            rolling = timeline['rolling']
+            panels = [('Bias z-score', rolling['bias_z'], 0.0),
+                      ('Max bit-position |z|', rolling['max_position_z'], None),
+                      ('Hamming mean', rolling['hamming_mean'], 128.0),
+                      ('Serial p-value', rolling['serial_p_value'], 0.01)]
+            jobs.append(('rolling_metrics.png', rolling_plot, dict(
+                x=timeline['window_end_epoch'], panels=panels,
+                change_epochs=sorted({e for epochs in change_epochs(timeline).values() for e in epochs}),
+                title=f"Rolling Metrics ({timeline['window']}-epoch windows, change points in orange)")))
+        
+        # 6. Byte transition dependence
+        if 'byte_transitions' in results and 'positions' in results['byte_transitions']:
+            transitions = results['byte_transitions']
+            positions = transitions['positions']
+            pair_key = 'collision_p_value' if transitions['sparse'] else 'g_p_value'
+            neg_log_p = {label: [-math.log10(max(p[key], 1e-300)) for p in positions]
+                         for key, label in ((pair_key, 'Pairing'), ('xor_p_value', 'XOR difference'))}
             
-            print(f"  📊 Visualizations saved to {self.output_dir}")
+            xor_counts = np.asarray(transitions['xor_difference_counts'], dtype=float)
+            expected = np.asarray(transitions['xor_difference_expected'], dtype=float)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                xor_residual = np.where(expected > 0, (xor_counts - expected) / np.sqrt(expected), 0.0)
             
-        except Exception as e:
-            print(f"  ⚠️ Could not generate some visualizations: {e}")
+            position = transitions['strongest_position']
+            table = transition_table(self.seed_bytes, position, lag=transitions['lag']).astype(float)
+            table_expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / max(table.sum(), 1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                residual = np.where(table_expected > 0, (table - table_expected) / np.sqrt(table_expected), 0.0)
+            jobs.append(('byte_transitions.png', byte_transition_plot, dict(
+                neg_log_p=neg_log_p, threshold=-math.log10(transitions['alpha']),
+                xor_residual=xor_residual, table_residual=residual, position=position)))
+        
+        # 7. Periodograms along the epoch axis
+        if 'spectral' in results and 'periodogram' in results['spectral']:
+            spectral = results['spectral']
+            periodogram = spectral['periodogram']
+            panels = [('Mean over bit positions', periodogram['frequency'], periodogram['mean_power'],
+                       spectral['mean_periodogram']['threshold']),
+                      ('Coherent (summed bit positions)', periodogram['coherent_frequency'],
+                       periodogram['coherent_power'], spectral['coherent_periodogram']['threshold'])]
+            jobs.append(('spectral_periodogram.png', periodogram_plot, dict(
+                panels=panels, peaks=spectral['dominant_periods'])))
+        
+        # 8. Bit position x epoch heatmap
+        if len(self.seed_bytes) > 1:
+            heatmap = bit_epoch_heatmap(self.seed_bytes)
+            jobs.append(('bit_epoch_heatmap.png', heatmap_plot, dict(
+                z=heatmap['z'], epoch_first=int(self.epochs[0]), epoch_last=int(self.epochs[-1]),
+                epochs_per_row=len(self.seed_bytes) / len(heatmap['z']))))
+        
+        return jobs
 
 # ==================== MAIN EXECUTION ====================
 
@@ -688,22 +1126,72 @@ def main():
     """Main execution function"""
     parser = argparse.ArgumentParser(description='Analyze RANDAO randomness')
     parser.add_argument('--log-file', '-l', required=True, 
-                       help='Path to JSONL log file with RANDAO data')
+                       help='Path to JSONL log file with RANDAO data, or to a Parquet store directory')
+    parser.add_argument('--dataset', '-d', default=None,
+                       help='Dataset to analyze when --log-file is a Parquet store')
     parser.add_argument('--output-dir', '-o', default='./randao_analysis',
                        help='Output directory for analysis results')
     parser.add_argument('--basic', '-b', action='store_true',
                        help='Run only basic analysis (faster)')
+    parser.add_argument('--window', '-w', type=int, default=DEFAULT_WINDOW,
+                       help='Rolling window of the timeline analysis, in epochs')
+    parser.add_argument('--plot-workers', type=int, default=None,
+                       help='Processes rendering the plots in parallel (default: one per CPU, 1 = in-process)')
+    parser.add_argument('--clean', action='store_true',
+                       help='Analyze only the longest clean epoch range (no repeated seeds or gaps) from the log catalogue')
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR),
+                       help='Directory of the persistent result cache and log catalogue')
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_MAX_BYTES / 2**20,
+                       help='Size limit of the result cache in MiB (LRU eviction)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Recompute every analysis without reading or writing the cache')
+    parser.add_argument('--profile', action='store_true',
+                       help=f'Record wall/CPU time and peak memory per stage into {PROFILE_REPORT}')
+    parser.add_argument('--profile-dumps', action='store_true',
+                       help='With --profile, also write cProfile and tracemalloc dumps per stage')
     
     args = parser.parse_args()
+    if args.clean and Path(args.log_file).is_dir():
+        parser.error('--clean needs a JSONL log file, not a Parquet store')
     
     try:
+        seeds = None
+        if args.clean:
+            from catalogue import CATALOGUE_FILE, Catalogue
+            catalogue = Catalogue(Path(args.cache_dir) / CATALOGUE_FILE)
+            try:
+                seeds = catalogue.load_clean(args.log_file)
+            finally:
+                catalogue.close()
+            print(f"🧹 Clean range: epochs {seeds[0][0]} to {seeds[0][-1]}")
+        
+        cache = None
+        if not args.no_cache:
+            cache = AnalysisCache(args.cache_dir, max_bytes=int(args.cache_max_mb * 2**20))
+        
+        profiler = None
+        if args.profile:
+            dump_dir = Path(args.output_dir) / "profile" if args.profile_dumps else None
+            profiler = StageProfiler(dump_dir=dump_dir)
+        
         # Run analysis
-        analyzer = RANDAOAnalyzer(args.log_file, args.output_dir)
+        analyzer = RANDAOAnalyzer(args.log_file, args.output_dir, cache=cache, profiler=profiler,
+                                   seeds=seeds, dataset=args.dataset, plot_workers=args.plot_workers)
         
         if args.basic:
             results = analyzer.run_basic_analysis()
         else:
-            results = analyzer.run_complete_analysis()
+            results = analyzer.run_complete_analysis(window=args.window)
+        
+        if profiler is not None:
+            profiler.print_table()
+            report_file = profiler.save(analyzer.output_dir / PROFILE_REPORT,
+                                        log_file=str(analyzer.log_file),
+                                        mode='basic' if args.basic else 'complete',
+                                        n_samples=len(analyzer.epochs),
+                                        cache_enabled=cache is not None)
+            profiler.close()
+            print(f"  📄 Profile saved to: {report_file}")
         
         # Print quick summary
         if 'summary' in results:
@@ -712,6 +1200,12 @@ def main():
             print(f"  Issues: {len(results['summary']['issues'])}")
             print(f"  Warnings: {len(results['summary']['warnings'])}")
         
+        if cache is not None:
+            cache_stats = cache.stats()
+            print(f"  Cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                  f"{cache_stats['entries']} entries ({cache_stats['bytes'] / 2**20:.1f} MiB)")
+            cache.close()
+        
     except Exception as e:
         print(f"\n❌ Error during analysis: {e}")
         import traceback
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Vectorised overlapping m-bit pattern counting.
+
+Windows are read straight from the packed byte array: every byte offset k
+gets a big-endian 32-bit word, and the window starting at bit 8k + r is
+(word >> (32 - r - m)) & mask. Eight shifts cover all start positions, and
+one np.bincount per shift counts them. No per-bit Python loop and no
+string slicing.
+
+One pass with m+1 bit windows (cyclic, as in NIST SP 800-22) yields the
+serial test (2.11), approximate entropy (2.12) and runs test (2.3). The
+shorter window counts are obtained by marginalising the longer ones.
+"""
+
+import math
+from typing import Dict, Tuple
+
+import numpy as np
+
+MAX_M = 16
+# One extra bit for approximate entropy, and the word must hold r + window <= 24 bits
+MAX_WINDOW = MAX_M + 1
+
+
+def pack_bits(bits) -> Tuple[np.ndarray, int]:
+    """Pack a 0/1 array into (packed uint8 array, number of bits)"""
+    bits = np.asarray(bits, dtype=np.uint8)
+    return np.packbits(bits), len(bits)
+
+
+def _cyclic_extension(packed: np.ndarray, n_bits: int, extra: int) -> np.ndarray:
+    """Packed sequence followed by its own first `extra` bits (NIST wrap-around)"""
+    if n_bits % 8 == 0:
+        n_bytes = n_bits // 8
+        return np.resize(packed[:n_bytes], n_bytes + -(-extra // 8))
+    bits = np.unpackbits(packed, count=n_bits)
+    return np.packbits(np.resize(bits, n_bits + extra))
+
+
+def window_counts(packed: np.ndarray, n_bits: int, m: int, cyclic: bool = True) -> np.ndarray:
+    """
+    Counts of all 2**m overlapping m-bit windows, indexed by their integer value.
+
+    cyclic=True appends the first m-1 bits so there are exactly n_bits
+    windows; cyclic=False counts only the n_bits - m + 1 windows that fit.
+    """
+    if not 1 <= m <= MAX_WINDOW:
+        raise ValueError(f"window length must be between 1 and {MAX_WINDOW}, got {m}")
+    if n_bits < m and not cyclic:
+        return np.zeros(2 ** m, dtype=np.int64)
+
+    ext = _cyclic_extension(packed, n_bits, m - 1)
+    words = np.zeros(len(ext) + 3, dtype=np.uint32)
+    words[:len(ext)] = ext
+    words = (words[:-3] << 24) | (words[1:-2] << 16) | (words[2:-1] << 8) | words[3:]
+
+    n_windows = n_bits if cyclic else n_bits - m + 1
+    mask = np.uint32((1 << m) - 1)
+    counts = np.zeros(2 ** m, dtype=np.int64)
+    for r in range(8):
+        n_starts = (n_windows - r + 7) // 8  # start positions 8k + r < n_windows
+        if n_starts <= 0:
+            break
+        values = (words[:n_starts] >> np.uint32(32 - r - m)) & mask
+        counts += np.bincount(values, minlength=2 ** m)
+    return counts
+
+
+def marginalize(counts: np.ndarray, m_from: int, m_to: int) -> np.ndarray:
+    """Counts of the m_to-bit prefixes of m_from-bit windows (exact for cyclic counts)"""
+    if m_to == 0:
+        return np.array([counts.sum()])
+    return counts.reshape(2 ** m_to, 2 ** (m_from - m_to)).sum(axis=1)
+
+
+def _psi_squared(counts: np.ndarray, n_bits: int) -> float:
+    m = int(math.log2(len(counts)))
+    if m == 0:
+        return 0.0
+    return float((2 ** m / n_bits) * np.sum(counts.astype(np.float64) ** 2) - n_bits)
+
+
+def _phi(counts: np.ndarray, n_bits: int) -> float:
+    freq = counts[counts > 0] / n_bits
+    return float(np.sum(freq * np.log(freq)))
+
+
+def pattern_statistics(packed: np.ndarray, n_bits: int, m: int = 2) -> Dict:
+    """
+    Serial, approximate-entropy and runs statistics from one (m+1)-bit window count.
+
+    Follows NIST SP 800-22: serial test 2.11 (two p-values), approximate
+    entropy 2.12 (block length m) and runs test 2.3.
+    """
+    if not 1 <= m <= MAX_M:
+        raise ValueError(f"m must be between 1 and {MAX_M}, got {m}")
+    counts = window_counts(packed, n_bits, m + 1, cyclic=True)
+    return statistics_from_counts(counts, n_bits, m, _bit_at(packed, 0), _bit_at(packed, n_bits - 1))
+
+
+def statistics_from_counts(counts: np.ndarray, n_bits: int, m: int, first_bit: int, last_bit: int) -> Dict:
+    """
+    pattern_statistics from the cyclic (m+1)-bit window counts of a sequence
+    and its first and last bit (for the wrap-around pair of the runs test)
+    """
+    from scipy.special import erfc, gammaincc
+
+    counts = np.asarray(counts, dtype=np.int64)
+    lengths = set(range(max(0, m - 2), m + 2)) | {1, 2}
+    by_length = {k: marginalize(counts, m + 1, k) for k in lengths}
+
+    # Serial test
+    psi = {k: _psi_squared(by_length[k], n_bits) if k >= 1 else 0.0 for k in (m, m - 1, m - 2)}
+    del1 = psi[m] - psi[m - 1]
+    del2 = psi[m] - 2 * psi[m - 1] + psi[m - 2]
+    serial = {
+        'psi2_m': psi[m],
+        'psi2_m_minus_1': psi[m - 1],
+        'psi2_m_minus_2': psi[m - 2],
+        'delta_psi2': del1,
+        'delta2_psi2': del2,
+        'p_value1': float(gammaincc(2 ** (m - 2), del1 / 2)),
+        'p_value2': float(gammaincc(2 ** (m - 3), del2 / 2)) if m >= 2 else None,
+        'valid_block_length': m < int(math.log2(n_bits)) - 2,
+    }
+
+    # Approximate entropy
+    phi_m = _phi(by_length[m], n_bits)
+    phi_m1 = _phi(by_length[m + 1], n_bits)
+    apen = phi_m - phi_m1
+    apen_chi2 = 2 * n_bits * (math.log(2) - apen)
+    approximate_entropy = {
+        'phi_m': phi_m,
+        'phi_m_plus_1': phi_m1,
+        'apen': apen,
+        'chi_square': apen_chi2,
+        'p_value': float(gammaincc(2 ** (m - 1), apen_chi2 / 2)),
+        'valid_block_length': m < int(math.log2(n_bits)) - 5,
+    }
+
+    # Runs test: transitions are the cyclic 01/10 pairs minus the wrap-around pair
+    ones = int(by_length[1][1])
+    pairs = by_length[2]
+    transitions = int(pairs[1] + pairs[2]) - int(first_bit != last_bit)
+    n_runs = transitions + 1
+    pi = ones / n_bits
+    prerequisite = abs(pi - 0.5) < 2 / math.sqrt(n_bits)
+    if prerequisite and 0 < pi < 1:
+        runs_p = float(erfc(abs(n_runs - 2 * n_bits * pi * (1 - pi))
+                            / (2 * math.sqrt(2 * n_bits) * pi * (1 - pi))))
+    else:
+        runs_p = 0.0
+    runs = {
+        'ones': ones,
+        'pi': pi,
+        'runs': n_runs,
+        'prerequisite_passed': prerequisite,
+        'p_value': runs_p,
+    }
+
+    return {
+        'n_bits': n_bits,
+        'm': m,
+        'counts': by_length[m].tolist(),
+        'serial': serial,
+        'approximate_entropy': approximate_entropy,
+        'runs': runs,
+    }
+
+
+def _bit_at(packed: np.ndarray, i: int) -> int:
+    return int(packed[i // 8] >> (7 - i % 8)) & 1
+
+
+def linear_pair_counts(packed: np.ndarray, n_bits: int) -> Dict[str, int]:
+    """Non-cyclic counts of the n-1 overlapping 2-bit pairs, keyed '00'..'11'"""
+    counts = window_counts(packed, n_bits, 2, cyclic=False)
+    return {format(v, '02b'): int(c) for v, c in enumerate(counts)}
+
+
+def transition_count(packed: np.ndarray, n_bits: int) -> int:
+    """Number of positions i with bit[i] != bit[i-1]"""
+    counts = window_counts(packed, n_bits, 2, cyclic=False)
+    return int(counts[1] + counts[2])
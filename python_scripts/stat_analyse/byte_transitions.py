@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Does byte j of one seed predict byte j of the next?
+
+For every byte position j the consecutive pairs (seed[t][j], seed[t+lag][j])
+form a 256 x 256 contingency table. All 32 tables come from a single
+np.bincount over the combined index
+
+    j * 65536 + seed[t][j] * 256 + seed[t+lag][j]
+
+and the statistics are evaluated for all positions at once. Per position:
+
+    chi-square / G-test   independence of the two bytes, df (r-1)(c-1)
+    mutual information    G / (2n ln 2) bits (plug-in)
+    collisions            pairs of transitions in the same cell, against
+                          their exact mean over random pairings (Poisson)
+    XOR difference        seed[t][j] ^ seed[t+lag][j], chi-square against the
+                          XOR-convolution of the two marginals; a repeated
+                          XOR offset (e.g. a constant reveal) puts mass on a
+                          few of its 256 cells
+
+With a few hundred epochs the 65536-cell tables are very sparse, so the
+asymptotic G-test is not reliable; there the pairing is tested with the
+collision count instead. G is also put on a z-scale against a permutation
+null: the later seeds are shuffled as whole rows, which keeps both marginals
+and only breaks the pairing. Each permutation is one more bincount.
+"""
+
+import math
+from typing import Dict
+
+import numpy as np
+
+SEED_BYTES = 32
+SYMBOLS = 256
+CELLS = SYMBOLS * SYMBOLS
+
+DEFAULT_PERMUTATIONS = 20
+SPARSE_EXPECTED = 5.0   # asymptotic tests need about this many expected counts per cell
+ALPHA = 0.01            # family-wise level, Bonferroni over the 32 positions
+
+
+def transition_counts(seed_bytes: np.ndarray, lag: int = 1) -> np.ndarray:
+    """(32, 256, 256) counts of (byte j at t, byte j at t + lag)"""
+    return _PairStatistics(seed_bytes[:-lag], seed_bytes[lag:]).counts.reshape(SEED_BYTES, SYMBOLS, SYMBOLS)
+
+
+def _cell_index(prev: np.ndarray, nxt: np.ndarray) -> np.ndarray:
+    return np.arange(SEED_BYTES) * CELLS + prev.astype(np.int64) * SYMBOLS + nxt
+
+
+def transition_table(seed_bytes: np.ndarray, position: int, lag: int = 1) -> np.ndarray:
+    """256 x 256 transition counts of a single byte position"""
+    prev = seed_bytes[:-lag, position].astype(np.int64)
+    return np.bincount(prev * SYMBOLS + seed_bytes[lag:, position], minlength=CELLS).reshape(SYMBOLS, SYMBOLS)
+
+
+def xor_difference_counts(seed_bytes: np.ndarray, lag: int = 1) -> np.ndarray:
+    """(32, 256) counts of byte j at t XOR byte j at t + lag"""
+    return _xor_counts(seed_bytes[:-lag], seed_bytes[lag:])
+
+
+def _xor_counts(prev: np.ndarray, nxt: np.ndarray) -> np.ndarray:
+    index = (np.arange(SEED_BYTES) * SYMBOLS + (prev ^ nxt)).ravel()
+    return np.bincount(index, minlength=SEED_BYTES * SYMBOLS).reshape(SEED_BYTES, SYMBOLS)
+
+
+def xor_expected(row_sums: np.ndarray, col_sums: np.ndarray, n: int) -> np.ndarray:
+    """(32, 256) expected XOR-difference counts of a random pairing: the XOR-convolution of the marginals"""
+    partner = np.arange(SYMBOLS)[:, None] ^ np.arange(SYMBOLS)[None, :]     # [a, d] -> a ^ d
+    return np.einsum('ja,jad->jd', row_sums.astype(np.float64), col_sums[:, partner]) / n
+
+
+class _PairStatistics:
+    """
+    Chi-square and G of the 32 tables for the observed and for shuffled pairings.
+
+    Shuffling the later seeds keeps the row sums r and column sums c, so
+    sum_cells O ln E = sum r ln r + sum c ln c - n ln n is fixed and G of a
+    permutation only needs sum_cells O ln O: one bincount and one table
+    lookup per cell.
+    """
+
+    def __init__(self, prev: np.ndarray, nxt: np.ndarray):
+        self.n = len(prev)
+        self.prev, self.nxt = prev, nxt
+        self.xlogx = np.arange(self.n + 1) * np.log(np.maximum(np.arange(self.n + 1), 1))
+        self.counts = self.cell_counts()
+        tables = self.counts.reshape(SEED_BYTES, SYMBOLS, SYMBOLS)
+        self.row_sums = tables.sum(axis=2)
+        self.col_sums = tables.sum(axis=1)
+        self.sum_o_log_e = (self.xlogx[self.row_sums].sum(axis=1) + self.xlogx[self.col_sums].sum(axis=1)
+                            - self.xlogx[self.n])
+
+    def cell_counts(self, order: np.ndarray = None) -> np.ndarray:
+        nxt = self.nxt if order is None else self.nxt[order]
+        index = _cell_index(self.prev, nxt)
+        return np.bincount(index.ravel(), minlength=SEED_BYTES * CELLS).reshape(SEED_BYTES, CELLS)
+
+    def g_stat(self, counts: np.ndarray) -> np.ndarray:
+        return 2 * (self.xlogx[counts].sum(axis=1) - self.sum_o_log_e)
+
+    def collisions(self, counts: np.ndarray) -> np.ndarray:
+        """Pairs of transitions sharing a cell, sum C(O, 2)"""
+        return (counts * (counts - 1) // 2).sum(axis=1)
+
+    def expected_collisions(self) -> np.ndarray:
+        """
+        Mean of sum C(O, 2) over random pairings.
+
+        Two transitions with the same earlier byte collide when their shuffled
+        later bytes are equal: sum_i C(r_i, 2) * sum_j C(c_j, 2) / C(n, 2).
+        """
+        same_row = (self.row_sums * (self.row_sums - 1) / 2).sum(axis=1)
+        same_col = (self.col_sums * (self.col_sums - 1) / 2).sum(axis=1)
+        return same_row * same_col / (self.n * (self.n - 1) / 2)
+
+    def chi_square(self, counts: np.ndarray) -> np.ndarray:
+        pos, cell = np.nonzero(counts)
+        observed = counts[pos, cell].astype(np.float64)
+        expected = self.row_sums[pos, cell // SYMBOLS] * self.col_sums[pos, cell % SYMBOLS] / self.n
+        return np.bincount(pos, observed ** 2 / expected, minlength=SEED_BYTES) - self.n
+
+
+def analyze_transitions(seed_bytes: np.ndarray, lag: int = 1,
+                        permutations: int = DEFAULT_PERMUTATIONS, rng_seed: int = 0) -> Dict:
+    """Per-position independence, mutual information and XOR-difference tests between seeds t and t + lag"""
+    seed_bytes = np.ascontiguousarray(seed_bytes, dtype=np.uint8)
+    n = len(seed_bytes) - lag
+    if n < 2:
+        return {"error": "Not enough seeds"}
+
+    prev, nxt = seed_bytes[:-lag], seed_bytes[lag:]
+    statistics = _PairStatistics(prev, nxt)
+    chi_square = statistics.chi_square(statistics.counts)
+    g_stat = statistics.g_stat(statistics.counts)
+    collisions = statistics.collisions(statistics.counts)
+    expected_collisions = statistics.expected_collisions()
+    xor_counts = _xor_counts(prev, nxt)
+    expected_xor = xor_expected(statistics.row_sums, statistics.col_sums, n)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        xor_chi = np.where(expected_xor > 0, (xor_counts - expected_xor) ** 2 / expected_xor, 0.0).sum(axis=1)
+    xor_df = (expected_xor > 0).sum(axis=1) - 1
+
+    df = ((statistics.row_sums > 0).sum(axis=1) - 1) * ((statistics.col_sums > 0).sum(axis=1) - 1)
+    mutual_information = g_stat / (2 * n * math.log(2))
+
+    # Permutation null of G: same marginals, pairing broken
+    rng = np.random.default_rng(rng_seed)
+    null_g = np.empty((permutations, SEED_BYTES))
+    for k in range(permutations):
+        null_g[k] = statistics.g_stat(statistics.cell_counts(rng.permutation(n)))
+    if permutations > 1:
+        null_std = null_g.std(axis=0, ddof=1)
+        g_z = np.where(null_std > 0, (g_stat - null_g.mean(axis=0)) / np.where(null_std > 0, null_std, 1), 0.0)
+    else:
+        g_z = np.zeros(SEED_BYTES)
+    null_mi = null_g.mean(axis=0) / (2 * n * math.log(2))
+    mean_expected = n / CELLS
+    sparse = mean_expected < SPARSE_EXPECTED
+
+    from scipy.stats import chi2, poisson
+    with np.errstate(invalid='ignore'):
+        g_p = np.where(df > 0, chi2.sf(g_stat, np.maximum(df, 1)), 1.0)
+        chi_square_p = np.where(df > 0, chi2.sf(chi_square, np.maximum(df, 1)), 1.0)
+        xor_p = np.where(xor_df > 0, chi2.sf(xor_chi, np.maximum(xor_df, 1)), 1.0)
+    # P(collisions >= observed) under Poisson(expected)
+    collision_p = np.where(collisions > 0, poisson.sf(collisions - 1, expected_collisions), 1.0)
+
+    positions = []
+    for j in range(SEED_BYTES):
+        # sparse tables: the pairing test is the collision count, dense: the G-test
+        pair_p = float(collision_p[j] if sparse else g_p[j])
+        positions.append({
+            'position': j,
+            'chi_square': float(chi_square[j]),
+            'g_stat': float(g_stat[j]),
+            'df': int(df[j]),
+            'chi_square_p_value': float(chi_square_p[j]),
+            'g_p_value': float(g_p[j]),
+            'mutual_information': float(mutual_information[j]),
+            'mutual_information_excess': float(mutual_information[j] - null_mi[j]),
+            'g_z': float(g_z[j]),
+            'collisions': int(collisions[j]),
+            'expected_collisions': float(expected_collisions[j]),
+            'collision_p_value': float(collision_p[j]),
+            'xor_chi_square': float(xor_chi[j]),
+            'xor_df': int(xor_df[j]),
+            'xor_p_value': float(xor_p[j]),
+            'top_xor_difference': int(xor_counts[j].argmax()),
+            'top_xor_count': int(xor_counts[j].max()),
+            'p_value': min(1.0, 2 * min(pair_p, float(xor_p[j]))),
+        })
+
+    # Bonferroni over the positions
+    alpha = ALPHA / SEED_BYTES
+    dependent = [p['position'] for p in positions if p['p_value'] < alpha]
+    strongest = min(positions, key=lambda p: p['p_value'])
+
+    return {
+        'lag': lag,
+        'n_transitions': n,
+        'permutations': permutations,
+        'mean_expected_cell': mean_expected,
+        'sparse': sparse,
+        'positions': positions,
+        'alpha': alpha,
+        'dependent_positions': dependent,
+        'strongest_position': strongest['position'],
+        'min_p_value': strongest['p_value'],
+        'mean_mutual_information_excess': float(np.mean(mutual_information - null_mi)),
+        'xor_difference_counts': xor_counts.tolist(),
+        'xor_difference_expected': np.round(expected_xor, 3).tolist(),
+    }
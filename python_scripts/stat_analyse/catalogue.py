@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Catalogue of RANDAO seed logs with integrity checks.
+
+Every log is scanned once into a SQLite index holding one row per record:
+
+    (file, line, epoch, capture_at_epoch, seed, status)
+
+status is one of
+    ok               usable record
+    repeat           same seed as a later epoch of the same file: the logger's
+                     catch-up loop writes the current finalized seed for every
+                     epoch it missed, so only the latest epoch owns the seed
+    duplicate_epoch  epoch already logged earlier in the file
+    out_of_order     usable, but logged after a later epoch
+
+From the index, duplicate seeds (seed -> epochs, also across files), epoch
+gaps, capture lag and clean ranges (maximal runs of consecutive usable
+epochs) are plain queries. Files are tracked by size, mtime and content
+hash: unchanged files are skipped, and files that only grew (the logger
+appends) are scanned from the old end onwards.
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from analyze import LOGGER_EPOCH_KEY, LOGGER_SEED_KEY, SEED_BYTES, seed_to_bytes
+from result_cache import DEFAULT_CACHE_DIR
+
+CATALOGUE_FILE = "catalogue.sqlite"
+DEFAULT_LOG_ROOT = Path(__file__).resolve().parent.parent / "randao_seed_logger"
+
+STATUS_OK = 'ok'
+STATUS_REPEAT = 'repeat'
+STATUS_DUPLICATE_EPOCH = 'duplicate_epoch'
+STATUS_OUT_OF_ORDER = 'out_of_order'
+USABLE = (STATUS_OK, STATUS_OUT_OF_ORDER)
+
+
+def _parse_line(line: bytes) -> Optional[Tuple[Optional[int], Optional[int], Optional[bytes]]]:
+    """(epoch, capture_at_epoch, seed) of one log line, None if it is not JSON"""
+    try:
+        entry = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    if not isinstance(entry, dict):
+        return None
+    if 'randao_bits' in entry:
+        seed = seed_to_bytes(entry['randao_bits'], True)
+    else:
+        seed = seed_to_bytes(entry.get(LOGGER_SEED_KEY), False)
+    epoch = entry.get('epoch', entry.get(LOGGER_EPOCH_KEY))
+    capture = entry.get('capture_at_epoch')
+    return (int(epoch) if isinstance(epoch, int) else None,
+            int(capture) if isinstance(capture, int) else None,
+            seed)
+
+
+class Catalogue:
+    def __init__(self, path=DEFAULT_CACHE_DIR / CATALOGUE_FILE):
+        """
+        Open (or create) the catalogue index at path
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.executescript(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " file_id INTEGER PRIMARY KEY,"
+            " path TEXT UNIQUE NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " mtime REAL NOT NULL,"
+            " content_hash TEXT NOT NULL,"
+            " n_lines INTEGER NOT NULL,"
+            " n_malformed INTEGER NOT NULL,"
+            " n_invalid INTEGER NOT NULL,"
+            " scanned_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS records ("
+            " file_id INTEGER NOT NULL,"
+            " line INTEGER NOT NULL,"
+            " epoch INTEGER NOT NULL,"
+            " capture_at_epoch INTEGER,"
+            " seed BLOB NOT NULL,"
+            " status TEXT NOT NULL,"
+            " PRIMARY KEY (file_id, line));"
+            "CREATE INDEX IF NOT EXISTS records_seed ON records (seed);"
+            "CREATE INDEX IF NOT EXISTS records_epoch ON records (file_id, epoch);"
+        )
+        self.conn.commit()
+
+    # ==================== SCANNING ====================
+
+    def scan(self, paths: Iterable) -> Dict[str, str]:
+        """Scan log files and directories (recursively, *.jsonl); returns path -> scan status"""
+        results = {}
+        for path in map(Path, paths):
+            files = sorted(path.rglob('*.jsonl')) if path.is_dir() else [path]
+            for log_file in files:
+                results[str(log_file.resolve())] = self.scan_file(log_file)
+        return results
+
+    def scan_file(self, log_file) -> str:
+        """
+        Bring the index of one file up to date
+
+        Returns 'unchanged', 'appended', 'rescanned' or 'new'.
+        """
+        log_file = Path(log_file).resolve()
+        stat = log_file.stat()
+        row = self.conn.execute(
+            "SELECT file_id, size, mtime, content_hash, n_lines, n_malformed, n_invalid FROM files WHERE path = ?",
+            (str(log_file),)).fetchone()
+        if row is not None and row[1] == stat.st_size and row[2] == stat.st_mtime:
+            return 'unchanged'
+
+        data = log_file.read_bytes()
+        content_hash = hashlib.sha256(data).hexdigest()
+        if row is None:
+            status, start, first_line, n_malformed, n_invalid = 'new', 0, 1, 0, 0
+            file_id = None
+        else:
+            file_id, old_size, _, old_hash, old_lines, n_malformed, n_invalid = row
+            if old_hash == content_hash:
+                self.conn.execute("UPDATE files SET mtime = ? WHERE file_id = ?", (stat.st_mtime, file_id))
+                self.conn.commit()
+                return 'unchanged'
+            grown = (old_size < len(data) and data[old_size - 1:old_size] in (b'\n', b'')
+                     and hashlib.sha256(data[:old_size]).hexdigest() == old_hash)
+            if grown:
+                status, start, first_line = 'appended', old_size, old_lines + 1
+            else:
+                status, start, first_line, n_malformed, n_invalid = 'rescanned', 0, 1, 0, 0
+                self.conn.execute("DELETE FROM records WHERE file_id = ?", (file_id,))
+
+        rows = []
+        lines = data[start:].split(b'\n')
+        if lines and lines[-1] == b'':
+            lines.pop()
+        for line_num, line in enumerate(lines, first_line):
+            if not line.strip():
+                continue
+            parsed = _parse_line(line)
+            if parsed is None:
+                n_malformed += 1
+                continue
+            epoch, capture, seed = parsed
+            if epoch is None or seed is None:
+                n_invalid += 1
+                continue
+            rows.append((line_num, epoch, capture, seed))
+
+        values = (stat.st_size, stat.st_mtime, content_hash, first_line - 1 + len(lines),
+                  n_malformed, n_invalid, time.time())
+        if file_id is None:
+            file_id = self.conn.execute(
+                "INSERT INTO files (size, mtime, content_hash, n_lines, n_malformed, n_invalid, scanned_at, path) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", values + (str(log_file),)).lastrowid
+        else:
+            self.conn.execute(
+                "UPDATE files SET size = ?, mtime = ?, content_hash = ?, n_lines = ?, n_malformed = ?,"
+                " n_invalid = ?, scanned_at = ? WHERE file_id = ?", values + (file_id,))
+        self.conn.executemany(
+            "INSERT INTO records (file_id, line, epoch, capture_at_epoch, seed, status) VALUES (?, ?, ?, ?, ?, ?)",
+            [(file_id, line, epoch, capture, seed, STATUS_OK) for line, epoch, capture, seed in rows])
+        self._classify(file_id)
+        self.conn.commit()
+        return status
+
+    def _classify(self, file_id: int):
+        """Recompute the status of every record of one file (appends can change earlier ones)"""
+        rows = self.conn.execute(
+            "SELECT line, epoch, seed FROM records WHERE file_id = ? ORDER BY line", (file_id,)).fetchall()
+        last_epoch_of_seed = {}
+        for _, epoch, seed in rows:
+            last_epoch_of_seed[seed] = max(epoch, last_epoch_of_seed.get(seed, epoch))
+
+        status = []
+        seen_epochs = set()
+        max_epoch = None
+        for line, epoch, seed in rows:
+            if epoch in seen_epochs:
+                s = STATUS_DUPLICATE_EPOCH
+            elif epoch < last_epoch_of_seed[seed]:
+                s = STATUS_REPEAT
+            elif max_epoch is not None and epoch < max_epoch:
+                s = STATUS_OUT_OF_ORDER
+            else:
+                s = STATUS_OK
+            seen_epochs.add(epoch)
+            max_epoch = epoch if max_epoch is None else max(max_epoch, epoch)
+            status.append((s, file_id, line))
+        self.conn.executemany("UPDATE records SET status = ? WHERE file_id = ? AND line = ?", status)
+
+    # ==================== QUERIES ====================
+
+    def _file_id(self, log_file) -> int:
+        row = self.conn.execute("SELECT file_id FROM files WHERE path = ?",
+                                (str(Path(log_file).resolve()),)).fetchone()
+        if row is None:
+            raise KeyError(f"{log_file} is not in the catalogue, scan it first")
+        return row[0]
+
+    def files(self) -> List[Dict]:
+        """Per-file summary: record counts by status, epoch span and capture lag"""
+        summaries = []
+        for file_id, path, n_lines, n_malformed, n_invalid, content_hash in self.conn.execute(
+                "SELECT file_id, path, n_lines, n_malformed, n_invalid, content_hash FROM files ORDER BY path"
+        ).fetchall():
+            counts = dict(self.conn.execute(
+                "SELECT status, COUNT(*) FROM records WHERE file_id = ? GROUP BY status", (file_id,)).fetchall())
+            first, last, max_lag, lagged = self.conn.execute(
+                "SELECT MIN(epoch), MAX(epoch), MAX(capture_at_epoch - epoch),"
+                " SUM(capture_at_epoch > epoch) FROM records WHERE file_id = ?", (file_id,)).fetchone()
+            summaries.append({
+                'path': path,
+                'content_hash': content_hash,
+                'lines': n_lines,
+                'malformed': n_malformed,
+                'invalid': n_invalid,
+                'status_counts': counts,
+                'first_epoch': first,
+                'last_epoch': last,
+                'max_capture_lag': max_lag,
+                'lagged_records': lagged or 0,
+                'gaps': len(self.gaps(path)),
+            })
+        return summaries
+
+    def duplicates(self, log_file=None) -> List[Dict]:
+        """Seeds logged more than once: seed -> [(path, epoch, status)], within one file or across all"""
+        where, args = "", ()
+        if log_file is not None:
+            where, args = "WHERE r.file_id = ?", (self._file_id(log_file),)
+        rows = self.conn.execute(
+            f"SELECT r.seed, f.path, r.epoch, r.status FROM records r JOIN files f USING (file_id) "
+            f"WHERE r.seed IN (SELECT seed FROM records r {where} GROUP BY seed HAVING COUNT(*) > 1) "
+            f"{'AND r.file_id = ?' if log_file is not None else ''} ORDER BY r.seed, f.path, r.epoch",
+            args + args).fetchall()
+        groups: Dict[bytes, List] = {}
+        for seed, path, epoch, status in rows:
+            groups.setdefault(seed, []).append({'path': path, 'epoch': epoch, 'status': status})
+        return [{'seed': '0x' + seed.hex(), 'occurrences': occ} for seed, occ in groups.items()]
+
+    def gaps(self, log_file) -> List[Tuple[int, int]]:
+        """Missing epoch ranges (first, last), inclusive, between the usable records of a file"""
+        rows = self.conn.execute(
+            "SELECT prev + 1, epoch - 1 FROM ("
+            " SELECT epoch, LAG(epoch) OVER (ORDER BY epoch) AS prev FROM ("
+            "  SELECT DISTINCT epoch FROM records WHERE file_id = ? AND status IN (?, ?)))"
+            " WHERE epoch > prev + 1", (self._file_id(log_file),) + USABLE).fetchall()
+        return [tuple(r) for r in rows]
+
+    def clean_ranges(self, log_file, min_length: int = 1) -> List[Tuple[int, int]]:
+        """Maximal runs (first, last) of consecutive usable epochs, longest first"""
+        rows = self.conn.execute(
+            "SELECT MIN(epoch), MAX(epoch) FROM ("
+            " SELECT epoch, epoch - ROW_NUMBER() OVER (ORDER BY epoch) AS island"
+            " FROM records WHERE file_id = ? AND status IN (?, ?))"
+            " GROUP BY island HAVING COUNT(*) >= ? ORDER BY COUNT(*) DESC, MIN(epoch)",
+            (self._file_id(log_file),) + USABLE + (min_length,)).fetchall()
+        return [tuple(r) for r in rows]
+
+    def load_seeds(self, log_file, first: Optional[int] = None,
+                   last: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(epochs, N x 32 uint8 seed matrix) of the usable records in [first, last], from the index"""
+        rows = self.conn.execute(
+            "SELECT epoch, seed FROM records WHERE file_id = ? AND status IN (?, ?)"
+            " AND epoch >= ? AND epoch <= ? ORDER BY epoch",
+            (self._file_id(log_file),) + USABLE +
+            (first if first is not None else -2**62, last if last is not None else 2**62)).fetchall()
+        if not rows:
+            raise ValueError(f"No usable seeds for {log_file} in the requested range")
+        epochs = np.array([r[0] for r in rows], dtype=np.int64)
+        seed_bytes = np.frombuffer(b''.join(r[1] for r in rows), dtype=np.uint8).reshape(-1, SEED_BYTES)
+        return epochs, seed_bytes
+
+    def load_clean(self, log_file) -> Tuple[np.ndarray, np.ndarray]:
+        """Seeds of the longest clean range of a file (scanning it first if needed)"""
+        self.scan_file(log_file)
+        ranges = self.clean_ranges(log_file)
+        if not ranges:
+            raise ValueError(f"No usable seeds in {log_file}")
+        return self.load_seeds(log_file, *ranges[0])
+
+    def close(self):
+        self.conn.close()
+
+
+def print_report(catalogue: Catalogue, show_duplicates: int = 5):
+    """Human-readable per-file integrity report"""
+    for info in catalogue.files():
+        counts = info['status_counts']
+        ranges = catalogue.clean_ranges(info['path'])
+        longest = f"{ranges[0][0]}-{ranges[0][1]} ({ranges[0][1] - ranges[0][0] + 1} epochs)" if ranges else "none"
+        flag = "✓" if len(counts) <= 1 and not info['gaps'] and not info['malformed'] else "⚠️"
+        print(f"\n{flag} {info['path']}")
+        print(f"  Records: {sum(counts.values())} "
+              + ", ".join(f"{k}={v}" for k, v in sorted(counts.items()))
+              + f" | malformed={info['malformed']}, invalid={info['invalid']}")
+        print(f"  Epochs: {info['first_epoch']}-{info['last_epoch']}, gaps: {info['gaps']}, "
+              f"lagged captures: {info['lagged_records']} (max lag {info['max_capture_lag']})")
+        print(f"  Longest clean range: {longest}")
+    dups = catalogue.duplicates()
+    print(f"\n🔁 {len(dups)} seeds logged more than once")
+    for dup in dups[:show_duplicates]:
+        where = ", ".join(f"{Path(o['path']).name}:{o['epoch']}" for o in dup['occurrences'])
+        print(f"  {dup['seed'][:18]}…  {where}")
+
+
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description='Catalogue RANDAO seed logs: duplicates, gaps, capture lag')
+    parser.add_argument('paths', nargs='*', default=[str(DEFAULT_LOG_ROOT)],
+                       help='Log files or directories to scan (default: randao_seed_logger/)')
+    parser.add_argument('--catalogue', default=str(DEFAULT_CACHE_DIR / CATALOGUE_FILE),
+                       help='Path of the catalogue index')
+    parser.add_argument('--json', action='store_true', help='Print the file summaries as JSON')
+    args = parser.parse_args()
+
+    catalogue = Catalogue(args.catalogue)
+    try:
+        start = time.perf_counter()
+        scanned = catalogue.scan(args.paths)
+        by_status = {}
+        for status in scanned.values():
+            by_status[status] = by_status.get(status, 0) + 1
+        print(f"📚 Scanned {len(scanned)} logs in {time.perf_counter() - start:.2f}s: "
+              + ", ".join(f"{k}={v}" for k, v in sorted(by_status.items())))
+        if args.json:
+            print(json.dumps(catalogue.files(), indent=2))
+        else:
+            print_report(catalogue)
+    finally:
+        catalogue.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Pairwise comparison of all experiment configurations in geloggde_seeds.
+
+Logs are collected recursively, so older_logs/ is included; a log in a
+subdirectory is named after it (older_logs/config10_60ep).
+
+Every log is reduced once to a small profile of sufficient statistics:
+
+    hamming_hist   histogram of consecutive Hamming distances (0..256)
+    ones           per-bit ones counts
+    block_bias     per-bit bias of every BIAS_BLOCK-epoch block (subsampled
+                   to MAX_BLOCKS), plus its mean within-sample distance
+
+Each pair of configs is then compared on the profiles alone:
+
+    ks        two-sample Kolmogorov-Smirnov on the Hamming distributions,
+              computed from the two histograms
+    chi2      chi-square homogeneity of the per-bit ones/zeros counts
+              (one 2x2 table per bit, summed, df = bits)
+    energy    energy distance between the block-bias vectors, with a
+              permutation p-value
+
+Profiles are cached by seed content hash and pair results by the pair of
+hashes (result_cache.AnalysisCache). Adding a config therefore costs one
+profile and one comparison against each existing config. The matrix is
+written as JSON and Markdown, plus a heatmap per statistic with rows in
+average-linkage cluster order.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from analyze import load_log
+from result_cache import (AnalysisCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, dataset_hash, function_fingerprint,
+                          json_default, module_fingerprint)
+from timeline import POPCOUNT, kolmogorov_sf
+
+SEED_BITS = 256
+DEFAULT_DATA_DIR = Path(__file__).resolve().parent.parent / "randao_seed_logger" / "geloggde_seeds"
+LOG_PREFIX = "randao_log_"
+
+BIAS_BLOCK = 32
+MAX_BLOCKS = 256
+ENERGY_PERMUTATIONS = 199
+ALPHA = 0.01
+
+# Module constants (BIAS_BLOCK, ...) and helpers feed every cached profile and pair
+PROFILE_CODE = module_fingerprint(['compare_configs.py', 'timeline.py'])
+
+# (key, label, statistic used for the heatmap)
+METRICS = [
+    ('ks', 'KS on Hamming distances', 'statistic'),
+    ('chi2', 'Chi-square homogeneity of bit counts', 'statistic_per_df'),
+    ('energy', 'Energy distance of block bias vectors', 'statistic'),
+]
+
+
+def config_name(path: Path, root: Optional[Path] = None) -> str:
+    """Log name without the prefix, qualified by its subdirectory of root (e.g. older_logs/config10_60ep)"""
+    path = Path(path)
+    name = path.stem
+    name = name[len(LOG_PREFIX):] if name.startswith(LOG_PREFIX) else name
+    if root is not None and path.parent != Path(root):
+        name = f"{path.parent.relative_to(root).as_posix()}/{name}"
+    return name
+
+
+def find_logs(data_dirs: Sequence) -> List[Tuple[str, Path]]:
+    """(config name, path) of every *.jsonl log below the given directories, subdirectories included"""
+    logs, seen = [], set()
+    for d in data_dirs:
+        for path in sorted(Path(d).rglob("*.jsonl")):
+            if path.resolve() not in seen:     # overlapping directories list a log once
+                seen.add(path.resolve())
+                logs.append((config_name(path, Path(d)), path))
+    names = [name for name, _ in logs]
+    duplicates = {n for n in names if names.count(n) > 1}
+    if duplicates:
+        raise ValueError(f"several logs map to the same config name: {', '.join(sorted(duplicates))}")
+    return sorted(logs)
+
+
+# ==================== PROFILES ====================
+
+def _pairwise_distances(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    sq = (a ** 2).sum(axis=1)[:, None] + (b ** 2).sum(axis=1)[None, :] - 2 * a @ b.T
+    return np.sqrt(np.maximum(sq, 0.0))
+
+
+def dataset_profile(seed_bytes: np.ndarray) -> Dict:
+    """Sufficient statistics of one dataset for all pairwise comparisons"""
+    seed_bytes = np.ascontiguousarray(seed_bytes, dtype=np.uint8)
+    n = len(seed_bytes)
+    bits = np.unpackbits(seed_bytes, axis=1)
+
+    hamming = POPCOUNT[seed_bytes[1:] ^ seed_bytes[:-1]].sum(axis=1)
+    n_blocks = n // BIAS_BLOCK
+    block_bias = (bits[:n_blocks * BIAS_BLOCK].reshape(n_blocks, BIAS_BLOCK, SEED_BITS).mean(axis=1) - 0.5
+                  if n_blocks else np.zeros((0, SEED_BITS)))
+    if n_blocks > MAX_BLOCKS:
+        block_bias = block_bias[np.linspace(0, n_blocks - 1, MAX_BLOCKS).astype(np.int64)]
+
+    return {
+        'n_seeds': n,
+        'ones': bits.sum(axis=0).tolist(),
+        'hamming_hist': np.bincount(hamming, minlength=SEED_BITS + 1).tolist(),
+        'block_bias': block_bias.tolist(),
+        'energy_within': float(_pairwise_distances(block_bias, block_bias).mean()) if len(block_bias) else 0.0,
+    }
+
+
+# ==================== PAIRWISE STATISTICS ====================
+
+def ks_from_histograms(hist_a, hist_b) -> Dict:
+    """Two-sample KS statistic and asymptotic p-value from two histograms on the same bins"""
+    hist_a, hist_b = np.asarray(hist_a, dtype=np.float64), np.asarray(hist_b, dtype=np.float64)
+    n_a, n_b = hist_a.sum(), hist_b.sum()
+    if n_a == 0 or n_b == 0:
+        return {'statistic': None, 'p_value': None}
+    d = float(np.abs(np.cumsum(hist_a) / n_a - np.cumsum(hist_b) / n_b).max())
+    n_eff = n_a * n_b / (n_a + n_b)
+    # Stephens' small-sample correction of the Kolmogorov argument
+    x = (math.sqrt(n_eff) + 0.12 + 0.11 / math.sqrt(n_eff)) * d
+    return {'statistic': d, 'p_value': kolmogorov_sf(x)}
+
+
+def chi_square_homogeneity(ones_a, n_a: int, ones_b, n_b: int) -> Dict:
+    """Sum over bits of the 2x2 ones/zeros chi-square between two datasets"""
+    from scipy.stats import chi2
+    o_a, o_b = np.asarray(ones_a, dtype=np.float64), np.asarray(ones_b, dtype=np.float64)
+    ones, zeros = o_a + o_b, (n_a - o_a) + (n_b - o_b)
+    valid = (ones > 0) & (zeros > 0)
+    cross = o_a * (n_b - o_b) - o_b * (n_a - o_a)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        per_bit = np.where(valid, (n_a + n_b) * cross ** 2 / (n_a * n_b * ones * zeros), 0.0)
+    statistic, df = float(per_bit.sum()), int(valid.sum())
+    return {
+        'statistic': statistic,
+        'df': df,
+        'statistic_per_df': statistic / df if df else None,
+        'p_value': float(chi2.sf(statistic, df)) if df else 1.0,
+        'max_bit': int(per_bit.argmax()),
+    }
+
+
+def energy_distance(bias_a, within_a: float, bias_b, within_b: float,
+                    permutations: int = ENERGY_PERMUTATIONS, rng_seed: int = 0) -> Dict:
+    """
+    Energy distance 2 E|X-Y| - E|X-X'| - E|Y-Y'| between two sets of bias vectors.
+
+    The within-sample means come with the profiles. The permutation test
+    relabels the pooled blocks and reuses one pooled distance matrix.
+    """
+    a, b = np.asarray(bias_a, dtype=np.float64), np.asarray(bias_b, dtype=np.float64)
+    if len(a) < 2 or len(b) < 2:
+        return {'statistic': None, 'p_value': None}
+    cross = float(_pairwise_distances(a, b).mean())
+    statistic = 2 * cross - within_a - within_b
+
+    pooled = np.concatenate((a, b))
+    d = _pairwise_distances(pooled, pooled)
+    n_a, n = len(a), len(pooled)
+    rng = np.random.default_rng(rng_seed)
+    labels = np.zeros((permutations, n), dtype=bool)
+    labels[:, :n_a] = True
+    labels = rng.permuted(labels, axis=1).astype(np.float64)
+    other = 1.0 - labels
+    # mean of d over (A, B), (A, A) and (B, B) for every relabelling at once
+    d_labels = labels @ d
+    d_other = other @ d
+    null = (2 * (d_labels * other).sum(axis=1) / (n_a * (n - n_a))
+            - (d_labels * labels).sum(axis=1) / n_a ** 2
+            - (d_other * other).sum(axis=1) / (n - n_a) ** 2)
+    return {
+        'statistic': float(statistic),
+        'cross_mean': cross,
+        'p_value': float((1 + np.sum(null >= statistic)) / (1 + permutations)),
+    }
+
+
+def compare_profiles(profile_a: Dict, profile_b: Dict) -> Dict:
+    """All pairwise statistics of two profiles"""
+    return {
+        'ks': ks_from_histograms(profile_a['hamming_hist'], profile_b['hamming_hist']),
+        'chi2': chi_square_homogeneity(profile_a['ones'], profile_a['n_seeds'],
+                                       profile_b['ones'], profile_b['n_seeds']),
+        'energy': energy_distance(profile_a['block_bias'], profile_a['energy_within'],
+                                  profile_b['block_bias'], profile_b['energy_within']),
+    }
+
+
+# ==================== CLUSTERING ====================
+
+def cluster_order(distance: np.ndarray) -> List[int]:
+    """Leaf order of average-linkage (UPGMA) clustering of a symmetric distance matrix"""
+    distance = np.asarray(distance, dtype=np.float64)
+    clusters = [[i] for i in range(len(distance))]
+    d = distance.copy()
+    np.fill_diagonal(d, np.inf)
+    while len(clusters) > 1:
+        i, j = sorted(np.unravel_index(np.argmin(d), d.shape))
+        n_i, n_j = len(clusters[i]), len(clusters[j])
+        # Lance-Williams update for average linkage
+        merged_row = (n_i * d[i] + n_j * d[j]) / (n_i + n_j)
+        d[i], d[:, i] = merged_row, merged_row
+        d[i, i] = np.inf
+        d = np.delete(np.delete(d, j, axis=0), j, axis=1)
+        clusters[i] = clusters[i] + clusters.pop(j)
+    return clusters[0] if clusters else []
+
+
+# ==================== DRIVER ====================
+
+def pair_fingerprint() -> str:
+    """Code fingerprint of everything that goes into one pair comparison"""
+    parts = [function_fingerprint(f) for f in (compare_profiles, ks_from_histograms,
+                                               chi_square_homogeneity, energy_distance, _pairwise_distances)]
+    return hashlib.sha256("".join(parts).encode() + PROFILE_CODE.encode()).hexdigest()[:16]
+
+
+def _cached(cache: Optional[AnalysisCache], data_hash: str, analysis: str, code: str, compute):
+    if cache is None:
+        return json.loads(json.dumps(compute(), default=json_default))
+    key = cache.make_key(data_hash, analysis, {}, code)
+    value = cache.get(key)
+    if value is None:
+        value = json.loads(json.dumps(compute(), default=json_default))
+        cache.put(key, analysis, data_hash, value)
+    return value
+
+
+def compare_configs(data_dirs: Sequence = (DEFAULT_DATA_DIR,), cache: Optional[AnalysisCache] = None) -> Dict:
+    """
+    Profile every *.jsonl log below data_dirs (subdirectories included) and compare all pairs
+
+    Returns the config names (sorted), their sizes and content hashes, one
+    k x k matrix of statistics and one of p-values per metric, and the
+    cluster order of the configs by energy distance (configs without one last).
+    """
+    if isinstance(data_dirs, (str, Path)):
+        data_dirs = [data_dirs]
+    logs = find_logs(data_dirs)
+    where = ', '.join(str(d) for d in data_dirs)
+    if len(logs) < 2:
+        raise ValueError(f"Need at least two logs in {where}, found {len(logs)}")
+
+    print(f"📂 Profiling {len(logs)} configurations in {where}")
+    names, hashes, profiles = [], [], []
+    for name, path in logs:
+        _, seed_bytes = load_log(path)
+        data_hash = dataset_hash(seed_bytes)
+        profile = _cached(cache, data_hash, 'config_profile', function_fingerprint(dataset_profile) + PROFILE_CODE,
+                          lambda: dataset_profile(seed_bytes))
+        names.append(name)
+        hashes.append(data_hash)
+        profiles.append(profile)
+        print(f"  {names[-1]}: {profile['n_seeds']} seeds, {len(profile['block_bias'])} bias blocks")
+
+    k = len(logs)
+    code = pair_fingerprint()
+    statistics = {key: np.full((k, k), np.nan) for key, _, _ in METRICS}
+    p_values = {key: np.full((k, k), np.nan) for key, _, _ in METRICS}
+    for key, _, _ in METRICS:
+        np.fill_diagonal(statistics[key], 0.0)
+        np.fill_diagonal(p_values[key], 1.0)
+
+    print(f"\n🔀 Comparing {k * (k - 1) // 2} pairs...")
+    for i in range(k):
+        for j in range(i + 1, k):
+            # Order the pair by hash so the cached result does not depend on file names
+            a, b = (i, j) if hashes[i] <= hashes[j] else (j, i)
+            pair_hash = hashlib.sha256((hashes[a] + hashes[b]).encode()).hexdigest()
+            result = _cached(cache, pair_hash, 'config_pair', code,
+                             lambda: compare_profiles(profiles[a], profiles[b]))
+            for key, _, stat_name in METRICS:
+                for r, c in ((i, j), (j, i)):
+                    value = result[key].get(stat_name)
+                    statistics[key][r, c] = np.nan if value is None else value
+                    p = result[key].get('p_value')
+                    p_values[key][r, c] = np.nan if p is None else p
+
+    # Configs with fewer than two bias blocks have no energy distance; they go last, unclustered
+    measured = [i for i in range(k) if len(profiles[i]['block_bias']) >= 2]
+    order = [measured[i] for i in cluster_order(statistics['energy'][np.ix_(measured, measured)])]
+    order += [i for i in range(k) if i not in measured]
+    n_pairs = k * (k - 1) // 2
+    # Bonferroni over all pairs of one metric
+    alpha = ALPHA / n_pairs
+    different = {key: [[names[i], names[j]] for i in range(k) for j in range(i + 1, k)
+                       if p_values[key][i, j] < alpha]
+                 for key, _, _ in METRICS}
+    for key, label, _ in METRICS:
+        print(f"  {label}: {len(different[key])}/{n_pairs} pairs differ (p < {alpha:.1e})")
+
+    return {
+        'configs': names,
+        'n_seeds': [p['n_seeds'] for p in profiles],
+        'dataset_hashes': hashes,
+        'alpha': alpha,
+        'statistics': {key: np.where(np.isnan(m), None, m).tolist() for key, m in statistics.items()},
+        'p_values': {key: np.where(np.isnan(m), None, m).tolist() for key, m in p_values.items()},
+        'cluster_order': [names[i] for i in order],
+        'different_pairs': different,
+    }
+
+
+def write_summary(results: Dict, output_dir: Path) -> Path:
+    """Markdown tables of the pairwise p-values, in cluster order"""
+    names = results['configs']
+    order = [names.index(name) for name in results['cluster_order']]
+    lines = ["# Configuration Comparison", "",
+             f"Configurations: {len(names)}  ",
+             f"Per-pair significance level (Bonferroni): {results['alpha']:.2e}", "",
+             "| Config | Seeds |", "|--------|-------|"]
+    lines += [f"| {names[i]} | {results['n_seeds'][i]:,} |" for i in order]
+
+    for key, label, _ in METRICS:
+        p = results['p_values'][key]
+        lines += ["", f"## {label} (p-values)", "",
+                  "| | " + " | ".join(names[i] for i in order) + " |",
+                  "|---" * (len(order) + 1) + "|"]
+        for i in order:
+            cells = []
+            for j in order:
+                value = p[i][j]
+                if i == j or value is None:
+                    cells.append("–")
+                else:
+                    cells.append(f"{value:.3g}" + (" ⚠️" if value < results['alpha'] else ""))
+            lines.append(f"| {names[i]} | " + " | ".join(cells) + " |")
+
+    summary_file = output_dir / "comparison_summary.md"
+    summary_file.write_text("\n".join(lines) + "\n")
+    return summary_file
+
+
+def plot_heatmaps(results: Dict, output_dir: Path) -> Optional[Path]:
+    """One heatmap per metric, rows and columns in cluster order"""
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("  ⚠️  matplotlib not available, skipping heatmap")
+        return None
+
+    names = results['configs']
+    order = [names.index(name) for name in results['cluster_order']]
+    labels = [names[i] for i in order]
+    fig, axes = plt.subplots(1, len(METRICS), figsize=(6 * len(METRICS), 5.5))
+    for ax, (key, label, stat_name) in zip(axes, METRICS):
+        matrix = np.array(results['statistics'][key], dtype=np.float64)[np.ix_(order, order)]
+        p = np.array(results['p_values'][key], dtype=np.float64)[np.ix_(order, order)]
+        im = ax.imshow(matrix, cmap='viridis')
+        fig.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
+        for r, c in zip(*np.nonzero(p < results['alpha'])):
+            ax.text(c, r, '*', ha='center', va='center', color='red', fontsize=14)
+        ax.set_xticks(range(len(labels)))
+        ax.set_xticklabels(labels, rotation=45, ha='right')
+        ax.set_yticks(range(len(labels)))
+        ax.set_yticklabels(labels)
+        ax.set_title(f'{label}\n({stat_name}, * = significant)')
+    plt.tight_layout()
+    plot_file = output_dir / "config_distances.png"
+    plt.savefig(plot_file, dpi=150, bbox_inches='tight')
+    plt.close()
+    return plot_file
+
+
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description='Compare seed distributions across experiment configurations')
+    parser.add_argument('--data-dir', '-d', nargs='+', default=[str(DEFAULT_DATA_DIR)],
+                       help='Directories with one JSONL log per configuration (searched recursively)')
+    parser.add_argument('--output-dir', '-o', default='./randao_analysis',
+                       help='Output directory for the comparison results')
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR),
+                       help='Directory of the persistent result cache')
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_MAX_BYTES / 2**20,
+                       help='Size limit of the result cache in MiB (LRU eviction)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Recompute every profile and pair without reading or writing the cache')
+    args = parser.parse_args()
+
+    cache = None
+    if not args.no_cache:
+        cache = AnalysisCache(args.cache_dir, max_bytes=int(args.cache_max_mb * 2**20))
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    try:
+        results = compare_configs(args.data_dir, cache=cache)
+        matrix_file = output_dir / "comparison_matrix.json"
+        with open(matrix_file, 'w') as f:
+            json.dump(results, f, indent=2, default=json_default)
+        print(f"\n💾 Matrix saved to: {matrix_file}")
+        print(f"  📄 Summary saved to: {write_summary(results, output_dir)}")
+        plot_file = plot_heatmaps(results, output_dir)
+        if plot_file is not None:
+            print(f"  📊 Heatmap saved to: {plot_file}")
+        print(f"  Cluster order: {' → '.join(results['cluster_order'])}")
+    finally:
+        if cache is not None:
+            cache_stats = cache.stats()
+            print(f"  Cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+            cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Counterfactual RANDAO mixes: which seeds could a set of proposers have chosen?
+
+Each block mixes H(reveal) = sha256(randao_reveal) into the RANDAO mix by
+XOR, so the mix at the end of an epoch is
+
+    final = start ^ H(r_1) ^ ... ^ H(r_32)
+
+and withholding any subset S of those blocks yields final ^ XOR_{i in S} H(r_i).
+For the k blocks a party controls in an epoch, the 2^k deltas are built by
+doubling (delta[2^i + j] = delta[j] ^ H(r_i)), so every counterfactual costs
+one 32-byte XOR on top of one it shares a prefix with. Epochs with the same
+k are processed as one batch.
+
+The controlled blocks are those of the attacker from an attack log, or of one
+client group, taken from a kurtosis network_params YAML the way
+rb_attack.get_validator_client maps validator indices to clients. The attack
+scripts stop a client at exactly its attacked slots, so those slots have no
+reveal to vary. The attacker is therefore whoever proposed them: their
+validator indices from the log, or, with --topology, every validator of the
+stopped clients. Its remaining proposals are the blocks it could still
+withhold.
+
+For every epoch the chosen (actual) seed is ranked among the available ones
+under a few score functions. Without grinding the mid-rank percentile has mean
+1/2 whatever the score, so a systematic shift is the party's measurable
+advantage for that objective. The shift measures how extreme the outcome is
+relative to a party's options, not who caused it: if one group grinds, every
+group's options look worse than the chosen seed, only less so. The grinding
+party is the one whose chosen seed is its own optimum (chosen_min/chosen_max)
+in nearly every epoch.
+
+Inputs:
+    seed log     JSONL from randao_logger.py (the final mix of every epoch)
+    reveal log   JSONL, one line per proposed block:
+                 {"slot": 1234, "proposer_index": 140, "randao_reveal": "0x<96 bytes>"}
+                 missed slots are absent or have "randao_reveal": null
+"""
+
+import argparse
+import hashlib
+import json
+import math
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from analyze import load_log, read_records
+from result_cache import json_default
+
+SEED_BYTES = 32
+REVEAL_BYTES = 96
+SLOTS_PER_EPOCH = 32
+
+# 2^16 counterfactuals per epoch; beyond that only the last MAX_CONTROLLED controlled blocks are varied
+MAX_CONTROLLED = 16
+SUPERNODE_VALIDATORS = 128  # rb_attack.py never stops the first participant
+
+
+def _score_popcount(seeds: np.ndarray) -> np.ndarray:
+    return np.unpackbits(seeds, axis=-1).sum(axis=-1, dtype=np.int64)
+
+
+def _score_leading_value(seeds: np.ndarray) -> np.ndarray:
+    return seeds[..., :8].copy().view('>u8')[..., 0]
+
+
+def _score_low_byte(seeds: np.ndarray) -> np.ndarray:
+    return seeds[..., -1].astype(np.int64)
+
+
+# Vectorised score functions over (..., 32) uint8 seeds; add objectives here
+SCORES: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    'popcount': _score_popcount,
+    'leading_value': _score_leading_value,
+    'low_byte': _score_low_byte,
+}
+
+# ==================== INPUTS ====================
+
+def load_reveals(reveal_file) -> Dict[int, List[Tuple[int, Optional[int], bytes]]]:
+    """epoch -> [(slot, proposer_index, sha256(reveal))] of the proposed blocks, by slot"""
+    epochs: Dict[int, List] = {}
+    seen = set()
+    for entry in read_records(reveal_file):
+        reveal = entry.get('randao_reveal')
+        if not isinstance(reveal, str) or 'slot' not in entry:
+            continue
+        raw = bytes.fromhex(reveal[2:] if reveal[:2].lower() == '0x' else reveal)
+        if len(raw) != REVEAL_BYTES:
+            print(f"⚠️ Skipping slot {entry['slot']}: reveal is {len(raw)} bytes, expected {REVEAL_BYTES}")
+            continue
+        slot = int(entry['slot'])
+        if slot in seen:
+            continue
+        seen.add(slot)
+        epochs.setdefault(slot // SLOTS_PER_EPOCH, []).append(
+            (slot, entry.get('proposer_index'), hashlib.sha256(raw).digest()))
+    for blocks in epochs.values():
+        blocks.sort()
+    return epochs
+
+
+def topology_groups(params_file) -> Dict[str, Tuple[int, int]]:
+    """
+    Validator index range [lo, hi) of every participant in a kurtosis network_params YAML
+
+    Names follow the kurtosis service names (cl-<n>-<cl>-<el>), which are the
+    clients rb_attack.py stops.
+    """
+    import yaml
+    with open(params_file) as f:
+        participants = yaml.safe_load(f).get('participants', [])
+    groups, start, n = {}, 0, 1
+    for p in participants:
+        for _ in range(int(p.get('count', 1))):
+            size = int(p.get('validator_count', 0))
+            groups[f"cl-{n}-{p.get('cl_type', 'cl')}-{p.get('el_type', 'el')}"] = (start, start + size)
+            start += size
+            n += 1
+    return groups
+
+
+def load_attackers(attack_file) -> Tuple[set, set]:
+    """
+    (validator indices, client names) that proposed the attacked slots of a JSONL attack log
+
+    Entries are rb_attack-style [client, validator, slot] lists or dicts with
+    "proposer_index" (or "validator_index") and optionally "client".
+    """
+    validators, clients = set(), set()
+    for entry in read_records(attack_file):
+        if isinstance(entry, dict):
+            index = entry.get('proposer_index', entry.get('validator_index'))
+            client = entry.get('client')
+        elif isinstance(entry, list) and len(entry) == 3:
+            client, index, _ = entry
+        else:
+            continue
+        if index is not None:
+            validators.add(int(index))
+        if client:
+            clients.add(str(client))
+    return validators, clients
+
+# ==================== COUNTERFACTUALS ====================
+
+def subset_deltas(hashes: np.ndarray) -> np.ndarray:
+    """
+    XOR of every subset of k reveal hashes, for a batch: (E, k, 32) -> (E, 2^k, 32)
+
+    Subset s (bit i set = block i withheld) is built from s without its top
+    bit with a single XOR.
+    """
+    n_epochs, k, _ = hashes.shape
+    deltas = np.zeros((n_epochs, 1 << k, SEED_BYTES), dtype=np.uint8)
+    for i in range(k):
+        half = 1 << i
+        np.bitwise_xor(deltas[:, :half], hashes[:, i:i + 1], out=deltas[:, half:2 * half])
+    return deltas
+
+
+def mid_rank(scores: np.ndarray, chosen: np.ndarray) -> np.ndarray:
+    """Mid-rank percentile of chosen (E,) within scores (E, M): (below + ties/2) / M, ties excluding itself"""
+    below = (scores < chosen[:, None]).sum(axis=1)
+    ties = (scores == chosen[:, None]).sum(axis=1) - 1
+    return (below + ties / 2 + 0.5) / scores.shape[1]
+
+
+def explore(final_mixes: Dict[int, bytes], reveals: Dict[int, List], controlled: Callable[[int, Optional[int]], bool],
+            start_mixes: Optional[Dict[int, bytes]] = None,
+            max_controlled: int = MAX_CONTROLLED) -> Dict:
+    """
+    Available vs chosen seeds for every epoch where some proposed block is controlled
+
+    controlled(slot, proposer_index) says whether the party could have
+    withheld that block. If start_mixes is given, epochs whose reveals do
+    not reproduce final = start ^ XOR H(r) are reported and skipped.
+    """
+    by_k: Dict[int, List] = {}
+    inconsistent, truncated = [], 0
+    for epoch in sorted(set(final_mixes) & set(reveals)):
+        blocks = reveals[epoch]
+        if start_mixes is not None and epoch in start_mixes:
+            acc = np.frombuffer(start_mixes[epoch], dtype=np.uint8).copy()
+            for _, _, h in blocks:
+                acc ^= np.frombuffer(h, dtype=np.uint8)
+            if acc.tobytes() != final_mixes[epoch]:
+                inconsistent.append(epoch)
+                continue
+        mine = [h for slot, proposer, h in blocks if controlled(slot, proposer)]
+        if not mine:
+            continue
+        if len(mine) > max_controlled:
+            mine, truncated = mine[-max_controlled:], truncated + 1
+        by_k.setdefault(len(mine), []).append((epoch, mine))
+
+    per_epoch = {}
+    for k, items in sorted(by_k.items()):
+        hashes = np.frombuffer(b''.join(b''.join(m) for _, m in items), dtype=np.uint8).reshape(len(items), k, SEED_BYTES)
+        finals = np.frombuffer(b''.join(final_mixes[e] for e, _ in items), dtype=np.uint8).reshape(-1, SEED_BYTES)
+        available = subset_deltas(hashes) ^ finals[:, None, :]
+        ranks = {}
+        for name, score in SCORES.items():
+            s = score(available)
+            ranks[name] = (mid_rank(s, s[:, 0]), s[:, 0], s.min(axis=1), s.max(axis=1))
+        for row, (epoch, _) in enumerate(items):
+            per_epoch[epoch] = {
+                'controlled': k,
+                'available': 1 << k,
+                'distinct': int(len(np.unique(available[row], axis=0))),
+                'scores': {name: {'percentile': float(r[0][row]), 'chosen': int(r[1][row]),
+                                  'min': int(r[2][row]), 'max': int(r[3][row])}
+                           for name, r in ranks.items()},
+            }
+
+    return {
+        'epochs': per_epoch,
+        'summary': summarize(per_epoch),
+        'inconsistent_epochs': inconsistent,
+        'truncated_epochs': truncated,
+    }
+
+
+def summarize(per_epoch: Dict[int, Dict]) -> Dict:
+    """Mean chosen-seed percentile per score, with a z-score against the no-grinding null"""
+    if not per_epoch:
+        return {'n_epochs': 0}
+    m = np.array([e['available'] for e in per_epoch.values()], dtype=np.float64)
+    # Variance of the mid-rank percentile of a uniform position among m values
+    null_var = (m ** 2 - 1) / (12 * m ** 2)
+    summary = {
+        'n_epochs': len(per_epoch),
+        'mean_controlled': float(np.mean([e['controlled'] for e in per_epoch.values()])),
+        'max_controlled': int(max(e['controlled'] for e in per_epoch.values())),
+        'scores': {},
+    }
+    sd = math.sqrt(null_var.sum())
+    for name in SCORES:
+        p = np.array([e['scores'][name]['percentile'] for e in per_epoch.values()])
+        z = float((p.sum() - len(p) / 2) / sd) if sd > 0 else 0.0
+        at_min = sum(e['scores'][name]['chosen'] == e['scores'][name]['min'] for e in per_epoch.values())
+        at_max = sum(e['scores'][name]['chosen'] == e['scores'][name]['max'] for e in per_epoch.values())
+        summary['scores'][name] = {
+            'mean_percentile': float(p.mean()),
+            'chosen_min': int(at_min),
+            'chosen_max': int(at_max),
+            'expected_extreme': float((1 / m).sum()),  # ignoring ties
+            'z': z,
+            'p_value': math.erfc(abs(z) / math.sqrt(2)),
+        }
+    return summary
+
+
+def mixes_by_epoch(seed_log) -> Dict[int, bytes]:
+    epochs, seed_bytes = load_log(seed_log)
+    return {int(e): seed_bytes[i].tobytes() for i, e in enumerate(epochs)}
+
+
+def plot_percentiles(results: Dict[str, Dict], output_file: Path) -> Optional[Path]:
+    """Histogram of chosen-seed percentiles per group and score"""
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("  ⚠️  matplotlib not available, skipping plot")
+        return None
+    groups = [g for g, r in results.items() if r['epochs']]
+    if not groups:
+        return None
+    fig, axes = plt.subplots(len(groups), len(SCORES), figsize=(4 * len(SCORES), 3 * len(groups)), squeeze=False)
+    for row, group in enumerate(groups):
+        for col, name in enumerate(SCORES):
+            p = [e['scores'][name]['percentile'] for e in results[group]['epochs'].values()]
+            ax = axes[row, col]
+            ax.hist(p, bins=10, range=(0, 1), alpha=0.7, edgecolor='black')
+            ax.axhline(len(p) / 10, color='red', linestyle='--')
+            ax.set_title(f"{group}: {name}", fontsize=9)
+            ax.set_xlabel('Chosen seed percentile')
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=150, bbox_inches='tight')
+    plt.close()
+    return output_file
+
+
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description='Explore the seeds withholding proposers could have chosen')
+    parser.add_argument('--seed-log', '-l', required=True, help='JSONL seed log (randao_logger.py)')
+    parser.add_argument('--reveals', '-r', required=True, help='JSONL per-block reveal log')
+    parser.add_argument('--topology', '-t', help='kurtosis network_params YAML: explore every client group')
+    parser.add_argument('--attacked', '-a',
+                        help='JSONL attack log: explore the proposers of the attacked slots '
+                             '(whole stopped clients with --topology)')
+    parser.add_argument('--include-supernode', action='store_true',
+                       help=f'Also explore the first participant (validators 0-{SUPERNODE_VALIDATORS - 1})')
+    parser.add_argument('--output-dir', '-o', default='./randao_analysis', help='Output directory')
+    args = parser.parse_args()
+    if not args.topology and not args.attacked:
+        parser.error('give --topology and/or --attacked')
+
+    final_mixes = mixes_by_epoch(args.seed_log)
+    start_mixes = {e + 1: m for e, m in final_mixes.items()}
+    reveals = load_reveals(args.reveals)
+    print(f"📥 {len(final_mixes)} epoch mixes, {sum(map(len, reveals.values()))} reveals in {len(reveals)} epochs")
+
+    groups = topology_groups(args.topology) if args.topology else {}
+    parties = {}
+    if args.attacked:
+        validators, clients = load_attackers(args.attacked)
+        ranges = [groups[c] for c in clients if c in groups]
+        if not validators and not ranges:
+            parser.error(f'no attacking validators or clients in {args.attacked}')
+        print(f"🗡️  Attacker: {len(validators)} validator(s)"
+              + (f", clients {', '.join(sorted(clients))}" if ranges else ""))
+        parties['attacker'] = lambda slot, proposer, validators=validators, ranges=ranges: (
+            proposer is not None and (int(proposer) in validators or any(lo <= int(proposer) < hi for lo, hi in ranges)))
+    if args.topology:
+        for name, (lo, hi) in groups.items():
+            if lo < SUPERNODE_VALIDATORS and not args.include_supernode:
+                continue
+            parties[name] = lambda slot, proposer, lo=lo, hi=hi: proposer is not None and lo <= int(proposer) < hi
+
+    results = {}
+    for name, controlled in parties.items():
+        results[name] = explore(final_mixes, reveals, controlled, start_mixes=start_mixes)
+        s = results[name]['summary']
+        print(f"\n🎲 {name}: {s['n_epochs']} epochs with controlled blocks")
+        if results[name]['inconsistent_epochs']:
+            print(f"  ⚠️ {len(results[name]['inconsistent_epochs'])} epochs do not reproduce the logged mix")
+        for score, r in s.get('scores', {}).items():
+            flag = "⚠️" if r['p_value'] < 0.01 else "✓"
+            print(f"  {score:14s} mean percentile {r['mean_percentile']:.3f}  z={r['z']:+.2f}  "
+                  f"chosen min/max {r['chosen_min']}/{r['chosen_max']} (null ~{r['expected_extreme']:.0f})  {flag}")
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    out_file = output_dir / "counterfactual_seeds.json"
+    with open(out_file, 'w') as f:
+        json.dump(results, f, indent=2, default=json_default)
+    print(f"\n💾 Results saved to: {out_file}")
+    plot_file = plot_percentiles(results, output_dir / "counterfactual_percentiles.png")
+    if plot_file is not None:
+        print(f"  📊 Plot saved to: {plot_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Linear algebra over GF(2) on the seed matrix.
+
+Each 256-bit seed is a vector over GF(2), stored as four big-endian uint64
+words, so bit c of a seed is bit 63 - c % 64 of word c // 64. Adding two
+rows is then a 4-word XOR. Bit-frequency tests cannot see linear structure,
+for example seeds that are the XOR of a few nearby seeds. With constant
+reveals, consecutive mixes differ by XORs drawn from a small fixed set of
+reveal hashes, which produces exactly that kind of structure.
+
+    rank        rank of the whole seed matrix and of the consecutive
+                differences, plus a sliding-block rank. All blocks are
+                eliminated together as one (blocks, rows, words) array, with
+                one vectorised step per column. Each rank gets its exact tail
+                probability under a uniformly random matrix. The reported
+                rank-deficient blocks are eliminated again, together and
+                with an identity augmentation, which gives the seeds that
+                XOR to zero.
+    relations   every set of 2, 3 or 4 seeds within `span` epochs whose XOR
+                is zero. The sets are enumerated by offset pattern with
+                shifted views, and the first word filters the candidates
+                before full comparison.
+    complexity  Berlekamp-Massey linear complexity of the sequence of each
+                bit position, with all 256 positions run at once. Every
+                polynomial coefficient is a 4-word bitmask over the
+                positions, so one step costs O(L) word operations for all
+                positions together. The NIST SP 800-22 (2.10) T statistic
+                is binned and chi-square tested over the positions.
+"""
+
+import math
+from itertools import combinations
+from typing import Dict, List, Optional
+
+import numpy as np
+
+SEED_BITS = 256
+WORDS = SEED_BITS // 64
+
+RANK_BLOCK = 128
+RANK_STRIDE = 32
+RELATION_SPAN = 16
+MAX_RELATION_SIZE = 4
+MAX_EXAMPLES = 20
+DEFAULT_MAX_BITS = 20_000   # Berlekamp-Massey is quadratic in the sequence length
+LC_SLACK = 10               # L more than this far below n/2 has probability ~2^-20 per position
+
+# NIST SP 800-22 2.10 class probabilities of T <= -2.5, -1.5, ..., > 2.5
+LC_CLASS_PROBS = np.array([0.010417, 0.03125, 0.125, 0.5, 0.25, 0.0625, 0.020833])
+
+
+def pack_rows(seed_bytes: np.ndarray) -> np.ndarray:
+    """N x 32 uint8 seeds -> N x 4 uint64 rows (bit 0 of the seed is the top bit of word 0)"""
+    seed_bytes = np.ascontiguousarray(seed_bytes, dtype=np.uint8)
+    return seed_bytes.view('>u8').astype(np.uint64)
+
+
+def _word_bits(words: np.ndarray) -> np.ndarray:
+    """(..., 4) uint64 -> (..., 256) bool, in seed bit order"""
+    return np.unpackbits(words.astype('>u8').view(np.uint8), axis=-1).astype(bool)
+
+
+# ==================== RANK ====================
+
+def log2_rank_probability(rank: int, m: int, n: int) -> float:
+    """log2 P(rank) of a uniformly random m x n matrix over GF(2)"""
+    if rank > min(m, n):
+        return -math.inf
+    log_p = rank * (m + n - rank) - m * n
+    for i in range(rank):
+        log_p += (math.log1p(-2.0 ** (i - m)) + math.log1p(-2.0 ** (i - n))
+                  - math.log1p(-2.0 ** (i - rank))) / math.log(2)
+    return log_p
+
+
+def rank_tail_probability(rank: int, m: int, n: int) -> float:
+    """P(rank <= `rank`) for a uniformly random m x n matrix over GF(2)"""
+    full = min(m, n)
+    if rank >= full:
+        return 1.0
+    # the terms fall off like 2^(-d^2), so a few dozen below `rank` are plenty
+    return float(min(1.0, sum(2.0 ** log2_rank_probability(r, m, n)
+                              for r in range(rank, max(-1, rank - 40), -1))))
+
+
+def eliminate(blocks: np.ndarray, n_cols: int = SEED_BITS):
+    """
+    In-place forward elimination of a stack of packed matrices.
+
+    blocks is (B, R, W) uint64, and column c is bit 63 - c % 64 of word c // 64.
+    It returns (rank per block, pivot-row mask (B, R)). Afterwards every
+    non-pivot row is zero in the first n_cols columns, so any words after
+    those columns (an identity augmentation) record which original rows
+    XOR to zero.
+    """
+    n_blocks, n_rows, _ = blocks.shape
+    pivots = np.zeros((n_blocks, n_rows), dtype=bool)
+    ranks = np.zeros(n_blocks, dtype=np.int64)
+    block_index = np.arange(n_blocks)
+
+    for c in range(n_cols):
+        if ranks.min() == n_rows:
+            break
+        word, bit = divmod(c, 64)
+        has_bit = (blocks[:, :, word] & np.uint64(1 << (63 - bit))) != 0
+        candidates = has_bit & ~pivots
+        row = candidates.argmax(axis=1)
+        found = candidates[block_index, row]
+        if not found.any():
+            continue
+
+        # non-pivot rows are already zero in the columns before c
+        b, r = block_index[found], row[found]
+        pivots[b, r] = True
+        ranks[b] += 1
+        if found.all():
+            targets = has_bit & ~pivots
+            tail = blocks[:, :, word:]
+            tail ^= np.where(targets[:, :, None], tail[b, r][:, None, :], np.uint64(0))
+        else:
+            targets = has_bit[b] & ~pivots[b]
+            tail = blocks[b, :, word:]
+            tail ^= np.where(targets[:, :, None], tail[np.arange(len(b)), r][:, None, :], np.uint64(0))
+            blocks[b, :, word:] = tail
+
+    return ranks, pivots
+
+
+def gf2_rank(rows: np.ndarray) -> int:
+    """Rank of an N x 4 packed matrix"""
+    if len(rows) == 0:
+        return 0
+    ranks, _ = eliminate(rows[None].copy())
+    return int(ranks[0])
+
+
+def block_ranks(rows: np.ndarray, block: int = RANK_BLOCK, stride: int = RANK_STRIDE,
+                chunk_words: int = 1 << 22) -> np.ndarray:
+    """Rank of every `block` consecutive rows starting at multiples of `stride`"""
+    starts = np.arange(0, len(rows) - block + 1, stride)
+    ranks = np.empty(len(starts), dtype=np.int64)
+    per_chunk = max(1, chunk_words // (block * WORDS))
+    for lo in range(0, len(starts), per_chunk):
+        s = starts[lo:lo + per_chunk]
+        stack = rows[s[:, None] + np.arange(block)]
+        ranks[lo:lo + len(s)], _ = eliminate(stack)
+    return ranks
+
+
+def block_relations(rows: np.ndarray, starts: np.ndarray, block: int,
+                    chunk_words: int = 1 << 22) -> List[Optional[List[int]]]:
+    """
+    Smallest set of row offsets XORing to zero that the elimination yields, per block starting at `starts`
+
+    All blocks are eliminated together with an identity augmentation (as in
+    block_ranks), so many deficient blocks cost one vectorised pass.
+    """
+    aug_words = -(-block // 64)
+    identity = np.zeros((block, aug_words), dtype=np.uint64)
+    identity[np.arange(block), np.arange(block) // 64] = \
+        np.uint64(1) << (63 - np.arange(block) % 64).astype(np.uint64)
+    relations: List[Optional[List[int]]] = []
+    per_chunk = max(1, chunk_words // (block * (WORDS + aug_words)))
+    for lo in range(0, len(starts), per_chunk):
+        s = starts[lo:lo + per_chunk]
+        stack = np.concatenate((rows[s[:, None] + np.arange(block)],
+                                np.broadcast_to(identity, (len(s), block, aug_words))), axis=2)
+        _, pivots = eliminate(stack)
+        for b in range(len(s)):
+            dependent = np.flatnonzero(~pivots[b])
+            if len(dependent) == 0:
+                relations.append(None)
+                continue
+            members = _word_bits(stack[b, dependent, WORDS:])[:, :block]
+            relations.append(np.flatnonzero(members[members.sum(axis=1).argmin()]).tolist())
+    return relations
+
+
+def rank_analysis(rows: np.ndarray, epochs: np.ndarray, block: int = RANK_BLOCK,
+                  stride: int = RANK_STRIDE) -> Dict:
+    """Global, difference and sliding-block ranks with tail probabilities"""
+    n = len(rows)
+    result = {
+        'n_seeds': n,
+        'rank': gf2_rank(rows),
+        'expected_rank': min(n, SEED_BITS),
+        'difference_rank': gf2_rank(rows[1:] ^ rows[:-1]) if n > 1 else 0,
+        'expected_difference_rank': min(max(n - 1, 0), SEED_BITS),
+    }
+    result['p_value'] = rank_tail_probability(result['rank'], n, SEED_BITS)
+    result['difference_p_value'] = rank_tail_probability(result['difference_rank'], max(n - 1, 0), SEED_BITS)
+
+    block = min(block, n)
+    if block < 2:
+        result['blocks'] = {'error': 'Not enough seeds for block ranks'}
+        return result
+    stride = max(1, min(stride, block))
+    ranks = block_ranks(rows, block, stride)
+    starts = np.arange(len(ranks)) * stride
+    full = min(block, SEED_BITS)
+    tail = {int(r): rank_tail_probability(int(r), block, SEED_BITS) for r in np.unique(ranks)}
+
+    # overlapping blocks are not independent, so correct over the disjoint ones
+    n_independent = max(1, n // block)
+    deficient_index = np.flatnonzero(ranks < full)
+    # only the reported examples need their relation
+    examples = deficient_index[:MAX_EXAMPLES]
+    relations = block_relations(rows, starts[examples], block)
+    deficient = [{
+        'start_epoch': int(epochs[starts[i]]),
+        'rank': int(ranks[i]),
+        'p_value': tail[int(ranks[i])],
+        'relation_epochs': [int(epochs[starts[i] + k]) for k in relation] if relation else None,
+    } for i, relation in zip(examples, relations)]
+    min_p = min(tail.values())
+
+    result['blocks'] = {
+        'block': block,
+        'stride': stride,
+        'full_rank': full,
+        'start_epochs': epochs[starts].tolist(),
+        'ranks': ranks.tolist(),
+        'min_rank': int(ranks.min()),
+        'n_deficient': len(deficient_index),
+        'deficient': deficient,
+        'min_p_value': min_p,
+        'p_value': min(1.0, min_p * n_independent),
+    }
+    return result
+
+
+# ==================== SHORT XOR RELATIONS ====================
+
+def short_relations(rows: np.ndarray, epochs: np.ndarray, span: int = RELATION_SPAN,
+                    max_size: int = MAX_RELATION_SIZE) -> Dict:
+    """
+    All sets of 2..max_size seeds, at most `span` epochs apart, whose XOR is zero.
+
+    Only minimal relations are counted: a triple or quadruple that is the
+    union of duplicate pairs is left out.
+    """
+    n = len(rows)
+    span = max(1, min(span, n - 1))
+    diff = {lag: rows[:-lag] ^ rows[lag:] for lag in range(1, span + 1)}
+    duplicate = {lag: ~d.any(axis=1) for lag, d in diff.items()}
+
+    counts, examples = {}, []
+    for size in range(2, max_size + 1):
+        found = []
+        for offsets in combinations(range(1, span + 1), size - 1):
+            last = offsets[-1]
+            i = np.arange(n - last)
+            if size == 2:
+                hit = duplicate[last]
+            else:
+                # first word filters, full rows confirm
+                if size == 3:
+                    left = diff[offsets[0]][:n - last]
+                    right = rows[last:]
+                else:
+                    left = diff[offsets[0]][:n - last]
+                    right = diff[offsets[2] - offsets[1]][offsets[1]:n - last + offsets[1]]
+                hit = left[:, 0] == right[:, 0]
+                idx = np.flatnonzero(hit)
+                hit = np.zeros(len(i), dtype=bool)
+                hit[idx[(left[idx] == right[idx]).all(axis=1)]] = True
+            members = [i] + [i + o for o in offsets]
+            idx = np.flatnonzero(hit)
+            if size >= 3 and len(idx):
+                # drop relations containing a duplicate pair (not minimal)
+                keep = np.ones(len(idx), dtype=bool)
+                for a, b in combinations(range(size), 2):
+                    keep &= ~_is_duplicate(duplicate, members[a][idx], members[b][idx] - members[a][idx])
+                idx = idx[keep]
+            found.extend(np.stack([m[idx] for m in members], axis=1).tolist())
+        found.sort()
+        counts[str(size)] = len(found)
+        examples.extend([[int(epochs[k]) for k in rel] for rel in found[:MAX_EXAMPLES - len(examples)]])
+
+    return {
+        'span': span,
+        'counts': counts,
+        'total': sum(counts.values()),
+        'examples': examples,
+    }
+
+
+def _is_duplicate(duplicate: Dict[int, np.ndarray], first: np.ndarray, lag: np.ndarray) -> np.ndarray:
+    out = np.zeros(len(first), dtype=bool)
+    for l in np.unique(lag):
+        sel = lag == l
+        out[sel] = duplicate[int(l)][first[sel]]
+    return out
+
+
+# ==================== LINEAR COMPLEXITY ====================
+
+def linear_complexity(rows: np.ndarray) -> np.ndarray:
+    """
+    Berlekamp-Massey linear complexity of each of the 256 bit-position sequences.
+
+    C and the shifted B polynomial are (4, length) arrays whose column i is
+    the bitmask, over positions, of coefficient i. The discrepancy of all
+    positions is the XOR-reduction of C & (reversed sequence). The shift
+    x^(n-m) B moves one column per step inside a buffer instead of being copied.
+    """
+    n = len(rows)
+    lengths = np.zeros(SEED_BITS, dtype=np.int64)
+    if n == 0:
+        return lengths
+
+    reversed_rows = np.ascontiguousarray(rows[::-1].T)     # column n-1-t is seed t
+    c = np.zeros((WORDS, n + 2), dtype=np.uint64)
+    c[:, 0] = ~np.uint64(0)
+    b_buf = np.zeros((WORDS, 2 * n + 4), dtype=np.uint64)
+    start = n + 1
+    b_buf[:, start] = ~np.uint64(0)
+    start -= 1                        # B starts as x * 1 (m = -1)
+    c_len = 1
+    l_max = l_min = 0
+    scratch = np.empty((WORDS, n + 2), dtype=np.uint64)
+
+    for t in range(n):
+        # deg C <= L and deg x^(t-m) B <= t + 1 - L for every position
+        b_len = t + 2 - l_min
+        k = min(l_max, t) + 1
+        window = scratch[:, :k]
+        np.bitwise_and(c[:, :k], reversed_rows[:, n - 1 - t:n - 1 - t + k], out=window)
+        d = np.bitwise_xor.reduce(window, axis=1)
+        if d.any():
+            update_bits = _word_bits(d) & (2 * lengths <= t)
+            old_c = None
+            if update_bits.any():
+                u = np.packbits(update_bits).view('>u8').astype(np.uint64)[:, None]
+                old_c = c[:, :c_len] & u
+
+            shifted = scratch[:, :b_len]
+            np.bitwise_and(b_buf[:, start:start + b_len], d[:, None], out=shifted)
+            c[:, :b_len] ^= shifted
+
+            if old_c is not None:
+                lengths[update_bits] = t + 1 - lengths[update_bits]
+                l_max, l_min = int(lengths.max()), int(lengths.min())
+                c_len = l_max + 1
+                b = b_buf[:, start:start + max(b_len, c_len)]
+                b &= ~u
+                b[:, :old_c.shape[1]] |= old_c
+        start -= 1
+
+    return lengths
+
+
+def expected_linear_complexity(n: int) -> float:
+    """Mean linear complexity of a random length-n sequence (NIST SP 800-22 2.10)"""
+    return n / 2 + (9 + (-1) ** (n + 1)) / 36 - math.ldexp(n / 3 + 2 / 9, -n)
+
+
+def complexity_analysis(rows: np.ndarray, max_bits: int = DEFAULT_MAX_BITS) -> Dict:
+    """Per-position linear complexity, its NIST T statistic and a chi-square over positions"""
+    rows = rows[:max_bits]
+    n = len(rows)
+    lengths = linear_complexity(rows)
+    mu = expected_linear_complexity(n)
+    t_stat = (-1) ** n * (lengths - mu) + 2 / 9
+    classes = np.clip(np.ceil(t_stat + 2.5).astype(np.int64), 0, 6)
+    observed = np.bincount(classes, minlength=7)
+    expected = SEED_BITS * LC_CLASS_PROBS
+    chi_square = float(np.sum((observed - expected) ** 2 / expected))
+    # chi-square survival function, 6 degrees of freedom
+    half = chi_square / 2
+    p_value = math.exp(-half) * (1 + half + half ** 2 / 2)
+
+    deficient = np.flatnonzero(lengths < n / 2 - LC_SLACK)
+    return {
+        'n_bits': n,
+        'expected': mu,
+        'complexity': lengths.tolist(),
+        'min': int(lengths.min()),
+        'max': int(lengths.max()),
+        'class_counts': observed.tolist(),
+        'chi_square': chi_square,
+        'p_value': p_value,
+        'deficient_positions': deficient.tolist(),
+    }
+
+
+# ==================== COMBINED ====================
+
+def analyze_gf2(epochs: np.ndarray, seed_bytes: np.ndarray, block: int = RANK_BLOCK,
+                stride: int = RANK_STRIDE, span: int = RELATION_SPAN,
+                max_bits: int = DEFAULT_MAX_BITS) -> Dict:
+    """Rank, short XOR relations and linear complexity of a seed set"""
+    rows = pack_rows(seed_bytes)
+    epochs = np.asarray(epochs)
+    return {
+        'rank': rank_analysis(rows, epochs, block=block, stride=stride),
+        'relations': short_relations(rows, epochs, span=span),
+        'linear_complexity': complexity_analysis(rows, max_bits=max_bits),
+    }
@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Shardable analysis: per-chunk partial summaries, merged exactly.
+
+A chunk of consecutive seeds is mapped to a Partial, a small summary of
+integer counts:
+
+    bit_ones        1s per bit position                    -> bit bias
+    popcounts       histogram of 1s per seed (0-256)       -> per-seed entropy
+    byte_popcounts  histogram of 1s per byte (0-8)         -> byte entropy
+    hamming         histogram of consecutive distances     -> Hamming stats
+    disagreements   bit pairs (i, i + lag) that differ in the flattened
+                    stream, lags 1..MAX_LAG               -> autocorrelation
+    windows         non-cyclic PATTERN_WINDOW-bit window counts of the
+                    stream                                 -> monobit, serial,
+                                                              approximate
+                                                              entropy, runs
+    phase_sums      per bit, the sum of exp(-2 pi i t / P)
+                    over the epochs t where it is 1, and
+                    the same sum over all epochs, for
+                    every period P = 2..MAX_PERIOD         -> epoch spectrum
+
+plus the first and last seed of the chunk. Everything that crosses a chunk
+boundary (one Hamming distance, the lagged pairs and windows spanning it) is
+computed from those two seeds when adjacent partials are merged, and the
+cyclic wrap of the pattern tests when the final partial is turned into
+results, so any split of a seed log (chunks of one file, files of one
+capture, partials mapped on other machines) reduces to exactly the counts of
+a single pass. The phase sums are DFT terms at the fixed frequencies 1 / P
+taken over absolute epoch numbers, so they add across chunks like the
+counts do (up to float rounding). Centring on the final bit frequency
+happens at the end, so the periodogram of every bit at every period 2..MAX_PERIOD
+is found without holding the series.
+
+Results have the shape of the RANDAOAnalyzer stages they correspond to
+(bit_bias, hamming without the random-pair sample, entropy,
+autocorrelation) plus patterns (analysis2's monobit and m-bit tests) and
+spectrum. Estimators that need the whole sequence at once (SP 800-90B
+min-entropy, GF(2) rank, byte-transition permutation nulls, timeline change
+points) stay in analyze.py.
+
+    python mapreduce.py run a.jsonl b.jsonl -w 8           # map in a pool, reduce
+    python mapreduce.py map big.jsonl -o partials/         # on each machine
+    python mapreduce.py reduce partials/*.json             # anywhere
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from analyze import SEED_BITS, binary_entropy, bit_bias_from_counts, key_metrics, records_to_seeds
+from bit_patterns import statistics_from_counts, window_counts
+from result_cache import json_default
+from timeline import POPCOUNT
+
+MAX_LAG = 50                      # analyze_autocorrelation default
+PATTERN_M = 4                     # analysis2.PATTERN_M
+PATTERN_WINDOW = PATTERN_M + 1    # serial/approximate entropy use m + 1 bit windows
+MAX_PERIOD = 64                   # epoch spectrum: periods of 2..MAX_PERIOD epochs
+PERIODS = np.arange(2, MAX_PERIOD + 1)
+SPECTRUM_ALPHA = 0.01
+DEFAULT_CHUNK_EPOCHS = 1 << 16
+
+# ==================== PARTIAL SUMMARIES ====================
+
+class Partial:
+    """Mergeable summary of a run of consecutive seeds (epochs first_epoch..last_epoch)"""
+
+    def __init__(self, n: int, first_epoch: int, last_epoch: int, first_seed: bytes, last_seed: bytes,
+                 bit_ones, popcounts, byte_popcounts, hamming, disagreements, windows, phase_sums,
+                 phase_epochs):
+        self.n = int(n)
+        self.first_epoch = int(first_epoch)
+        self.last_epoch = int(last_epoch)
+        self.first_seed = bytes(first_seed)
+        self.last_seed = bytes(last_seed)
+        self.bit_ones = np.asarray(bit_ones, dtype=np.int64)
+        self.popcounts = np.asarray(popcounts, dtype=np.int64)
+        self.byte_popcounts = np.asarray(byte_popcounts, dtype=np.int64)
+        self.hamming = np.asarray(hamming, dtype=np.int64)
+        self.disagreements = np.asarray(disagreements, dtype=np.int64)
+        self.windows = np.asarray(windows, dtype=np.int64)
+        # (real, imaginary) parts, per period and bit / per period
+        self.phase_sums = np.asarray(phase_sums, dtype=np.float64).reshape(2, len(PERIODS), SEED_BITS)
+        self.phase_epochs = np.asarray(phase_epochs, dtype=np.float64).reshape(2, len(PERIODS))
+
+    COUNTS = ('bit_ones', 'popcounts', 'byte_popcounts', 'hamming', 'disagreements', 'windows',
+              'phase_sums', 'phase_epochs')
+
+    @property
+    def n_bits(self) -> int:
+        return self.n * SEED_BITS
+
+    def merge(self, other: 'Partial') -> 'Partial':
+        """Summary of self followed directly by other"""
+        if other.first_epoch <= self.last_epoch:
+            raise ValueError(f"partials overlap: epochs {self.first_epoch}-{self.last_epoch} and "
+                             f"{other.first_epoch}-{other.last_epoch}")
+        counts = {name: getattr(self, name) + getattr(other, name) for name in self.COUNTS}
+        left, right = seed_bits(self.last_seed), seed_bits(other.first_seed)
+        counts['hamming'][np.count_nonzero(left != right)] += 1
+        counts['disagreements'] += boundary_disagreements(left, right)
+        counts['windows'] += boundary_windows(left, right)
+        return Partial(self.n + other.n, self.first_epoch, other.last_epoch, self.first_seed, other.last_seed,
+                       **counts)
+
+    def to_dict(self) -> Dict:
+        return {'n': self.n, 'first_epoch': self.first_epoch, 'last_epoch': self.last_epoch,
+                'first_seed': self.first_seed.hex(), 'last_seed': self.last_seed.hex(),
+                'max_period': MAX_PERIOD, 'max_lag': MAX_LAG, 'pattern_window': PATTERN_WINDOW,
+                **{name: getattr(self, name).tolist() for name in self.COUNTS}}
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> 'Partial':
+        layout = (d.get('max_period'), d.get('max_lag'), d.get('pattern_window'))
+        if layout != (MAX_PERIOD, MAX_LAG, PATTERN_WINDOW):
+            raise ValueError(f"partial was mapped with (max_period, max_lag, window) = {layout}, "
+                             f"expected {(MAX_PERIOD, MAX_LAG, PATTERN_WINDOW)}")
+        return cls(d['n'], d['first_epoch'], d['last_epoch'], bytes.fromhex(d['first_seed']),
+                   bytes.fromhex(d['last_seed']), **{name: d[name] for name in cls.COUNTS})
+
+
+def seed_bits(seed: bytes) -> np.ndarray:
+    return np.unpackbits(np.frombuffer(seed, dtype=np.uint8))
+
+
+def boundary_disagreements(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Differing pairs (i, i + lag) with i in the last seed of one run and i + lag in the first of the next"""
+    joined = np.concatenate((left, right))
+    return np.array([np.count_nonzero(joined[SEED_BITS - lag:SEED_BITS] != joined[SEED_BITS:SEED_BITS + lag])
+                     for lag in range(1, MAX_LAG + 1)], dtype=np.int64)
+
+
+def boundary_windows(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """The PATTERN_WINDOW - 1 windows spanning the end of left and the start of right"""
+    span = PATTERN_WINDOW - 1
+    joined = np.concatenate((left[SEED_BITS - span:], right[:span]))
+    return window_counts(np.packbits(joined), 2 * span, PATTERN_WINDOW, cyclic=False)
+
+
+def map_chunk(epochs: np.ndarray, seed_bytes: np.ndarray) -> Partial:
+    """Partial summary of consecutive seeds (an N x 32 uint8 matrix with their epochs)"""
+    seed_bytes = np.ascontiguousarray(seed_bytes, dtype=np.uint8)
+    epochs = np.asarray(epochs, dtype=np.int64)
+    if len(seed_bytes) == 0:
+        raise ValueError("empty chunk")
+    bit_arrays = np.unpackbits(seed_bytes, axis=1)
+    byte_ones = POPCOUNT[seed_bytes]
+    hamming = POPCOUNT[seed_bytes[1:] ^ seed_bytes[:-1]].sum(axis=1)
+
+    stream = bit_arrays.ravel().astype(bool)
+    disagreements = np.array([np.count_nonzero(stream[lag:] != stream[:-lag]) for lag in range(1, MAX_LAG + 1)],
+                             dtype=np.int64)
+    windows = window_counts(seed_bytes.ravel(), len(stream), PATTERN_WINDOW, cyclic=False)
+
+    # exp(-2 pi i t / P) from t mod P, exact for any epoch number
+    angle = -2 * np.pi * (epochs[:, None] % PERIODS) / PERIODS
+    phasors = np.stack((np.cos(angle), np.sin(angle)))                          # (2, n, periods)
+    phase_sums = np.einsum('knf,nb->kfb', phasors, bit_arrays.astype(np.float64), optimize=True)
+
+    return Partial(len(seed_bytes), epochs[0], epochs[-1], seed_bytes[0].tobytes(), seed_bytes[-1].tobytes(),
+                   bit_ones=bit_arrays.sum(axis=0, dtype=np.int64),
+                   popcounts=np.bincount(byte_ones.sum(axis=1), minlength=SEED_BITS + 1),
+                   byte_popcounts=np.bincount(byte_ones.ravel(), minlength=9),
+                   hamming=np.bincount(hamming, minlength=SEED_BITS + 1),
+                   disagreements=disagreements, windows=windows, phase_sums=phase_sums,
+                   phase_epochs=phasors.sum(axis=1))
+
+
+def reduce_partials(partials: Iterable[Partial]) -> Partial:
+    """Merge partials in epoch order (stable, so chunks of one file keep their order)"""
+    ordered = sorted(partials, key=lambda p: p.first_epoch)
+    if not ordered:
+        raise ValueError("nothing to reduce")
+    total = ordered[0]
+    for partial in ordered[1:]:
+        total = total.merge(partial)
+    return total
+
+# ==================== RESULTS ====================
+
+def _histogram_stats(values: np.ndarray, counts: np.ndarray) -> Dict:
+    """mean, std, min, max, median and n of a sample given as (distinct values, counts)"""
+    order = np.argsort(values, kind='stable')
+    values, counts = values[order], counts[order]
+    n = int(counts.sum())
+    present = np.flatnonzero(counts)
+    mean = float(np.dot(values, counts) / n)
+    std = float(math.sqrt(np.dot(counts, (values - mean) ** 2) / n))
+    cumulative = np.cumsum(counts)
+    lower = values[np.searchsorted(cumulative, (n - 1) // 2, side='right')]
+    upper = values[np.searchsorted(cumulative, n // 2, side='right')]
+    return {'mean': mean, 'std': std, 'min': float(values[present[0]]), 'max': float(values[present[-1]]),
+            'median': float((lower + upper) / 2), 'n': n}
+
+
+def hamming_results(p: Partial) -> Dict:
+    if p.n < 2:
+        return {"error": "Need at least 2 samples for Hamming analysis"}
+    distances = np.arange(SEED_BITS + 1, dtype=np.float64)
+    return {'consecutive': {**_histogram_stats(distances, p.hamming), 'histogram': p.hamming.tolist()},
+            'all': {'expected_mean': 128.0, 'expected_std': 8.0}}
+
+
+def entropy_results(p: Partial) -> Dict:
+    values = binary_entropy(np.arange(SEED_BITS + 1) / SEED_BITS)
+    sample = _histogram_stats(values, p.popcounts)
+    counts, edges = np.histogram(values, bins=20, range=(sample['min'], sample['max']), weights=p.popcounts)
+    sample['histogram'] = {'edges': edges.tolist(), 'counts': counts.astype(np.int64).tolist()}
+    byte_values = binary_entropy(np.arange(9) / 8)
+    byte = _histogram_stats(byte_values, p.byte_popcounts)
+    return {'sample_entropy': sample,
+            'overall_entropy': float(binary_entropy(p.bit_ones.sum() / p.n_bits)),
+            'expected_entropy': 1.0,
+            'byte_entropy': {'mean': byte['mean'], 'std': byte['std'], 'n': byte['n']}}
+
+
+def autocorrelation_results(p: Partial, max_lag: int = MAX_LAG) -> Dict:
+    n = p.n_bits
+    max_lag = min(max_lag, n // 2)
+    autocorr = [1.0] + [float((n - lag - 2 * int(p.disagreements[lag - 1])) / (n - lag))
+                        for lag in range(1, max_lag + 1)]
+    bound = 1.96 / np.sqrt(n)
+    return {'autocorrelation': autocorr, 'lags': list(range(max_lag + 1)), 'confidence_95': float(bound),
+            'significant_lags': [{'lag': lag, 'correlation': autocorr[lag], 'significant': True}
+                                 for lag in range(1, max_lag + 1) if abs(autocorr[lag]) > bound],
+            'max_abs_correlation': float(np.max(np.abs(autocorr[1:]))) if max_lag else 0.0,
+            'total_bits': n}
+
+
+def pattern_results(p: Partial) -> Dict:
+    """analysis2 monobit and m-bit (serial, approximate entropy, runs) tests over the flattened stream"""
+    from scipy.special import erfc
+    n = p.n_bits
+    ones = int(p.bit_ones.sum())
+    s_obs = abs(2 * ones - n) / np.sqrt(n)
+    first, last = seed_bits(p.first_seed), seed_bits(p.last_seed)
+    cyclic = p.windows + boundary_windows(last, first)
+    return {'monobit': {'zeros': n - ones, 'ones': ones, 'z_score': float(s_obs),
+                        'p_value': float(erfc(s_obs / np.sqrt(2)))},
+            'm_bit': statistics_from_counts(cyclic, n, PATTERN_M, int(first[0]), int(last[-1]))}
+
+
+def spectrum_results(p: Partial, alpha: float = SPECTRUM_ALPHA) -> Dict:
+    """
+    Periodogram of every bit over the epoch number at 1 / P cycles per epoch, P = 2..MAX_PERIOD
+
+    Bits are centred on their observed frequency and powers normalised by
+    their null mean N/4, so each is ~Exp(1) (chi2_1 at P = 2) for
+    independent fair bits; peaks are tested with Bonferroni over bits x
+    periods. A pattern repeating every P epochs also puts power at the
+    periods dividing P (its harmonics), so fundamental_periods keeps the
+    significant periods that are not a divisor of another significant one.
+    """
+    from scipy.special import erfc
+    sums = p.phase_sums[0] + 1j * p.phase_sums[1]
+    epochs = p.phase_epochs[0] + 1j * p.phase_epochs[1]
+    centred = sums - epochs[:, None] * (p.bit_ones / p.n)
+    power = np.abs(centred) ** 2 / (p.n / 4)
+    p_values = np.where((PERIODS == 2)[:, None], erfc(np.sqrt(power / 2)), np.exp(-power))
+    n_tests = p_values.size
+    peaks = [{'period_epochs': int(PERIODS[i]), 'bit': int(b), 'power': float(power[i, b]),
+              'p_value': float(min(1.0, p_values[i, b] * n_tests))}
+             for i, b in zip(*np.nonzero(p_values * n_tests < alpha))]
+    significant = sorted({peak['period_epochs'] for peak in peaks})
+    fundamental = [q for q in significant if not any(r != q and r % q == 0 for r in significant)]
+    i, b = np.unravel_index(np.argmax(power), power.shape)
+    return {'max_period': MAX_PERIOD,
+            'periods_epochs': PERIODS.tolist(),
+            'mean_power': power.mean(axis=1).tolist(),
+            'max_power': power.max(axis=1).tolist(),
+            'strongest': {'period_epochs': int(PERIODS[i]), 'bit': int(b), 'power': float(power[i, b]),
+                          'p_value': float(min(1.0, p_values[i, b] * n_tests))},
+            'alpha': alpha,
+            'fundamental_periods': fundamental,
+            'significant_peaks': sorted(peaks, key=lambda x: x['p_value'])}
+
+
+def results_from_partial(p: Partial) -> Dict:
+    """Analyzer-shaped results of a reduced partial"""
+    return {'n_samples': p.n,
+            'epoch_range': f"{p.first_epoch}-{p.last_epoch}",
+            'bit_bias': bit_bias_from_counts(p.bit_ones, p.n),
+            'hamming': hamming_results(p),
+            'entropy': entropy_results(p),
+            'autocorrelation': autocorrelation_results(p),
+            'patterns': pattern_results(p),
+            'spectrum': spectrum_results(p)}
+
+# ==================== INPUT ====================
+
+# (log file, byte offset of the first line, number of lines)
+ChunkTask = Tuple[str, int, int]
+
+
+def plan_chunks(log_file, chunk_epochs: int = DEFAULT_CHUNK_EPOCHS) -> List[ChunkTask]:
+    """Split a JSONL log into line ranges of chunk_epochs records without parsing it"""
+    tasks, offset, start, lines = [], 0, 0, 0
+    with open(log_file, 'rb') as f:
+        for line in f:
+            if line.strip():
+                if lines == chunk_epochs:
+                    tasks.append((str(log_file), start, lines))
+                    start, lines = offset, 0
+                lines += 1
+            offset += len(line)
+    if lines:
+        tasks.append((str(log_file), start, lines))
+    return tasks
+
+
+def read_chunk(task: ChunkTask) -> Tuple[np.ndarray, np.ndarray]:
+    path, offset, n_lines = task
+    records = []
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        while len(records) < n_lines:
+            line = f.readline()
+            if not line:
+                break
+            if line.strip():
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    n_lines -= 1
+    return records_to_seeds(records)
+
+
+def map_task(task: ChunkTask) -> Partial:
+    return map_chunk(*read_chunk(task))
+
+
+def map_logs(log_files: List, chunk_epochs: int = DEFAULT_CHUNK_EPOCHS,
+             workers: Optional[int] = None) -> List[Partial]:
+    """Partials of every chunk of every log, mapped in worker processes when workers > 1"""
+    tasks = [task for log_file in log_files for task in plan_chunks(log_file, chunk_epochs)]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        return [map_task(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(map_task, tasks))
+
+
+def write_partials(partials: List[Partial], output_dir, prefix: str) -> List[Path]:
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for partial in partials:
+        path = output_dir / f"{prefix}_{partial.first_epoch:010d}-{partial.last_epoch:010d}.json"
+        with open(path, 'w') as f:
+            json.dump(partial.to_dict(), f)
+        paths.append(path)
+    return paths
+
+
+def read_partials(paths: List) -> List[Partial]:
+    partials = []
+    for path in paths:
+        with open(path) as f:
+            partials.append(Partial.from_dict(json.load(f)))
+    return partials
+
+# ==================== CLI ====================
+
+def report(results: Dict, output_file: Path):
+    print(f"\n📊 {results['n_samples']:,} seeds, epochs {results['epoch_range']}")
+    for metric in key_metrics(results):
+        print(f"  {metric['name']:<22} {metric['display']:>12}  (expected {metric['expected']}) "
+              f"{'✓' if metric['ok'] else '⚠️'}")
+    m_bit = results['patterns']['m_bit']
+    print(f"  Monobit p={results['patterns']['monobit']['p_value']:.4f}, serial p={m_bit['serial']['p_value1']:.4f}, "
+          f"ApEn p={m_bit['approximate_entropy']['p_value']:.4f}, runs p={m_bit['runs']['p_value']:.4f}")
+    strongest = results['spectrum']['strongest']
+    print(f"  Epoch spectrum: strongest period {strongest['period_epochs']} epochs at bit {strongest['bit']} "
+          f"(adjusted p={strongest['p_value']:.4f}), {len(results['spectrum']['significant_peaks'])} significant"
+          + (f", periods {results['spectrum']['fundamental_periods']}" if results['spectrum']['fundamental_periods'] else ""))
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, 'w') as f:
+        json.dump(results, f, indent=2, default=json_default)
+    print(f"\n💾 Results saved to: {output_file}")
+
+
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description='Chunked map-reduce analysis of RANDAO seed logs')
+    sub = parser.add_subparsers(dest='command', required=True)
+    run_p = sub.add_parser('run', help='Map the logs in a process pool and reduce')
+    map_p = sub.add_parser('map', help='Write one partial summary per chunk')
+    reduce_p = sub.add_parser('reduce', help='Merge partial summaries into results')
+    for p in (run_p, map_p):
+        p.add_argument('logs', nargs='+', help='JSONL seed logs (together one epoch-ordered dataset)')
+        p.add_argument('--chunk-epochs', type=int, default=DEFAULT_CHUNK_EPOCHS, help='Seeds per chunk')
+        p.add_argument('--workers', '-w', type=int, default=None, help='Worker processes (default: CPU count)')
+    reduce_p.add_argument('partials', nargs='+', help='Partial summary JSON files')
+    map_p.add_argument('--output-dir', '-o', default='./randao_analysis/partials', help='Directory for the partials')
+    for p in (run_p, reduce_p):
+        p.add_argument('--output', '-o', default='./randao_analysis/mapreduce_results.json', help='Results JSON')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == 'reduce':
+        partials = read_partials(args.partials)
+        print(f"📥 {len(partials)} partials")
+    else:
+        partials = map_logs(args.logs, args.chunk_epochs, args.workers)
+        print(f"🗺️  Mapped {len(partials)} chunks of {len(args.logs)} log(s) in {time.perf_counter() - start:.2f}s")
+        if args.command == 'map':
+            paths = write_partials(partials, args.output_dir, Path(args.logs[0]).stem)
+            print(f"💾 {len(paths)} partials written to {args.output_dir}")
+            return
+    try:
+        total = reduce_partials(partials)
+    except ValueError as e:
+        parser.error(f"{e} (sort the logs by epoch or split overlapping captures)")
+    report(results_from_partial(total), Path(args.output))
+
+
+if __name__ == "__main__":
+    main()
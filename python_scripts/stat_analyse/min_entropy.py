@@ -0,0 +1,573 @@
+#!/usr/bin/env python3
+"""
+NIST SP 800-90B non-IID min-entropy estimators (section 6.3) for RANDAO seeds.
+
+The seed stream is assessed twice: as bits (all ten estimators) and as bytes.
+The collision, Markov and compression estimators are defined for binary data
+only, so the byte pass uses the other seven. Following NIST's ea_non_iid tool,
+the assessed entropy per bit is min(H_bitstring, H_original / 8).
+
+Everything is vectorised. The t-tuple and LRS estimators and the context
+models of MultiMMC and LZ78Y run on one suffix array (prefix doubling) with
+an LCP array from binary lifting over the doubling ranks. The predictors
+compute their running counts with sorts and cumulative sums instead of a
+per-sample dictionary loop.
+
+Implementation choices where the spec leaves room: MultiMMC and LZ78Y break
+count ties toward the larger symbol value, and MultiMMC has no MAXENTRIES
+cap. LZ78Y does honour the 65536-entry dictionary limit.
+"""
+
+import math
+from typing import Dict, Tuple
+
+import numpy as np
+
+Z_99 = 2.576          # two-sided 99% normal quantile used throughout 6.3
+TUPLE_CUTOFF = 35     # t-tuple / LRS occurrence cutoff
+DEFAULT_MAX_SAMPLES = 1_000_000
+
+MCW_WINDOWS = (63, 255, 1023, 4095)
+LAG_DEPTH = 128
+MMC_DEPTH = 16
+LZ78Y_B = 16
+LZ78Y_MAX_DICT = 65536
+COMPRESSION_BLOCK = 6
+COMPRESSION_INIT = 1000
+
+# ==================== SHARED HELPERS ====================
+
+def _upper_bound(p: float, n: int) -> float:
+    """Upper 99% confidence bound on a proportion, capped at 1"""
+    if n <= 1:
+        return 1.0
+    return min(1.0, p + Z_99 * math.sqrt(p * (1 - p) / (n - 1)))
+
+
+def _entropy(p: float) -> float:
+    return -math.log2(p) if p > 0 else float('inf')
+
+
+def _bisect(func, target: float, lo: float, hi: float, decreasing: bool = True,
+            iterations: int = 100) -> float:
+    """Solve func(x) = target on [lo, hi] for a monotone func"""
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        value = func(mid)
+        if (value > target) == decreasing:
+            lo = mid
+        else:
+            hi = mid
+    return (lo + hi) / 2
+
+
+def _true_runs(mask: np.ndarray) -> np.ndarray:
+    """Lengths of the runs of True in a boolean array"""
+    padded = np.concatenate(([False], mask, [False])).astype(np.int8)
+    edges = np.diff(padded)
+    return np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+
+# ==================== SUFFIX ARRAY ====================
+
+class SuffixArray:
+    """Suffix array, LCP array and doubling ranks of an integer sequence"""
+
+    def __init__(self, symbols: np.ndarray):
+        s = np.asarray(symbols)
+        n = len(s)
+        self.n = n
+
+        # Prefix doubling: levels[k] ranks the length-2**k prefixes of every suffix
+        rank = np.unique(s, return_inverse=True)[1].astype(np.int64).ravel()
+        self.levels = [rank]
+        k = 1
+        while n and rank.max() < n - 1:
+            shifted = np.full(n, -1, dtype=np.int64)
+            shifted[:n - k] = rank[k:]
+            rank = np.unique(rank * (n + 1) + shifted + 1, return_inverse=True)[1].astype(np.int64).ravel()
+            self.levels.append(rank)
+            k *= 2
+        self.sa = np.argsort(rank, kind='stable')
+
+        # lcp[i] = common prefix of suffixes sa[i-1] and sa[i] (lcp[0] = 0), by binary lifting
+        a, b = self.sa[:-1], self.sa[1:]
+        lcp = np.zeros(max(0, n - 1), dtype=np.int64)
+        for lev in range(len(self.levels) - 2, -1, -1):
+            ia, ib = a + lcp, b + lcp
+            valid = (ia < n) & (ib < n)
+            ranks = self.levels[lev]
+            same = valid & (ranks[np.minimum(ia, n - 1)] == ranks[np.minimum(ib, n - 1)])
+            lcp[same] += 1 << lev
+        self.lcp = np.concatenate(([0], lcp)) if n else lcp
+
+    def max_tuple_count(self, length: int) -> int:
+        """Occurrences of the most common length-`length` tuple"""
+        if self.n < length:
+            return 0
+        runs = _true_runs(self.lcp[1:] >= length)
+        return int(runs.max()) + 1 if len(runs) else 1
+
+    def group_ids(self, length: int) -> np.ndarray:
+        """
+        Dense ids of the length-`length` substrings: ids[p] == ids[q] iff the substrings
+        starting at p and q are equal. The last length-1 positions, too close to the end
+        for a full substring, get the id of a neighbouring group.
+        """
+        full = self.sa <= self.n - length
+        ids = np.empty(self.n, dtype=np.int64)
+        ids[self.sa] = np.maximum(np.cumsum((self.lcp < length) & full) - 1, 0)
+        return ids
+
+    @property
+    def longest_repeat(self) -> int:
+        return int(self.lcp.max()) if self.n else 0
+
+# ==================== ESTIMATORS 6.3.1 - 6.3.6 ====================
+
+def most_common_value(s: np.ndarray) -> Dict:
+    """6.3.1 Most common value estimate"""
+    counts = np.bincount(s)
+    p_hat = counts.max() / len(s)
+    p_u = _upper_bound(p_hat, len(s))
+    return {'p_hat': float(p_hat), 'p_u': p_u, 'min_entropy': _entropy(p_u)}
+
+
+def collision(bits: np.ndarray) -> Dict:
+    """6.3.2 Collision estimate (binary only)"""
+    n = len(bits)
+    # t = 2 if the next sample repeats the current one, else 3 (binary data always collides by then)
+    step = np.where(bits[:-1] == bits[1:], 2, 3).tolist()
+    times = [0, 0]
+    i = 0
+    while i + 2 < n:
+        t = step[i]
+        times[t - 2] += 1
+        i += t
+    v = times[0] + times[1]
+    if v < 2:
+        return {'min_entropy': None, 'reason': 'not enough data'}
+
+    mean = (2 * times[0] + 3 * times[1]) / v
+    var = (times[0] * (2 - mean) ** 2 + times[1] * (3 - mean) ** 2) / (v - 1)
+    mean_lower = mean - Z_99 * math.sqrt(var) / math.sqrt(v)
+
+    # For binary data the spec's collision-time expectation p q^-2 (1 + (1/p - 1/q)/2) F(q)
+    # - p q^-1 (1/p - 1/q)/2 reduces to 3 - (p^2 + q^2), which is solved in closed form
+    c = 3 - mean_lower
+    if 0.5 <= c <= 1:
+        p = (1 + math.sqrt(2 * c - 1)) / 2
+        h = _entropy(p)
+    else:
+        p, h = None, 1.0
+    return {'mean': mean, 'mean_lower': mean_lower, 'collisions': v, 'p': p, 'min_entropy': min(h, 1.0)}
+
+
+def markov(bits: np.ndarray) -> Dict:
+    """6.3.3 Markov estimate (binary only)"""
+    n = len(bits)
+    p1 = bits.mean()
+    p0 = 1 - p1
+    pair = np.bincount(bits[:-1] * 2 + bits[1:], minlength=4)
+    from0, from1 = pair[0] + pair[1], pair[2] + pair[3]
+    t = {
+        (0, 0): pair[0] / from0 if from0 else 0.0, (0, 1): pair[1] / from0 if from0 else 0.0,
+        (1, 0): pair[2] / from1 if from1 else 0.0, (1, 1): pair[3] / from1 if from1 else 0.0,
+    }
+
+    def log2(x):
+        return math.log2(x) if x > 0 else float('-inf')
+
+    # Log-probabilities of the most likely 128-bit sequences
+    candidates = [
+        log2(p0) + 127 * log2(t[0, 0]),
+        log2(p0) + 64 * log2(t[0, 1]) + 63 * log2(t[1, 0]),
+        log2(p0) + log2(t[0, 1]) + 126 * log2(t[1, 1]),
+        log2(p1) + log2(t[1, 0]) + 126 * log2(t[0, 0]),
+        log2(p1) + 64 * log2(t[1, 0]) + 63 * log2(t[0, 1]),
+        log2(p1) + 127 * log2(t[1, 1]),
+    ]
+    log_p_max = max(candidates)
+    return {'log2_p_max': log_p_max, 'min_entropy': min(-log_p_max / 128, 1.0), 'n': n}
+
+
+def compression(bits: np.ndarray) -> Dict:
+    """6.3.4 Compression estimate (binary only)"""
+    b = COMPRESSION_BLOCK
+    n_blocks = len(bits) // b
+    d = COMPRESSION_INIT
+    v = n_blocks - d
+    if v < 2:
+        return {'min_entropy': None, 'reason': 'not enough data'}
+
+    weights = 1 << np.arange(b - 1, -1, -1)
+    blocks = bits[:n_blocks * b].reshape(n_blocks, b) @ weights
+
+    # Distance to the previous occurrence of the same block (1-indexed position if none)
+    pos = np.arange(1, n_blocks + 1)
+    order = np.lexsort((pos, blocks))
+    prev = np.zeros(n_blocks, dtype=np.int64)
+    same = blocks[order[1:]] == blocks[order[:-1]]
+    prev[order[1:][same]] = pos[order[:-1][same]]
+    dist = np.where(prev > 0, pos - prev, pos)[d:]
+
+    log_d = np.log2(dist)
+    mean = log_d.mean()
+    sigma = 0.5907 * math.sqrt(max(0.0, np.sum(log_d ** 2) / (v - 1) - mean ** 2))
+    mean_lower = mean - Z_99 * sigma / math.sqrt(v)
+
+    u = np.arange(1, n_blocks + 1)
+    log_u = np.log2(u)
+    t_range = slice(d, n_blocks)  # t = d+1 .. n_blocks (1-indexed)
+
+    def g(z):
+        if z <= 0:
+            return 0.0
+        decay = np.exp((u - 1) * math.log1p(-z)) if z < 1 else (u == 1).astype(float)
+        a = log_u * decay
+        prefix = np.concatenate(([0.0], np.cumsum(a)[:-1]))  # sum over u < t
+        return (z * z * prefix[t_range].sum() + z * a[t_range].sum()) / v
+
+    k = 2 ** b
+
+    def expected(p):
+        return g(p) + (k - 1) * g((1 - p) / (k - 1))
+
+    if mean_lower >= expected(1 / k):
+        p, h = None, 1.0
+    else:
+        p = _bisect(expected, mean_lower, 1 / k, 1.0, decreasing=True)
+        h = _entropy(p) / b
+    return {'mean': float(mean), 'mean_lower': float(mean_lower), 'p': p, 'min_entropy': min(h, 1.0)}
+
+
+def t_tuple(s: np.ndarray, sa: SuffixArray) -> Dict:
+    """6.3.5 t-Tuple estimate"""
+    n = len(s)
+    q = []
+    length = 1
+    while True:
+        count = sa.max_tuple_count(length)
+        if count < TUPLE_CUTOFF:
+            break
+        q.append(count)
+        length += 1
+    if not q:
+        return {'t': 0, 'min_entropy': None, 'reason': 'no tuple occurs 35 times'}
+
+    p_max = max((q[i - 1] / (n - i + 1)) ** (1 / i) for i in range(1, len(q) + 1))
+    p_u = _upper_bound(p_max, n)
+    return {'t': len(q), 'p_hat': p_max, 'p_u': p_u, 'min_entropy': _entropy(p_u)}
+
+
+def longest_repeated_substring(s: np.ndarray, sa: SuffixArray, t: int) -> Dict:
+    """6.3.6 Longest repeated substring (LRS) estimate"""
+    n = len(s)
+    u = t + 1
+    v = sa.longest_repeat
+    if u > v:
+        return {'u': u, 'v': v, 'min_entropy': None, 'reason': 'no repeated tuple longer than t'}
+
+    # Positions still in some repeated W-tuple group shrink as W grows, so work is sum(lcp)
+    lcp = sa.lcp[1:]
+    active = np.flatnonzero(lcp >= u)
+    p_max = 0.0
+    for w in range(u, v + 1):
+        active = active[lcp[active] >= w]
+        if len(active) == 0:
+            break
+        breaks = np.flatnonzero(np.diff(active) != 1)
+        sizes = np.diff(np.concatenate(([0], breaks + 1, [len(active)]))) + 1
+        pairs = float(np.sum(sizes * (sizes - 1) / 2))
+        total_pairs = (n - w + 1) * (n - w) / 2
+        p_max = max(p_max, (pairs / total_pairs) ** (1 / w))
+
+    p_u = _upper_bound(p_max, n)
+    return {'u': u, 'v': v, 'p_hat': p_max, 'p_u': p_u, 'min_entropy': _entropy(p_u)}
+
+# ==================== PREDICTORS 6.3.7 - 6.3.10 ====================
+
+def _local_probability(r: int, n: int) -> float:
+    """P_local: success probability at which a longest run of r-1 has 99% probability"""
+    def no_run_probability(p):
+        q = 1 - p
+        x = 1.0
+        for _ in range(10):
+            x = 1 + q * p ** r * x ** (r + 1)
+        denom = (r + 1 - r * x) * q
+        num = 1 - p * x
+        if denom <= 0 or num <= 0:
+            return 0.0
+        return math.exp(math.log(num / denom) - (n + 1) * math.log(x))
+
+    return _bisect(no_run_probability, 0.99, 1e-12, 1 - 1e-12, decreasing=True)
+
+
+def predictor_result(correct: np.ndarray, k: int) -> Dict:
+    """Global/local prediction probabilities and min-entropy from a correctness sequence"""
+    n = len(correct)
+    if n == 0:
+        return {'min_entropy': None, 'reason': 'no predictions'}
+    c = int(correct.sum())
+    p_global = c / n
+    if c == 0:
+        p_global_u = 1 - 0.01 ** (1 / n)
+    else:
+        p_global_u = _upper_bound(p_global, n)
+    runs = _true_runs(correct)
+    r = int(runs.max()) + 1 if len(runs) else 1
+    p_local = _local_probability(r, n)
+    p_max = max(p_global_u, p_local, 1 / k)
+    return {'predictions': n, 'correct': c, 'p_global': p_global, 'p_global_u': p_global_u,
+            'longest_run': r - 1, 'p_local': p_local, 'min_entropy': _entropy(p_max)}
+
+
+def _scoreboard(correct: np.ndarray, score: np.ndarray, first: bool = True) -> np.ndarray:
+    """
+    Ensemble correctness of 6.3.7-6.3.9 from a (subpredictors x steps) correctness matrix.
+
+    The very first prediction uses subpredictor 1, later ones the subpredictor with
+    the best score so far, ties going to the higher index (the spec's `>=` update
+    rule). `score` carries the scores of earlier chunks and is updated in place.
+    """
+    hits = correct.astype(np.int32)
+    before = np.cumsum(hits, axis=1)
+    before -= hits
+    before += score[:, None].astype(np.int32)
+    best = before.max(axis=0)
+    winner = len(correct) - 1 - np.argmax(before[::-1] == best, axis=0)
+    if first:
+        winner[0] = 0
+    score += hits.sum(axis=1)
+    return correct[winner, np.arange(correct.shape[1])]
+
+
+def _window_modes(s: np.ndarray, k: int, windows, start: int, chunk: int = 8192) -> np.ndarray:
+    """
+    Most common value of s[i-w:i] for every window w and i >= start, ties to the most
+    recent value; -1 where i < w. Returns a (windows x steps) matrix.
+    """
+    n = len(s)
+    w_max = max(windows)
+    out = np.full((len(windows), n - start), -1, dtype=np.int64)
+    for a in range(start, n, chunk):
+        b = min(n, a + chunk)
+        lo = max(0, a - w_max)
+        seg = s[lo:b]
+        m = len(seg)
+        onehot = np.zeros((m, k), dtype=np.int32)
+        onehot[np.arange(m), seg] = 1
+        cum = np.zeros((m + 1, k), dtype=np.int32)
+        np.cumsum(onehot, axis=0, out=cum[1:])
+        # 1-based position of each symbol's latest occurrence so far, 0 if none
+        last = np.where(onehot == 1, np.arange(1, m + 1, dtype=np.int32)[:, None], 0)
+        np.maximum.accumulate(last, axis=0, out=last)
+        for row, w in enumerate(windows):
+            first = max(a, w)
+            if first >= b:
+                continue
+            i0, i1 = first - lo, b - lo  # windows are seg[i-w:i] for i in [i0, i1)
+            score = cum[i0:i1] - cum[i0 - w:i1 - w]
+            score *= m + 1
+            score += last[i0 - 1:i1 - 1]
+            out[row, first - start:b - start] = np.argmax(score, axis=1)
+    return out
+
+
+def multi_mcw(s: np.ndarray, k: int) -> Dict:
+    """6.3.7 Multi Most Common in Window prediction estimate"""
+    start = MCW_WINDOWS[0]
+    if len(s) <= start:
+        return {'min_entropy': None, 'reason': 'not enough data'}
+    preds = _window_modes(s, k, MCW_WINDOWS, start)
+    ensemble = _scoreboard(preds == s[start:], np.zeros(len(MCW_WINDOWS), dtype=np.int64))
+    return predictor_result(ensemble, k)
+
+
+def lag(s: np.ndarray, k: int, chunk: int = 32768) -> Dict:
+    """6.3.8 Lag prediction estimate"""
+    n = len(s)
+    if n < 2:
+        return {'min_entropy': None, 'reason': 'not enough data'}
+    depth = LAG_DEPTH
+    padded = np.concatenate((np.full(depth, -1, dtype=s.dtype), s))
+    score = np.zeros(depth, dtype=np.int64)
+    parts = []
+    for a in range(1, n, chunk):
+        b = min(n, a + chunk)
+        target = padded[a + depth:b + depth]
+        correct = np.stack([target == padded[a + depth - d:b + depth - d] for d in range(1, depth + 1)])
+        parts.append(_scoreboard(correct, score, first=(a == 1)))
+    return predictor_result(np.concatenate(parts), k)
+
+
+def _stable_order(keys: np.ndarray) -> np.ndarray:
+    """Stable argsort; non-negative keys below 2**16 are narrowed so NumPy radix sorts them"""
+    top = int(keys.max()) if len(keys) else 0
+    for dtype in (np.uint8, np.uint16):
+        if top <= np.iinfo(dtype).max:
+            return np.argsort(keys.astype(dtype), kind='stable')
+    return np.argsort(keys, kind='stable')
+
+
+def _running_mode(ctx: np.ndarray, y: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    For events in time order with context ids ctx and outcomes y, the most frequent outcome
+    among *earlier* events of the same context (ties to the larger value) and its count;
+    (-1, 0) when the context has not been seen before.
+    """
+    n = len(ctx)
+    # Stable sorts keep time order within each context / (context, outcome) group
+    order = _stable_order(ctx)
+    c_o, y_o = ctx[order], y[order]
+    new_ctx = np.concatenate(([True], c_o[1:] != c_o[:-1]))
+    ctx_group = np.cumsum(new_ctx) - 1
+
+    # Count of (ctx, y) up to and including each event; two-pass LSD sort by (ctx, y)
+    by_y = _stable_order(y)
+    order_cy = by_y[_stable_order(ctx[by_y])]
+    cy = ctx[order_cy] * k + y[order_cy]
+    starts = np.concatenate(([True], cy[1:] != cy[:-1]))
+    start_idx = np.maximum.accumulate(np.where(starts, np.arange(n), 0))
+    count = np.empty(n, dtype=np.int64)
+    count[order_cy] = np.arange(n) - start_idx + 1
+    count_o = count[order]
+
+    # Running maximum count per context; a strictly larger count starts a new segment
+    offset = ctx_group * (n + 2)
+    running_max = np.maximum.accumulate(offset + count_o) - offset
+    prev_max = np.concatenate(([0], running_max[:-1]))
+    prev_max[new_ctx] = 0
+    segment = np.cumsum(count_o > prev_max)
+
+    # Mode = largest outcome that holds the maximal count within the segment
+    holder = np.where(count_o == running_max, y_o, -1) + 1
+    seg_offset = segment * (k + 2)
+    mode_after = np.maximum.accumulate(seg_offset + holder) - seg_offset - 1
+
+    mode_before = np.concatenate(([-1], mode_after[:-1]))
+    count_before = np.concatenate(([0], running_max[:-1]))
+    mode_before[new_ctx] = -1
+    count_before[new_ctx] = 0
+
+    out_mode = np.empty(n, dtype=np.int64)
+    out_count = np.empty(n, dtype=np.int64)
+    out_mode[order] = mode_before
+    out_count[order] = count_before
+    return out_mode, out_count
+
+
+def multi_mmc(s: np.ndarray, k: int, sa: SuffixArray) -> Dict:
+    """6.3.9 Multi Markov Model with Counting prediction estimate"""
+    n = len(s)
+    if n < 3:
+        return {'min_entropy': None, 'reason': 'not enough data'}
+    first = 2
+    preds = np.full((MMC_DEPTH, n - first), -1, dtype=np.int16)
+    for d in range(1, MMC_DEPTH + 1):
+        if d >= n:
+            break
+        # Event at t: context s[t-d:t] followed by s[t]
+        ids = sa.group_ids(d)[:n - d]
+        mode, _ = _running_mode(ids, s[d:], k)
+        lo = max(first, d)
+        preds[d - 1, lo - first:] = mode[lo - d:]
+    ensemble = _scoreboard(preds == s[first:], np.zeros(MMC_DEPTH, dtype=np.int64))
+    return predictor_result(ensemble, k)
+
+
+def lz78y(s: np.ndarray, k: int, sa: SuffixArray) -> Dict:
+    """6.3.10 LZ78Y prediction estimate (65536-entry dictionary)"""
+    n = len(s)
+    b = LZ78Y_B
+    first = b + 1
+    if n <= first:
+        return {'min_entropy': None, 'reason': 'not enough data'}
+
+    # Events t = b .. n-1: context s[t-j:t] -> s[t]; events up to n-2 update the dictionary
+    t = np.arange(b, n)
+    lengths = range(1, b + 1)
+    first_events = []
+    for j in lengths:
+        ids = sa.group_ids(j)[t - j]
+        order = _stable_order(ids)
+        sorted_ids = ids[order]
+        new_group = np.concatenate(([True], sorted_ids[1:] != sorted_ids[:-1]))
+        firsts = np.sort(order[new_group])
+        first_events.append(firsts[firsts < len(t) - 1])
+
+    # Dictionary admission: first occurrences in update order (t ascending, j from b down to 1)
+    first_t = np.concatenate(first_events)
+    first_j = np.concatenate([np.full(len(f), j) for j, f in zip(lengths, first_events)])
+    admitted = np.zeros(len(first_t), dtype=bool)
+    admitted[np.lexsort((-first_j, first_t))[:LZ78Y_MAX_DICT]] = True
+    bounds = np.cumsum([0] + [len(f) for f in first_events])
+
+    # Longest context first; a shorter one only wins with a strictly larger count
+    prediction = np.full(n - first, -1, dtype=np.int64)
+    best_count = np.zeros(n - first, dtype=np.int64)
+    for j in reversed(lengths):
+        ids = sa.group_ids(j)[t - j]
+        member = np.zeros(int(ids.max()) + 1, dtype=bool)
+        member[ids[first_events[j - 1][admitted[bounds[j - 1]:bounds[j]]]]] = True
+        mode, count = _running_mode(ids, s[b:], k)
+        count = np.where(member[ids], count, 0)[1:]
+        better = count > best_count
+        best_count[better] = count[better]
+        prediction[better] = mode[1:][better]
+    return predictor_result(prediction == s[first:], k)
+
+# ==================== SUITE ====================
+
+def assess(symbols: np.ndarray, k: int) -> Dict:
+    """Run every applicable 6.3 estimator on a symbol sequence with alphabet size k"""
+    s = np.asarray(symbols, dtype=np.int64)
+    sa = SuffixArray(s)
+    results = {'n_samples': len(s), 'alphabet_size': k}
+    results['mcv'] = most_common_value(s)
+    if k == 2:
+        results['collision'] = collision(s)
+        results['markov'] = markov(s)
+        results['compression'] = compression(s)
+    results['t_tuple'] = t_tuple(s, sa)
+    results['lrs'] = longest_repeated_substring(s, sa, results['t_tuple'].get('t', 0))
+    results['multi_mcw'] = multi_mcw(s, k)
+    results['lag'] = lag(s, k)
+    results['multi_mmc'] = multi_mmc(s, k, sa)
+    results['lz78y'] = lz78y(s, k, sa)
+
+    estimates = {name: r['min_entropy'] for name, r in results.items()
+                 if isinstance(r, dict) and r.get('min_entropy') is not None}
+    limiting = min(estimates, key=estimates.get)
+    results['min_entropy'] = min(estimates[limiting], math.log2(k))
+    results['limiting_estimator'] = limiting
+    return results
+
+
+def estimate_min_entropy(seed_bytes: np.ndarray, max_samples: int = DEFAULT_MAX_SAMPLES) -> Dict:
+    """
+    SP 800-90B assessment of an N x 32 seed matrix as a bit stream and a byte stream.
+
+    At most max_samples symbols of each stream are used (the spec's 1M-sample
+    guideline), taken from the start of the log.
+    """
+    flat = np.ascontiguousarray(seed_bytes, dtype=np.uint8).ravel()
+    byte_stream = flat[:max_samples]
+    bit_stream = np.unpackbits(flat[:-(-max_samples // 8)])[:max_samples]
+
+    bits = assess(bit_stream, 2)
+    bytes_ = assess(byte_stream, 256)
+    per_bit = min(bits['min_entropy'], bytes_['min_entropy'] / 8)
+    if bits['min_entropy'] <= bytes_['min_entropy'] / 8:
+        limiting = f"bits.{bits['limiting_estimator']}"
+    else:
+        limiting = f"bytes.{bytes_['limiting_estimator']}"
+    return {
+        'bits': bits,
+        'bytes': bytes_,
+        'h_bitstring': bits['min_entropy'],
+        'h_original': bytes_['min_entropy'],
+        'min_entropy_per_bit': per_bit,
+        'min_entropy_per_seed': per_bit * 256,
+        'limiting_estimator': limiting,
+        'naive_min_entropy': float(-math.log2(max(bit_stream.mean(), 1 - bit_stream.mean()))),
+    }
@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Parallel driver for the NIST statistical test suite binary (sts).
+
+Builds raw-binary inputs (32 bytes per seed, epoch order, most significant
+bit first) from JSONL seed logs or Parquet stores, splits every dataset into
+bitstreams of --bits bits and those into batches of --batch-streams streams,
+and runs one `sts -F r` process per batch, several at a time and each with
+its own -T threads:
+
+    python nist_sts.py ../randao_seed_logger/geloggde_seeds/*.jsonl --sts ../NIST/sts/sts
+
+Each run's finalAnalysisReport is parsed into rows (C1..C10 p-value decile
+counts, passing/total per test and subtest) and its p-value files (-s) into
+lists. Batches of a dataset merge exactly: the decile counts and passing
+counts add up, and the uniformity p-value and the minimum pass rate are
+recomputed from the sums as in SP 800-22 section 4.2. A dataset is therefore
+assessed the same whether it ran as one sts process or many.
+
+Parsed batches are cached (result_cache.py) by the hash of the batch input,
+the sts parameters, the sts binary and this parser, so rerunning the battery
+over all configs only runs the new or changed data. With --merge-into the
+assessment is added as 'nist_sts' to a dataset's analysis_results.json
+(analyze.py output); '{dataset}' in the path is replaced by the dataset name.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from analyze import load_log
+from result_cache import (AnalysisCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, dataset_hash, function_fingerprint,
+                          json_default)
+
+LOG_PREFIX = "randao_log_"
+
+DEFAULT_STS = Path(__file__).resolve().parent.parent / "NIST" / "sts" / "sts"
+DEFAULT_BITS = 10752  # per bitstream, as in NIST/sts_command.txt
+DEFAULT_THREADS = 1
+DEFAULT_TIMEOUT = 3600
+
+ALPHA = 0.01                  # per-p-value significance level of sts
+UNIFORMITY_ALPHA = 0.0001     # level of the p-value uniformity test
+MIN_UNIFORMITY_SAMPLES = 55   # fewer p-values and the uniformity test is not meaningful
+
+REPORT_FILE = "finalAnalysisReport.txt"
+# " 1   1   0   0   1   1   2   2   1   1  0.739918     10/10      Frequency", '*' marks failures.
+# The p-value is '----' when too few streams produced one, the proportion '------' when none did
+# (RandomExcursions on streams without enough cycles).
+REPORT_ROW = re.compile(r'^\s*((?:\d+\s+){10})(\S+)\s*\*?\s+(?:(\d+)\s*/\s*(\d+)|-+)\s*\*?\s+(\w+)\s*$')
+FLOAT = re.compile(r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?')
+
+Batch = Tuple[str, int, int]  # dataset, first stream, number of streams
+
+
+def dataset_name(log_file) -> str:
+    name = Path(log_file).stem
+    return name[len(LOG_PREFIX):] if name.startswith(LOG_PREFIX) else name
+
+# ==================== INPUTS ====================
+
+def load_datasets(inputs: Sequence, datasets: Optional[Sequence[str]] = None) -> Dict[str, bytes]:
+    """Raw seed bytes per dataset from JSONL logs and/or Parquet store directories"""
+    data = {}
+    for source in inputs:
+        source = Path(source)
+        if source.is_dir():
+            from parquet_store import list_datasets, load_seeds
+            for name in list_datasets(source):
+                if datasets is None or name in datasets:
+                    data[name] = load_seeds(source, name)[1].tobytes()
+        else:
+            name = dataset_name(source)
+            if datasets is None or name in datasets:
+                data[name] = load_log(source)[1].tobytes()
+    return data
+
+
+def plan_batches(data: Dict[str, bytes], bits: int, batch_streams: Optional[int] = None) -> List[Batch]:
+    """Batches of whole bitstreams per dataset; trailing bits that do not fill a stream are left out"""
+    batches = []
+    for name, raw in data.items():
+        streams = len(raw) * 8 // bits
+        if streams == 0:
+            print(f"⚠️ {name}: {len(raw) * 8} bits, less than one {bits}-bit stream, skipped")
+            continue
+        size = batch_streams or streams
+        batches.extend((name, first, min(size, streams - first)) for first in range(0, streams, size))
+    return batches
+
+
+def batch_bytes(raw: bytes, bits: int, first: int, streams: int) -> bytes:
+    start = first * bits // 8
+    return raw[start:start + streams * bits // 8]
+
+
+def binary_hash(sts) -> str:
+    """Content hash of the sts binary, so a rebuilt suite invalidates cached runs"""
+    with open(sts, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+# ==================== PARSING ====================
+
+def parse_final_report(text: str) -> List[Dict]:
+    """Rows of a finalAnalysisReport in report order; repeated test names are its subtests"""
+    rows, seen = [], {}
+    for line in text.splitlines():
+        match = REPORT_ROW.match(line)
+        if match is None:
+            continue
+        counts, p_value, passed, total, test = match.groups()
+        subtest = seen.get(test, 0)
+        seen[test] = subtest + 1
+        rows.append({
+            'test': test,
+            'subtest': subtest,
+            'counts': [int(c) for c in counts.split()],
+            'p_value': float(p_value) if FLOAT.fullmatch(p_value) else None,
+            'passed': int(passed or 0),
+            'total': int(total or 0),
+        })
+    return rows
+
+
+def _read_pvalues(path: Path) -> List[float]:
+    values = []
+    for token in path.read_text().split():
+        try:
+            values.append(float(token))
+        except ValueError:
+            continue
+    return values
+
+
+def parse_pvalue_dirs(work_dir: Path) -> Dict[str, List[List[float]]]:
+    """
+    Per-test p-values written by sts -s: one list per subtest, from data<k>.txt
+    when a test has several subtests, else from result(s).txt
+    """
+    pvalues = {}
+    for test_dir in sorted(p for p in work_dir.rglob('*') if p.is_dir()):
+        data_files = sorted(test_dir.glob('data*.txt'), key=lambda p: int(re.sub(r'\D', '', p.stem) or 0))
+        if data_files:
+            pvalues[test_dir.name] = [_read_pvalues(p) for p in data_files]
+            continue
+        for name in ('results.txt', 'result.txt'):
+            if (test_dir / name).exists():
+                pvalues[test_dir.name] = [_read_pvalues(test_dir / name)]
+                break
+    return pvalues
+
+# ==================== RUNNING ====================
+
+def sts_command(sts, input_file, work_dir, bits: int, streams: int, threads: int = DEFAULT_THREADS,
+                tests: Optional[Sequence[int]] = None, params: Optional[Sequence[str]] = None) -> List[str]:
+    command = [str(sts), '-v', '1', '-F', 'r', '-S', str(bits), '-i', str(streams), '-w', str(work_dir), '-s',
+               '-T', str(threads)]
+    command += ['-t', ','.join(str(t) for t in tests)] if tests else ['-A']
+    for param in params or []:
+        command += ['-P', param]
+    return command + [str(input_file)]
+
+
+def run_batch(sts, raw: bytes, bits: int, streams: int, threads: int = DEFAULT_THREADS,
+              tests: Optional[Sequence[int]] = None, params: Optional[Sequence[str]] = None,
+              timeout: float = DEFAULT_TIMEOUT) -> Dict:
+    """Run sts on one batch in a scratch directory and parse what it wrote"""
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix='sts_') as tmp:
+        tmp = Path(tmp)
+        input_file = tmp / 'input.bin'
+        input_file.write_bytes(raw)
+        work_dir = tmp / 'work'
+        work_dir.mkdir()
+        command = sts_command(sts, input_file, work_dir, bits, streams, threads, tests, params)
+        process = subprocess.run(command, cwd=work_dir, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                 stderr=subprocess.STDOUT, timeout=timeout)
+        output = process.stdout.decode(errors='replace')
+        reports = list(work_dir.rglob(REPORT_FILE))
+        if process.returncode != 0 or not reports:
+            message = f"sts exited with {process.returncode}"
+            if not reports:
+                message += f" and wrote no {REPORT_FILE}"
+            tail = "\n".join(output.strip().splitlines()[-10:])
+            raise RuntimeError(f"{message}:\n{tail}" if tail else message)
+        rows = parse_final_report(reports[0].read_text(errors='replace'))
+        if not rows:
+            raise RuntimeError(f"no result rows in {REPORT_FILE}")
+        pvalues = parse_pvalue_dirs(work_dir)
+    return {'streams': streams, 'rows': rows, 'pvalues': pvalues, 'seconds': time.perf_counter() - start}
+
+# ==================== ASSESSMENT ====================
+
+def uniformity_p_value(counts: Sequence[int]) -> float:
+    """SP 800-22 4.2.2: chi-square of the ten p-value deciles, igamc(9/2, chi2/2)"""
+    from scipy.special import gammaincc
+    counts = np.asarray(counts, dtype=np.float64)
+    expected = counts.sum() / len(counts)
+    if expected == 0:
+        return float('nan')
+    chi2 = float(((counts - expected) ** 2 / expected).sum())
+    return float(gammaincc((len(counts) - 1) / 2, chi2 / 2))
+
+
+def min_pass_rate(total: int, alpha: float = ALPHA) -> float:
+    """SP 800-22 4.2.1: lower end of the 3-sigma interval around 1 - alpha"""
+    p = 1 - alpha
+    return p - 3 * math.sqrt(p * alpha / total) if total else float('nan')
+
+
+def merge_batches(batches: List[Dict]) -> Dict:
+    """Sum the report rows of a dataset's batches and assess the sums"""
+    merged: Dict[Tuple[str, int], Dict] = {}
+    pvalues: Dict[str, List[List[float]]] = {}
+    for batch in batches:
+        for row in batch['rows']:
+            key = (row['test'], row['subtest'])
+            if key not in merged:
+                merged[key] = {'test': row['test'], 'subtest': row['subtest'], 'counts': [0] * 10,
+                               'passed': 0, 'total': 0}
+            entry = merged[key]
+            entry['counts'] = [a + b for a, b in zip(entry['counts'], row['counts'])]
+            entry['passed'] += row['passed']
+            entry['total'] += row['total']
+        for test, lists in batch['pvalues'].items():
+            target = pvalues.setdefault(test, [[] for _ in lists])
+            for values, new in zip(target, lists):
+                values.extend(new)
+
+    rows = []
+    for entry in merged.values():
+        total = entry['total']
+        n_pvalues = sum(entry['counts'])
+        uniformity = uniformity_p_value(entry['counts']) if n_pvalues else float('nan')
+        uniformity_valid = n_pvalues >= MIN_UNIFORMITY_SAMPLES
+        threshold = min_pass_rate(total)
+        proportion = entry['passed'] / total if total else float('nan')
+        proportion_ok = total > 0 and proportion >= threshold
+        uniformity_ok = not uniformity_valid or uniformity >= UNIFORMITY_ALPHA
+        # A subtest no stream qualified for (total 0) is not applicable rather than failed
+        rows.append({**entry, 'uniformity_p': uniformity, 'uniformity_valid': uniformity_valid,
+                     'proportion': proportion, 'min_pass_rate': threshold, 'applicable': total > 0,
+                     'passed_test': total == 0 or (proportion_ok and uniformity_ok)})
+
+    tests = {}
+    for row in rows:
+        summary = tests.setdefault(row['test'], {'subtests': 0, 'failed_subtests': 0, 'not_applicable': 0})
+        summary['subtests'] += 1
+        summary['failed_subtests'] += not row['passed_test']
+        summary['not_applicable'] += not row['applicable']
+    return {
+        'streams': sum(b['streams'] for b in batches),
+        'batches': len(batches),
+        'rows': rows,
+        'tests': tests,
+        'failed_tests': sorted(t for t, s in tests.items() if s['failed_subtests']),
+        'pvalues': pvalues,
+    }
+
+# ==================== DRIVER ====================
+
+def run_battery(data: Dict[str, bytes], sts, bits: int = DEFAULT_BITS, batch_streams: Optional[int] = None,
+                workers: Optional[int] = None, threads: int = DEFAULT_THREADS,
+                tests: Optional[Sequence[int]] = None, params: Optional[Sequence[str]] = None,
+                cache: Optional[AnalysisCache] = None, timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Dict]:
+    """Run (or fetch from the cache) every batch of every dataset and merge them per dataset"""
+    batches = plan_batches(data, bits, batch_streams)
+    run_params = {'bits': bits, 'tests': list(tests or []), 'params': list(params or []), 'sts': binary_hash(sts)}
+    code = function_fingerprint(run_batch) + function_fingerprint(parse_final_report) \
+        + function_fingerprint(parse_pvalue_dirs)
+
+    results: Dict[Batch, Dict] = {}
+    pending = []
+    for batch in batches:
+        name, first, streams = batch
+        raw = batch_bytes(data[name], bits, first, streams)
+        key = None
+        if cache is not None:
+            key = cache.make_key(dataset_hash(raw), 'nist_sts', {**run_params, 'streams': streams}, code)
+            cached = cache.get(key)
+            if cached is not None:
+                results[batch] = cached
+                continue
+        pending.append((batch, raw, key))
+
+    errors = {}
+    if pending:
+        workers = min(workers or max(1, (os.cpu_count() or 1) // threads), len(pending))
+        print(f"🧪 Running {len(pending)} sts batch(es) ({len(batches) - len(pending)} cached) "
+              f"on {workers} worker(s) x {threads} thread(s)")
+        # Each worker only waits on its sts process, so threads are enough to keep them all busy
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(run_batch, sts, raw, bits, batch[2], threads, tests, params, timeout):
+                       (batch, raw, key) for batch, raw, key in pending}
+            for future, (batch, raw, key) in futures.items():
+                name, first, streams = batch
+                try:
+                    result = future.result()
+                except (RuntimeError, OSError, ValueError, subprocess.TimeoutExpired) as e:
+                    errors[batch] = str(e)
+                    print(f"❌ {name} streams {first}-{first + streams - 1}: {e}")
+                    continue
+                print(f"  ✓ {name} streams {first}-{first + streams - 1} in {result['seconds']:.1f}s")
+                result = json.loads(json.dumps(result, default=json_default))
+                if cache is not None:
+                    cache.put(key, 'nist_sts', dataset_hash(raw), result)
+                results[batch] = result
+    else:
+        print(f"♻️  All {len(batches)} sts batch(es) cached")
+
+    assessments = {}
+    for name in data:
+        done = [results[b] for b in batches if b[0] == name and b in results]
+        failed = [f"streams {b[1]}-{b[1] + b[2] - 1}: {errors[b]}" for b in batches if b[0] == name and b in errors]
+        if not done:
+            if failed:
+                assessments[name] = {'errors': failed}
+            continue
+        assessment = merge_batches(done)
+        assessment.update({'dataset': name, 'bits_per_stream': bits, 'parameters': run_params})
+        if failed:
+            assessment['errors'] = failed
+        assessments[name] = assessment
+    return assessments
+
+
+def merge_into_results(path, assessment: Dict):
+    """Add the assessment as 'nist_sts' to an existing analysis_results.json"""
+    path = Path(path)
+    with open(path) as f:
+        results = json.load(f)
+    results['nist_sts'] = assessment
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, default=json_default)
+
+
+def print_assessment(name: str, assessment: Dict):
+    if 'rows' not in assessment:
+        print(f"\n❌ {name}: no batch completed")
+        return
+    n_tests = len(assessment['tests'])
+    failed = assessment['failed_tests']
+    flag = "⚠️" if failed else "✓"
+    print(f"\n{flag} {name}: {assessment['streams']} streams of {assessment['bits_per_stream']} bits "
+          f"in {assessment['batches']} batch(es), {n_tests - len(failed)}/{n_tests} tests passed")
+    not_applicable = {t: s['not_applicable'] for t, s in assessment['tests'].items() if s.get('not_applicable')}
+    if not_applicable:
+        print("  No qualifying streams (not applicable): "
+              + ", ".join(f"{t} {n}/{assessment['tests'][t]['subtests']}" for t, n in not_applicable.items()))
+    for test in failed:
+        worst = min((r for r in assessment['rows'] if r['test'] == test),
+                    key=lambda r: (r['proportion'] - r['min_pass_rate'], r['uniformity_p']))
+        print(f"  {test:28s} {assessment['tests'][test]['failed_subtests']}/{assessment['tests'][test]['subtests']} "
+              f"subtests failed, worst: {worst['passed']}/{worst['total']} passing, "
+              f"uniformity p={worst['uniformity_p']:.6f}")
+
+
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description='Run the NIST sts battery on RANDAO seed logs in parallel')
+    parser.add_argument('inputs', nargs='+', help='JSONL seed logs and/or Parquet store directories')
+    parser.add_argument('--datasets', '-d', nargs='+', default=None, help='Only these datasets')
+    parser.add_argument('--sts', default=str(DEFAULT_STS), help='Path of the sts binary')
+    parser.add_argument('--bits', '-S', type=int, default=DEFAULT_BITS, help='Bits per bitstream (sts -S)')
+    parser.add_argument('--batch-streams', '-b', type=int, default=None,
+                        help='Bitstreams per sts process (default: all streams of a dataset in one)')
+    parser.add_argument('--workers', '-w', type=int, default=None,
+                        help='Concurrent sts processes (default: CPU count / --threads)')
+    parser.add_argument('--threads', '-T', type=int, default=DEFAULT_THREADS, help='Threads per sts process (sts -T)')
+    parser.add_argument('--tests', '-t', type=int, nargs='+', default=None, help='Test numbers (sts -t, default: all)')
+    parser.add_argument('--param', '-P', action='append', default=[], help='Test parameter num=value (sts -P)')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='Seconds per sts process')
+    parser.add_argument('--output-dir', '-o', default='./randao_analysis/nist_sts',
+                        help='Directory for the per-dataset JSON assessments')
+    parser.add_argument('--merge-into', default=None,
+                        help="analysis_results.json to add the assessment to; '{dataset}' is replaced")
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR), help='Directory of the persistent result cache')
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_MAX_BYTES / 2**20,
+                        help='Size limit of the result cache in MiB (LRU eviction)')
+    parser.add_argument('--no-cache', action='store_true', help='Always run sts')
+    args = parser.parse_args()
+
+    if args.bits % 8:
+        parser.error('--bits must be a multiple of 8 (streams are cut from raw bytes)')
+    if not Path(args.sts).is_file():
+        parser.error(f"sts binary not found at {args.sts} (build it in NIST/sts or pass --sts)")
+
+    start = time.perf_counter()
+    data = load_datasets(args.inputs, args.datasets)
+    if not data:
+        parser.error('no datasets selected')
+    print(f"📥 {len(data)} dataset(s): " + ", ".join(f"{n} ({len(raw) * 8} bits)" for n, raw in data.items()))
+
+    cache = None if args.no_cache else AnalysisCache(args.cache_dir, max_bytes=int(args.cache_max_mb * 2**20))
+    try:
+        assessments = run_battery(data, args.sts, bits=args.bits, batch_streams=args.batch_streams,
+                                  workers=args.workers, threads=args.threads, tests=args.tests, params=args.param,
+                                  cache=cache, timeout=args.timeout)
+    finally:
+        if cache is not None:
+            cache.close()
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for name, assessment in assessments.items():
+        print_assessment(name, assessment)
+        with open(output_dir / f"{name}.json", 'w') as f:
+            json.dump(assessment, f, indent=2, default=json_default)
+        if args.merge_into:
+            target = Path(args.merge_into.replace('{dataset}', name))
+            if target.exists():
+                merge_into_results(target, assessment)
+                print(f"  📄 Merged into {target}")
+            else:
+                print(f"  ⚠️ {target} does not exist, not merged")
+
+    print(f"\n💾 Assessments saved to: {output_dir} ({time.perf_counter() - start:.1f}s)")
+    if any('errors' in a for a in assessments.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
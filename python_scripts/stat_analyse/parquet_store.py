@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Columnar (Parquet) store for seeds, per-epoch metrics and per-slot data.
+
+Layout under the store root, one hive partition per dataset (config):
+
+    seeds/dataset=<name>/*.parquet          epoch, capture_at_epoch, seed (32-byte fixed binary)
+    epoch_metrics/dataset=<name>/*.parquet  epoch, ones, hamming, transitions, capture_lag, missed_slots
+    slots/dataset=<name>/*.parquet          epoch, slot, proposer_index, missed
+
+Re-exporting a dataset replaces its partitions only. Reads go through
+pyarrow with projection (`columns`) and predicate pushdown (`filters`, in
+the pyarrow/pandas DNF form, e.g. [('missed_slots', '>=', 3)]), so a
+cross-config query touches only the columns and row groups it needs.
+
+pyarrow is required for this module only; analyze.py imports it lazily
+when given a store directory instead of a JSONL log.
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import unquote
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from analyze import LOGGER_EPOCH_KEY, SEED_BITS, SEED_BYTES, read_records, records_to_seeds
+from timeline import epoch_series
+
+SLOTS_PER_EPOCH = 32
+LOG_PREFIX = "randao_log_"
+
+SEEDS_TABLE = "seeds"
+METRICS_TABLE = "epoch_metrics"
+SLOTS_TABLE = "slots"
+
+SEEDS_SCHEMA = pa.schema([
+    ('dataset', pa.string()),
+    ('epoch', pa.int64()),
+    ('capture_at_epoch', pa.int64()),
+    ('seed', pa.binary(SEED_BYTES)),
+])
+METRICS_SCHEMA = pa.schema([
+    ('dataset', pa.string()),
+    ('epoch', pa.int64()),
+    ('ones', pa.int16()),
+    ('hamming', pa.int16()),        # to the previous seed, null for the first
+    ('transitions', pa.int16()),
+    ('capture_lag', pa.int64()),    # capture_at_epoch - epoch, null if not logged
+    ('missed_slots', pa.int16()),   # null unless slot data was exported
+])
+SLOTS_SCHEMA = pa.schema([
+    ('dataset', pa.string()),
+    ('epoch', pa.int64()),
+    ('slot', pa.int64()),
+    ('proposer_index', pa.int64()),
+    ('missed', pa.bool_()),
+])
+
+# Read the partition key back as a plain string so tables from different datasets join cleanly
+PARTITIONING = ds.partitioning(pa.schema([('dataset', pa.string())]), flavor='hive')
+
+
+def dataset_name(log_file) -> str:
+    name = Path(log_file).stem
+    return name[len(LOG_PREFIX):] if name.startswith(LOG_PREFIX) else name
+
+# ==================== WRITING ====================
+
+def _write(table: pa.Table, root: Path, name: str):
+    pq.write_to_dataset(table, root / name, partition_cols=['dataset'],
+                        existing_data_behavior='delete_matching')
+
+
+def seeds_table(dataset: str, epochs: np.ndarray, seed_bytes: np.ndarray,
+                capture: Optional[np.ndarray] = None) -> pa.Table:
+    """Seeds as a table with the seed in a 32-byte fixed-size binary column"""
+    n = len(epochs)
+    seed_bytes = np.ascontiguousarray(seed_bytes, dtype=np.uint8)
+    seeds = pa.FixedSizeBinaryArray.from_buffers(pa.binary(SEED_BYTES), n, [None, pa.py_buffer(seed_bytes)])
+    capture_col = (pa.nulls(n, pa.int64()) if capture is None
+                   else pa.array(capture, type=pa.int64(), mask=capture < 0))
+    return pa.Table.from_arrays([pa.array([dataset] * n, pa.string()), pa.array(epochs, pa.int64()),
+                                 capture_col, seeds], schema=SEEDS_SCHEMA)
+
+
+def metrics_table(dataset: str, epochs: np.ndarray, seed_bytes: np.ndarray,
+                  capture: Optional[np.ndarray] = None,
+                  missed_slots: Optional[np.ndarray] = None) -> pa.Table:
+    """Per-epoch count metrics (timeline.epoch_series) plus capture lag and missed slots"""
+    n = len(epochs)
+    series = epoch_series(seed_bytes)
+    hamming = np.concatenate(([0], series['hamming']))
+    lag = (pa.nulls(n, pa.int64()) if capture is None
+           else pa.array(capture - epochs, type=pa.int64(), mask=capture < 0))
+    missed = (pa.nulls(n, pa.int16()) if missed_slots is None
+              else pa.array(missed_slots, type=pa.int16(), mask=missed_slots < 0))
+    return pa.Table.from_arrays([
+        pa.array([dataset] * n, pa.string()),
+        pa.array(epochs, pa.int64()),
+        pa.array(series['ones'], pa.int16()),
+        pa.array(hamming, pa.int16(), mask=np.arange(n) == 0),
+        pa.array(series['transitions'], pa.int16()),
+        lag,
+        missed,
+    ], schema=METRICS_SCHEMA)
+
+
+def slots_table(dataset: str, slot_records: List[Dict]) -> pa.Table:
+    """
+    Per-slot entries ('slot', optional 'epoch', 'proposer_index', 'missed')
+
+    A slot without an explicit epoch is assigned slot // SLOTS_PER_EPOCH.
+    """
+    slots = [int(r['slot']) for r in slot_records]
+    return pa.Table.from_pydict({
+        'dataset': [dataset] * len(slots),
+        'epoch': [int(r.get('epoch', s // SLOTS_PER_EPOCH)) for r, s in zip(slot_records, slots)],
+        'slot': slots,
+        'proposer_index': [r.get('proposer_index') for r in slot_records],
+        'missed': [bool(r.get('missed', False)) for r in slot_records],
+    }, schema=SLOTS_SCHEMA)
+
+
+def export_log(log_file, root, dataset: Optional[str] = None, slots_file=None) -> Dict:
+    """
+    Export one JSONL seed log (and optionally a JSONL slot log) into the store
+
+    Returns the dataset name and the number of rows written per table.
+    """
+    root = Path(root)
+    dataset = dataset or dataset_name(log_file)
+    records = read_records(log_file)
+    epochs, seed_bytes = records_to_seeds(records)
+
+    captured = {r[LOGGER_EPOCH_KEY]: r['capture_at_epoch'] for r in records
+                if LOGGER_EPOCH_KEY in r and 'capture_at_epoch' in r}
+    capture = np.array([captured.get(int(e), -1) for e in epochs], dtype=np.int64) if captured else None
+
+    missed_slots = None
+    counts = {SEEDS_TABLE: len(epochs), METRICS_TABLE: len(epochs)}
+    if slots_file is not None:
+        slots = slots_table(dataset, read_records(slots_file))
+        _write(slots, root, SLOTS_TABLE)
+        counts[SLOTS_TABLE] = slots.num_rows
+        slot_epochs = slots.column('epoch').to_numpy()
+        missed = slots.column('missed').to_numpy(zero_copy_only=False)
+        per_epoch = dict(zip(*np.unique(slot_epochs[missed], return_counts=True)))
+        logged = set(slot_epochs.tolist())
+        # -1 (null) for epochs without any slot data, rather than a misleading 0
+        missed_slots = np.array([per_epoch.get(e, 0) if e in logged else -1 for e in epochs.tolist()],
+                                dtype=np.int64)
+
+    _write(seeds_table(dataset, epochs, seed_bytes, capture), root, SEEDS_TABLE)
+    _write(metrics_table(dataset, epochs, seed_bytes, capture, missed_slots), root, METRICS_TABLE)
+    return {'dataset': dataset, 'rows': counts}
+
+# ==================== READING ====================
+
+def read_table(root, name: str, columns: Optional[Sequence[str]] = None,
+               filters: Optional[List] = None) -> pa.Table:
+    """Read one store table with projection and predicate pushdown"""
+    return pq.read_table(Path(root) / name, columns=list(columns) if columns else None,
+                         filters=filters, partitioning=PARTITIONING)
+
+
+def list_datasets(root) -> List[str]:
+    return sorted(unquote(p.name.split('=', 1)[1]) for p in (Path(root) / SEEDS_TABLE).glob('dataset=*'))
+
+
+def seed_matrix(column) -> np.ndarray:
+    """N x 32 uint8 view of a 32-byte fixed-size binary column"""
+    arr = column.combine_chunks() if isinstance(column, pa.ChunkedArray) else column
+    if arr.null_count:
+        raise ValueError("Seed column contains nulls")
+    return np.frombuffer(arr.buffers()[1], dtype=np.uint8,
+                         offset=arr.offset * SEED_BYTES, count=len(arr) * SEED_BYTES).reshape(-1, SEED_BYTES)
+
+
+def load_seeds(root, dataset: Optional[str] = None,
+               filters: Optional[List] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (epochs, N x 32 uint8 seed matrix) of one dataset, sorted by epoch
+
+    dataset may be omitted if the store holds exactly one.
+    """
+    if dataset is None:
+        datasets = list_datasets(root)
+        if len(datasets) != 1:
+            raise ValueError(f"Store holds {len(datasets)} datasets, pick one of: {', '.join(datasets)}")
+        dataset = datasets[0]
+    table = read_table(root, SEEDS_TABLE, columns=['epoch', 'seed'],
+                       filters=[('dataset', '=', dataset)] + list(filters or []))
+    if table.num_rows == 0:
+        raise ValueError(f"No seeds for dataset {dataset!r} in {root}")
+    epochs = table.column('epoch').to_numpy()
+    order = np.argsort(epochs, kind='stable')
+    return epochs[order], seed_matrix(table.column('seed'))[order]
+
+
+def select_seeds(root, metric_filters: List, datasets: Optional[Sequence[str]] = None) -> pa.Table:
+    """
+    Seeds of the epochs whose metrics match metric_filters, across datasets
+
+    Only (dataset, epoch) plus the filtered columns are read from the
+    metrics table, and only the matching partitions from the seeds table.
+    """
+    dataset_filter = [('dataset', 'in', list(datasets))] if datasets else []
+    keys = read_table(root, METRICS_TABLE, columns=['dataset', 'epoch'],
+                      filters=dataset_filter + list(metric_filters))
+    if keys.num_rows == 0:
+        return SEEDS_SCHEMA.empty_table().select(['dataset', 'epoch', 'seed'])
+    seeds = read_table(root, SEEDS_TABLE, columns=['dataset', 'epoch', 'seed'], filters=[
+        ('dataset', 'in', keys.column('dataset').unique().to_pylist()),
+        ('epoch', 'in', keys.column('epoch').unique().to_pylist()),
+    ])
+    return seeds.join(keys, keys=['dataset', 'epoch'], join_type='inner')
+
+
+def bias_by_dataset(seeds: pa.Table) -> Dict[str, Dict]:
+    """Per-dataset bit bias of a (dataset, seed) table, e.g. from select_seeds"""
+    results = {}
+    names = np.asarray(seeds.column('dataset').to_pylist(), dtype=object)
+    bits = np.unpackbits(seed_matrix(seeds.column('seed')), axis=1) if seeds.num_rows else np.zeros((0, SEED_BITS))
+    for name in sorted(set(names)):
+        freq = bits[names == name].mean(axis=0)
+        bias = freq - 0.5
+        results[name] = {
+            'n_seeds': int((names == name).sum()),
+            'mean_abs_bias': float(np.abs(bias).mean()),
+            'max_abs_bias': float(np.abs(bias).max()),
+            'max_bias_bit': int(np.abs(bias).argmax()),
+        }
+    return results
+
+
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description='Export RANDAO logs to a Parquet store and query it')
+    parser.add_argument('--store', '-s', required=True, help='Root directory of the Parquet store')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    export = sub.add_parser('export', help='Export JSONL seed logs (files or directories)')
+    export.add_argument('logs', nargs='+', help='JSONL log files or directories of them')
+    export.add_argument('--dataset', help='Dataset name (single log only, default: from the file name)')
+    export.add_argument('--slots', help='JSONL per-slot log for the exported dataset (single log only)')
+
+    bias = sub.add_parser('bias', help='Bit bias per dataset over epochs matching a metric filter')
+    bias.add_argument('--min-missed', type=int, default=None, help='Only epochs with at least this many missed slots')
+    bias.add_argument('--min-lag', type=int, default=None, help='Only epochs captured at least this late')
+    bias.add_argument('--datasets', nargs='*', help='Restrict to these datasets')
+
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        files = []
+        for entry in map(Path, args.logs):
+            files.extend(sorted(entry.glob('*.jsonl')) if entry.is_dir() else [entry])
+        if (args.dataset or args.slots) and len(files) != 1:
+            parser.error('--dataset and --slots need exactly one log')
+        for log_file in files:
+            info = export_log(log_file, args.store, dataset=args.dataset, slots_file=args.slots)
+            rows = ', '.join(f"{k}={v}" for k, v in info['rows'].items())
+            print(f"📦 {info['dataset']}: {rows}")
+        print(f"💾 Store: {args.store} ({len(list_datasets(args.store))} datasets)")
+
+    elif args.command == 'bias':
+        filters = []
+        if args.min_missed is not None:
+            filters.append(('missed_slots', '>=', args.min_missed))
+        if args.min_lag is not None:
+            filters.append(('capture_lag', '>=', args.min_lag))
+        results = bias_by_dataset(select_seeds(args.store, filters, datasets=args.datasets))
+        if not results:
+            print("No epochs match the filter")
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Rendering backend for the analysis plots.
+
+Figures are described as jobs (file name, renderer, plot data) whose data is
+already aggregated: histograms as bin counts, long series min/max-decimated
+to MAX_POINTS, the bit x epoch view binned to at most HEATMAP_ROWS epoch
+groups. A plot's cost therefore no longer grows with the number of epochs,
+and jobs are small enough to hand to worker processes, which render them in
+parallel with the Agg backend.
+
+matplotlib is only imported inside the renderers (i.e. in the workers).
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DPI = 150
+MAX_POINTS = 4000
+HEATMAP_ROWS = 512
+HEATMAP_CHUNK = 1 << 16  # epochs unpacked per step when building the heatmap
+
+# (file name, renderer, keyword arguments)
+PlotJob = Tuple[str, Callable, Dict]
+
+# ==================== AGGREGATION ====================
+
+def minmax_decimate(x, y, max_points: int = MAX_POINTS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce a series to at most max_points points, keeping each bucket's min and max
+
+    Unlike striding, every spike of the full series survives in the plot.
+    """
+    x, y = np.asarray(x), np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= max_points:
+        return x, y
+    width = -(-n // (max_points // 2))
+    n_buckets = -(-n // width)
+    padded = np.full(n_buckets * width, np.nan)
+    padded[:n] = y
+    buckets = padded.reshape(n_buckets, width)
+    offsets = np.arange(n_buckets) * width
+    keep = np.unique(np.concatenate((offsets + np.nanargmin(buckets, axis=1),
+                                     offsets + np.nanargmax(buckets, axis=1))))
+    return x[keep], y[keep]
+
+
+def binned_counts(values, bins: int, value_range: Tuple[float, float]) -> Dict:
+    """Histogram of values as plain lists (edges, counts)"""
+    counts, edges = np.histogram(np.asarray(values), bins=bins, range=value_range)
+    return {'edges': edges.tolist(), 'counts': counts.tolist()}
+
+
+def integer_histograms(counts: Dict[str, Sequence[int]], target_bins: int = 30) -> Dict[str, Dict]:
+    """
+    Re-bin per-integer counts (index = value) onto shared edges, about target_bins wide
+
+    Empty tails common to all inputs are trimmed first.
+    """
+    arrays = {label: np.asarray(c, dtype=np.int64) for label, c in counts.items()}
+    nonzero = np.flatnonzero(np.sum([np.pad(a, (0, max(map(len, arrays.values())) - len(a)))
+                                     for a in arrays.values()], axis=0))
+    if len(nonzero) == 0:
+        return {}
+    lo, hi = int(nonzero[0]), int(nonzero[-1]) + 1
+    width = max(1, -(-(hi - lo) // target_bins))
+    edges = np.arange(lo, hi + width, width)
+    result = {}
+    for label, a in arrays.items():
+        a = np.pad(a, (0, max(0, edges[-1] - len(a))))[lo:edges[-1]]
+        result[label] = {'edges': (edges - 0.5).tolist(), 'counts': a.reshape(-1, width).sum(axis=1).tolist()}
+    return result
+
+
+def bit_epoch_heatmap(seed_bytes: np.ndarray, rows: int = HEATMAP_ROWS, chunk: int = HEATMAP_CHUNK) -> Dict:
+    """
+    Bit-position x epoch-group bias z-scores of an N x 32 seed matrix
+
+    Epochs are split into at most `rows` contiguous groups and the ones count
+    of every bit is summed per group, streaming over `chunk` epochs at a time
+    so memory stays bounded at millions of epochs. Returns z-scores
+    (ones - n/2) / sqrt(n/4), one row per group, and the group boundaries.
+    """
+    seed_bytes = np.asarray(seed_bytes, dtype=np.uint8)
+    n = len(seed_bytes)
+    bounds = np.unique(np.linspace(0, n, min(rows, n) + 1).astype(np.int64))
+    ones = np.zeros((len(bounds) - 1, seed_bytes.shape[1] * 8), dtype=np.int64)
+    n_bytes = seed_bytes.shape[1]
+    # Byte-value histograms per (group, byte position), then ones per bit by a
+    # 256 x 8 table lookup: one bincount per chunk instead of unpacking every bit
+    byte_bits = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).astype(np.int64)
+    for start in range(0, n, chunk):
+        stop = min(start + chunk, n)
+        first = np.searchsorted(bounds, start, side='right') - 1
+        local = np.searchsorted(bounds, np.arange(start, stop), side='right') - 1 - first
+        n_local = int(local[-1]) + 1
+        index = (local[:, None] * n_bytes + np.arange(n_bytes)) * 256 + seed_bytes[start:stop]
+        hist = np.bincount(index.ravel(), minlength=n_local * n_bytes * 256).reshape(n_local, n_bytes, 256)
+        ones[first:first + n_local] += (hist @ byte_bits).reshape(n_local, n_bytes * 8)
+    sizes = np.diff(bounds)[:, None].astype(np.float64)
+    z = (ones - sizes / 2) / np.sqrt(sizes / 4)
+    return {'z': z.astype(np.float32), 'bounds': bounds}
+
+# ==================== RENDERING ====================
+
+def _use_agg():
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _render(job: PlotJob, output_dir: str) -> str:
+    name, renderer, data = job
+    _use_agg()
+    renderer(Path(output_dir) / name, **data)
+    return name
+
+
+def render_figures(jobs: Sequence[PlotJob], output_dir, workers: Optional[int] = None) -> List[str]:
+    """
+    Render plot jobs, in parallel worker processes when workers > 1
+
+    workers defaults to the CPU count (capped by the number of jobs). A job
+    that fails is reported and skipped. Returns the saved file names in job
+    order.
+    """
+    output_dir = str(output_dir)
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    outcomes = []
+    if workers <= 1:
+        for job in jobs:
+            try:
+                outcomes.append(_render(job, output_dir))
+            except Exception as e:
+                outcomes.append(e)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_use_agg) as pool:
+            futures = [pool.submit(_render, job, output_dir) for job in jobs]
+            for future in futures:
+                try:
+                    outcomes.append(future.result())
+                except Exception as e:
+                    outcomes.append(e)
+    saved = []
+    for (name, _, _), outcome in zip(jobs, outcomes):
+        if isinstance(outcome, Exception):
+            print(f"  ⚠️ Could not render {name}: {outcome}")
+        else:
+            saved.append(name)
+    return saved
+
+
+def _save(fig, path: Path):
+    import matplotlib.pyplot as plt
+    fig.tight_layout()
+    fig.savefig(path, dpi=DPI)
+    plt.close(fig)
+
+
+def line_plot(path: Path, x, y, title: str, xlabel: str, ylabel: str,
+              reference: Optional[float] = None, reference_label: Optional[str] = None,
+              bands: Optional[float] = None, marker: Optional[str] = None, figsize=(10, 6)):
+    """One (already decimated) series with an optional reference line and +/- bands"""
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=figsize)
+    ax.plot(x, y, marker=marker, markersize=3, linewidth=0.8)
+    if reference is not None:
+        ax.axhline(y=reference, color='r', linestyle='--', alpha=0.5, label=reference_label)
+    if bands is not None:
+        ax.axhline(y=bands, color='r', linestyle='--', alpha=0.5, label='95% Confidence')
+        ax.axhline(y=-bands, color='r', linestyle='--', alpha=0.5)
+        ax.axhline(y=0, color='k', linestyle='-', alpha=0.3)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    if reference_label or bands is not None:
+        ax.legend()
+    _save(fig, path)
+
+
+def histogram_plot(path: Path, histograms: Dict[str, Dict], title: str, xlabel: str,
+                   density: bool = False, reference: Optional[float] = None,
+                   reference_label: Optional[str] = None):
+    """Overlaid pre-binned histograms ({label: {'edges', 'counts'}})"""
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(10, 6))
+    for label, hist in histograms.items():
+        counts = np.asarray(hist['counts'], dtype=np.float64)
+        edges = np.asarray(hist['edges'], dtype=np.float64)
+        if density and counts.sum() > 0:
+            counts = counts / (counts.sum() * np.diff(edges))
+        ax.stairs(counts, edges, fill=True, alpha=0.5, label=label)
+    if reference is not None:
+        ax.axvline(x=reference, color='r', linestyle='--', label=reference_label)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel('Density' if density else 'Frequency')
+    ax.set_title(title)
+    ax.legend()
+    _save(fig, path)
+
+
+def bar_plot(path: Path, labels: Sequence[str], values: Sequence[float], title: str, xlabel: str, ylabel: str):
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(8, 5))
+    ax.bar(list(labels), list(values))
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    _save(fig, path)
+
+
+def rolling_plot(path: Path, x, panels: List[Tuple[str, List, Optional[float]]], change_epochs: List[int],
+                 title: str):
+    """Stacked rolling-metric panels sharing the epoch axis, change points marked"""
+    import matplotlib.pyplot as plt
+    fig, axes = plt.subplots(len(panels), 1, figsize=(12, 10), sharex=True)
+    for ax, (label, values, reference) in zip(axes, panels):
+        px, py = minmax_decimate(x, values)
+        ax.plot(px, py, linewidth=0.8)
+        if reference is not None:
+            ax.axhline(y=reference, color='r', linestyle='--', alpha=0.5)
+        for epoch in change_epochs:
+            ax.axvline(x=epoch, color='orange', alpha=0.6)
+        ax.set_ylabel(label)
+    axes[0].set_title(title)
+    axes[-1].set_xlabel('Epoch (window end)')
+    _save(fig, path)
+
+
+def byte_transition_plot(path: Path, neg_log_p: Dict[str, List[float]], threshold: float,
+                         xor_residual: np.ndarray, table_residual: np.ndarray, position: int):
+    import matplotlib.pyplot as plt
+    fig, axes = plt.subplots(1, 3, figsize=(18, 5.5))
+    index = np.arange(len(next(iter(neg_log_p.values()))))
+    for offset, (label, values) in zip((-0.2, 0.2), neg_log_p.items()):
+        axes[0].bar(index + offset, values, width=0.4, label=label)
+    axes[0].axhline(y=threshold, color='r', linestyle='--', alpha=0.5, label='Bonferroni threshold')
+    axes[0].set_xlabel('Byte Position')
+    axes[0].set_ylabel('-log10 p')
+    axes[0].set_title('Dependence on the Previous Seed')
+    axes[0].legend()
+
+    im = axes[1].imshow(xor_residual, aspect='auto', cmap='RdBu_r', interpolation='nearest')
+    axes[1].set_xlabel('seed[t][j] XOR seed[t+lag][j]')
+    axes[1].set_ylabel('Byte Position j')
+    axes[1].set_title('XOR Difference Residuals')
+    fig.colorbar(im, ax=axes[1])
+
+    im = axes[2].imshow(table_residual, cmap='RdBu_r', interpolation='nearest')
+    axes[2].set_xlabel('Byte at t + lag')
+    axes[2].set_ylabel('Byte at t')
+    axes[2].set_title(f'Transition Residuals, Byte {position}')
+    fig.colorbar(im, ax=axes[2])
+    _save(fig, path)
+
+
+def heatmap_plot(path: Path, z: np.ndarray, epoch_first: int, epoch_last: int, epochs_per_row: float):
+    """Bit-position x epoch-group z-score heatmap"""
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(12, 7))
+    limit = max(4.0, float(np.abs(z).max())) if z.size else 4.0
+    im = ax.imshow(z, aspect='auto', cmap='RdBu_r', vmin=-limit, vmax=limit, interpolation='nearest',
+                   extent=(-0.5, z.shape[1] - 0.5, epoch_last, epoch_first))
+    ax.set_xlabel('Bit Position (0-255)')
+    ax.set_ylabel('Epoch')
+    ax.set_title(f'Bit Bias over Time (z-score, {epochs_per_row:.1f} epochs per row)')
+    fig.colorbar(im, ax=ax, label='z')
+    _save(fig, path)
+
+
+def power_plot(path: Path, sizes: Sequence[int], curves: Dict[str, Dict[str, List[float]]], title: str,
+               target: Optional[float] = None, planned: Optional[int] = None):
+    """Power against epochs (log axis), one panel per test with a curve per effect size"""
+    import matplotlib.pyplot as plt
+    n_panels = len(curves)
+    cols = min(3, n_panels)
+    rows = -(-n_panels // cols)
+    fig, axes = plt.subplots(rows, cols, figsize=(5 * cols, 3.8 * rows), squeeze=False, sharey=True)
+    for ax, (test, by_size) in zip(axes.ravel(), curves.items()):
+        for label, power in by_size.items():
+            ax.plot(sizes, power, marker='o', markersize=3, linewidth=1, label=label)
+        if target is not None:
+            ax.axhline(y=target, color='r', linestyle='--', alpha=0.5)
+        if planned is not None:
+            ax.axvline(x=planned, color='k', linestyle=':', alpha=0.6)
+        ax.set_xscale('log')
+        ax.set_ylim(-0.02, 1.02)
+        ax.set_title(test)
+        ax.set_xlabel('Epochs')
+    for ax in axes[:, 0]:
+        ax.set_ylabel('Power')
+    for ax in axes.ravel()[n_panels:]:
+        ax.set_visible(False)
+    axes[0, 0].legend(fontsize=8)
+    fig.suptitle(title)
+    _save(fig, path)
+
+
+def periodogram_plot(path: Path, panels: List[Tuple[str, List[float], List[float], float]], peaks: List[float]):
+    """Stacked (already decimated) periodograms against frequency, Bonferroni threshold and significant periods"""
+    import matplotlib.pyplot as plt
+    fig, axes = plt.subplots(len(panels), 1, figsize=(12, 4 * len(panels)), sharex=True, squeeze=False)
+    for ax, (label, x, y, threshold) in zip(axes[:, 0], panels):
+        ax.plot(x, y, linewidth=0.6)
+        ax.axhline(y=1.0, color='k', linestyle='-', alpha=0.3)
+        ax.axhline(y=threshold, color='r', linestyle='--', alpha=0.5, label='Bonferroni threshold')
+        for period in peaks:
+            ax.axvline(x=1 / period, color='orange', alpha=0.6)
+        ax.set_ylabel('Normalised power')
+        ax.set_title(label)
+        ax.legend(loc='upper right')
+    axes[-1, 0].set_xlabel('Frequency (cycles per epoch)')
+    _save(fig, path)
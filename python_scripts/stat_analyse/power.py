@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+"""
+Statistical power and sample-size planner for the analyzer tests.
+
+Simulates seed streams with an injected effect over a grid of effect sizes
+and epoch counts, runs every selected test on each stream and reports, per
+test and effect, the power curve and the number of epochs needed to reach a
+target power. Run it before a campaign to size it: if the bias a campaign
+is meant to show needs 2000 epochs at 80% power, 286 epochs will not show it.
+
+Effects (size 0 is the unbiased null for all of them):
+
+    bit_bias           one bit position is 1 with probability 0.5 + size
+    constant_fraction  a fraction `size` of epochs carries one fixed seed (the
+                       constant-reveal runs)
+    withholding        in a fraction `size` of epochs a last revealer picks the
+                       better of publishing and withholding under a
+                       counterfactual.SCORES objective (popcount by default)
+
+Each test is reduced to one statistic, larger meaning more evidence against
+the null. Critical values are the (1 - alpha) quantiles of the statistic on
+simulated null streams of the same length, so every test is compared at the
+same false-positive rate. Next to the calibrated power the planner reports
+how often the analyzer's own summary rule (generate_summary) fires, on the
+null and under each effect; those rules are fixed thresholds, not tests at a
+common level.
+
+Streams are generated as (replicates, epochs, 32) batches and the cheap tests
+are vectorised over the replicate axis; the tests built on the analyzer
+modules (linear_structure, byte_transitions, spectral, min_entropy) run per replicate
+and are therefore not in the default set. Batches are spread over a process
+pool, each with its own SeedSequence child, so results do not depend on the
+worker count.
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from analyze import GF2_ALPHA, MIN_ENTROPY_WARN, binary_entropy, binom_test_half
+from counterfactual import SCORES
+from plotting import power_plot, render_figures
+from result_cache import json_default
+
+SEED_BITS = 256
+SEED_BYTES = 32
+
+DEFAULT_SIZES = [32, 64, 128, 256, 512, 1024, 2048, 4096]
+DEFAULT_PLANNED = 286  # config12_286ep_LR_attack
+DEFAULT_REPS = 200
+DEFAULT_NULL_REPS = 1000
+DEFAULT_ALPHA = 0.01
+DEFAULT_TARGET = 0.8
+DEFAULT_SCORE = 'popcount'
+JOB_BITS = 1 << 25  # unpacked seed bits per batch; bounds worker memory to a few hundred MB
+
+EFFECT_SIZES: Dict[str, List[float]] = {
+    'bit_bias': [0.01, 0.02, 0.05, 0.1],
+    'constant_fraction': [0.01, 0.02, 0.05, 0.1],
+    'withholding': [0.05, 0.1, 0.25, 0.5],
+}
+BIASED_BIT = 0  # most significant bit of byte 0
+
+MAX_LAG = 50        # analyze_autocorrelation default
+MONOBIT_Z = 2.5758293035489  # two-sided p = 0.01
+P_FLOOR = 1e-300
+
+# ==================== EFFECTS ====================
+
+def uniform(rng: np.random.Generator, reps: int, n: int) -> np.ndarray:
+    return rng.integers(0, 256, size=(reps, n, SEED_BYTES), dtype=np.uint8)
+
+
+def inject_bit_bias(rng: np.random.Generator, reps: int, n: int, size: float, score: str) -> np.ndarray:
+    seeds = uniform(rng, reps, n)
+    shift = 7 - BIASED_BIT % 8
+    ones = (rng.random((reps, n)) < 0.5 + size).astype(np.uint8) << shift
+    byte = seeds[..., BIASED_BIT // 8]
+    seeds[..., BIASED_BIT // 8] = (byte & ~np.uint8(1 << shift)) | ones
+    return seeds
+
+
+def inject_constant(rng: np.random.Generator, reps: int, n: int, size: float, score: str) -> np.ndarray:
+    seeds = uniform(rng, reps, n)
+    constant = uniform(rng, reps, 1)
+    return np.where((rng.random((reps, n)) < size)[..., None], constant, seeds)
+
+
+def inject_withholding(rng: np.random.Generator, reps: int, n: int, size: float, score: str) -> np.ndarray:
+    seeds = uniform(rng, reps, n)
+    withheld = uniform(rng, reps, n)
+    objective = SCORES[score]
+    better = (rng.random((reps, n)) < size) & (objective(withheld) > objective(seeds))
+    return np.where(better[..., None], withheld, seeds)
+
+
+# Batched generators (rng, replicates, epochs, size, score) -> (replicates, epochs, 32) uint8
+EFFECTS: Dict[str, Callable[..., np.ndarray]] = {
+    'bit_bias': inject_bit_bias,
+    'constant_fraction': inject_constant,
+    'withholding': inject_withholding,
+}
+
+
+def simulate(effect: Optional[str], size: float, reps: int, n: int, rng: np.random.Generator,
+             score: str = DEFAULT_SCORE) -> np.ndarray:
+    """reps seed streams of n epochs; effect None (or size 0) is the null"""
+    if effect is None or size == 0:
+        return uniform(rng, reps, n)
+    return EFFECTS[effect](rng, reps, n, size, score)
+
+# ==================== TESTS ====================
+# Each test maps (reps, n, 32) seeds to (statistic, analyzer rule fired), both of shape (reps,)
+
+Outcome = Tuple[np.ndarray, np.ndarray]
+
+
+def _neg_log10(p) -> np.ndarray:
+    return -np.log10(np.maximum(p, P_FLOOR))
+
+
+def test_bit_bias(seeds: np.ndarray) -> Outcome:
+    """Smallest per-position exact binomial p-value; rule: mean bias > 0.01 or > 5 bits at p < 0.01"""
+    n = seeds.shape[1]
+    ones = np.unpackbits(seeds, axis=2).sum(axis=1, dtype=np.int64)
+    p_values = binom_test_half(ones, n)
+    mean_bias = np.abs(ones / n - 0.5).mean(axis=1)
+    flags = (mean_bias > 0.01) | ((p_values < 0.01).sum(axis=1) > 5)
+    return _neg_log10(p_values.min(axis=1)), flags
+
+
+def test_monobit(seeds: np.ndarray) -> Outcome:
+    """|z| of the total number of ones (analysis2 frequency test); rule: p < 0.01"""
+    n_bits = seeds.shape[1] * SEED_BITS
+    ones = np.unpackbits(seeds.reshape(len(seeds), -1), axis=1).sum(axis=1, dtype=np.int64)
+    z = np.abs(2 * ones - n_bits) / math.sqrt(n_bits)
+    return z, z > MONOBIT_Z
+
+
+def test_hamming(seeds: np.ndarray) -> Outcome:
+    """|z| of the mean consecutive Hamming distance; rule: mean more than 2 from 128"""
+    distances = np.unpackbits(seeds[:, 1:] ^ seeds[:, :-1], axis=2).sum(axis=2, dtype=np.int64)
+    deviation = np.abs(distances.mean(axis=1) - SEED_BITS / 2)
+    return deviation / (math.sqrt(SEED_BITS) / 2 / math.sqrt(distances.shape[1])), deviation > 2
+
+
+def test_entropy(seeds: np.ndarray) -> Outcome:
+    """Deficit of the mean per-seed Shannon entropy from 1; rule: deficit > 0.01"""
+    popcount = np.unpackbits(seeds, axis=2).sum(axis=2, dtype=np.int64)
+    deficit = 1.0 - binary_entropy(popcount / SEED_BITS).mean(axis=1)
+    return deficit, deficit > 0.01
+
+
+def test_autocorrelation(seeds: np.ndarray) -> Outcome:
+    """Largest |r| * sqrt(bits) over lags 1-50 of the bit stream; rule: any lag outside the 95% bound"""
+    bits = np.unpackbits(seeds.reshape(len(seeds), -1), axis=1).astype(bool)
+    n_bits = bits.shape[1]
+    max_lag = min(MAX_LAG, n_bits // 2)
+    largest = np.zeros(len(seeds))
+    for lag in range(1, max_lag + 1):
+        pairs = n_bits - lag
+        differ = np.count_nonzero(bits[:, lag:] != bits[:, :-lag], axis=1)
+        largest = np.maximum(largest, np.abs(pairs - 2 * differ) / pairs)
+    return largest * math.sqrt(n_bits), largest > 1.96 / math.sqrt(n_bits)
+
+
+def _per_replicate(seeds: np.ndarray, evaluate: Callable[[np.ndarray, np.ndarray], Tuple[float, bool]]) -> Outcome:
+    epochs = np.arange(seeds.shape[1], dtype=np.int64)
+    outcomes = [evaluate(epochs, replicate) for replicate in seeds]
+    return np.array([s for s, _ in outcomes], dtype=float), np.array([f for _, f in outcomes], dtype=bool)
+
+
+def _linear_structure(epochs: np.ndarray, seed_bytes: np.ndarray) -> Tuple[float, bool]:
+    from gf2 import analyze_gf2
+    r = analyze_gf2(epochs, seed_bytes)
+    rank, complexity = r['rank'], r['linear_complexity']
+    p = min(rank['p_value'], rank['difference_p_value'], rank['blocks'].get('p_value', 1.0), complexity['p_value'])
+    # A short XOR relation has probability ~2^-256 on independent seeds
+    stat = math.inf if r['relations']['total'] else float(_neg_log10(p))
+    flag = (p < GF2_ALPHA or bool(r['relations']['total']) or bool(complexity['deficient_positions']))
+    return stat, flag
+
+
+def _byte_transitions(epochs: np.ndarray, seed_bytes: np.ndarray) -> Tuple[float, bool]:
+    from byte_transitions import analyze_transitions
+    r = analyze_transitions(seed_bytes)
+    return float(_neg_log10(r['min_p_value'])), bool(r['dependent_positions'])
+
+
+def _spectral(epochs: np.ndarray, seed_bytes: np.ndarray) -> Tuple[float, bool]:
+    from spectral import analyze_spectrum
+    r = analyze_spectrum(epochs, seed_bytes)
+    p = min(r['mean_periodogram']['peaks'][0]['p_value'], r['coherent_periodogram']['peaks'][0]['p_value'])
+    return float(_neg_log10(p)), bool(r['dominant_periods'])
+
+
+def _min_entropy(epochs: np.ndarray, seed_bytes: np.ndarray) -> Tuple[float, bool]:
+    from min_entropy import estimate_min_entropy
+    h = estimate_min_entropy(seed_bytes)['min_entropy_per_bit']
+    return -h, h < MIN_ENTROPY_WARN
+
+
+def test_linear_structure(seeds: np.ndarray) -> Outcome:
+    """-log10 of the smallest GF(2) rank/complexity p-value, infinite with an XOR relation"""
+    return _per_replicate(seeds, _linear_structure)
+
+
+def test_byte_transitions(seeds: np.ndarray) -> Outcome:
+    """-log10 of the smallest per-position transition p-value"""
+    return _per_replicate(seeds, _byte_transitions)
+
+
+def test_spectral(seeds: np.ndarray) -> Outcome:
+    """-log10 of the smallest Bonferroni-adjusted periodogram p-value"""
+    return _per_replicate(seeds, _spectral)
+
+
+def test_min_entropy(seeds: np.ndarray) -> Outcome:
+    """Negated SP 800-90B min-entropy per bit"""
+    return _per_replicate(seeds, _min_entropy)
+
+
+TESTS: Dict[str, Callable[[np.ndarray], Outcome]] = {
+    'bit_bias': test_bit_bias,
+    'monobit': test_monobit,
+    'hamming': test_hamming,
+    'entropy': test_entropy,
+    'autocorrelation': test_autocorrelation,
+    'linear_structure': test_linear_structure,
+    'byte_transitions': test_byte_transitions,
+    'spectral': test_spectral,
+    'min_entropy': test_min_entropy,
+}
+DEFAULT_TESTS = ['bit_bias', 'monobit', 'hamming', 'entropy', 'autocorrelation']
+
+# ==================== SIMULATION ====================
+
+# (effect or None, effect size, epochs, replicates, tests, score, SeedSequence)
+Job = Tuple[Optional[str], float, int, int, Tuple[str, ...], str, np.random.SeedSequence]
+
+
+def run_job(job: Job) -> Dict[str, Outcome]:
+    effect, size, n, reps, tests, score, seed_seq = job
+    seeds = simulate(effect, size, reps, n, np.random.default_rng(seed_seq), score)
+    return {test: TESTS[test](seeds) for test in tests}
+
+
+def plan_jobs(grid: Dict[str, List[float]], sizes: Sequence[int], reps: int, null_reps: int,
+              tests: Sequence[str], score: str, rng_seed: int) -> List[Job]:
+    """Null and effect batches for every (effect, size, epochs), split so one batch stays under JOB_BITS"""
+    cells = [(None, 0.0, n, null_reps) for n in sizes]
+    cells += [(effect, size, n, reps) for effect, values in grid.items() for size in values for n in sizes]
+    specs = []
+    for effect, size, n, total in cells:
+        per_job = max(1, min(total, JOB_BITS // (n * SEED_BITS)))
+        for start in range(0, total, per_job):
+            specs.append((effect, size, n, min(per_job, total - start)))
+    children = np.random.SeedSequence(rng_seed).spawn(len(specs))
+    return [(effect, size, n, count, tuple(tests), score, child)
+            for (effect, size, n, count), child in zip(specs, children)]
+
+
+def run_jobs(jobs: Sequence[Job], workers: Optional[int] = None) -> Dict[Tuple, Dict[str, Outcome]]:
+    """Run batches (in worker processes when workers > 1) and concatenate them per (effect, size, epochs)"""
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        return _merge(jobs, map(run_job, jobs))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return _merge(jobs, pool.map(run_job, jobs))
+
+
+def _merge(jobs: Sequence[Job], outcomes) -> Dict[Tuple, Dict[str, Outcome]]:
+    parts: Dict[Tuple, Dict[str, List[Outcome]]] = {}
+    done, last_report = 0, time.perf_counter()
+    for job, outcome in zip(jobs, outcomes):
+        cell = parts.setdefault(job[:3], {})
+        for test, result in outcome.items():
+            cell.setdefault(test, []).append(result)
+        done += 1
+        if time.perf_counter() - last_report > 10:
+            print(f"  {done}/{len(jobs)} batches")
+            last_report = time.perf_counter()
+    return {cell: {test: (np.concatenate([s for s, _ in results]), np.concatenate([f for _, f in results]))
+                   for test, results in by_test.items()}
+            for cell, by_test in parts.items()}
+
+# ==================== POWER ====================
+
+def min_epochs(sizes: Sequence[int], power: Sequence[float], target: float) -> Optional[int]:
+    """
+    Epochs at which power first reaches target, interpolated linearly in log(epochs)
+    between grid points; the first grid size if it already does, None if no size does
+    """
+    for i, (n, p) in enumerate(zip(sizes, power)):
+        if p >= target:
+            if i == 0 or p <= power[i - 1]:
+                return int(n)
+            n0, p0 = sizes[i - 1], power[i - 1]
+            frac = (target - p0) / (p - p0)
+            return int(math.ceil(math.exp(math.log(n0) + frac * (math.log(n) - math.log(n0)))))
+    return None
+
+
+def analyze_power(results: Dict[Tuple, Dict[str, Outcome]], grid: Dict[str, List[float]], sizes: Sequence[int],
+                  tests: Sequence[str], alpha: float, target: float) -> Dict:
+    """Null critical values per (test, epochs), then power and minimum epochs per (effect, size, test)"""
+    null = {}
+    for test in tests:
+        null[test] = {}
+        for n in sizes:
+            stats, flags = results[(None, 0.0, n)][test]
+            critical = float(np.quantile(stats, 1 - alpha))
+            null[test][n] = {'critical': critical, 'size': float(np.mean(stats > critical)),
+                             'rule_rate': float(np.mean(flags))}
+    power = {}
+    for effect, values in grid.items():
+        power[effect] = {}
+        for size in values:
+            power[effect][size] = {}
+            for test in tests:
+                curve, rule = [], []
+                for n in sizes:
+                    stats, flags = results[(effect, size, n)][test]
+                    curve.append(float(np.mean(stats > null[test][n]['critical'])))
+                    rule.append(float(np.mean(flags)))
+                power[effect][size][test] = {'power': curve, 'rule_power': rule,
+                                             'min_epochs': min_epochs(sizes, curve, target)}
+    return {'null': null, 'power': power}
+
+
+def format_epochs(value: Optional[int], sizes: Sequence[int]) -> str:
+    if value is None:
+        return f">{sizes[-1]}"
+    return f"≤{value}" if value == sizes[0] else str(value)
+
+
+def summary_tables(analysis: Dict, sizes: Sequence[int], tests: Sequence[str], planned: Optional[int],
+                   alpha: float, target: float) -> List[str]:
+    """Markdown: minimum epochs per test and effect size (power at the planned length in brackets)"""
+    at = sizes.index(planned) if planned in sizes else None
+    lines = [f"# Power and sample-size plan", "",
+             f"Level alpha = {alpha} (null-calibrated), target power {target:.0%}"
+             + (f", planned length {planned} epochs" if planned else ""), ""]
+    for effect, by_size in analysis['power'].items():
+        lines += [f"## {effect}", "", "| test | " + " | ".join(str(s) for s in by_size) + " |",
+                  "|---|" + "---:|" * len(by_size)]
+        for test in tests:
+            cells = []
+            for size, by_test in by_size.items():
+                r = by_test[test]
+                cell = format_epochs(r['min_epochs'], sizes)
+                if at is not None:
+                    cell += f" ({r['power'][at]:.0%})"
+                cells.append(cell)
+            lines.append(f"| {test} | " + " | ".join(cells) + " |")
+        lines.append("")
+    lines += ["## Analyzer rule on the null", "", "Fraction of unbiased streams on which the summary rule fires.", "",
+              "| test | " + " | ".join(str(n) for n in sizes) + " |", "|---|" + "---:|" * len(sizes)]
+    for test in tests:
+        lines.append(f"| {test} | " + " | ".join(f"{analysis['null'][test][n]['rule_rate']:.2f}" for n in sizes)
+                     + " |")
+    return lines
+
+
+def plot_jobs(analysis: Dict, sizes: Sequence[int], tests: Sequence[str], planned: Optional[int], target: float):
+    jobs = []
+    for effect, by_size in analysis['power'].items():
+        curves = {test: {f"{effect}={size}": by_size[size][test]['power'] for size in by_size} for test in tests}
+        jobs.append((f"power_{effect}.png", power_plot,
+                     dict(sizes=list(sizes), curves=curves, title=f"Power against {effect}",
+                          target=target, planned=planned)))
+    return jobs
+
+# ==================== CLI ====================
+
+def parse_grid(specs: Optional[List[str]]) -> Dict[str, List[float]]:
+    if not specs:
+        return dict(EFFECT_SIZES)
+    grid = {}
+    for spec in specs:
+        name, _, values = spec.partition('=')
+        if name not in EFFECTS:
+            raise ValueError(f"unknown effect {name!r} (one of {', '.join(EFFECTS)})")
+        grid[name] = [float(v) for v in values.split(',')] if values else EFFECT_SIZES[name]
+    return grid
+
+
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description='Monte Carlo power and sample-size planner for the analyzer tests')
+    parser.add_argument('--effect', action='append', metavar='NAME[=S1,S2,...]',
+                        help=f'Effect and sizes to simulate (repeatable; default: all of {", ".join(EFFECTS)} '
+                             f'with their default sizes)')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)), help='Epoch counts to simulate')
+    parser.add_argument('--planned', type=int, default=DEFAULT_PLANNED,
+                        help='Planned campaign length; added to the grid and reported (0 to skip)')
+    parser.add_argument('--tests', default=','.join(DEFAULT_TESTS),
+                        help=f'Tests to evaluate (available: {", ".join(TESTS)})')
+    parser.add_argument('--reps', type=int, default=DEFAULT_REPS, help='Replicates per effect size and length')
+    parser.add_argument('--null-reps', type=int, default=DEFAULT_NULL_REPS,
+                        help='Null replicates per length (critical values)')
+    parser.add_argument('--alpha', type=float, default=DEFAULT_ALPHA, help='False-positive rate of every test')
+    parser.add_argument('--target', type=float, default=DEFAULT_TARGET, help='Power to size campaigns for')
+    parser.add_argument('--score', default=DEFAULT_SCORE, choices=sorted(SCORES),
+                        help='Objective of the simulated withholding attacker')
+    parser.add_argument('--seed', type=int, default=0, help='RNG seed')
+    parser.add_argument('--workers', '-w', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--output-dir', '-o', default='./randao_analysis/power', help='Output directory')
+    args = parser.parse_args()
+
+    try:
+        grid = parse_grid(args.effect)
+    except ValueError as e:
+        parser.error(str(e))
+    tests = [t.strip() for t in args.tests.split(',') if t.strip()]
+    unknown = [t for t in tests if t not in TESTS]
+    if unknown:
+        parser.error(f"unknown test(s) {', '.join(unknown)}")
+    sizes = sorted({int(s) for s in args.sizes.split(',')} | ({args.planned} if args.planned else set()))
+    if sizes[0] < 2:
+        parser.error('epoch counts must be at least 2')
+    planned = args.planned or None
+
+    jobs = plan_jobs(grid, sizes, args.reps, args.null_reps, tests, args.score, args.seed)
+    print(f"🎯 {len(tests)} tests x {sum(map(len, grid.values()))} effect sizes x {len(sizes)} lengths "
+          f"({args.reps} replicates, {args.null_reps} null): {len(jobs)} batches")
+    start = time.perf_counter()
+    results = run_jobs(jobs, workers=args.workers)
+    print(f"  Simulated in {time.perf_counter() - start:.1f}s")
+
+    analysis = analyze_power(results, grid, sizes, tests, args.alpha, args.target)
+    lines = summary_tables(analysis, sizes, tests, planned, args.alpha, args.target)
+    print("\n" + "\n".join(lines))
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    config = {'sizes': sizes, 'planned': planned, 'tests': tests, 'grid': grid, 'reps': args.reps,
+              'null_reps': args.null_reps, 'alpha': args.alpha, 'target': args.target, 'score': args.score,
+              'seed': args.seed, 'biased_bit': BIASED_BIT}
+    with open(output_dir / "power.json", 'w') as f:
+        json.dump({'config': config, **analysis}, f, indent=2, default=json_default)
+    with open(output_dir / "power.md", 'w') as f:
+        f.write("\n".join(lines) + "\n")
+    print(f"\n💾 Results saved to: {output_dir / 'power.json'} and power.md")
+    saved = render_figures(plot_jobs(analysis, sizes, tests, planned, args.target), output_dir, workers=args.workers)
+    for name in saved:
+        print(f"  📊 Plot saved to: {output_dir / name}")
+
+
+if __name__ == "__main__":
+    main()
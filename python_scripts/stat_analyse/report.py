@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Single-file HTML report over all analyzed datasets.
+
+For every seed log the complete analysis is run (stages come from the result
+cache when unchanged) and reduced to a report entry: the summary, the key
+metrics with their pass/fail thresholds (analyze.key_metrics) and the plots,
+downscaled and re-encoded as WebP (JPEG/PNG without Pillow's WebP support)
+data URIs. Entries are cached by seed content hash and analysis code, so
+regenerating after a new capture only analyzes the new log.
+
+The report has a sortable overview table of all datasets, coloured by the
+summary thresholds, and one collapsible drill-down section per dataset.
+"""
+
+import argparse
+import base64
+import contextlib
+import html
+import io
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from analyze import ANALYSIS_MODULES, RANDAOAnalyzer, key_metrics, load_log
+from result_cache import (AnalysisCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, dataset_hash, function_fingerprint,
+                          module_fingerprint)
+from timeline import DEFAULT_WINDOW
+
+DEFAULT_DATA_DIR = Path(__file__).resolve().parent.parent / "randao_seed_logger" / "geloggde_seeds"
+LOG_PREFIX = "randao_log_"
+PLOT_WIDTH = 1000    # pixels, embedded plots are downscaled to this width
+PLOT_QUALITY = 80
+
+# Modules whose code determines a report entry; editing any of them rebuilds all entries
+REPORT_MODULES = ANALYSIS_MODULES + ['report.py']
+
+
+def dataset_name(log_file) -> str:
+    name = Path(log_file).stem
+    return name[len(LOG_PREFIX):] if name.startswith(LOG_PREFIX) else name
+
+
+def analysis_code_fingerprint() -> str:
+    return module_fingerprint(REPORT_MODULES)
+
+# ==================== ENTRIES ====================
+
+def embed_image(path: Path, width: int = PLOT_WIDTH, quality: int = PLOT_QUALITY) -> str:
+    """Data URI of a plot, downscaled and recompressed when Pillow is available"""
+    try:
+        from PIL import Image, features
+    except ImportError:
+        return "data:image/png;base64," + base64.b64encode(path.read_bytes()).decode()
+    image = Image.open(path).convert('RGB')
+    if image.width > width:
+        image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+    buffer = io.BytesIO()
+    if features.check('webp'):
+        image.save(buffer, format='WEBP', quality=quality, method=6)
+        mime = 'image/webp'
+    else:
+        image.save(buffer, format='JPEG', quality=quality, optimize=True)
+        mime = 'image/jpeg'
+    return f"data:{mime};base64," + base64.b64encode(buffer.getvalue()).decode()
+
+
+def build_entry(log_file: Path, work_dir: Path, cache: Optional[AnalysisCache], window: int,
+                quiet: bool = True) -> Dict:
+    """Run (or fetch from the stage cache) the complete analysis of one log and reduce it to a report entry"""
+    epochs, seed_bytes = load_log(log_file)
+    name = dataset_name(log_file)
+    out_dir = work_dir / name
+    out_dir.mkdir(parents=True, exist_ok=True)
+    output = io.StringIO() if quiet else None
+    with contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+        analyzer = RANDAOAnalyzer.from_seeds(epochs, seed_bytes, output_dir=str(out_dir), source=str(log_file),
+                                             cache=cache)
+        results = analyzer.run_complete_analysis(window=window)
+    summary = results.get('summary', {})
+    plots = {png.stem: embed_image(png) for png in sorted(out_dir.glob('*.png'))}
+    return {
+        'name': name,
+        'path': str(log_file),
+        'data_hash': analyzer.data_hash,
+        'summary': summary,
+        'metrics': key_metrics(results),
+        'plots': plots,
+    }
+
+
+def collect_entries(log_files: List[Path], work_dir: Path, cache: Optional[AnalysisCache],
+                    window: int = DEFAULT_WINDOW) -> List[Dict]:
+    """Report entries of all logs, reusing cached entries of unchanged datasets"""
+    code = analysis_code_fingerprint() + function_fingerprint(build_entry) + function_fingerprint(embed_image)
+    entries = []
+    for log_file in log_files:
+        epochs, seed_bytes = load_log(log_file)
+        data_hash = dataset_hash(seed_bytes, epochs)
+        key = cache.make_key(data_hash, 'report_entry', {'window': window, 'name': dataset_name(log_file)}, code) \
+            if cache is not None else None
+        entry = cache.get(key) if cache is not None else None
+        if entry is not None:
+            print(f"  ♻️  {dataset_name(log_file)}: cached")
+        else:
+            print(f"  🔬 {dataset_name(log_file)}: analyzing {len(seed_bytes)} seeds...")
+            entry = build_entry(log_file, work_dir, cache, window)
+            if cache is not None:
+                cache.put(key, 'report_entry', data_hash, entry)
+        entry['path'] = str(log_file)
+        entries.append(entry)
+    return entries
+
+# ==================== HTML ====================
+
+STYLE = """
+body { font-family: -apple-system, 'Segoe UI', Helvetica, Arial, sans-serif; margin: 2em; color: #222; }
+table { border-collapse: collapse; margin: 1em 0; font-size: 0.9em; }
+th, td { border: 1px solid #ccc; padding: 4px 8px; text-align: right; }
+th { background: #f0f0f0; cursor: pointer; user-select: none; position: sticky; top: 0; }
+th.sorted-asc::after { content: ' \\25B2'; } th.sorted-desc::after { content: ' \\25BC'; }
+td.name, th.name { text-align: left; }
+td.ok { background: #e3f5e1; } td.warn { background: #fde8c8; }
+.GOOD { background: #c8ecc4; } .FAIR { background: #fde8c8; } .POOR { background: #f7c6c2; }
+details { border: 1px solid #ddd; border-radius: 4px; margin: 0.6em 0; padding: 0.4em 0.8em; }
+summary { font-weight: bold; cursor: pointer; }
+.plots { display: flex; flex-wrap: wrap; gap: 1em; }
+.plots figure { margin: 0; max-width: 48%; } .plots img { max-width: 100%; }
+.badge { padding: 1px 6px; border-radius: 3px; font-size: 0.85em; }
+"""
+
+SORT_SCRIPT = """
+document.querySelectorAll('table.sortable').forEach(function (table) {
+  table.querySelectorAll('th').forEach(function (th, col) {
+    th.addEventListener('click', function () {
+      var asc = !th.classList.contains('sorted-asc');
+      table.querySelectorAll('th').forEach(function (h) { h.classList.remove('sorted-asc', 'sorted-desc'); });
+      th.classList.add(asc ? 'sorted-asc' : 'sorted-desc');
+      var body = table.tBodies[0];
+      var rows = Array.from(body.rows);
+      rows.sort(function (a, b) {
+        var x = a.cells[col].dataset.sort, y = b.cells[col].dataset.sort;
+        var nx = parseFloat(x), ny = parseFloat(y);
+        var cmp = (!isNaN(nx) && !isNaN(ny)) ? nx - ny : String(x).localeCompare(String(y));
+        return asc ? cmp : -cmp;
+      });
+      rows.forEach(function (r) { body.appendChild(r); });
+    });
+  });
+});
+"""
+
+
+def _grade(assessment: str) -> str:
+    return assessment.split(' ', 1)[0] if assessment else 'UNKNOWN'
+
+
+def _cell(display, sort_value, css: str = '') -> str:
+    css_attr = f' class="{css}"' if css else ''
+    return f'<td{css_attr} data-sort="{html.escape(str(sort_value), quote=True)}">{html.escape(str(display))}</td>'
+
+
+def render_html(entries: List[Dict]) -> str:
+    """The complete report as one HTML document"""
+    metric_names = []
+    for entry in entries:
+        for metric in entry['metrics']:
+            if metric['name'] not in metric_names:
+                metric_names.append(metric['name'])
+
+    head = ''.join(f'<th>{html.escape(n)}</th>' for n in metric_names)
+    rows = []
+    for entry in entries:
+        summary = entry['summary']
+        grade = _grade(summary.get('assessment', ''))
+        metrics = {m['name']: m for m in entry['metrics']}
+        cells = [
+            f'<td class="name" data-sort="{html.escape(entry["name"], quote=True)}">'
+            f'<a href="#{html.escape(entry["name"], quote=True)}">{html.escape(entry["name"])}</a></td>',
+            _cell(summary.get('samples_analyzed', ''), summary.get('samples_analyzed', 0)),
+            _cell(grade, grade, grade),
+            _cell(len(summary.get('issues', [])), len(summary.get('issues', []))),
+            _cell(len(summary.get('warnings', [])), len(summary.get('warnings', []))),
+        ]
+        for name in metric_names:
+            metric = metrics.get(name)
+            if metric is None:
+                cells.append(_cell('–', ''))
+            else:
+                cells.append(_cell(metric['display'], metric['value'], 'ok' if metric['ok'] else 'warn'))
+        rows.append(f'<tr>{"".join(cells)}</tr>')
+
+    sections = [render_entry(entry) for entry in entries]
+    generated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>RANDAO Randomness Report</title>
+<style>{STYLE}</style>
+</head>
+<body>
+<h1>RANDAO Randomness Report</h1>
+<p>Generated {generated} &middot; {len(entries)} datasets &middot; click a column header to sort</p>
+<table class="sortable">
+<thead><tr><th class="name">Dataset</th><th>Samples</th><th>Assessment</th><th>Issues</th><th>Warnings</th>{head}</tr></thead>
+<tbody>
+{chr(10).join(rows)}
+</tbody>
+</table>
+<h2>Datasets</h2>
+{chr(10).join(sections)}
+<script>{SORT_SCRIPT}</script>
+</body>
+</html>
+"""
+
+
+def render_entry(entry: Dict) -> str:
+    """Drill-down section of one dataset"""
+    summary = entry['summary']
+    grade = _grade(summary.get('assessment', ''))
+    parts = [
+        f'<details id="{html.escape(entry["name"], quote=True)}">',
+        f'<summary>{html.escape(entry["name"])} <span class="badge {grade}">{html.escape(grade)}</span></summary>',
+        f'<p><b>Assessment:</b> {html.escape(summary.get("assessment", "UNKNOWN"))}<br>'
+        f'<b>Samples:</b> {summary.get("samples_analyzed", 0)} &middot; '
+        f'<b>Epochs:</b> {html.escape(str(summary.get("epoch_range", "N/A")))}<br>'
+        f'<b>Log:</b> <code>{html.escape(entry["path"])}</code> &middot; '
+        f'<b>Data hash:</b> <code>{entry["data_hash"][:16]}</code></p>',
+    ]
+    for title, items in (('❌ Issues', summary.get('issues', [])), ('⚠️ Warnings', summary.get('warnings', []))):
+        if items:
+            parts.append(f'<h4>{title}</h4><ul>' + ''.join(f'<li>{html.escape(i)}</li>' for i in items) + '</ul>')
+    parts.append('<table><thead><tr><th class="name">Metric</th><th>Value</th><th>Expected</th></tr></thead><tbody>')
+    for metric in entry['metrics']:
+        css = 'ok' if metric['ok'] else 'warn'
+        parts.append(f'<tr><td class="name">{html.escape(metric["name"])}</td>'
+                     f'<td class="{css}">{html.escape(metric["display"])}</td>'
+                     f'<td>{html.escape(metric["expected"])}</td></tr>')
+    parts.append('</tbody></table>')
+    if entry['plots']:
+        parts.append('<div class="plots">' + ''.join(
+            f'<figure><img loading="lazy" alt="{html.escape(name, quote=True)}" src="{uri}">'
+            f'<figcaption>{html.escape(name.replace("_", " "))}</figcaption></figure>'
+            for name, uri in entry['plots'].items()) + '</div>')
+    parts.append('</details>')
+    return '\n'.join(parts)
+
+
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description='Build one HTML report over all analyzed RANDAO datasets')
+    parser.add_argument('paths', nargs='*', default=[str(DEFAULT_DATA_DIR)],
+                       help='JSONL logs or directories of them (default: geloggde_seeds)')
+    parser.add_argument('--output', '-o', default='./randao_analysis/report.html', help='HTML file to write')
+    parser.add_argument('--window', '-w', type=int, default=DEFAULT_WINDOW,
+                       help='Rolling window of the timeline analysis, in epochs')
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR),
+                       help='Directory of the persistent result cache')
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_MAX_BYTES / 2**20,
+                       help='Size limit of the result cache in MiB (LRU eviction)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Re-analyze every dataset without reading or writing the cache')
+    args = parser.parse_args()
+
+    log_files = []
+    for path in map(Path, args.paths):
+        log_files.extend(sorted(path.glob('*.jsonl')) if path.is_dir() else [path])
+    if not log_files:
+        parser.error('no JSONL logs found')
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    cache = None
+    if not args.no_cache:
+        cache = AnalysisCache(args.cache_dir, max_bytes=int(args.cache_max_mb * 2**20))
+    try:
+        print(f"📚 Building report over {len(log_files)} datasets")
+        entries = collect_entries(log_files, output.parent / 'report_datasets', cache, window=args.window)
+        output.write_text(render_html(entries), encoding='utf-8')
+        print(f"📄 Report saved to: {output} ({output.stat().st_size / 2**20:.1f} MiB)")
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Persistent cache for RANDAO analysis results.
+
+Every entry is keyed by a hash of the seed bytes and their epochs, the
+analysis name, its parameters and a fingerprint of the code: the source of
+the analysis function plus the file contents of the modules doing the work
+(module_fingerprint), so edits to a helper or a module constant invalidate
+the entries that depend on it. Results are stored as zlib-compressed JSON in a single SQLite file
+and the least recently used entries are evicted once the store grows past
+`max_bytes`.
+"""
+
+import hashlib
+import inspect
+import json
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "randao_analysis"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+CACHE_FILE = "results.sqlite"
+
+
+def json_default(obj):
+    """JSON fallback for NumPy scalars/arrays, timestamps and anything else"""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    elif hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    else:
+        return str(obj)
+
+
+def dataset_hash(seed_bytes, epochs=None) -> str:
+    """Content hash of an N x 32 seed matrix (or any buffer) and, if given, its epochs"""
+    data = seed_bytes.tobytes() if hasattr(seed_bytes, 'tobytes') else bytes(seed_bytes)
+    digest = hashlib.sha256(data)
+    if epochs is not None:
+        digest.update(b'epochs')
+        digest.update(np.asarray(epochs, dtype='<i8').tobytes())
+    return digest.hexdigest()
+
+
+def function_fingerprint(func: Callable) -> str:
+    """Hash of a function's source, so edits to an analysis invalidate its entries"""
+    func = getattr(func, '__func__', func)
+    try:
+        code = inspect.getsource(func).encode()
+    except (OSError, TypeError):
+        code = func.__code__.co_code
+    return hashlib.sha256(code).hexdigest()[:16]
+
+
+def module_fingerprint(modules: Sequence[str], base: Optional[Path] = None) -> str:
+    """Hash of the file contents of modules (paths relative to base, default this directory)"""
+    base = Path(base) if base is not None else Path(__file__).resolve().parent
+    digest = hashlib.sha256()
+    for module in modules:
+        path = base / module
+        if path.exists():
+            digest.update(module.encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class AnalysisCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Open (or create) the cache store in cache_dir
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self.conn = sqlite3.connect(self.cache_dir / CACHE_FILE, timeout=30)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY,"
+            " analysis TEXT NOT NULL,"
+            " dataset TEXT NOT NULL,"
+            " value BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(data_hash: str, analysis: str, params: Optional[Dict] = None, code: str = "") -> str:
+        """Cache key for one analysis run on one dataset"""
+        payload = json.dumps({
+            'data': data_hash,
+            'analysis': analysis,
+            'params': params or {},
+            'code': code,
+        }, sort_keys=True, default=json_default)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key (refreshing its LRU stamp), or None"""
+        row = self.conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+        self.conn.commit()
+        self.hits += 1
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key: str, analysis: str, data_hash: str, value: Any):
+        """Store a JSON-serialisable value and evict old entries if over budget"""
+        blob = zlib.compress(json.dumps(value, default=json_default).encode(), 6)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO results (key, analysis, dataset, value, size, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, analysis, data_hash, blob, len(blob), time.time()),
+        )
+        self.conn.commit()
+        self.evict()
+
+    def get_or_compute(self, data_hash: str, analysis: str, func: Callable,
+                       params: Optional[Dict] = None, code: str = "") -> Any:
+        """
+        Return the cached result of func(**params) on this dataset, computing it on a miss
+
+        code is added to func's own fingerprint, e.g. a module_fingerprint of
+        the modules func calls into.
+        """
+        params = params or {}
+        key = self.make_key(data_hash, analysis, params, function_fingerprint(func) + code)
+        cached = self.get(key)
+        if cached is not None:
+            print(f"\n♻️  Using cached {analysis} results")
+            return cached
+
+        result = func(**params)
+        # Round-trip so hits and misses return identical (plain JSON) types
+        result = json.loads(json.dumps(result, default=json_default))
+        self.put(key, analysis, data_hash, result)
+        return result
+
+    def evict(self):
+        """Drop least recently used entries until the store fits in max_bytes"""
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self.conn.execute("SELECT key, size FROM results ORDER BY last_used ASC").fetchall()
+        doomed = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        self.conn.executemany("DELETE FROM results WHERE key = ?", doomed)
+        self.conn.commit()
+
+    def invalidate(self, data_hash: Optional[str] = None, analysis: Optional[str] = None) -> int:
+        """Delete entries for a dataset and/or analysis (everything if both are None)"""
+        clauses, args = [], []
+        if data_hash is not None:
+            clauses.append("dataset = ?")
+            args.append(data_hash)
+        if analysis is not None:
+            clauses.append("analysis = ?")
+            args.append(analysis)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        deleted = self.conn.execute(f"DELETE FROM results{where}", args).rowcount
+        self.conn.commit()
+        return deleted
+
+    def stats(self) -> Dict:
+        """Entry count, stored bytes and hit/miss counters of this session"""
+        entries, size = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        return {
+            'entries': entries,
+            'bytes': size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Sequential testing of a live seed stream against a baseline configuration.
+
+Every captured epoch updates a few per-epoch features of the seed (the
+counterfactual.SCORES objectives and the Hamming distance to the previous
+seed). For each feature a mixture SPRT (normal mixture over the mean shift,
+scale tau) compares the running mean with the mean of the baseline log and
+gives an always-valid p-value: it may be checked after every epoch and the
+experiment stopped the first time it drops below alpha, without inflating
+the false-positive rate. The same mixture gives a confidence sequence for the
+shift, so the opposite conclusion is also available: once the interval of
+every feature lies within +/- min_effect the stream is indistinguishable from
+the baseline at the resolution that matters and running longer is wasted.
+
+Only epochs the logger captured on time are used (capture_at_epoch equal to
+epoch_finalized): when it catches up over several finalized epochs it reads
+the current finalized mix for all of them, and the repeated seed would count
+as a zero Hamming distance the chain never produced.
+
+Shifts, tau and min_effect are in units of the baseline standard deviation
+of each feature. The baseline is a fixed sample, so its sampling variance is
+added to the live one and bounds how narrow the interval can get. Whether
+'no effect' can be concluded therefore depends on the baseline length and on
+how many live epochs there will be (the horizon, e.g. a campaign's epoch
+budget): by default min_effect is the smallest shift for which a stream up to
+REACH_SE standard errors off the baseline still fits inside the margin at the
+horizon, and an explicit min_effect that cannot be reached there is refused
+(or warned about when only a stream right on the baseline could reach it).
+Features are combined by Bonferroni.
+
+    python sequential.py -l live.jsonl -b randao_log_Simple_Unmod_base.jsonl
+
+replays a finished log and shows when it would have stopped; campaign.py
+runs the same monitor on every epoch its logger captures.
+"""
+
+import argparse
+import json
+import math
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from analyze import LOGGER_EPOCH_KEY, read_records, records_to_seeds
+from counterfactual import SCORES
+from result_cache import json_default
+
+SEED_BYTES = 32
+
+DEFAULT_ALPHA = 0.05
+DEFAULT_MIN_EPOCHS = 20
+DEFAULT_HORIZON = 1000     # live epochs within which 'no effect' should be reachable
+REACH_SE = 2.0             # observed shift (standard errors) the interval must still fit at the horizon
+
+EFFECT = 'effect'
+NO_EFFECT = 'no_effect'
+
+
+def captured_on_time(record: Dict) -> bool:
+    """Whether a logger record holds the mix of its own epoch (records without capture info count as on time)"""
+    epoch = record.get(LOGGER_EPOCH_KEY)
+    return epoch is None or int(record.get('capture_at_epoch', epoch)) == int(epoch)
+
+
+def load_on_time(log_file):
+    """(epochs, seed matrix) of the on-time records of a seed log"""
+    records = [r for r in read_records(log_file) if captured_on_time(r)]
+    if not records:
+        raise ValueError(f"no on-time records in {log_file}")
+    return records_to_seeds(records)
+
+
+def seed_features(seed_bytes: np.ndarray) -> Dict[str, np.ndarray]:
+    """Per-epoch features of an N x 32 seed matrix; hamming (to the previous seed) is NaN for the first"""
+    features = {name: score(seed_bytes).astype(np.float64) for name, score in SCORES.items()}
+    features['leading_value'] /= 2.0 ** 64
+    hamming = np.full(len(seed_bytes), np.nan)
+    hamming[1:] = np.unpackbits(seed_bytes[1:] ^ seed_bytes[:-1], axis=1).sum(axis=1)
+    features['hamming'] = hamming
+    return features
+
+
+def confidence_radius(variance: float, tau2: float, alpha: float) -> float:
+    """Half-width of the (1 - alpha) normal-mixture confidence sequence at this variance of the shift"""
+    if math.isinf(variance):
+        return math.inf
+    return math.sqrt(variance * (variance + tau2) / tau2
+                     * (2 * math.log(1 / alpha) + math.log((variance + tau2) / variance)))
+
+
+def reachable_effect(n_baseline: int, horizon: int, alpha: float, tau: Optional[float] = None) -> float:
+    """Smallest min_effect (SD) within which a stream REACH_SE standard errors off the baseline
+    concludes 'no effect' after horizon live epochs (tau defaults to min_effect, as in MixtureSPRT)"""
+    variance = 1 / horizon + 1 / n_baseline
+
+    def reached(effect: float) -> bool:
+        radius = confidence_radius(variance, (tau if tau is not None else effect) ** 2, alpha)
+        return radius + REACH_SE * math.sqrt(variance) < effect
+
+    lo, hi = 0.0, 1.0
+    while not reached(hi):
+        lo, hi = hi, 2 * hi
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        lo, hi = (lo, mid) if reached(mid) else (mid, hi)
+    return math.ceil(hi * 100) / 100
+
+
+class MixtureSPRT:
+    """Always-valid two-sample test of mean(live) = mean(baseline) for one feature"""
+
+    def __init__(self, baseline: np.ndarray, min_effect: float, alpha: float = DEFAULT_ALPHA,
+                 tau: Optional[float] = None):
+        baseline = np.asarray(baseline, dtype=np.float64)
+        baseline = baseline[np.isfinite(baseline)]
+        if len(baseline) < 2 or baseline.std() == 0:
+            raise ValueError("baseline needs at least two distinct values")
+        self.baseline_mean = float(baseline.mean())
+        self.sd = float(baseline.std(ddof=1))
+        self.n_baseline = len(baseline)
+        self.alpha = alpha
+        self.margin = min_effect * self.sd
+        self.tau2 = ((tau if tau is not None else min_effect) * self.sd) ** 2
+        self.n = 0
+        self.total = 0.0
+        self.p_value = 1.0
+
+    @property
+    def shift(self) -> float:
+        return self.total / self.n - self.baseline_mean
+
+    def variance(self, n: Optional[int] = None) -> float:
+        """Variance of the estimated shift after n live epochs (infinite n: baseline only)"""
+        n = self.n if n is None else n
+        return self.sd ** 2 * ((1 / n if n else math.inf) + 1 / self.n_baseline)
+
+    def radius(self, n: Optional[int] = None) -> float:
+        """Half-width of the (1 - alpha) confidence sequence for the shift"""
+        return confidence_radius(self.variance(n), self.tau2, self.alpha)
+
+    def update(self, x: float):
+        if not math.isfinite(x):
+            return
+        self.n += 1
+        self.total += x
+        v = self.variance()
+        log_lr = (0.5 * math.log(v / (v + self.tau2))
+                  + self.tau2 * self.shift ** 2 / (2 * v * (v + self.tau2)))
+        self.p_value = min(self.p_value, math.exp(-min(log_lr, 700.0)))
+
+    @property
+    def equivalent(self) -> bool:
+        """The whole confidence interval lies within +/- min_effect"""
+        return self.n > 0 and abs(self.shift) + self.radius() < self.margin
+
+    def status(self) -> Dict:
+        return {'n': self.n, 'shift_sd': self.shift / self.sd if self.n else None,
+                'radius_sd': self.radius() / self.sd if self.n else None, 'p_value': self.p_value}
+
+
+class SequentialMonitor:
+    """
+    Mixture SPRTs of all features against a baseline seed log, updated one epoch at a time
+
+    update() returns 'effect' once some feature's always-valid p-value is
+    below alpha / features, 'no_effect' once every feature's interval lies
+    within +/- min_effect, None while undecided; no decision is made before
+    min_epochs epochs. The first decision sticks.
+
+    horizon is the number of live epochs expected (the epoch budget); the
+    default min_effect is the one reachable within it (reachable_effect), and
+    an explicit one that is not raises ValueError.
+    """
+
+    def __init__(self, baseline_seeds: np.ndarray, alpha: float = DEFAULT_ALPHA,
+                 min_effect: Optional[float] = None, tau: Optional[float] = None,
+                 min_epochs: int = DEFAULT_MIN_EPOCHS, horizon: int = DEFAULT_HORIZON):
+        features = seed_features(np.asarray(baseline_seeds, dtype=np.uint8))
+        self.n_baseline = len(baseline_seeds)
+        self.horizon = horizon
+        reachable = reachable_effect(self.n_baseline - 1, horizon, alpha / len(features), tau)
+        if min_effect is None:
+            min_effect = reachable
+        self.alpha = alpha
+        self.min_effect = min_effect
+        self.min_epochs = min_epochs
+        self.tests = {name: MixtureSPRT(values, min_effect, alpha=alpha / len(features), tau=tau)
+                      for name, values in features.items()}
+        self.previous: Optional[np.ndarray] = None
+        self.epochs = 0
+        self.last_epoch = None
+        self.decision = None
+        self.decided_at = None
+        self.decided_after = None
+        hint = f"(with {self.n_baseline} baseline epochs use min_effect >= {reachable} or a longer baseline)"
+        impossible = [name for name, test in self.tests.items() if test.radius(horizon) >= test.margin]
+        if impossible:
+            raise ValueError(f"'no effect' within {min_effect} SD can never be concluded in {horizon} epochs "
+                             f"for {', '.join(impossible)} {hint}")
+        if min_effect < reachable:
+            print(f"⚠️ 'no effect' within {min_effect} SD is only reachable in {horizon} epochs by a stream "
+                  f"closer than {REACH_SE:g} standard errors to the baseline {hint}")
+
+    @classmethod
+    def from_log(cls, baseline_log, **params) -> 'SequentialMonitor':
+        _, seed_bytes = load_on_time(baseline_log)
+        return cls(seed_bytes, **params)
+
+    def update(self, epoch: int, seed: bytes) -> Optional[str]:
+        current = np.frombuffer(seed, dtype=np.uint8).reshape(1, SEED_BYTES)
+        rows = current if self.previous is None else np.vstack((self.previous, current))
+        for name, values in seed_features(rows).items():
+            self.tests[name].update(float(values[-1]))
+        self.previous = current
+        self.epochs += 1
+        self.last_epoch = epoch
+        if self.decision is None and self.epochs >= self.min_epochs:
+            if any(test.p_value < test.alpha for test in self.tests.values()):
+                self.decision = EFFECT
+            elif all(test.equivalent for test in self.tests.values()):
+                self.decision = NO_EFFECT
+            if self.decision is not None:
+                self.decided_at, self.decided_after = epoch, self.epochs
+        return self.decision
+
+    def replay(self, epochs: np.ndarray, seed_bytes: np.ndarray) -> List[Dict]:
+        """Feed a whole seed log through update(); returns the status after every epoch"""
+        trajectory = []
+        for epoch, row in zip(epochs, seed_bytes):
+            self.update(int(epoch), row.tobytes())
+            trajectory.append(self.status())
+        return trajectory
+
+    def status(self) -> Dict:
+        return {'epochs': self.epochs, 'last_epoch': self.last_epoch, 'decision': self.decision,
+                'decided_at': self.decided_at, 'decided_after': self.decided_after, 'features': {name: t.status() for name, t in self.tests.items()}}
+
+    def describe(self) -> str:
+        strongest = min(self.tests, key=lambda name: self.tests[name].p_value)
+        test = self.tests[strongest]
+        return (f"{self.epochs} epochs, strongest {strongest}: shift {test.shift / test.sd:+.3f} SD "
+                f"± {test.radius() / test.sd:.3f}, always-valid p={min(1.0, test.p_value * len(self.tests)):.4g}")
+
+
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description='Replay a seed log through the sequential test against a baseline')
+    parser.add_argument('--log-file', '-l', required=True, help='JSONL seed log to replay')
+    parser.add_argument('--baseline', '-b', required=True, help='JSONL seed log of the baseline configuration')
+    parser.add_argument('--alpha', type=float, default=DEFAULT_ALPHA, help='Family-wise false-positive rate')
+    parser.add_argument('--min-effect', type=float, default=None,
+                        help='Smallest shift of interest, in baseline standard deviations '
+                             '(default: the smallest reachable within --horizon epochs)')
+    parser.add_argument('--tau', type=float, default=None, help='Mixture scale in SD (default: --min-effect)')
+    parser.add_argument('--min-epochs', type=int, default=DEFAULT_MIN_EPOCHS, help='No decision before this many epochs')
+    parser.add_argument('--horizon', type=int, default=None,
+                        help='Live epochs expected, for the reachability of min-effect (default: the replayed log)')
+    parser.add_argument('--output', '-o', default=None, help='Write the per-epoch trajectory to this JSON file')
+    args = parser.parse_args()
+
+    epochs, seed_bytes = load_on_time(args.log_file)
+    try:
+        monitor = SequentialMonitor.from_log(args.baseline, alpha=args.alpha, min_effect=args.min_effect,
+                                             tau=args.tau, min_epochs=args.min_epochs,
+                                             horizon=args.horizon or len(seed_bytes))
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"📥 {len(seed_bytes)} epochs from {args.log_file}, baseline {monitor.n_baseline} epochs, "
+          f"min effect {monitor.min_effect} SD")
+    trajectory = monitor.replay(epochs, seed_bytes)
+
+    if monitor.decision is None:
+        print(f"⏳ Undecided after {monitor.describe()}")
+    else:
+        stop = monitor.decided_after
+        flag = "⚠️" if monitor.decision == EFFECT else "✓"
+        print(f"{flag} {monitor.decision} at epoch {monitor.decided_at}: stopping after {stop} of "
+              f"{len(seed_bytes)} epochs ({1 - stop / len(seed_bytes):.0%} saved)")
+        print(f"  {monitor.describe()}")
+    for name, test in monitor.tests.items():
+        s = test.status()
+        print(f"  {name:14s} shift {s['shift_sd']:+.3f} SD ± {s['radius_sd']:.3f}  "
+              f"p={min(1.0, s['p_value'] * len(monitor.tests)):.4g}")
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump({'decision': monitor.decision, 'decided_at': monitor.decided_at, 'trajectory': trajectory},
+                      f, indent=2, default=json_default)
+        print(f"\n💾 Trajectory saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Per-bit-position spectral analysis along the epoch axis.
+
+Each bit position is a series over the epochs, taken as +1/-1. A manipulation
+that repeats every P epochs, such as one infinity reveal in 32 epochs or an
+attack every few epochs, puts power at frequency 1/P (and its harmonics)
+into the series of the bits it touches. The single concatenated-stream
+autocorrelation smears this out over 256-bit strides. All 256 series are
+transformed by one real FFT down the epoch axis, run over blocks of
+positions so memory stays bounded for large N.
+
+Epochs are placed on their own grid (epoch - first epoch), and missing
+epochs contribute 0, so a period is measured in epochs even when the log
+has gaps. A log sparser than half the grid is analysed in record order.
+
+    dft_test      NIST SP 800-22 2.6 discrete Fourier transform test per position
+                  (the share of moduli below the 95% threshold)
+    periodogram   power normalised by the number of epochs, Exp(1) per position under
+                  the null (chi2_1 at the Nyquist frequency):
+                    mean     averaged over positions, for periodicity in many bits
+                             at unrelated phases
+                    coherent spectrum of the summed series (2 * popcount - 256),
+                             normalised by its trimmed mean power, for bits that move together
+                  each tested per frequency, Bonferroni over frequencies
+    positions     strongest peak per position, with a p-value for the maximum
+                  over all frequencies
+
+The positions of a seed need not be independent: a seed injected at random
+epochs makes every bit move with it, which inflates the mean periodogram at
+every frequency without any period. The null is therefore the one of
+shuffled epochs, which keeps each seed whole. Under it the summed power is
+a weighted sum of independent Exp(1) (chi2_1) variables, weighted by the
+eigenvalues of the covariance of the positions, and its tail is taken by a
+saddlepoint approximation. Leading components far above the bulk of the
+eigenvalues are first rescaled to the bulk, so one shared seed cannot mask
+a period elsewhere. With independent fair bits the weights are all equal
+and this is the plain Gamma null.
+"""
+
+import math
+from typing import Dict, List
+
+import numpy as np
+
+from plotting import minmax_decimate
+
+SEED_BITS = 256
+
+SPECTRAL_ALPHA = 0.01
+DFT_THRESHOLD_P = 0.95       # SP 800-22 2.6: 95% of moduli should lie below T
+BLOCK_ELEMENTS = 1 << 24     # grid length x positions transformed at once (~64 MB float32 in, 128 MB out)
+COVARIANCE_ROWS = 1 << 16    # seeds unpacked at once for the position covariance
+SPIKE_FACTOR = 2.0           # components above this x the Marchenko-Pastur edge of the bulk are whitened
+MAX_SPIKES = 16
+COHERENT_TRIM = 0.9          # share of the coherent power (lowest first) that sets its scale
+MAX_POINTS = 2000            # stored periodogram points (min/max decimated)
+MAX_PEAKS = 20
+
+
+def bit_series(seed_bytes: np.ndarray, epochs: np.ndarray):
+    """(grid positions, grid length, mode): where each seed goes on the epoch axis"""
+    n = len(seed_bytes)
+    epochs = np.asarray(epochs, dtype=np.int64)
+    span = int(epochs.max() - epochs.min()) + 1 if n else 0
+    if n and span <= 2 * n:
+        return epochs - int(epochs.min()), span, 'epoch'
+    return np.arange(n), n, 'index'
+
+
+def _block_spectra(seed_bytes: np.ndarray, grid: np.ndarray, length: int, first_byte: int, n_bytes: int) -> np.ndarray:
+    """rfft over the grid of the +/-1 series of positions 8 * first_byte .. 8 * (first_byte + n_bytes)"""
+    from scipy import fft
+    series = np.zeros((length, 8 * n_bytes), dtype=np.float32)
+    bits = np.unpackbits(seed_bytes[:, first_byte:first_byte + n_bytes], axis=1)
+    series[grid] = bits.astype(np.float32) * 2 - 1
+    return fft.rfft(series, axis=0, workers=-1)
+
+
+def gamma_sf(shape: float, x: np.ndarray) -> np.ndarray:
+    """Upper tail of Gamma(shape, 1)"""
+    from scipy.special import gammaincc
+    return gammaincc(shape, x)
+
+
+def position_covariance(seed_bytes: np.ndarray) -> np.ndarray:
+    """Covariance of the +/-1 bit positions over the seeds (SEED_BITS x SEED_BITS)"""
+    n = len(seed_bytes)
+    gram = np.zeros((SEED_BITS, SEED_BITS))
+    sums = np.zeros(SEED_BITS)
+    for start in range(0, n, COVARIANCE_ROWS):
+        bits = np.unpackbits(seed_bytes[start:start + COVARIANCE_ROWS], axis=1).astype(np.float32) * 2 - 1
+        gram += bits.T @ bits
+        sums += bits.sum(axis=0, dtype=np.float64)
+    mean = sums / max(n, 1)
+    return gram / max(n, 1) - np.outer(mean, mean)
+
+
+def _component_spectra(seed_bytes: np.ndarray, grid: np.ndarray, length: int, vectors: np.ndarray) -> np.ndarray:
+    """rfft over the grid of the +/-1 seeds projected on the columns of vectors"""
+    from scipy import fft
+    series = np.zeros((length, vectors.shape[1]), dtype=np.float32)
+    vectors = vectors.astype(np.float32)
+    for start in range(0, len(seed_bytes), COVARIANCE_ROWS):
+        bits = np.unpackbits(seed_bytes[start:start + COVARIANCE_ROWS], axis=1).astype(np.float32) * 2 - 1
+        series[grid[start:start + COVARIANCE_ROWS]] = bits @ vectors
+    return fft.rfft(series, axis=0, workers=-1)
+
+
+def _trimmed_scale(power: np.ndarray) -> float:
+    """Scale of Exp-distributed power from the mean of its lower COHERENT_TRIM share"""
+    if len(power) == 0:
+        return 1.0
+    q = -math.log(1 - COHERENT_TRIM)
+    kept = np.sort(power)[:max(1, int(COHERENT_TRIM * len(power)))]
+    return float(kept.mean()) * COHERENT_TRIM / (1 - math.exp(-q) * (1 + q))
+
+
+def weighted_gamma_sf(q: np.ndarray, weights: np.ndarray, shape: float, iterations: int = 100) -> np.ndarray:
+    """Upper tail of sum_j weights_j * G_j, G_j ~ Gamma(shape, 1 / shape) independent (mean 1).
+
+    Lugannani-Rice saddlepoint approximation, whose error stays relative far
+    into the tail.
+    """
+    from scipy.stats import norm
+    q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+    w = weights[weights > weights.max() * 1e-12]
+
+    def cumulants(s):
+        t = 1 - np.outer(s, w) / shape
+        return (-shape * np.log(t).sum(axis=1), (w / t).sum(axis=1), (w * w / shape / (t * t)).sum(axis=1))
+
+    # K'(s) = q is increasing in s on (-inf, shape / max w); bisect
+    lo = -2 * shape * len(w) / np.maximum(q, 1e-300)
+    hi = np.full_like(q, shape / w.max())
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        above = cumulants(mid)[1] > q
+        hi = np.where(above, mid, hi)
+        lo = np.where(above, lo, mid)
+    s = (lo + hi) / 2
+    K, _, K2 = cumulants(s)
+    r = np.sign(s) * np.sqrt(np.maximum(2 * (s * q - K), 0))
+    u = s * np.sqrt(K2)
+    mean, sd = w.sum(), math.sqrt((w * w).sum() / shape)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sf = norm.sf(r) + norm.pdf(r) * (1 / u - 1 / r)
+    # next to the mean the formula is 0/0; the normal approximation is fine there
+    central = np.abs(q - mean) < 1e-3 * sd
+    sf = np.where(central | ~np.isfinite(sf), norm.sf((q - mean) / sd), sf)
+    return np.clip(sf, 0.0, 1.0)
+
+
+def weighted_gamma_isf(level: float, weights: np.ndarray, shape: float) -> float:
+    """q with weighted_gamma_sf(q) = level"""
+    from scipy.optimize import brentq
+    mean = weights.sum()
+    hi = mean + 1.0
+    while weighted_gamma_sf(hi, weights, shape)[0] > level:
+        hi = mean + 2 * (hi - mean)
+    return float(brentq(lambda q: weighted_gamma_sf(q, weights, shape)[0] - level, mean * 1e-3, hi, xtol=1e-10))
+
+
+def analyze_spectrum(epochs: np.ndarray, seed_bytes: np.ndarray, alpha: float = SPECTRAL_ALPHA,
+                     max_points: int = MAX_POINTS) -> Dict:
+    """DFT test per bit position and aggregated periodograms of all 256 positions"""
+    from scipy.special import erfc
+    seed_bytes = np.ascontiguousarray(seed_bytes, dtype=np.uint8)
+    grid, length, mode = bit_series(seed_bytes, epochs)
+    filled = len(np.unique(grid))                   # a repeated epoch keeps its last record
+    n_freq = length // 2 + 1
+    k = np.arange(n_freq)
+    tested = k[1:]                                  # DC is the bit bias, tested elsewhere
+    nyquist = (length % 2 == 0) & (tested == length // 2)
+    dof = np.where(nyquist, 1.0, 2.0)               # degrees of freedom of |X_k|^2 per position
+    F = len(tested)
+    if F == 0:
+        return {"error": "Not enough epochs for a spectrum"}
+
+    # Null of shuffled epochs: the covariance of the positions gives the weights of
+    # the summed power. Components far above the bulk (a seed shared by many epochs)
+    # are whitened down to the bulk level, so they neither dominate the null nor
+    # hide a period in the other positions.
+    covariance = position_covariance(seed_bytes)
+    eigenvalues, vectors = np.linalg.eigh(covariance)
+    eigenvalues = np.clip(eigenvalues, 0, None)
+    if eigenvalues.max() <= 0:
+        return {"error": "All seeds are identical"}
+    edge = float(np.mean(np.diag(covariance))) * (1 + math.sqrt(SEED_BITS / filled)) ** 2
+    spikes = np.flatnonzero(eigenvalues > SPIKE_FACTOR * edge)[::-1][:MAX_SPIKES]
+    bulk = float(np.delete(eigenvalues, spikes).mean())
+    weights = eigenvalues.copy()
+    weights[spikes] = bulk
+    weights /= SEED_BITS
+
+    threshold = math.sqrt(math.log(1 / (1 - DFT_THRESHOLD_P)) * filled)
+    n_half = max(1, filled // 2)
+    power_sum = np.zeros(F)
+    coherent = np.zeros(n_freq, dtype=np.complex128)
+    below = np.zeros(SEED_BITS, dtype=np.int64)
+    peak_power = np.zeros(SEED_BITS)
+    peak_k = np.zeros(SEED_BITS, dtype=np.int64)
+
+    block_bytes = int(max(1, min(SEED_BITS // 8, BLOCK_ELEMENTS // (8 * max(length, 1)))))
+    for first in range(0, SEED_BITS // 8, block_bytes):
+        n_bytes = min(block_bytes, SEED_BITS // 8 - first)
+        spectra = _block_spectra(seed_bytes, grid, length, first, n_bytes)
+        positions = slice(8 * first, 8 * (first + n_bytes))
+        modulus = np.abs(spectra)
+        # SP 800-22 2.6 counts the first n/2 moduli, DC included
+        below[positions] = (modulus[:n_half] < threshold).sum(axis=0)
+        power = np.square(modulus[1:]) / np.float32(filled)
+        power_sum += power.sum(axis=1, dtype=np.float64)
+        coherent += spectra.sum(axis=1, dtype=np.complex128)
+        peak_k[positions] = power.argmax(axis=0) + 1
+        peak_power[positions] = power.max(axis=0)
+    if len(spikes):
+        component_power = np.abs(_component_spectra(seed_bytes, grid, length, vectors[:, spikes])[1:]) ** 2 / filled
+        power_sum -= component_power @ (1 - bulk / eigenvalues[spikes])
+
+    # DFT test per position
+    expected_below = DFT_THRESHOLD_P * n_half
+    d = (below - expected_below) / math.sqrt(filled * DFT_THRESHOLD_P * (1 - DFT_THRESHOLD_P) / 4)
+    dft_p = erfc(np.abs(d) / math.sqrt(2))
+    dft_failed = np.flatnonzero(dft_p < alpha)
+    from scipy.stats import binom
+    dft_excess_p = float(binom.sf(len(dft_failed) - 1, SEED_BITS, alpha)) if len(dft_failed) else 1.0
+
+    # Aggregated periodograms. The summed series is normalised by the mean of the
+    # lower COHERENT_TRIM of its power over frequencies: shared structure raises
+    # every frequency, a period raises only a few.
+    mean_power = power_sum / SEED_BITS
+    coherent_power = np.abs(coherent[1:]) ** 2 / filled
+    coherent_power /= max(_trimmed_scale(coherent_power[~nyquist]), 1e-12)
+    coherent_p = gamma_sf(dof / 2, coherent_power * dof / 2)
+    periods = length / tested
+
+    def mean_p_values(candidates: np.ndarray) -> np.ndarray:
+        p_values = np.ones(F)
+        for shape in (1.0, 0.5):
+            chosen = candidates[dof[candidates] == 2 * shape]
+            if len(chosen):
+                p_values[chosen] = weighted_gamma_sf(mean_power[chosen], weights, shape)
+        return p_values
+
+    def peaks(power: np.ndarray, p_values: np.ndarray) -> List[Dict]:
+        adjusted = np.minimum(1.0, p_values * F)
+        order = np.argsort(p_values, kind='stable')[:MAX_PEAKS]
+        return [{'period_epochs': float(periods[i]), 'frequency': float(tested[i] / length),
+                 'power': float(power[i]), 'p_value': float(adjusted[i])} for i in order]
+
+    # the tail is monotone in the power, so only the strongest frequencies (and Nyquist) need it
+    candidates = np.union1d(np.argsort(mean_power)[::-1][:MAX_PEAKS], np.flatnonzero(nyquist))
+    mean_peaks, coherent_peaks = peaks(mean_power, mean_p_values(candidates)), peaks(coherent_power, coherent_p)
+    significant = sorted({round(p['period_epochs'], 6) for p in mean_peaks + coherent_peaks if p['p_value'] < alpha},
+                         reverse=True)
+
+    # Strongest peak per position; the max of F independent Exp(1) exceeds m with 1 - (1 - e^-m)^F
+    peak_p = -np.expm1(F * np.log1p(-np.exp(-peak_power)))
+    positions = [{'position': b, 'dft_p_value': float(dft_p[b]), 'below_threshold': int(below[b]),
+                  'peak_period_epochs': float(length / peak_k[b]), 'peak_power': float(peak_power[b]),
+                  'peak_p_value': float(peak_p[b])} for b in range(SEED_BITS)]
+    periodic_positions = [b for b in range(SEED_BITS) if peak_p[b] * SEED_BITS < alpha]
+
+    freq = tested / length
+    plot_x, plot_mean = minmax_decimate(freq, mean_power, max_points)
+    coherent_x, plot_coherent = minmax_decimate(freq, coherent_power, max_points)
+    return {
+        'axis': mode,
+        'n_samples': len(seed_bytes),
+        'grid_length': length,
+        'missing_epochs': length - filled if mode == 'epoch' else 0,
+        'n_frequencies': F,
+        'alpha': alpha,
+        'dft_test': {
+            'threshold': threshold,
+            'expected_below': expected_below,
+            'failed_positions': dft_failed.tolist(),
+            'expected_failures': alpha * SEED_BITS,
+            'excess_p_value': dft_excess_p,
+            'min_p_value': float(dft_p.min()),
+        },
+        'mean_periodogram': {'peaks': mean_peaks, 'max_power': float(mean_power.max()),
+                             'threshold': weighted_gamma_isf(alpha / F, weights, 1.0),
+                             'effective_positions': float(weights.sum() ** 2 / (weights ** 2).sum()),
+                             'whitened_components': len(spikes)},
+        'coherent_periodogram': {'peaks': coherent_peaks, 'max_power': float(coherent_power.max()),
+                                 'threshold': -math.log(alpha / F)},
+        'dominant_periods': significant,
+        'periodic_positions': periodic_positions,
+        'positions': positions,
+        'periodogram': {'frequency': plot_x.tolist(), 'mean_power': plot_mean.tolist(),
+                        'coherent_frequency': coherent_x.tolist(), 'coherent_power': plot_coherent.tolist()},
+    }
+
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Per-stage timing and memory instrumentation for RANDAOAnalyzer.
+
+Each stage records wall time, CPU time and the peak memory allocated while it
+ran (via tracemalloc, which also sees NumPy buffers). Optionally every stage
+gets its own cProfile dump (`<stage>.prof`, open with snakeviz/pstats) and
+tracemalloc snapshot (`<stage>.tracemalloc`).
+"""
+
+import cProfile
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PROFILE_REPORT = "profile_report.json"
+
+
+class StageProfiler:
+    def __init__(self, dump_dir: Optional[str] = None, trace_memory: bool = True):
+        """
+        Create a profiler; if dump_dir is set, write cProfile/tracemalloc dumps per stage
+        """
+        self.dump_dir = Path(dump_dir) if dump_dir else None
+        self.trace_memory = trace_memory
+        self.stages: List[Dict] = []
+        self._started_tracing = False
+
+        if self.dump_dir is not None:
+            self.dump_dir.mkdir(parents=True, exist_ok=True)
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    @contextmanager
+    def stage(self, name: str, **info):
+        """Measure the enclosed block as one stage; extra info is stored in its record"""
+        record = {'name': name, **info}
+        profiler = cProfile.Profile() if self.dump_dir is not None else None
+
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            mem_before = tracemalloc.get_traced_memory()[0]
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        if profiler is not None:
+            profiler.enable()
+
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            record['wall_s'] = time.perf_counter() - wall_start
+            record['cpu_s'] = time.process_time() - cpu_start
+
+            if self.trace_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                record['peak_bytes'] = max(0, peak - mem_before)
+                record['retained_bytes'] = current - mem_before
+
+            if self.dump_dir is not None:
+                prof_file = self.dump_dir / f"{name}.prof"
+                profiler.dump_stats(prof_file)
+                record['cprofile_dump'] = str(prof_file)
+                if self.trace_memory:
+                    snap_file = self.dump_dir / f"{name}.tracemalloc"
+                    tracemalloc.take_snapshot().dump(str(snap_file))
+                    record['tracemalloc_dump'] = str(snap_file)
+
+            self.stages.append(record)
+
+    def report(self, **metadata) -> Dict:
+        """Machine-readable report of all recorded stages"""
+        return {
+            **metadata,
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'memory_traced': self.trace_memory,
+            'total': {
+                'wall_s': sum(s['wall_s'] for s in self.stages),
+                'cpu_s': sum(s['cpu_s'] for s in self.stages),
+                'peak_bytes': max((s.get('peak_bytes', 0) for s in self.stages), default=0),
+            },
+            'stages': self.stages,
+        }
+
+    def save(self, path, **metadata) -> Path:
+        """Write the report as JSON to path"""
+        path = Path(path)
+        with open(path, 'w') as f:
+            json.dump(self.report(**metadata), f, indent=2)
+        return path
+
+    def print_table(self):
+        """Print stages sorted by wall time, slowest first"""
+        print("\n⏱️  Stage profile (slowest first):")
+        print(f"  {'stage':<22} {'wall [s]':>10} {'cpu [s]':>10} {'peak [MiB]':>11}")
+        for s in sorted(self.stages, key=lambda s: s['wall_s'], reverse=True):
+            peak = s.get('peak_bytes')
+            peak_str = f"{peak / 2**20:11.2f}" if peak is not None else f"{'-':>11}"
+            cached = "  (cached)" if s.get('cached') else ""
+            print(f"  {s['name']:<22} {s['wall_s']:10.4f} {s['cpu_s']:10.4f} {peak_str}{cached}")
+
+    def close(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
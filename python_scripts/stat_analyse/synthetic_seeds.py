@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Reproducible synthetic RANDAO seed sets.
+
+Every generator takes a seed for np.random.default_rng and returns
+(epochs, seed_bytes) with seed_bytes an N x 32 uint8 matrix, the same shape
+RANDAOAnalyzer works on. Generation runs in chunks, so 10M-epoch sets only
+need the 320 MB of the result itself.
+
+    unbiased           independent uniform seeds (the null hypothesis)
+    biased             every bit is 1 with probability p (scalar or per-bit vector)
+    correlated         each seed is the previous one with a fraction of bits flipped
+    constant_injected  a fraction of epochs carries one fixed seed, as when the
+                       infinity-signature runs made the mix repeat a constant
+"""
+
+import json
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+
+SEED_BITS = 256
+SEED_BYTES = 32
+CHUNK_EPOCHS = 1 << 16
+
+Seeds = Tuple[np.ndarray, np.ndarray]
+
+
+def _epochs(n: int) -> np.ndarray:
+    return np.arange(n, dtype=np.int64)
+
+
+def unbiased(n: int, seed: int = 0) -> Seeds:
+    """n independent uniformly random seeds"""
+    rng = np.random.default_rng(seed)
+    return _epochs(n), rng.integers(0, 256, size=(n, SEED_BYTES), dtype=np.uint8)
+
+
+def biased(n: int, p=0.52, seed: int = 0) -> Seeds:
+    """Seeds whose bits are independently 1 with probability p (scalar or length-256 vector)"""
+    rng = np.random.default_rng(seed)
+    p = np.broadcast_to(np.asarray(p, dtype=float), (SEED_BITS,))
+    out = np.empty((n, SEED_BYTES), dtype=np.uint8)
+    for start in range(0, n, CHUNK_EPOCHS):
+        stop = min(n, start + CHUNK_EPOCHS)
+        out[start:stop] = np.packbits(rng.random((stop - start, SEED_BITS)) < p, axis=1)
+    return _epochs(n), out
+
+
+def correlated(n: int, flip_prob: float = 0.4, seed: int = 0) -> Seeds:
+    """
+    Markov chain of seeds: seed[t] = seed[t-1] XOR noise with each noise bit set
+    with flip_prob, so consecutive Hamming distances average 256 * flip_prob.
+    """
+    rng = np.random.default_rng(seed)
+    out = np.empty((n, SEED_BYTES), dtype=np.uint8)
+    prev = rng.integers(0, 256, size=SEED_BYTES, dtype=np.uint8)
+    for start in range(0, n, CHUNK_EPOCHS):
+        stop = min(n, start + CHUNK_EPOCHS)
+        noise = np.packbits(rng.random((stop - start, SEED_BITS)) < flip_prob, axis=1)
+        noise[0] ^= prev
+        out[start:stop] = np.bitwise_xor.accumulate(noise, axis=0)
+        prev = out[stop - 1]
+    return _epochs(n), out
+
+
+def constant_injected(n: int, fraction: float = 0.1, seed: int = 0) -> Seeds:
+    """Uniform seeds where a `fraction` of epochs is replaced by one fixed constant seed"""
+    rng = np.random.default_rng(seed)
+    out = rng.integers(0, 256, size=(n, SEED_BYTES), dtype=np.uint8)
+    constant = rng.integers(0, 256, size=SEED_BYTES, dtype=np.uint8)
+    out[rng.random(n) < fraction] = constant
+    return _epochs(n), out
+
+
+GENERATORS: Dict[str, Callable[..., Seeds]] = {
+    'unbiased': unbiased,
+    'biased': biased,
+    'correlated': correlated,
+    'constant_injected': constant_injected,
+}
+
+
+def generate(name: str, n: int, seed: int = 0, **params) -> Seeds:
+    """Generate n epochs with the named generator"""
+    if name not in GENERATORS:
+        raise ValueError(f"Unknown generator '{name}', choose from {sorted(GENERATORS)}")
+    return GENERATORS[name](n, seed=seed, **params)
+
+
+def to_bits(seed_bytes: np.ndarray) -> np.ndarray:
+    """N x 256 bit matrix of a seed matrix"""
+    return np.unpackbits(seed_bytes, axis=1)
+
+
+def write_log(path, epochs: np.ndarray, seed_bytes: np.ndarray):
+    """Write seeds in randao_logger.py's JSONL format, so the CLI tools can read them"""
+    with open(Path(path), 'w') as f:
+        for epoch, row in zip(epochs, seed_bytes):
+            f.write(json.dumps({
+                "epoch_finalized": int(epoch),
+                "capture_at_epoch": int(epoch),
+                "randao_seed_for_next_epoch": "0x" + row.tobytes().hex(),
+            }) + "\n")
@@ -0,0 +1,46 @@
+"""Parser and merge checks for nist_sts.py on finalAnalysisReport excerpts"""
+
+from nist_sts import merge_batches, parse_final_report
+
+REPORT = """\
+------------------------------------------------------------------------------
+RESULTS FOR THE UNIFORMITY OF P-VALUES AND THE PROPORTION OF PASSING SEQUENCES
+------------------------------------------------------------------------------
+   generator is <data.bin>
+------------------------------------------------------------------------------
+ C1  C2  C3  C4  C5  C6  C7  C8  C9 C10  P-VALUE  PROPORTION  STATISTICAL TEST
+------------------------------------------------------------------------------
+  1   1   0   0   1   1   2   2   1   1  0.739918     10/10      Frequency
+  9   0   0   0   0   0   0   0   0   1  0.000000 *    1/10   *  Runs
+  1   0   2   1   1   1   1   1   1   1  0.911413     10/10      NonOverlappingTemplate
+  0   1   1   2   1   1   1   1   1   1  0.911413     10/10      NonOverlappingTemplate
+  0   0   1   0   0   0   0   1   0   0     ----       2/2       RandomExcursions
+  0   0   0   0   0   0   0   0   0   0     ----     ------     RandomExcursionsVariant
+  0   0   0   0   0   0   0   0   0   0  1.2e-05      0/0       RandomExcursionsVariant
+- - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+The minimum pass rate for each statistical test with the exception of the
+random excursion (variant) test is approximately = 8 for a
+sample size = 10 binary sequences.
+"""
+
+
+def test_parse_rows():
+    rows = parse_final_report(REPORT)
+    assert [(r['test'], r['subtest']) for r in rows] == [
+        ('Frequency', 0), ('Runs', 0), ('NonOverlappingTemplate', 0), ('NonOverlappingTemplate', 1),
+        ('RandomExcursions', 0), ('RandomExcursionsVariant', 0), ('RandomExcursionsVariant', 1)]
+    assert rows[0]['counts'] == [1, 1, 0, 0, 1, 1, 2, 2, 1, 1]
+    assert rows[0]['p_value'] == 0.739918
+    assert (rows[1]['p_value'], rows[1]['passed'], rows[1]['total']) == (0.0, 1, 10)
+    assert (rows[4]['p_value'], rows[4]['passed'], rows[4]['total']) == (None, 2, 2)
+    assert (rows[5]['p_value'], rows[5]['passed'], rows[5]['total']) == (None, 0, 0)
+    assert rows[6]['p_value'] == 1.2e-05
+
+
+def test_merge_skips_subtests_without_streams():
+    rows = parse_final_report(REPORT)
+    merged = merge_batches([{'rows': rows, 'pvalues': {}, 'streams': 10}] * 2)
+    assert merged['failed_tests'] == ['Runs']
+    assert merged['tests']['RandomExcursionsVariant'] == {'subtests': 2, 'failed_subtests': 0, 'not_applicable': 2}
+    frequency = next(r for r in merged['rows'] if r['test'] == 'Frequency')
+    assert (frequency['passed'], frequency['total']) == (20, 20)
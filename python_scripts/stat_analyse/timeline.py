@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Rolling-window statistics and change-point detection along the epoch axis.
+
+Every seed is reduced to a handful of per-epoch counts, read straight from
+the packed N x 32 byte matrix with popcount tables:
+
+    ones         set bits in the seed                     Binomial(256, 1/2)
+    hamming      bits changed since the previous seed     Binomial(256, 1/2)
+    transitions  bit changes inside the seed              Binomial(255, 1/2)
+    pairs        the 00/01/10/11 counts of the 255 adjacent bit pairs
+
+Window statistics come from differences of cumulative sums of these
+series, so every window costs O(1) and the whole timeline O(n). Only the
+per-position bias scan touches all 256 columns. It updates the previous
+window's counts with one entering and one leaving row.
+
+Change points are located three ways:
+
+    cusum    two-sided Page CUSUM on the standardised series, in closed form
+             via the Lindley recursion S_t = C_t - min(0, min C_s)
+    offline  most likely single mean shift (Brownian-bridge CUSUM) with its
+             Kolmogorov p-value
+    bocpd    Bayesian online change-point detection (Adams & MacKay) with a
+             Beta-Binomial model and a truncated run-length posterior
+"""
+
+import math
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from plotting import minmax_decimate
+
+SEED_BITS = 256
+DEFAULT_WINDOW = 64
+MAX_POINTS = 2000
+
+CUSUM_K = 0.25        # allowance, in null standard deviations (targets ~0.5 sigma shifts)
+CUSUM_ALPHA = 0.01    # probability of any false CUSUM alarm over a whole log
+BOCPD_HAZARD = 1 / 250
+BOCPD_MAX_RUN = 1024
+BOCPD_PRIOR = 128.0   # Beta(a, a) prior on the per-bit probability, centred on 1/2
+BOCPD_MAX_STEPS = 5000
+
+POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.int64)
+
+# (trials per epoch) of each count series under the null hypothesis p = 1/2
+SERIES_TRIALS = {'ones': SEED_BITS, 'hamming': SEED_BITS, 'transitions': SEED_BITS - 1}
+
+
+def _binary_entropy(p: np.ndarray) -> np.ndarray:
+    p = np.clip(np.asarray(p, dtype=np.float64), 1e-12, 1 - 1e-12)
+    return -(p * np.log2(p) + (1 - p) * np.log2(1 - p))
+
+
+def rolling_sum(x: np.ndarray, window: int) -> np.ndarray:
+    """Sums of all length-`window` windows along axis 0 (exact for integer input)"""
+    c = np.cumsum(x, axis=0)
+    c = np.concatenate((np.zeros((1,) + c.shape[1:], dtype=c.dtype), c))
+    return c[window:] - c[:-window]
+
+# ==================== PER-EPOCH SERIES ====================
+
+def epoch_series(seed_bytes: np.ndarray) -> Dict[str, np.ndarray]:
+    """Per-epoch count series of an N x 32 seed matrix"""
+    b = np.asarray(seed_bytes, dtype=np.uint8)
+    ones = POPCOUNT[b].sum(axis=1)
+    hamming = POPCOUNT[b[1:] ^ b[:-1]].sum(axis=1)
+
+    # Adjacent 1-1 pairs and transitions, inside each byte and across byte boundaries
+    inner11 = POPCOUNT[b & (b >> 1)].sum(axis=1)
+    inner_tr = POPCOUNT[(b ^ (b >> 1)) & 0x7F].sum(axis=1)
+    last, first = b[:, :-1] & 1, b[:, 1:] >> 7
+    n11 = inner11 + (last & first).sum(axis=1)
+    transitions = inner_tr + (last ^ first).sum(axis=1)
+
+    # Remaining pair counts from the ones count and the seed's first/last bit
+    first_bit = (b[:, 0] >> 7).astype(np.int64)
+    last_bit = (b[:, -1] & 1).astype(np.int64)
+    n10 = ones - last_bit - n11
+    n01 = ones - first_bit - n11
+    n00 = (SEED_BITS - 1) - n11 - n10 - n01
+    pairs = np.stack([n00, n01, n10, n11], axis=1)
+
+    return {'ones': ones, 'hamming': hamming, 'transitions': transitions, 'pairs': pairs}
+
+# ==================== ROLLING METRICS ====================
+
+def _position_extremes(seed_bytes: np.ndarray, window: int, chunk: int = 8192) -> np.ndarray:
+    """Largest per-bit-position |z| of the ones count in every window, and its position"""
+    n = len(seed_bytes)
+    n_windows = n - window + 1
+    out_z = np.empty(n_windows)
+    out_pos = np.empty(n_windows, dtype=np.int64)
+    counts = np.unpackbits(seed_bytes[:window], axis=1).sum(axis=0).astype(np.int64)
+    for a in range(0, n_windows, chunk):
+        b = min(n_windows, a + chunk)
+        # Window i+1 = window i + row i+window - row i
+        delta = np.zeros((b - a, SEED_BITS), dtype=np.int64)
+        if b - a > 1:
+            delta[1:] = (np.unpackbits(seed_bytes[a + window:b - 1 + window], axis=1).astype(np.int64)
+                         - np.unpackbits(seed_bytes[a:b - 1], axis=1))
+        window_counts = counts + np.cumsum(delta, axis=0)
+        dev = np.abs(window_counts - window / 2)
+        out_pos[a:b] = np.argmax(dev, axis=1)
+        out_z[a:b] = dev[np.arange(b - a), out_pos[a:b]] / math.sqrt(window / 4)
+        if b < n_windows:
+            counts = window_counts[-1] + (np.unpackbits(seed_bytes[b - 1 + window]).astype(np.int64)
+                                          - np.unpackbits(seed_bytes[b - 1]))
+    return np.stack([out_z, out_pos])
+
+
+def rolling_metrics(seed_bytes: np.ndarray, series: Dict[str, np.ndarray], window: int) -> Dict[str, np.ndarray]:
+    """Bias, entropy, Hamming and 2-bit serial statistics of every `window`-epoch window"""
+    ones = rolling_sum(series['ones'], window)
+    n_bits = SEED_BITS * window
+    p = ones / n_bits
+
+    ham = rolling_sum(series['hamming'].astype(np.float64), window - 1)
+    ham2 = rolling_sum(series['hamming'].astype(np.float64) ** 2, window - 1)
+    ham_mean = ham / (window - 1)
+    ham_std = np.sqrt(np.maximum(ham2 / (window - 1) - ham_mean ** 2, 0.0))
+
+    # Serial test (m = 2, SP 800-22 2.11) on the window's in-seed bit pairs
+    pairs = rolling_sum(series['pairs'], window).astype(np.float64)
+    n_pairs = (SEED_BITS - 1) * window
+    psi2_2 = 4 / n_pairs * np.sum(pairs ** 2, axis=1) - n_pairs
+    prefix = np.stack([pairs[:, 0] + pairs[:, 1], pairs[:, 2] + pairs[:, 3]], axis=1)
+    psi2_1 = 2 / n_pairs * np.sum(prefix ** 2, axis=1) - n_pairs
+    delta_psi2 = psi2_2 - psi2_1
+    position_z, position = _position_extremes(seed_bytes, window)
+
+    return {
+        'bias': p - 0.5,
+        'bias_z': (ones - n_bits / 2) / math.sqrt(n_bits / 4),
+        'entropy': _binary_entropy(p),
+        'max_position_z': position_z,
+        'max_position': position.astype(np.int64),
+        'hamming_mean': ham_mean,
+        'hamming_std': ham_std,
+        'serial_delta_psi2': delta_psi2,
+        'serial_p_value': np.exp(-np.maximum(delta_psi2, 0.0) / 2),  # igamc(1, x/2)
+    }
+
+# ==================== CHANGE-POINT DETECTION ====================
+
+def standardize(counts: np.ndarray, trials: int) -> np.ndarray:
+    """z-scores of Binomial(trials, 1/2) counts under the null"""
+    return (counts - trials / 2) / math.sqrt(trials / 4)
+
+
+def _lindley(y: np.ndarray) -> np.ndarray:
+    """S_t = max(0, S_{t-1} + y_t) with S_0 = 0, without a Python loop"""
+    c = np.cumsum(y)
+    return c - np.minimum(np.minimum.accumulate(c), 0.0)
+
+
+def cusum_threshold(n: int, k: float = CUSUM_K, alpha: float = CUSUM_ALPHA, tests: int = 1) -> float:
+    """
+    Decision threshold h whose in-control average run length (Siegmund's
+    approximation) makes a false alarm within n steps of any of `tests`
+    one-sided CUSUMs about alpha likely.
+    """
+    target = max(n, 1) * tests / alpha
+
+    def arl(h):
+        b = 2 * k * (h + 1.166)
+        return (math.exp(b) - b - 1) / (2 * k * k)
+
+    return _bisect_increasing(arl, target, 0.0, 200.0)
+
+
+def _bisect_increasing(func, target: float, lo: float, hi: float, iterations: int = 100) -> float:
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        if func(mid) < target:
+            lo = mid
+        else:
+            hi = mid
+    return hi
+
+
+def cusum(z: np.ndarray, k: float = CUSUM_K, h: Optional[float] = None) -> List[Dict]:
+    """
+    Two-sided Page CUSUM on a standardised series (h defaults to cusum_threshold).
+
+    Each excursion of the statistic above h is one episode: the shift starts
+    after the last index where the statistic was 0, is detected at the first
+    crossing of h, and ends when the statistic returns to 0 (None if it never
+    does before the end of the log).
+    """
+    if h is None:
+        h = cusum_threshold(len(z), k, tests=2)
+    episodes = []
+    for direction, y in (('up', z - k), ('down', -z - k)):
+        s = _lindley(y)
+        zero = np.flatnonzero(s == 0)
+        crossed = np.flatnonzero(s > h)
+        while len(crossed):
+            at = int(crossed[0])
+            before = zero[zero < at]
+            after = zero[zero > at]
+            start = int(before[-1]) + 1 if len(before) else 0
+            end = int(after[0]) if len(after) else None
+            stop = end if end is not None else len(s)
+            episodes.append({'direction': direction, 'change_index': start, 'alarm_index': at,
+                             'end_index': end, 'peak': float(s[at:stop].max())})
+            crossed = crossed[crossed > stop]
+    return sorted(episodes, key=lambda e: e['alarm_index'])
+
+
+def kolmogorov_sf(x: float) -> float:
+    """P(sup |Brownian bridge| > x)"""
+    if x <= 0:
+        return 1.0
+    j = np.arange(1, 101)
+    return float(min(1.0, max(0.0, 2 * np.sum((-1.0) ** (j - 1) * np.exp(-2 * j ** 2 * x ** 2)))))
+
+
+def offline_change_point(z: np.ndarray) -> Dict:
+    """Most likely single mean shift of a unit-variance series (CUSUM of deviations)"""
+    n = len(z)
+    if n < 3:
+        return {'index': None, 'statistic': 0.0, 'p_value': 1.0}
+    c = np.cumsum(z)
+    bridge = np.abs(c - np.arange(1, n + 1) / n * c[-1])[:-1]
+    idx = int(np.argmax(bridge))
+    stat = float(bridge[idx] / math.sqrt(n))
+    before, after = z[:idx + 1], z[idx + 1:]
+    return {'index': idx + 1, 'statistic': stat, 'p_value': kolmogorov_sf(stat),
+            'mean_before': float(before.mean()), 'mean_after': float(after.mean())}
+
+
+def _lgamma(z: np.ndarray) -> np.ndarray:
+    """log Gamma(z) by the Stirling series; accurate to ~1e-13 for z >= 10"""
+    z = np.asarray(z, dtype=np.float64)
+    inv = 1 / z
+    inv2 = inv * inv
+    return ((z - 0.5) * np.log(z) - z + 0.5 * math.log(2 * math.pi)
+            + inv * (1 / 12 - inv2 * (1 / 360 - inv2 * (1 / 1260 - inv2 / 1680))))
+
+
+def bocpd(counts: np.ndarray, trials: int, hazard: float = BOCPD_HAZARD,
+          max_run: int = BOCPD_MAX_RUN, prior: float = BOCPD_PRIOR, min_segment: int = 10) -> Dict:
+    """
+    Bayesian online change-point detection for Binomial(trials, p) counts.
+
+    Each run carries a Beta(prior + ones, prior + zeros) posterior. Run lengths
+    are truncated at max_run, and longer runs are merged into the last bucket.
+    Returns the MAP run length after every step and the change points of the
+    MAP segmentation.
+    """
+    if prior < 10:
+        raise ValueError(f"prior must be >= 10 for the Stirling lgamma, got {prior}")
+    counts = np.asarray(counts, dtype=np.int64)
+    n = len(counts)
+    log_choose = (math.lgamma(trials + 1) - np.array([math.lgamma(x + 1) + math.lgamma(trials - x + 1)
+                                                       for x in range(trials + 1)]))
+
+    # Per-run Beta parameters and their log-gammas; the log-gammas computed for the
+    # predictive at step t are exactly the ones the grown runs need at step t+1
+    lg_prior, lg_prior2 = math.lgamma(prior), math.lgamma(2 * prior)
+    a, b = np.array([prior]), np.array([prior])
+    lg_a, lg_b, lg_ab = np.array([lg_prior]), np.array([lg_prior]), np.array([lg_prior2])
+    probs = np.array([1.0])
+    map_run = np.empty(n, dtype=np.int64)
+    recent = np.empty(n)  # P(run length <= 10): a change happened very recently
+    for t, x in enumerate(counts.tolist()):
+        lg_ax, lg_bx, lg_abn = _lgamma(a + x), _lgamma(b + trials - x), _lgamma(a + b + trials)
+        log_pred = log_choose[x] + lg_ax + lg_bx + lg_ab - lg_a - lg_b - lg_abn
+        pred = np.exp(log_pred - log_pred.max())
+        growth = probs * pred * (1 - hazard)
+        probs = np.concatenate(([np.sum(probs * pred) * hazard], growth))
+        a = np.concatenate(([prior], a + x))
+        b = np.concatenate(([prior], b + trials - x))
+        lg_a = np.concatenate(([lg_prior], lg_ax))
+        lg_b = np.concatenate(([lg_prior], lg_bx))
+        lg_ab = np.concatenate(([lg_prior2], lg_abn))
+        if len(probs) > max_run + 1:
+            probs[max_run] += probs[max_run + 1]
+            probs, a, b = probs[:max_run + 1], a[:max_run + 1], b[:max_run + 1]
+            lg_a, lg_b, lg_ab = lg_a[:max_run + 1], lg_b[:max_run + 1], lg_ab[:max_run + 1]
+        probs /= probs.sum()
+        map_run[t] = int(np.argmax(probs))
+        recent[t] = float(probs[:11].sum())
+
+    # Segmentation by backtracking the MAP run lengths from the last step. Truncated runs
+    # only say "at least max_run"; segments shorter than min_segment are not reported
+    change_points = []
+    t = n - 1
+    while t > 0:
+        r = int(map_run[t])
+        if r >= max_run:
+            t -= max_run
+            continue
+        start = t - r
+        if start > 0 and r + 1 >= min_segment:
+            change_points.append(start)
+        t = start - 1
+    change_points.reverse()
+    return {'map_run_length': map_run, 'recent_change_probability': recent, 'change_points': change_points}
+
+# ==================== ANALYSIS ====================
+
+def _decimate_indices(series: List[np.ndarray], max_points: int) -> np.ndarray:
+    """Indices keeping the bucket min and max of every series (minmax_decimate), about max_points in all"""
+    n = len(series[0])
+    budget = max(2, max_points // len(series))
+    return np.unique(np.concatenate([minmax_decimate(np.arange(n), values, budget)[0] for values in series]))
+
+
+def analyze_timeline(epochs: np.ndarray, seed_bytes: np.ndarray, window: int = DEFAULT_WINDOW,
+                     max_points: int = MAX_POINTS, bocpd_max_steps: int = BOCPD_MAX_STEPS) -> Dict:
+    """
+    Rolling metrics and change points along the epoch timeline.
+
+    Window series are min/max decimated to about max_points values, so their
+    extremes survive. BOCPD
+    runs on blocks of consecutive epochs (counts summed) when the log has
+    more than bocpd_max_steps epochs.
+    """
+    n = len(epochs)
+    window = max(2, min(window, n // 2))
+    series = epoch_series(seed_bytes)
+    rolling = rolling_metrics(seed_bytes, series, window)
+    n_windows = n - window + 1
+    window_end = np.asarray(epochs)[window - 1:]
+    keep = _decimate_indices(list(rolling.values()), max_points)
+
+    # Per-epoch series aligned to epochs (hamming starts at the second epoch)
+    aligned = {'ones': (series['ones'], np.asarray(epochs)),
+               'hamming': (series['hamming'], np.asarray(epochs)[1:]),
+               'transitions': (series['transitions'], np.asarray(epochs))}
+
+    change_points = {}
+    block = max(1, -(-n // bocpd_max_steps))
+    for name, (counts, ep) in aligned.items():
+        trials = SERIES_TRIALS[name]
+        z = standardize(counts, trials)
+        alarms = cusum(z)
+        for alarm in alarms:
+            alarm['change_epoch'] = int(ep[alarm['change_index']])
+            alarm['alarm_epoch'] = int(ep[alarm['alarm_index']])
+            alarm['end_epoch'] = int(ep[alarm['end_index']]) if alarm['end_index'] is not None else None
+        offline = offline_change_point(z)
+        if offline['index'] is not None:
+            offline['epoch'] = int(ep[offline['index']])
+
+        n_blocks = len(counts) // block
+        blocked = counts[:n_blocks * block].reshape(n_blocks, block).sum(axis=1)
+        bayes = bocpd(blocked, trials * block)
+        recent_epochs, recent = minmax_decimate(ep[:n_blocks * block:block], bayes['recent_change_probability'],
+                                                max_points)
+        change_points[name] = {
+            'cusum': alarms,
+            'offline': offline,
+            'bocpd': {
+                'block_epochs': block,
+                'change_epochs': [int(ep[i * block]) for i in bayes['change_points']],
+                'recent_change_epochs': recent_epochs.tolist(),
+                'recent_change_probability': recent.tolist(),
+            },
+        }
+
+    return {
+        'window': window,
+        'n_windows': n_windows,
+        'n_points': len(keep),
+        'window_end_epoch': window_end[keep].tolist(),
+        'rolling': {name: values[keep].tolist() for name, values in rolling.items()},
+        'extremes': {
+            'max_abs_bias_z': float(np.max(np.abs(rolling['bias_z']))),
+            'max_position_z': float(rolling['max_position_z'].max()),
+            'min_serial_p_value': float(rolling['serial_p_value'].min()),
+            'min_entropy': float(rolling['entropy'].min()),
+        },
+        'change_points': change_points,
+    }
+
+
+def change_epochs(result: Dict, offline_alpha: float = 0.01) -> Dict[str, List[int]]:
+    """Epochs flagged per series: CUSUM change starts and significant offline shifts"""
+    flagged = {}
+    for name, cp in result.get('change_points', {}).items():
+        epochs = [a['change_epoch'] for a in cp['cusum']]
+        offline: Optional[Dict] = cp.get('offline')
+        if offline and offline.get('epoch') is not None and offline['p_value'] < offline_alpha:
+            epochs.append(offline['epoch'])
+        if epochs:
+            flagged[name] = sorted(set(epochs))
+    return flagged